@@ -1,12 +1,28 @@
 """Flask application factory for KeystoneBid."""
 
+import threading
+import time
+from contextlib import contextmanager
 from importlib import import_module
-from typing import Optional
+from typing import Iterator, Optional
 
 from flask import Flask
 from werkzeug.middleware.proxy_fix import ProxyFix
 
-from app.extensions import bcrypt, db, limiter, login_manager, mail, migrate, oauth
+from app.cli import register_commands
+from app.extensions import (
+    bcrypt,
+    db,
+    fragment_cache,
+    limiter,
+    login_manager,
+    mail,
+    migrate,
+    oauth,
+    query_detector,
+    request_metrics,
+)
+from app.utils.shm_storage import anchor_uri
 from config import resolve_config_path
 
 BLUEPRINTS = [
@@ -22,6 +38,9 @@ BLUEPRINTS = [
     "admin",
     "api",
 ]
+OAUTH_PROVIDERS = ("google", "apple")
+
+_blueprint_lock = threading.Lock()
 
 
 def create_app(config_object: Optional[str] = None) -> Flask:
@@ -37,32 +56,98 @@ def create_app(config_object: Optional[str] = None) -> Flask:
             x_port=trusted_proxy_count,
         )
 
+    app.extensions["startup_timings"] = []
+
     _register_extensions(app)
-    _configure_oauth(app)
-    _register_blueprints(app)
+    with _timed(app, "configure", "oauth providers"):
+        _configure_oauth(app)
+    if app.config.get("LAZY_BLUEPRINTS"):
+        _defer_blueprints(app)
+    else:
+        register_blueprints(app)
+    register_commands(app)
 
     @app.get("/")
     def home():
         from flask import render_template
+        from sqlalchemy import func, select
+
+        from app.models import Listing
+
+        # Called from inside the cached fragment, so only a cache miss queries.
+        def active_listing_count() -> int:
+            return db.session.scalar(select(func.count()).select_from(Listing).where(Listing.status == "active"))
 
-        return render_template("home.html")
+        return render_template("home.html", active_listing_count=active_listing_count)
 
     return app
 
 
+@contextmanager
+def _timed(app: Flask, phase: str, name: str) -> Iterator[None]:
+    started = time.perf_counter()
+    yield
+    app.extensions["startup_timings"].append((phase, name, time.perf_counter() - started))
+
+
 def _register_extensions(app: Flask) -> None:
-    db.init_app(app)
-    migrate.init_app(app, db)
-    login_manager.init_app(app)
-    bcrypt.init_app(app)
-    mail.init_app(app)
-    limiter.init_app(app)
-    oauth.init_app(app)
+    # Before the limiter reads it, or each worker's working directory would pick the file.
+    app.config["RATELIMIT_STORAGE_URI"] = anchor_uri(app.config["RATELIMIT_STORAGE_URI"], app.instance_path)
+    for name, extension, args in (
+        ("db", db, ()),
+        ("migrate", migrate, (db,)),
+        ("login_manager", login_manager, ()),
+        ("bcrypt", bcrypt, ()),
+        ("mail", mail, ()),
+        ("limiter", limiter, ()),
+        ("oauth", oauth, ()),
+        ("fragment_cache", fragment_cache, ()),
+        ("request_metrics", request_metrics, ()),
+        ("query_detector", query_detector, ()),
+    ):
+        with _timed(app, "init", name):
+            extension.init_app(app, *args)
+
+    from app.models import EducationArticle, Listing, UserStory
+    from app.services import ratings  # noqa: F401  (keeps member ratings in step with reviews)
+
+    fragment_cache.watch({Listing: "listing", EducationArticle: "education", UserStory: "story"})
+    _configure_services(app)
 
     login_manager.login_view = "auth.login"
     login_manager.login_message_category = "info"
 
 
+def _configure_services(app: Flask) -> None:
+    # Here rather than in the blueprints: with LAZY_BLUEPRINTS the CLI never registers
+    # them, and its commands must still see the configured settings.
+    from app.services.badges import badge_engine
+    from app.services.facets import listing_facets
+    from app.services.holdings import holdings_cache
+    from app.services.images import image_pipeline
+    from app.services.passwords import password_hasher
+    from app.services.price_guide import price_guide
+    from app.services.search_index import listing_search
+    from app.services.unread_counts import unread_counts
+    from app.services.user_cache import user_cache
+    from app.services.view_counter import view_counter
+
+    for name, configure in (
+        ("badge_engine", badge_engine.init_app),
+        ("holdings_cache", holdings_cache.configure),
+        ("image_pipeline", image_pipeline.init_app),
+        ("listing_facets", listing_facets.configure),
+        ("listing_search", listing_search.configure),
+        ("password_hasher", password_hasher.configure),
+        ("price_guide", price_guide.configure),
+        ("unread_counts", unread_counts.configure),
+        ("user_cache", user_cache.configure),
+        ("view_counter", view_counter.init_app),
+    ):
+        with _timed(app, "init", name):
+            configure(app)
+
+
 def _configure_oauth(app: Flask) -> None:
     google_client_id = app.config.get("OAUTH_GOOGLE_CLIENT_ID")
     google_client_secret = app.config.get("OAUTH_GOOGLE_CLIENT_SECRET")
@@ -86,15 +171,43 @@ def _configure_oauth(app: Flask) -> None:
             client_kwargs={"scope": "openid email name", "response_mode": "form_post"},
         )
 
+    # Resolved once here so templates never have to ask Authlib per render.
+    app.extensions["oauth_providers"] = {name: oauth.create_client(name) is not None for name in OAUTH_PROVIDERS}
+
+
+def register_blueprints(app: Flask) -> None:
+    """Import and register every blueprint once; later calls are no-ops."""
+    if app.extensions.get("blueprints_loaded"):
+        return
+    with _blueprint_lock:
+        if app.extensions.get("blueprints_loaded"):
+            return
+        for blueprint_name in BLUEPRINTS:
+            with _timed(app, "import", f"blueprint:{blueprint_name}"):
+                module = import_module(f"app.blueprints.{blueprint_name}.routes")
+            with _timed(app, "register", f"blueprint:{blueprint_name}"):
+                app.register_blueprint(module.bp)
+        app.extensions["blueprints_loaded"] = True
+
+
+def _defer_blueprints(app: Flask) -> None:
+    # CLI and background processes usually never serve a request, so they skip
+    # the blueprint imports entirely. A process that does serve one loads them
+    # just before its first request is dispatched.
+    inner = app.wsgi_app
+
+    def load_then_dispatch(environ, start_response):
+        register_blueprints(app)
+        app.wsgi_app = inner  # type: ignore[method-assign]
+        return inner(environ, start_response)
 
-def _register_blueprints(app: Flask) -> None:
-    for blueprint_name in BLUEPRINTS:
-        module = import_module(f"app.blueprints.{blueprint_name}.routes")
-        app.register_blueprint(module.bp)
+    app.wsgi_app = load_then_dispatch  # type: ignore[method-assign]
 
 
 @login_manager.user_loader
 def load_user(user_id: str):
-    from app.models.user import User
+    from app.services.user_cache import user_cache
 
-    return User.query.get(int(user_id))
+    if not user_id.isdigit():
+        return None
+    return user_cache.get(int(user_id))
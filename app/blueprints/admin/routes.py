@@ -1,8 +1,38 @@
-from flask import Blueprint, render_template
+import hmac
+
+from flask import Blueprint, Response, abort, current_app, render_template, request
+from flask_login import current_user
+
+from app.extensions import request_metrics
 
 bp = Blueprint("admin", __name__, url_prefix="/admin")
 
 
+def _require_admin() -> None:
+    if not (current_user.is_authenticated and current_user.is_admin):
+        abort(403)
+
+
 @bp.get("/")
 def index():
     return render_template("admin/index.html")
+
+
+@bp.get("/metrics")
+def metrics():
+    _require_admin()
+    return render_template(
+        "admin/metrics.html",
+        endpoints=request_metrics.snapshot(),
+        slow_queries=request_metrics.slow_queries(),
+        metrics=request_metrics,
+    )
+
+
+@bp.get("/metrics/prometheus")
+def prometheus():
+    token = current_app.config.get("METRICS_TOKEN")
+    supplied = request.headers.get("Authorization", "").removeprefix("Bearer ").strip()
+    if not (token and supplied and hmac.compare_digest(supplied, token)):
+        _require_admin()
+    return Response(request_metrics.prometheus(), mimetype="text/plain; version=0.0.4")
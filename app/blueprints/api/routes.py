@@ -1,8 +1,159 @@
-from flask import Blueprint, render_template
+from flask import Blueprint, abort, current_app, jsonify, make_response, render_template, request, url_for
+from flask_login import current_user, login_required
+
+from app.extensions import db
+from app.models import Bid, Listing, Notification
+from app.services.facets import listing_facets, parse_filters
+from app.services.feeds import active_listings, bid_history, notification_feed
+from app.services.price_guide import price_guide
+from app.services.unread_counts import mark_all_read, unread_counts
+from app.services.watchlist import add_to_watchlist, ending_soon, remove_from_watchlist
+from app.utils.pagination import InvalidCursor, Page
 
 bp = Blueprint("api", __name__, url_prefix="/api")
 
 
+@bp.errorhandler(InvalidCursor)
+def invalid_cursor(exc: InvalidCursor):
+    return jsonify({"ok": False, "error": exc.description}), 400
+
+
+def _limit() -> int:
+    limit = request.args.get("limit", type=int) or current_app.config["PAGE_SIZE"]
+    return max(1, min(limit, current_app.config["API_MAX_PAGE_SIZE"]))
+
+
+def _page_json(page: Page, serialize) -> dict:
+    return {"items": [serialize(item) for item in page.items], "next_cursor": page.next_cursor}
+
+
+def _listing_json(listing: Listing) -> dict:
+    return {
+        "id": listing.id,
+        "title": listing.title,
+        "license_year": listing.license_year,
+        "county": listing.county,
+        "current_bid": str(listing.current_bid or listing.starting_price),
+        "bid_count": listing.bid_count,
+        "auction_end": listing.auction_end.isoformat() + "Z" if listing.auction_end else None,
+        "url": url_for("listings.detail", listing_id=listing.id),
+    }
+
+
+def _bid_json(bid: Bid) -> dict:
+    return {"id": bid.id, "amount": str(bid.amount), "is_auto": bid.is_auto, "placed_at": bid.placed_at.isoformat() + "Z"}
+
+
+def _notification_json(notification: Notification) -> dict:
+    return {
+        "id": notification.id,
+        "type": notification.type,
+        "message": notification.message,
+        "link": notification.link,
+        "is_read": notification.is_read,
+        "created_at": notification.created_at.isoformat() + "Z",
+    }
+
+
 @bp.get("/")
 def index():
     return render_template("api/index.html")
+
+
+@bp.get("/facets")
+def facets():
+    filters = parse_filters(request.args)
+    counts = listing_facets.counts(filters)
+    return jsonify(
+        {
+            "total": len(listing_facets.matching(filters)),
+            "facets": {field: {str(value): count for value, count in values.items()} for field, values in counts.items()},
+        }
+    )
+
+
+@bp.get("/price-guide")
+def price_guide_lookup():
+    license_year = request.args.get("license_year", type=int)
+    fields = {name: (request.args.get(name) or "").strip() for name in ("county", "license_type", "condition_grade")}
+    if license_year is None or not all(fields.values()):
+        return jsonify({"ok": False, "error": "license_year, county, license_type and condition_grade are required"}), 400
+    stats = price_guide.lookup(license_year, fields["county"], fields["license_type"], fields["condition_grade"])
+    if stats is None:
+        return jsonify({"ok": False, "error": "no completed sales for that combination"}), 404
+    return jsonify(
+        {
+            "license_year": license_year,
+            **fields,
+            "count": stats.count,
+            "mean": str(stats.mean),
+            "median": str(stats.median),
+            "min": str(stats.low),
+            "max": str(stats.high),
+        }
+    )
+
+
+@bp.get("/listings")
+def listings():
+    return jsonify(_page_json(active_listings(request.args.get("after"), _limit()), _listing_json))
+
+
+@bp.get("/listings/<int:listing_id>/bids")
+def listing_bids(listing_id: int):
+    listing = db.session.get(Listing, listing_id)
+    if listing is None or listing.status == "draft":
+        abort(404)
+    return jsonify(_page_json(bid_history(listing.id, request.args.get("after"), _limit()), _bid_json))
+
+
+@bp.get("/notifications")
+@login_required
+def notifications():
+    return jsonify(_page_json(notification_feed(current_user.id, request.args.get("after"), _limit()), _notification_json))
+
+
+@bp.get("/notifications/unread")
+@login_required
+def unread_notifications():
+    return jsonify({"unread": unread_counts.get(current_user.id)})
+
+
+@bp.post("/notifications/mark-all-read")
+@login_required
+def mark_all_notifications_read():
+    marked = mark_all_read(current_user.id)
+    return jsonify({"ok": True, "marked": marked, "unread": 0})
+
+
+def _listing_ids() -> list[int]:
+    payload = request.get_json(silent=True) or {}
+    listing_ids = payload.get("listing_ids")
+    if not isinstance(listing_ids, list) or not all(type(value) is int for value in listing_ids):
+        abort(make_response(jsonify({"ok": False, "error": "listing_ids must be a list of integers"}), 400))
+    bulk_limit = current_app.config["WATCHLIST_BULK_LIMIT"]
+    if len(listing_ids) > bulk_limit:
+        abort(make_response(jsonify({"ok": False, "error": f"at most {bulk_limit} listings per request"}), 400))
+    return listing_ids
+
+
+@bp.get("/watchlist/ending-soon")
+@login_required
+def watchlist_ending_soon():
+    return jsonify({"items": [_listing_json(listing) for listing in ending_soon(current_user.id, _limit())]})
+
+
+@bp.post("/watchlist/add")
+@login_required
+def watchlist_add():
+    change = add_to_watchlist(current_user.id, _listing_ids())
+    db.session.commit()
+    return jsonify({"ok": True, "added": change.added, "existing": change.existing, "unavailable": change.unavailable})
+
+
+@bp.post("/watchlist/remove")
+@login_required
+def watchlist_remove():
+    removed = remove_from_watchlist(current_user.id, _listing_ids())
+    db.session.commit()
+    return jsonify({"ok": True, "removed": removed})
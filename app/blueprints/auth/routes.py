@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-import re
 import secrets
 from datetime import datetime, timezone
 
@@ -8,8 +7,10 @@ from flask import Blueprint, current_app, flash, redirect, render_template, requ
 from flask_login import current_user, login_required, login_user, logout_user
 from sqlalchemy import func
 
-from app.extensions import bcrypt, db, limiter, oauth
+from app.extensions import db, limiter, oauth
 from app.models import User
+from app.services.accounts import UNUSABLE_PASSWORD_PREFIX, claim_username
+from app.services.passwords import HasherBusyError, password_hasher
 
 bp = Blueprint("auth", __name__, url_prefix="/auth")
 
@@ -18,8 +19,7 @@ bp = Blueprint("auth", __name__, url_prefix="/auth")
 def index():
     return render_template(
         "auth/index.html",
-        google_enabled=bool(oauth.create_client("google")),
-        apple_enabled=bool(oauth.create_client("apple")),
+        **_provider_flags(),
     )
 
 
@@ -43,8 +43,7 @@ def register():
                 "auth/register.html",
                 full_name=full_name,
                 email=email,
-                google_enabled=bool(oauth.create_client("google")),
-                apple_enabled=bool(oauth.create_client("apple")),
+                **_provider_flags(),
             )
 
         if User.query.filter(func.lower(User.email) == email).first():
@@ -53,19 +52,30 @@ def register():
                 "auth/register.html",
                 full_name=full_name,
                 email=email,
-                google_enabled=bool(oauth.create_client("google")),
-                apple_enabled=bool(oauth.create_client("apple")),
+                **_provider_flags(),
+            )
+
+        try:
+            password_hash = password_hasher.hash(password)
+        except HasherBusyError as exc:
+            flash(str(exc), "error")
+            return (
+                render_template(
+                    "auth/register.html",
+                    full_name=full_name,
+                    email=email,
+                    **_provider_flags(),
+                ),
+                503,
             )
 
         user = User(
-            username=_build_unique_username(full_name or email.split("@")[0]),
             email=email,
+            password_hash=password_hash,
             display_name=full_name,
             is_verified=False,
         )
-        user.set_password(password, bcrypt)
-
-        db.session.add(user)
+        claim_username(user, full_name or email.split("@")[0])
         db.session.commit()
 
         login_user(user, remember=True)
@@ -74,8 +84,7 @@ def register():
 
     return render_template(
         "auth/register.html",
-        google_enabled=bool(oauth.create_client("google")),
-        apple_enabled=bool(oauth.create_client("apple")),
+        **_provider_flags(),
     )
 
 
@@ -91,13 +100,25 @@ def login():
         remember_me = request.form.get("remember_me") == "on"
 
         user = User.query.filter(func.lower(User.email) == email).first()
-        if not user or not user.check_password(password, bcrypt):
+        try:
+            authenticated = bool(user) and password_hasher.verify_and_update(user, password)
+        except HasherBusyError as exc:
+            flash(str(exc), "error")
+            return (
+                render_template(
+                    "auth/login.html",
+                    email=email,
+                    **_provider_flags(),
+                ),
+                503,
+            )
+
+        if not authenticated:
             flash("Invalid email or password.", "error")
             return render_template(
                 "auth/login.html",
                 email=email,
-                google_enabled=bool(oauth.create_client("google")),
-                apple_enabled=bool(oauth.create_client("apple")),
+                **_provider_flags(),
             )
 
         user.last_login = datetime.now(timezone.utc)
@@ -113,8 +134,7 @@ def login():
 
     return render_template(
         "auth/login.html",
-        google_enabled=bool(oauth.create_client("google")),
-        apple_enabled=bool(oauth.create_client("apple")),
+        **_provider_flags(),
     )
 
 
@@ -128,7 +148,7 @@ def logout():
 
 @bp.get("/google")
 def google_start():
-    client = oauth.create_client("google")
+    client = oauth.create_client("google") if _providers()["google"] else None
     if not client:
         flash("Google login is not configured yet.", "info")
         return redirect(url_for("auth.login"))
@@ -139,7 +159,7 @@ def google_start():
 
 @bp.get("/google/callback")
 def google_callback():
-    client = oauth.create_client("google")
+    client = oauth.create_client("google") if _providers()["google"] else None
     if not client:
         flash("Google login is not configured yet.", "info")
         return redirect(url_for("auth.login"))
@@ -167,7 +187,7 @@ def google_callback():
 
 @bp.get("/apple")
 def apple_start():
-    client = oauth.create_client("apple")
+    client = oauth.create_client("apple") if _providers()["apple"] else None
     if not client:
         flash("Apple login is not configured yet.", "info")
         return redirect(url_for("auth.login"))
@@ -178,7 +198,7 @@ def apple_start():
 
 @bp.route("/apple/callback", methods=["GET", "POST"])
 def apple_callback():
-    client = oauth.create_client("apple")
+    client = oauth.create_client("apple") if _providers()["apple"] else None
     if not client:
         flash("Apple login is not configured yet.", "info")
         return redirect(url_for("auth.login"))
@@ -201,6 +221,14 @@ def apple_callback():
     return redirect(url_for("dashboard.index"))
 
 
+def _providers() -> dict[str, bool]:
+    return current_app.extensions["oauth_providers"]
+
+
+def _provider_flags() -> dict[str, bool]:
+    return {f"{name}_enabled": enabled for name, enabled in _providers().items()}
+
+
 def _validate_registration(full_name: str, email: str, password: str, confirm_password: str) -> list[str]:
     errors: list[str] = []
 
@@ -222,19 +250,6 @@ def _validate_registration(full_name: str, email: str, password: str, confirm_pa
     return errors
 
 
-def _build_unique_username(seed: str) -> str:
-    cleaned = re.sub(r"[^a-z0-9]+", "-", seed.lower()).strip("-")
-    base = cleaned or "collector"
-    candidate = base
-    suffix = 1
-
-    while User.query.filter_by(username=candidate).first():
-        suffix += 1
-        candidate = f"{base}-{suffix}"
-
-    return candidate
-
-
 def _create_or_update_oauth_user(
     provider: str,
     provider_sub: str,
@@ -251,13 +266,13 @@ def _create_or_update_oauth_user(
 
     if not user:
         user = User(
-            username=_build_unique_username(display_name or email.split("@")[0]),
             email=email,
+            # OAuth-only: no bcrypt work, and password sign-in stays refused until one is set.
+            password_hash=UNUSABLE_PASSWORD_PREFIX + secrets.token_urlsafe(40),
             display_name=display_name,
             is_verified=True,
         )
-        user.set_password(secrets.token_urlsafe(40), bcrypt)
-        db.session.add(user)
+        claim_username(user, display_name or email.split("@")[0])
 
     user.oauth_provider = provider
     user.oauth_sub = provider_sub
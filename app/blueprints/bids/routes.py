@@ -1,4 +1,16 @@
-from flask import Blueprint, render_template
+from decimal import InvalidOperation
+
+from flask import Blueprint, Response, abort, current_app, flash, jsonify, redirect, render_template, request, url_for
+from flask_login import current_user, login_required
+
+from app.extensions import db, limiter
+from app.models import Listing
+from app.services.bidding import BidError, place_bid
+from app.services.feeds import bid_history
+from app.services.live import listing_payload, listing_topic, publish_listing_state, snapshot_events, watcher
+from app.services.notifications import notify_bid
+from app.services.watchlist import watched_ids
+from app.utils.broker import BrokerFullError, broker, stream
 
 bp = Blueprint("bids", __name__, url_prefix="/bids")
 
@@ -6,3 +18,122 @@ bp = Blueprint("bids", __name__, url_prefix="/bids")
 @bp.get("/")
 def index():
     return render_template("bids/index.html")
+
+
+@bp.post("/<int:listing_id>")
+@login_required
+@limiter.limit("60 per minute")
+def place(listing_id: int):
+    payload = request.get_json(silent=True) if request.is_json else request.form
+    payload = payload or {}
+
+    try:
+        result = place_bid(
+            listing_id,
+            current_user.id,
+            payload.get("amount"),
+            proxy_max=payload.get("proxy_max"),
+        )
+    except (BidError, InvalidOperation, TypeError) as exc:
+        message = str(exc) if isinstance(exc, BidError) else "Enter a valid bid amount."
+        if request.is_json:
+            return jsonify({"ok": False, "error": message}), 409 if isinstance(exc, BidError) else 400
+        flash(message, "error")
+        return redirect(url_for("bids.index"))
+
+    publish_listing_state(
+        listing_payload(result.listing_id, result.current_bid, result.bid_count, "active", result.auction_end)
+    )
+    try:
+        notify_bid(result)
+        db.session.commit()
+    except Exception:
+        # The bid itself is committed; a failed fan-out must not turn it into an error page.
+        db.session.rollback()
+        current_app.logger.exception("Notification fan-out failed for listing %s", listing_id)
+
+    if request.is_json:
+        return jsonify(
+            {
+                "ok": True,
+                "listing_id": result.listing_id,
+                "bid_id": result.bid_id,
+                "current_bid": str(result.current_bid),
+                "bid_count": result.bid_count,
+                "is_leading": result.is_leading,
+            }
+        )
+
+    if result.is_leading:
+        flash(f"You are the high bidder at ${result.current_bid}.", "success")
+    else:
+        flash(f"You were outbid by an existing maximum bid. Current bid is ${result.current_bid}.", "info")
+    return redirect(url_for("bids.index"))
+
+
+@bp.get("/<int:listing_id>/history")
+def history(listing_id: int):
+    listing = db.session.get(Listing, listing_id)
+    if listing is None or listing.status == "draft":
+        abort(404)
+    page = bid_history(listing.id, request.args.get("after"))
+    return render_template("bids/history.html", listing=listing, page=page)
+
+
+@bp.get("/<int:listing_id>/stream")
+@limiter.exempt
+def listing_stream(listing_id: int):
+    initial = snapshot_events([listing_id], live_only=True)
+    if not initial:
+        listing = db.session.get(Listing, listing_id)
+        if listing is None or listing.status == "draft":
+            abort(404)
+        # 204 tells EventSource not to reconnect: nothing will change any more.
+        return Response(status=204)
+    return _event_stream([listing_id], initial)
+
+
+@bp.get("/watchlist/stream")
+@limiter.exempt
+@login_required
+def watchlist_stream():
+    initial = snapshot_events(watched_ids(current_user.id), live_only=True)
+    if not initial:
+        return Response(status=204)
+    return _event_stream([event.data["listing_id"] for event in initial], initial)
+
+
+def _event_stream(listing_ids: list[int], initial) -> Response:
+    config = current_app.config
+    topics = [listing_topic(listing_id) for listing_id in listing_ids]
+    try:
+        # Each stream holds a worker thread for up to SSE_MAX_STREAM_SECONDS; the
+        # cap keeps enough threads free for ordinary requests.
+        subscription = broker.subscribe(topics, maxsize=config["SSE_QUEUE_SIZE"], limit=config["SSE_MAX_STREAMS"])
+    except BrokerFullError:
+        return Response(
+            "Live updates are busy.", status=503, headers={"Retry-After": str(config["SSE_BUSY_RETRY_SECONDS"])}
+        )
+
+    if config["SSE_WATCHER_ENABLED"]:
+        watcher.ensure_started(current_app._get_current_object())
+    for event in initial:
+        watcher.remember(event.data)
+
+    # The generator runs after the request context is torn down, so it must
+    # not touch the database session; the connection goes back to the pool.
+    body = stream(
+        subscription,
+        initial=initial,
+        heartbeat=config["SSE_HEARTBEAT_SECONDS"],
+        max_seconds=config["SSE_MAX_STREAM_SECONDS"],
+    )
+    response = Response(
+        body,
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+    # A client that disconnects before the body is iterated never runs the
+    # generator's cleanup, so the response unsubscribes on close as well.
+    response.call_on_close(subscription.close)
+    return response
@@ -1,8 +1,29 @@
-from flask import Blueprint, render_template
+from flask import Blueprint, current_app, render_template, request
+from flask_login import current_user, login_required
+
+from app.services.holdings import PENNSYLVANIA_COUNTIES, decades, holdings_cache, want_list
 
 bp = Blueprint("collector", __name__, url_prefix="/collector")
 
 
 @bp.get("/")
 def index():
-    return render_template("collector/index.html")
+    grid = holdings_cache.get(current_user.id) if current_user.is_authenticated else None
+    return render_template("collector/index.html", grid=grid, counties=PENNSYLVANIA_COUNTIES, decades=decades())
+
+
+@bp.get("/want-list")
+@login_required
+def wants():
+    counties = [county for county in request.args.getlist("county") if county]
+    year_from = request.args.get("year_from", type=int)
+    year_to = request.args.get("year_to", type=int)
+    result = want_list(current_user.id, counties, year_from, year_to, limit=current_app.config["PAGE_SIZE"])
+    return render_template(
+        "collector/want_list.html",
+        result=result,
+        counties=PENNSYLVANIA_COUNTIES,
+        selected=set(counties),
+        year_from=year_from,
+        year_to=year_to,
+    )
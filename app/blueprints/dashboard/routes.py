@@ -1,10 +1,32 @@
-from flask import Blueprint, render_template
-from flask_login import login_required
+from flask import Blueprint, current_app, render_template, request
+from flask_login import current_user, login_required
+
+from app.services.feeds import notification_feed
+from app.services.unread_counts import unread_counts
+from app.services.watchlist import ending_soon, watched_ids
 
 bp = Blueprint("dashboard", __name__, url_prefix="/dashboard")
 
 
+@bp.app_context_processor
+def inject_unread_notifications():
+    if not current_user.is_authenticated:
+        return {"unread_notifications": 0}
+    return {"unread_notifications": unread_counts.get(current_user.id)}
+
+
 @bp.get("/")
 @login_required
 def index():
-    return render_template("dashboard/index.html")
+    return render_template(
+        "dashboard/index.html",
+        watching=len(watched_ids(current_user.id)),
+        ending=ending_soon(current_user.id, current_app.config["ENDING_SOON_LIMIT"]),
+    )
+
+
+@bp.get("/notifications")
+@login_required
+def notifications():
+    page = notification_feed(current_user.id, request.args.get("after"))
+    return render_template("dashboard/notifications.html", page=page)
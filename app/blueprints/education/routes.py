@@ -1,8 +1,20 @@
 from flask import Blueprint, render_template
+from sqlalchemy import select
+
+from app.extensions import db
+from app.models import EducationArticle
 
 bp = Blueprint("education", __name__, url_prefix="/education")
 
 
+def published_articles() -> list[EducationArticle]:
+    return db.session.scalars(
+        select(EducationArticle)
+        .where(EducationArticle.is_published.is_(True))
+        .order_by(EducationArticle.published_at.desc(), EducationArticle.id.desc())
+    ).all()
+
+
 @bp.get("/")
 def index():
-    return render_template("education/index.html")
+    return render_template("education/index.html", published_articles=published_articles)
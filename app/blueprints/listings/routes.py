@@ -1,8 +1,92 @@
-from flask import Blueprint, render_template
+from flask import Blueprint, abort, flash, jsonify, redirect, render_template, request, send_from_directory, url_for
+from flask_login import current_user, login_required
+
+from app.extensions import db, limiter
+from app.models import Listing
+from app.services.bidding import minimum_next_bid
+from app.services.feeds import active_listings
+from app.services.images import ImageUploadError, image_pipeline
+from app.services.view_counter import view_counter
+from app.utils.storage import LocalStorage
 
 bp = Blueprint("listings", __name__, url_prefix="/listings")
 
 
 @bp.get("/")
 def index():
-    return render_template("listings/index.html")
+    cursor = request.args.get("after") or None
+    # The template calls this inside its cached fragment, so cache hits skip the query.
+    return render_template("listings/index.html", cursor=cursor, active_listings=lambda: active_listings(cursor, for_cards=True))
+
+
+@bp.get("/<int:listing_id>")
+def detail(listing_id: int):
+    listing = db.session.get(Listing, listing_id)
+    if listing is None or listing.status == "draft":
+        abort(404)
+
+    view_counter.record(listing.id)
+    return render_template(
+        "listings/detail.html",
+        listing=listing,
+        views=listing.views + view_counter.pending(listing.id),
+        minimum_bid=minimum_next_bid(listing.starting_price, listing.current_bid),
+        variant_url=image_pipeline.variant_url,
+    )
+
+
+@bp.post("/<int:listing_id>/images")
+@login_required
+@limiter.limit("30 per minute")
+def upload_images(listing_id: int):
+    listing = db.session.get(Listing, listing_id)
+    if listing is None:
+        abort(404)
+    if listing.seller_id != current_user.id and not current_user.is_admin:
+        abort(403)
+
+    uploads = [upload for upload in request.files.getlist("images") if upload.filename]
+    images, error = [], None
+    try:
+        for upload in uploads:
+            image, _ = image_pipeline.ingest(listing, upload, request.form.get("caption"))
+            images.append(image)
+        db.session.commit()
+    except ImageUploadError as exc:
+        db.session.rollback()
+        images, error = [], str(exc)
+    if not uploads:
+        error = "Choose at least one photo to upload."
+
+    if request.is_json or request.accept_mimetypes.best == "application/json":
+        if error:
+            return jsonify({"ok": False, "error": error}), 400
+        return jsonify(
+            {
+                "ok": True,
+                "images": [
+                    {
+                        "id": image.id,
+                        "url": image.url,
+                        "thumbnail_url": image.thumbnail_url,
+                        "status": image.status,
+                    }
+                    for image in images
+                ],
+            }
+        ), 201
+
+    if error:
+        flash(error, "error")
+    else:
+        flash(f"Uploaded {len(images)} photo{'s' if len(images) != 1 else ''}. Thumbnails appear once processed.", "success")
+    return redirect(url_for("listings.detail", listing_id=listing.id))
+
+
+@bp.get("/media/<path:key>")
+def media(key: str):
+    storage = image_pipeline.storage
+    if not isinstance(storage, LocalStorage):
+        abort(404)
+    # Keys are content hashes, so a stored file never changes.
+    return send_from_directory(storage.root, key, max_age=31536000)
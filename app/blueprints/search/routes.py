@@ -1,8 +1,113 @@
-from flask import Blueprint, render_template
+from itertools import islice
+from typing import Optional
+
+from flask import Blueprint, current_app, render_template, request, url_for
+from sqlalchemy import select
+
+from app.extensions import db
+from app.models import Listing
+from app.services.facets import FACET_FIELDS, listing_facets, parse_filters
+from app.services.search_index import listing_search
+from app.utils.pagination import decode_cursor, encode_cursor
 
 bp = Blueprint("search", __name__, url_prefix="/search")
 
+ERAS = {
+    "1900-1920": (1900, 1920),
+    "1921-1940": (1921, 1940),
+    "1941-1960": (1941, 1960),
+}
+FACET_LABELS = {
+    "county": "County",
+    "license_year": "Year",
+    "license_type": "License type",
+    "condition_grade": "Grade",
+    "listing_type": "Listing type",
+}
+
 
 @bp.get("/")
 def index():
-    return render_template("search/index.html")
+    query = (request.args.get("q") or "").strip()
+    era = request.args.get("era") or ""
+    filters = parse_filters(request.args)
+    if "condition_grade" not in filters and request.args.get("condition"):
+        filters["condition_grade"] = [request.args["condition"]]
+    if era in ERAS and "license_year" not in filters:
+        start, end = ERAS[era]
+        filters["license_year"] = list(range(start, end + 1))
+
+    page_size = current_app.config["SEARCH_PAGE_SIZE"]
+    cursor = request.args.get("after") or None
+    candidates = listing_facets.matching(filters) if filters else None
+    next_cursor = None
+    if query:
+        after = decode_cursor("search", cursor, 2)
+        hits = listing_search.search(query, limit=page_size + 1, candidates=candidates, after=after)
+        if len(hits) > page_size:
+            hits = hits[:page_size]
+            next_cursor = encode_cursor("search", [hits[-1].score, hits[-1].listing_id])
+        ids = [hit.listing_id for hit in hits]
+    elif candidates is not None:
+        # Browsing by facets alone lists the newest matching listings first.
+        after = decode_cursor("browse", cursor, 1)
+        ids = list(islice(candidates.descending(after[0] if after else None), page_size + 1))
+        if len(ids) > page_size:
+            ids = ids[:page_size]
+            next_cursor = encode_cursor("browse", [ids[-1]])
+    else:
+        ids = []
+
+    results: list[Listing] = []
+    if ids:
+        ranks = {listing_id: rank for rank, listing_id in enumerate(ids)}
+        rows = db.session.execute(select(Listing).where(Listing.id.in_(ids))).scalars()
+        results = sorted(rows, key=lambda listing: ranks[listing.id])
+
+    return render_template(
+        "search/index.html",
+        query=query,
+        county=request.args.get("county") or "",
+        era=era,
+        condition=request.args.get("condition") or "",
+        searched=bool(query or filters),
+        results=results,
+        next_url=_next_url(next_cursor),
+        facets=_facet_links(filters),
+    )
+
+
+def _next_url(cursor: Optional[str]) -> Optional[str]:
+    if cursor is None:
+        return None
+    args = request.args.to_dict(flat=False)
+    args["after"] = cursor
+    return url_for("search.index", **args)
+
+
+def _facet_links(filters: dict) -> list[dict]:
+    counts = listing_facets.counts(filters)
+    base = request.args.to_dict(flat=False)
+    # Changing a filter starts over from the first page.
+    base.pop("after", None)
+    sections = []
+    for field in FACET_FIELDS:
+        selected = set(filters.get(field, ()))
+        options = []
+        for value, count in counts[field].items():
+            args = {key: list(values) for key, values in base.items()}
+            current = [item for item in args.get(field, []) if item != str(value)]
+            if value not in selected:
+                current.append(str(value))
+            args[field] = current
+            options.append(
+                {
+                    "value": value,
+                    "count": count,
+                    "selected": value in selected,
+                    "url": url_for("search.index", **args),
+                }
+            )
+        if options:
+            sections.append({"field": field, "label": FACET_LABELS[field], "options": options})
+    return sections
@@ -1,8 +1,20 @@
 from flask import Blueprint, render_template
+from sqlalchemy import select
+
+from app.extensions import db
+from app.models import UserStory
 
 bp = Blueprint("stories", __name__, url_prefix="/stories")
 
 
+def published_stories() -> list[UserStory]:
+    return db.session.scalars(
+        select(UserStory)
+        .where(UserStory.status == "published")
+        .order_by(UserStory.related_year, UserStory.id)
+    ).all()
+
+
 @bp.get("/")
 def index():
-    return render_template("stories/index.html")
+    return render_template("stories/index.html", published_stories=published_stories)
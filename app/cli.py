@@ -0,0 +1,195 @@
+"""Flask CLI commands registered on the application factory."""
+
+import json
+import signal
+import subprocess
+import sys
+import threading
+
+import click
+from flask import Flask, current_app
+from flask.cli import AppGroup
+
+auctions_cli = AppGroup("auctions", help="Auction lifecycle commands.")
+badges_cli = AppGroup("badges", help="Member badge commands.")
+data_cli = AppGroup("data", help="Synthetic data commands.")
+images_cli = AppGroup("images", help="Listing photo commands.")
+price_guide_cli = AppGroup("price-guide", help="Sale price guide commands.")
+ratings_cli = AppGroup("ratings", help="Member rating commands.")
+search_cli = AppGroup("search", help="Listing search index commands.")
+users_cli = AppGroup("users", help="Member account commands.")
+
+
+@auctions_cli.command("close-due")
+def close_due_command() -> None:
+    """Close every active auction whose deadline has passed, then exit."""
+    from app.services.auctions import AuctionScheduler
+
+    scheduler = AuctionScheduler(batch_size=current_app.config["AUCTION_CLOSER_BATCH_SIZE"])
+    scheduler.load()
+    summary = scheduler.run_once()
+    click.echo(f"Closed {len(summary.closed)} auctions ({len(summary.sold)} sold).")
+
+
+@auctions_cli.command("run-closer")
+def run_closer_command() -> None:
+    """Run the deadline-driven auction closer until interrupted."""
+    from app.services.auctions import AuctionScheduler
+
+    scheduler = AuctionScheduler(
+        batch_size=current_app.config["AUCTION_CLOSER_BATCH_SIZE"],
+        refresh_interval=current_app.config["AUCTION_CLOSER_REFRESH_SECONDS"],
+        refresh_lag=current_app.config["AUCTION_CLOSER_REFRESH_LAG_SECONDS"],
+        reload_interval=current_app.config["AUCTION_CLOSER_RELOAD_SECONDS"],
+    )
+    stop = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stop.set())
+
+    click.echo("Auction closer running. Press Ctrl+C to stop.")
+    scheduler.run_forever(
+        stop,
+        on_close=lambda summary: click.echo(f"Closed {len(summary.closed)} auctions ({len(summary.sold)} sold)."),
+    )
+
+
+@badges_cli.command("recompute")
+@click.option("--chunk-size", type=int, default=None, help="Members evaluated per query batch and commit.")
+@click.option("--badge", "slugs", multiple=True, help="Only these badge slugs (repeatable); defaults to every active badge.")
+@click.option("--revoke", is_flag=True, help="Also remove awards the current definitions no longer support.")
+def recompute_badges_command(chunk_size, slugs, revoke: bool) -> None:
+    """Re-check every member against the badge definitions, e.g. after editing them."""
+    from app.services.badges import badge_engine
+
+    summary = badge_engine.recompute(
+        chunk_size=chunk_size or current_app.config["BADGE_RECOMPUTE_CHUNK_SIZE"], slugs=slugs or None, revoke=revoke
+    )
+    click.echo(f"Checked {summary.members} members; awarded {summary.awarded}, revoked {summary.revoked}.")
+
+
+@data_cli.command("generate")
+@click.option("--scale", "scale_name", default="small", show_default=True, help="tiny, small, medium or large.")
+@click.option("--seed", default=0, show_default=True, help="Same seed and scale give the same data.")
+@click.option("--users", type=int, default=None, help="Override the scale's member count.")
+@click.option("--listings", type=int, default=None, help="Override the scale's listing count.")
+@click.option("--bids", type=int, default=None, help="Override the scale's bid count.")
+@click.option("--batch-size", default=5000, show_default=True, help="Rows per bulk insert.")
+@click.option("--force", is_flag=True, help="Allow running against a production profile.")
+def generate_data_command(scale_name: str, seed: int, users, listings, bids, batch_size: int, force: bool) -> None:
+    """Fill the database with seeded synthetic members, listings, bid wars and sales."""
+    from app.services.synthetic import SYNTHETIC_PASSWORD, generate, scale_for
+    from config import CONFIG_MAP
+
+    profile = current_app.config["DEPLOYMENT_PROFILE"].strip().lower()
+    if CONFIG_MAP.get(profile) == "config.ProductionConfig" and not force:
+        raise click.ClickException("Refusing to generate synthetic data for a production profile without --force.")
+    try:
+        scale = scale_for(scale_name, users=users, listings=listings, bids=bids)
+    except ValueError as exc:
+        raise click.BadParameter(str(exc), param_hint="--scale") from exc
+
+    summary = generate(scale, seed=seed, batch_size=batch_size, progress=click.echo)
+    for table, count in summary.counts.items():
+        click.echo(f"{table:<20} {count:>10}")
+    click.echo(f"Generated in {summary.seconds:.1f}s. Members log in with password {SYNTHETIC_PASSWORD!r}.")
+
+
+@images_cli.command("process-pending")
+@click.option("--timeout", default=600, show_default=True, help="Seconds to wait for the renders to finish.")
+def process_pending_images_command(timeout: int) -> None:
+    """Render variants for photos left pending, e.g. by a restart mid-upload."""
+    from app.services.images import image_pipeline
+
+    queued = image_pipeline.process_pending()
+    finished = image_pipeline.wait(timeout)
+    image_pipeline.shutdown()
+    click.echo(f"Queued {queued} photos; {'all written back' if finished else 'timed out waiting'}.")
+
+
+@price_guide_cli.command("rebuild")
+@click.option("--batch-size", default=5000, show_default=True, help="Sales read and entries written per batch.")
+def rebuild_price_guide_command(batch_size: int) -> None:
+    """Recompute the price guide from every completed transaction."""
+    from app.extensions import db
+    from app.services.price_guide import rebuild_price_guide
+
+    summary = rebuild_price_guide(batch_size=batch_size)
+    db.session.commit()
+    click.echo(f"Rebuilt {summary.entries} price guide entries from {summary.sales} completed sales.")
+
+
+@ratings_cli.command("reconcile")
+@click.option("--batch-size", default=1000, show_default=True, help="Members checked and rewritten per statement.")
+def reconcile_ratings_command(batch_size: int) -> None:
+    """Rebuild seller and buyer ratings from the reviews table."""
+    from app.extensions import db
+    from app.services.ratings import reconcile_ratings
+
+    summary = reconcile_ratings(batch_size=batch_size)
+    db.session.commit()
+    click.echo(f"Checked {summary.members} rated members; corrected {summary.corrected}.")
+
+
+@search_cli.command("rebuild-index")
+def rebuild_index_command() -> None:
+    """Rebuild the listing search index from the database and save it to disk."""
+    from app.services.search_index import listing_search
+
+    count = listing_search.rebuild()
+    if listing_search.path:
+        listing_search.save()
+        click.echo(f"Indexed {count} listings into {listing_search.path}.")
+    else:
+        click.echo(f"Indexed {count} listings (SEARCH_INDEX_PATH is not set; nothing saved).")
+
+
+@users_cli.command("import")
+@click.argument("csv_file", type=click.File("r", encoding="utf-8-sig"))
+@click.option("--batch-size", default=500, show_default=True, help="Members inserted per transaction.")
+@click.option("--verified", is_flag=True, help="Mark imported members as verified.")
+def import_users_command(csv_file, batch_size: int, verified: bool) -> None:
+    """Import members from a CSV with an email column and optional name, username, county and password."""
+    from app.services.accounts import import_users
+
+    summary = import_users(csv_file, batch_size=batch_size, verified=verified)
+    click.echo(
+        f"Imported {summary.created} members in {summary.batches} batches "
+        f"({summary.existing} already registered, {summary.invalid} invalid rows)."
+    )
+
+
+@click.command("startup-profile")
+@click.option("--lazy", is_flag=True, help="Profile with LAZY_BLUEPRINTS enabled.")
+@click.option("--config", "config_object", default=None, help="Config object path (defaults to APP_CONFIG/DEPLOYMENT_PROFILE).")
+@click.option("--as-json", is_flag=True, help="Print the raw JSON profile.")
+def startup_profile_command(lazy: bool, config_object, as_json: bool) -> None:
+    """Report cold-start import and init time for each extension and blueprint."""
+    # A fresh interpreter, because everything is already imported in this one.
+    from app.utils import startup
+
+    args = [sys.executable, startup.__file__] + ([config_object] if config_object else []) + (["--lazy"] if lazy else [])
+    result = subprocess.run(args, capture_output=True, text=True, check=False)
+    if result.returncode != 0:
+        raise click.ClickException(result.stderr.strip() or "startup profile failed")
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    if as_json:
+        click.echo(json.dumps(report, indent=2))
+        return
+
+    for row in report["phases"]:
+        click.echo(f"{row['phase']:<9} {row['name']:<36} {row['seconds'] * 1000:8.1f} ms")
+    mode = "lazy" if report["lazy_blueprints"] else "eager"
+    click.echo(f"create_app ({mode} blueprints): {report['create_app_seconds'] * 1000:.1f} ms")
+    click.echo(f"cold start total: {report['total_seconds'] * 1000:.1f} ms")
+
+
+def register_commands(app: Flask) -> None:
+    app.cli.add_command(auctions_cli)
+    app.cli.add_command(badges_cli)
+    app.cli.add_command(data_cli)
+    app.cli.add_command(images_cli)
+    app.cli.add_command(price_guide_cli)
+    app.cli.add_command(ratings_cli)
+    app.cli.add_command(search_cli)
+    app.cli.add_command(users_cli)
+    app.cli.add_command(startup_profile_command)
@@ -9,6 +9,11 @@ from flask_mail import Mail
 from flask_migrate import Migrate
 from flask_sqlalchemy import SQLAlchemy
 
+from app.utils import shm_storage  # noqa: F401 - registers the shm:// limiter storage
+from app.utils.fragment_cache import FragmentCache
+from app.utils.query_detector import QueryDetector
+from app.utils.request_metrics import RequestMetrics
+
 
 db = SQLAlchemy()
 migrate = Migrate()
@@ -17,3 +22,6 @@ bcrypt = Bcrypt()
 mail = Mail()
 limiter = Limiter(key_func=get_remote_address)
 oauth = OAuth()
+fragment_cache = FragmentCache()
+request_metrics = RequestMetrics()
+query_detector = QueryDetector()
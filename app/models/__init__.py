@@ -4,6 +4,7 @@ from app.models.collection import Collection
 from app.models.education import EducationArticle
 from app.models.listing import Listing, ListingImage
 from app.models.notification import Notification
+from app.models.price_guide import PriceGuideEntry
 from app.models.review import Review
 from app.models.story import UserStory
 from app.models.transaction import Transaction
@@ -18,6 +19,7 @@ __all__ = [
     "Listing",
     "ListingImage",
     "Notification",
+    "PriceGuideEntry",
     "Review",
     "Transaction",
     "User",
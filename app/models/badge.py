@@ -24,3 +24,6 @@ class UserBadge(db.Model):
     badge_id = db.Column(db.Integer, db.ForeignKey("badges.id"), nullable=False, index=True)
     earned_at = db.Column(db.DateTime, server_default=db.func.now(), nullable=False)
     is_featured = db.Column(db.Boolean, default=False, nullable=False)
+
+    # Evaluations race across workers and ``flask badges recompute``; awards insert ON CONFLICT DO NOTHING.
+    __table_args__ = (db.UniqueConstraint("user_id", "badge_id", name="uq_user_badges_user_badge"),)
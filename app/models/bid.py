@@ -1,19 +1,32 @@
 from sqlalchemy.orm import relationship
 
 from app.extensions import db
+from app.utils.dates import utcnow
 
 
 class Bid(db.Model):
     __tablename__ = "bids"
 
     id = db.Column(db.Integer, primary_key=True)
-    listing_id = db.Column(db.Integer, db.ForeignKey("listings.id"), nullable=False, index=True)
+    listing_id = db.Column(db.Integer, db.ForeignKey("listings.id"), nullable=False)
     bidder_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False, index=True)
     amount = db.Column(db.Numeric(10, 2), nullable=False)
     proxy_max = db.Column(db.Numeric(10, 2))
     is_auto = db.Column(db.Boolean, default=False, nullable=False)
     is_winning = db.Column(db.Boolean, default=False, nullable=False)
-    placed_at = db.Column(db.DateTime, server_default=db.func.now(), nullable=False)
+    placed_at = db.Column(db.DateTime, default=utcnow, server_default=db.func.now(), nullable=False)
+
+    __table_args__ = (
+        db.Index("ix_bids_listing_placed_at_id", "listing_id", "placed_at", "id"),
+        # At most one winning bid per listing, so this stays tiny.
+        db.Index(
+            "ix_bids_winning_listing",
+            "listing_id",
+            # Same expression the queries use, so both planners can match it.
+            postgresql_where=is_winning.is_(True),
+            sqlite_where=is_winning.is_(True),
+        ),
+    )
 
     listing = relationship("Listing", back_populates="bids")
     bidder = relationship("User", back_populates="bids")
@@ -1,6 +1,7 @@
 from sqlalchemy.orm import relationship
 
 from app.extensions import db
+from app.utils.dates import utcnow
 
 
 class Listing(db.Model):
@@ -21,14 +22,25 @@ class Listing(db.Model):
     current_bid = db.Column(db.Numeric(10, 2))
     bid_count = db.Column(db.Integer, default=0, nullable=False)
     auction_end = db.Column(db.DateTime)
-    status = db.Column(db.String(20), default="draft", nullable=False, index=True)
+    status = db.Column(db.String(20), default="draft", nullable=False)
     views = db.Column(db.Integer, default=0, nullable=False)
     featured = db.Column(db.Boolean, default=False, nullable=False)
     condition_notes = db.Column(db.Text)
     provenance = db.Column(db.Text)
     shipping_notes = db.Column(db.Text)
-    created_at = db.Column(db.DateTime, server_default=db.func.now(), nullable=False)
-    updated_at = db.Column(db.DateTime, server_default=db.func.now(), onupdate=db.func.now(), nullable=False)
+    # Set in Python too, so the stored format matches bound cursor values on SQLite.
+    created_at = db.Column(db.DateTime, default=utcnow, server_default=db.func.now(), nullable=False)
+    # Indexed for the incremental refresh of the search index, facets and closer. Set in Python
+    # for microsecond precision: SQLite's now() stores whole seconds, and those compare below a
+    # bound watermark from the same second, so rows written in that second were never re-read.
+    updated_at = db.Column(
+        db.DateTime, default=utcnow, onupdate=utcnow, server_default=db.func.now(), nullable=False, index=True
+    )
+
+    __table_args__ = (
+        db.Index("ix_listings_status_created_at_id", "status", "created_at", "id"),
+        db.Index("ix_listings_status_auction_end", "status", "auction_end"),
+    )
 
     seller = relationship("User", back_populates="listings")
     images = relationship("ListingImage", back_populates="listing", cascade="all, delete-orphan")
@@ -42,7 +54,10 @@ class ListingImage(db.Model):
     listing_id = db.Column(db.Integer, db.ForeignKey("listings.id"), nullable=False, index=True)
     s3_key = db.Column(db.String(500), nullable=False)
     url = db.Column(db.String(1000), nullable=False)
-    thumbnail_url = db.Column(db.String(1000), nullable=False)
+    # Filled in by the image pipeline once the variants are rendered.
+    thumbnail_url = db.Column(db.String(1000))
+    content_hash = db.Column(db.String(64), index=True)
+    status = db.Column(db.String(10), server_default="ready", nullable=False)
     sort_order = db.Column(db.SmallInteger, default=0, nullable=False)
     caption = db.Column(db.String(300))
     uploaded_at = db.Column(db.DateTime, server_default=db.func.now(), nullable=False)
@@ -1,13 +1,19 @@
 from app.extensions import db
+from app.utils.dates import utcnow
 
 
 class Notification(db.Model):
     __tablename__ = "notifications"
 
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False, index=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
     type = db.Column(db.String(50), nullable=False, index=True)
     message = db.Column(db.Text, nullable=False)
     link = db.Column(db.String(500))
     is_read = db.Column(db.Boolean, default=False, nullable=False)
-    created_at = db.Column(db.DateTime, server_default=db.func.now(), nullable=False)
+    created_at = db.Column(db.DateTime, default=utcnow, server_default=db.func.now(), nullable=False)
+
+    __table_args__ = (
+        db.Index("ix_notifications_user_created_at_id", "user_id", "created_at", "id"),
+        db.Index("ix_notifications_user_is_read_created_at", "user_id", "is_read", "created_at"),
+    )
@@ -0,0 +1,30 @@
+from sqlalchemy import JSON
+
+from app.extensions import db
+from app.utils.dates import utcnow
+
+
+# Completed-sale aggregates per year, county, license type and grade, kept by app.services.price_guide.
+class PriceGuideEntry(db.Model):
+    __tablename__ = "price_guide"
+
+    id = db.Column(db.Integer, primary_key=True)
+    license_year = db.Column(db.SmallInteger, nullable=False)
+    county = db.Column(db.String(50), nullable=False)
+    license_type = db.Column(db.String(50), nullable=False)
+    condition_grade = db.Column(db.String(20), nullable=False)
+    sale_count = db.Column(db.Integer, server_default="0", nullable=False)
+    total_amount = db.Column(db.Numeric(12, 2), server_default="0", nullable=False)
+    min_amount = db.Column(db.Numeric(10, 2))
+    max_amount = db.Column(db.Numeric(10, 2))
+    # QuantileSketch.to_dict() of every sale amount, for the median.
+    sketch = db.Column(JSON, nullable=False)
+    # Indexed for the incremental refresh of the in-memory guide; set in Python for the
+    # same reason as Listing.updated_at (whole-second now() on SQLite).
+    updated_at = db.Column(
+        db.DateTime, default=utcnow, onupdate=utcnow, server_default=db.func.now(), nullable=False, index=True
+    )
+
+    __table_args__ = (
+        db.UniqueConstraint("license_year", "county", "license_type", "condition_grade", name="uq_price_guide_key"),
+    )
@@ -20,13 +20,22 @@ class User(UserMixin, db.Model):
     county = db.Column(db.String(50))
     is_verified = db.Column(db.Boolean, default=False, nullable=False)
     is_admin = db.Column(db.Boolean, default=False, nullable=False)
+    # Averages of the running totals below, maintained by app.services.ratings.
     seller_rating = db.Column(db.Numeric(3, 2))
     buyer_rating = db.Column(db.Numeric(3, 2))
+    seller_review_count = db.Column(db.Integer, default=0, server_default="0", nullable=False)
+    seller_rating_total = db.Column(db.Integer, default=0, server_default="0", nullable=False)
+    buyer_review_count = db.Column(db.Integer, default=0, server_default="0", nullable=False)
+    buyer_rating_total = db.Column(db.Integer, default=0, server_default="0", nullable=False)
     notification_prefs = db.Column(JSON)
     stripe_customer_id = db.Column(db.String(100))
     created_at = db.Column(db.DateTime, server_default=db.func.now(), nullable=False)
     last_login = db.Column(db.DateTime)
 
+    # Serves the allocator's ``username LIKE 'base-%'`` prefix scans on Postgres, where the
+    # unique index follows the locale collation and cannot answer a LIKE.
+    __table_args__ = (db.Index("ix_users_username_pattern", "username", postgresql_ops={"username": "text_pattern_ops"}),)
+
     listings = relationship("Listing", back_populates="seller", lazy="dynamic")
     bids = relationship("Bid", back_populates="bidder", lazy="dynamic")
 
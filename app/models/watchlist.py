@@ -5,6 +5,9 @@ class Watchlist(db.Model):
     __tablename__ = "watchlist"
 
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False, index=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
     listing_id = db.Column(db.Integer, db.ForeignKey("listings.id"), nullable=False, index=True)
     added_at = db.Column(db.DateTime, server_default=db.func.now(), nullable=False)
+
+    # Unique, so a listing is watched once; also covers reading a member's watched ids.
+    __table_args__ = (db.Index("ix_watchlist_user_listing", "user_id", "listing_id", unique=True),)
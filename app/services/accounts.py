@@ -0,0 +1,201 @@
+"""Username allocation and bulk account import.
+
+Usernames are ``<base>`` or ``<base>-<n>``. Every name taken for a base is
+read with one escaped prefix match (``username = base OR username LIKE
+'base-%'``), which unlike a ``BETWEEN`` range does not depend on the database
+collation and is served by the ``text_pattern_ops`` index on Postgres. The
+lowest free suffix is picked in Python. Two registrations racing for the same
+name are settled by the unique constraint: the loser retries from a savepoint.
+"""
+
+from __future__ import annotations
+
+import csv
+import re
+import secrets
+from dataclasses import dataclass
+from typing import Iterable, Iterator, Optional, TextIO
+
+from sqlalchemy import func, insert, or_, select
+from sqlalchemy.exc import IntegrityError
+
+from app.extensions import db
+from app.models import User
+from app.services.passwords import password_hasher
+
+DEFAULT_BASE = "collector"
+MAX_CLAIM_ATTEMPTS = 5
+# Never a valid bcrypt hash, so password sign-in is refused until the
+# member sets a password or signs in through OAuth.
+UNUSABLE_PASSWORD_PREFIX = "!"
+
+
+def username_base(seed: str) -> str:
+    cleaned = re.sub(r"[^a-z0-9]+", "-", (seed or "").lower()).strip("-")
+    return cleaned[:70] or DEFAULT_BASE
+
+
+def _suffix(base: str, username: str) -> Optional[int]:
+    if username == base:
+        return 1
+    remainder = username[len(base) + 1 :]
+    return int(remainder) if remainder.isdigit() and not remainder.startswith("0") else None
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+class UsernameAllocator:
+    """Hands out unique usernames, reading each base's taken names once."""
+
+    def __init__(self) -> None:
+        self._taken: dict[str, set[int]] = {}
+
+    def reset(self) -> None:
+        self._taken.clear()
+
+    def load(self, bases: Iterable[str]) -> None:
+        missing = sorted(set(bases) - self._taken.keys())
+        if not missing:
+            return
+        for base in missing:
+            self._taken[base] = set()
+        prefixes = [
+            or_(User.username == base, User.username.like(f"{_escape_like(base)}-%", escape="\\")) for base in missing
+        ]
+        usernames = db.session.execute(select(User.username).where(or_(*prefixes))).scalars()
+        wanted = set(missing)
+        for username in usernames:
+            base, _, _ = username.rpartition("-")
+            for candidate in (username, base):
+                if candidate in wanted:
+                    suffix = _suffix(candidate, username)
+                    if suffix is not None:
+                        self._taken[candidate].add(suffix)
+
+    def allocate(self, seed: str) -> str:
+        base = username_base(seed)
+        self.load([base])
+        taken = self._taken[base]
+        suffix = 1
+        while suffix in taken:
+            suffix += 1
+        taken.add(suffix)
+        return base if suffix == 1 else f"{base}-{suffix}"
+
+
+def claim_username(user: User, seed: str) -> User:
+    """Give ``user`` a unique username and flush it; the caller commits."""
+    allocator = UsernameAllocator()
+    attempt = 1
+    while True:
+        user.username = allocator.allocate(seed)
+        try:
+            with db.session.begin_nested():
+                db.session.add(user)
+            return user
+        except IntegrityError:
+            taken = db.session.scalar(select(func.count()).select_from(User).where(User.username == user.username))
+            if not taken or attempt == MAX_CLAIM_ATTEMPTS:
+                raise
+            # Another registration took the name between our read and insert.
+            allocator.reset()
+            attempt += 1
+
+
+@dataclass
+class ImportSummary:
+    created: int = 0
+    existing: int = 0
+    invalid: int = 0
+    batches: int = 0
+
+
+def _rows(stream: TextIO) -> Iterator[dict]:
+    for row in csv.DictReader(stream):
+        yield {key.strip().lower(): (value or "").strip() for key, value in row.items() if key}
+
+
+def _prepare(row: dict) -> Optional[dict]:
+    email = row.get("email", "").lower()
+    if "@" not in email or "." not in email.split("@")[-1]:
+        return None
+    name = row.get("display_name") or row.get("full_name") or row.get("name") or ""
+    if row.get("password_hash", "").startswith("$2"):
+        password_hash = row["password_hash"]
+    elif row.get("password"):
+        password_hash = password_hasher.hash(row["password"])
+    else:
+        password_hash = UNUSABLE_PASSWORD_PREFIX + secrets.token_urlsafe(16)
+    return {
+        "seed": row.get("username") or name or email.split("@")[0],
+        "email": email,
+        "display_name": name or None,
+        "county": row.get("county") or None,
+        "password_hash": password_hash,
+    }
+
+
+def import_users(stream: TextIO, batch_size: int = 500, verified: bool = False) -> ImportSummary:
+    summary = ImportSummary()
+    allocator = UsernameAllocator()
+    seen: set[str] = set()
+    batch: list[dict] = []
+
+    def flush() -> None:
+        if batch:
+            _import_batch(batch, allocator, verified, summary)
+            batch.clear()
+
+    for row in _rows(stream):
+        prepared = _prepare(row)
+        if prepared is None:
+            summary.invalid += 1
+            continue
+        if prepared["email"] in seen:
+            summary.existing += 1
+            continue
+        seen.add(prepared["email"])
+        batch.append(prepared)
+        if len(batch) >= batch_size:
+            flush()
+    flush()
+    return summary
+
+
+def _import_batch(batch: list[dict], allocator: UsernameAllocator, verified: bool, summary: ImportSummary) -> None:
+    emails = [row["email"] for row in batch]
+    for attempt in range(MAX_CLAIM_ATTEMPTS):
+        existing = set(db.session.execute(select(func.lower(User.email)).where(func.lower(User.email).in_(emails))).scalars())
+        fresh = [row for row in batch if row["email"] not in existing]
+        if not fresh:
+            db.session.rollback()
+            break
+
+        allocator.load(username_base(row["seed"]) for row in fresh)
+        values = [
+            {
+                "username": allocator.allocate(row["seed"]),
+                "email": row["email"],
+                "display_name": row["display_name"],
+                "county": row["county"],
+                "password_hash": row["password_hash"],
+                "is_verified": verified,
+            }
+            for row in fresh
+        ]
+        try:
+            db.session.execute(insert(User), values)
+            db.session.commit()
+            break
+        except IntegrityError:
+            # A concurrent sign-up took one of the names or emails; reload and retry.
+            db.session.rollback()
+            allocator.reset()
+            if attempt == MAX_CLAIM_ATTEMPTS - 1:
+                raise
+
+    summary.existing += len(batch) - len(fresh)
+    summary.created += len(fresh)
+    summary.batches += 1
@@ -0,0 +1,240 @@
+"""Deadline-driven auction closing.
+
+Open ``Listing.auction_end`` deadlines are kept in a min-heap so the closer
+sleeps until the next one is due instead of scanning ``listings``. Changes made
+by other processes (new listings, drafts going live, withdrawn auctions) are
+picked up by a small incremental query on ``updated_at``. A row is stamped
+when its transaction flushes, not when it commits, so a slow transaction can
+commit a stamp older than the watermark: each refresh re-reads ``refresh_lag``
+seconds behind it, and the heap is rebuilt from scratch every
+``reload_interval`` seconds as a backstop. A failed pass is logged and retried
+with backoff rather than stopping the closer.
+
+Closing is idempotent: the status flip is conditional on ``status = 'active'``
+and happens in the same transaction as the ``Transaction`` inserts, so a
+restart simply reloads the heap and closes whatever is overdue.
+"""
+
+from __future__ import annotations
+
+import heapq
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Callable, Iterable, Optional
+
+from flask import current_app
+from sqlalchemy import insert, select, update
+
+from app.extensions import db, fragment_cache
+from app.models import Bid, Listing, Transaction
+from app.services.notifications import notify_closed
+from app.utils.dates import utcnow
+
+logger = logging.getLogger(__name__)
+
+MAX_BACKOFF_SECONDS = 60.0
+
+
+@dataclass
+class CloseSummary:
+    closed: list[int] = field(default_factory=list)
+    sold: list[int] = field(default_factory=list)
+
+    def merge(self, other: "CloseSummary") -> None:
+        self.closed.extend(other.closed)
+        self.sold.extend(other.sold)
+
+
+def close_listings(listing_ids: Iterable[int], now: Optional[datetime] = None) -> CloseSummary:
+    ids = list(listing_ids)
+    summary = CloseSummary()
+    if not ids:
+        return summary
+    now = now or utcnow()
+
+    # Flip status first so the proxy bidding CAS (which requires 'active') can
+    # no longer land a bid on these rows while winners are being read.
+    closed_ids = db.session.execute(
+        update(Listing)
+        .where(Listing.id.in_(ids), Listing.status == "active", Listing.auction_end <= now)
+        .values(status="ended")
+        .returning(Listing.id)
+        .execution_options(synchronize_session=False)
+    ).scalars().all()
+    if not closed_ids:
+        db.session.rollback()
+        return summary
+
+    winners = db.session.execute(
+        select(Bid.listing_id, Bid.bidder_id, Bid.amount, Listing.seller_id, Listing.reserve_price)
+        .join(Listing, Listing.id == Bid.listing_id)
+        .where(Bid.listing_id.in_(closed_ids), Bid.is_winning.is_(True))
+    ).all()
+
+    fee_rate = Decimal(current_app.config.get("PLATFORM_FEE_PERCENT", 10)) / 100
+    transactions = []
+    for winner in winners:
+        if winner.reserve_price is not None and winner.amount < winner.reserve_price:
+            continue
+        transactions.append(
+            {
+                "listing_id": winner.listing_id,
+                "buyer_id": winner.bidder_id,
+                "seller_id": winner.seller_id,
+                "sale_amount": winner.amount,
+                "platform_fee": (Decimal(winner.amount) * fee_rate).quantize(Decimal("0.01")),
+                "status": "pending",
+            }
+        )
+
+    sold_ids = [row["listing_id"] for row in transactions]
+    if sold_ids:
+        db.session.execute(
+            update(Listing)
+            .where(Listing.id.in_(sold_ids))
+            .values(status="sold")
+            .execution_options(synchronize_session=False)
+        )
+        db.session.execute(insert(Transaction), transactions)
+    # Notifications ride in the closing transaction so a crash cannot leave an
+    # auction closed without them, or notified twice after a restart.
+    notify_closed(closed_ids)
+    # The status flips above are Core updates, invisible to the ORM commit hooks.
+    fragment_cache.stage_invalidation("listing")
+    db.session.commit()
+
+    summary.closed.extend(closed_ids)
+    summary.sold.extend(sold_ids)
+    return summary
+
+
+class AuctionScheduler:
+    def __init__(
+        self,
+        batch_size: int = 500,
+        refresh_interval: float = 5.0,
+        refresh_lag: float = 60.0,
+        reload_interval: float = 600.0,
+        clock: Callable[[], datetime] = utcnow,
+    ) -> None:
+        self.batch_size = batch_size
+        self.refresh_interval = refresh_interval
+        self.refresh_lag = refresh_lag
+        self.reload_interval = reload_interval
+        self.clock = clock
+        self._heap: list[tuple[datetime, int]] = []
+        self._deadlines: dict[int, datetime] = {}
+        self._watermark: Optional[datetime] = None
+
+    def __len__(self) -> int:
+        return len(self._deadlines)
+
+    def schedule(self, listing_id: int, auction_end: datetime) -> None:
+        if self._deadlines.get(listing_id) == auction_end:
+            return
+        self._deadlines[listing_id] = auction_end
+        heapq.heappush(self._heap, (auction_end, listing_id))
+
+    def forget(self, listing_id: int) -> None:
+        # Stale heap entries are skipped lazily when they surface.
+        self._deadlines.pop(listing_id, None)
+
+    def next_deadline(self) -> Optional[datetime]:
+        self._discard_stale()
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: datetime) -> list[int]:
+        due: list[int] = []
+        while self._heap and self._heap[0][0] <= now:
+            auction_end, listing_id = heapq.heappop(self._heap)
+            if self._deadlines.get(listing_id) == auction_end:
+                del self._deadlines[listing_id]
+                due.append(listing_id)
+        return due
+
+    def load(self) -> None:
+        self._heap.clear()
+        self._deadlines.clear()
+        self._watermark = None
+        rows = db.session.execute(
+            select(Listing.id, Listing.auction_end, Listing.updated_at).where(
+                Listing.status == "active", Listing.auction_end.is_not(None)
+            )
+        ).all()
+        for row in rows:
+            self.schedule(row.id, row.auction_end)
+            self._advance_watermark(row.updated_at)
+        if self._watermark is None:
+            self._watermark = self.clock()
+        db.session.rollback()
+
+    def refresh(self) -> None:
+        if self._watermark is None:
+            self.load()
+            return
+        since = self._watermark - timedelta(seconds=self.refresh_lag)
+        rows = db.session.execute(
+            select(Listing.id, Listing.status, Listing.auction_end, Listing.updated_at).where(
+                Listing.updated_at >= since
+            )
+        ).all()
+        for row in rows:
+            if row.status == "active" and row.auction_end is not None:
+                self.schedule(row.id, row.auction_end)
+            else:
+                self.forget(row.id)
+            self._advance_watermark(row.updated_at)
+        db.session.rollback()
+
+    def run_once(self, now: Optional[datetime] = None) -> CloseSummary:
+        now = now or self.clock()
+        summary = CloseSummary()
+        due = self.pop_due(now)
+        for start in range(0, len(due), self.batch_size):
+            summary.merge(close_listings(due[start : start + self.batch_size], now=now))
+        return summary
+
+    def run_forever(self, stop: threading.Event, on_close: Optional[Callable[[CloseSummary], None]] = None) -> None:
+        failures = 0
+        next_reload = next_refresh = time.monotonic()
+        while not stop.is_set():
+            try:
+                if time.monotonic() >= next_reload:
+                    self.load()
+                    next_reload = time.monotonic() + self.reload_interval
+                    next_refresh = time.monotonic() + self.refresh_interval
+                elif time.monotonic() >= next_refresh:
+                    self.refresh()
+                    next_refresh = time.monotonic() + self.refresh_interval
+
+                summary = self.run_once()
+                if summary.closed and on_close:
+                    on_close(summary)
+            except Exception:
+                failures += 1
+                delay = min(MAX_BACKOFF_SECONDS, self.refresh_interval * 2 ** (failures - 1))
+                logger.exception("Auction closer pass failed; retrying in %.0fs", delay)
+                db.session.rollback()
+                # Deadlines popped by the failed pass are back in the table; reload them.
+                next_reload = time.monotonic()
+                stop.wait(delay)
+                continue
+            failures = 0
+
+            timeout = max(0.0, min(next_refresh, next_reload) - time.monotonic())
+            deadline = self.next_deadline()
+            if deadline is not None:
+                timeout = min(timeout, max(0.0, (deadline - self.clock()).total_seconds()))
+            stop.wait(timeout)
+
+    def _advance_watermark(self, updated_at: Optional[datetime]) -> None:
+        if updated_at is not None and (self._watermark is None or updated_at > self._watermark):
+            self._watermark = updated_at
+
+    def _discard_stale(self) -> None:
+        while self._heap and self._deadlines.get(self._heap[0][1]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
@@ -0,0 +1,430 @@
+"""Badge awards compiled from ``Badge.criteria`` and driven by model events.
+
+``Badge.criteria`` is a JSON object of metric thresholds, all of which must
+hold, plus optional filters that narrow the rows a metric counts::
+
+    {"counties": 10}                                  ten distinct counties collected
+    {"items": 5, "county": "Allegheny"}               five Allegheny licenses
+    {"years": 20, "year_from": 1913, "year_to": 1940} twenty years from 1913-1940
+    {"sales": 1}                                      a completed sale
+    {"rated_sales": 10, "min_rating": 4}              ten sales reviewed 4+ stars
+    {"reviews_given": 5, "bids": 25}                  both
+
+Each badge is compiled once into a predicate over the metrics it names, and
+each metric belongs to a source: one grouped query over one table for a batch
+of users. A commit touching a source's table (a ``Collection`` insert, a
+``Transaction`` created or changing status, a ``Review``, ``Bid`` or
+``UserStory``) queues ``(source, user)`` events, and only the badges reading
+that source are evaluated, only for those users, with one query per source
+for the whole batch. Events are coalesced and evaluated every
+``BADGE_EVALUATION_SECONDS`` on a background thread (``0`` evaluates right
+after the commit). A unique ``(user_id, badge_id)`` constraint settles two
+evaluations awarding the same badge at once. Awards are never revoked by
+events; ``recompute`` re-checks every member in keyset-paged chunks after badge
+definitions change, and can revoke awards the new definitions no longer
+support.
+"""
+
+from __future__ import annotations
+
+import atexit
+import logging
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Mapping, Optional
+
+from flask import Flask
+from sqlalchemy import ColumnElement, Select, delete, func, inspect, select, tuple_
+
+from app.extensions import db
+from app.models import Badge, Bid, Collection, Review, Transaction, UserBadge, User, UserStory
+from app.services.price_guide import UPSERT_INSERTS
+from app.utils.model_events import register_commit_hook, stage
+
+logger = logging.getLogger(__name__)
+
+HOOK_NAME = "badge_events"
+DEFINITIONS_HOOK_NAME = "badge_definitions"
+
+# (metric name, sorted filter items): the unit a source query computes per user.
+MetricKey = tuple[str, tuple[tuple[str, Any], ...]]
+
+
+class BadgeCriteriaError(ValueError):
+    """Raised when ``Badge.criteria`` names an unknown metric or filter."""
+
+
+@dataclass(frozen=True)
+class Source:
+    name: str
+    user_column: ColumnElement
+    metrics: Mapping[str, Callable[[], ColumnElement]]
+    filters: Mapping[str, Callable[[Any], ColumnElement]]
+    base: Callable[[], Iterable[ColumnElement]] = lambda: ()
+    defaults: Optional[Mapping[str, Any]] = None
+
+    def query(self, user_ids: list[int], metric_names: Iterable[str], filters: tuple) -> Select:
+        names = sorted(set(metric_names))
+        conditions = [self.user_column.in_(user_ids), *self.base()]
+        conditions += [self.filters[key](value) for key, value in filters]
+        return (
+            select(self.user_column, *(self.metrics[name]().label(name) for name in names))
+            .where(*conditions)
+            .group_by(self.user_column)
+        )
+
+
+def _in(column):
+    return lambda value: column.in_(value) if isinstance(value, (list, tuple)) else column == value
+
+
+COLLECTION_FILTERS = {
+    "county": _in(Collection.county),
+    "license_type": _in(Collection.license_type),
+    "year_from": lambda value: Collection.license_year >= value,
+    "year_to": lambda value: Collection.license_year <= value,
+}
+
+SOURCES = {
+    source.name: source
+    for source in (
+        Source(
+            "collection",
+            Collection.user_id,
+            {
+                "items": lambda: func.count(Collection.id),
+                "counties": lambda: func.count(Collection.county.distinct()),
+                "years": lambda: func.count(Collection.license_year.distinct()),
+                "decades": lambda: func.count((Collection.license_year // 10).distinct()),
+            },
+            COLLECTION_FILTERS,
+        ),
+        Source(
+            "sale",
+            Transaction.seller_id,
+            {"sales": lambda: func.count(Transaction.id)},
+            {},
+            base=lambda: (Transaction.status == "completed",),
+        ),
+        Source(
+            "purchase",
+            Transaction.buyer_id,
+            {"purchases": lambda: func.count(Transaction.id)},
+            {},
+            base=lambda: (Transaction.status == "completed",),
+        ),
+        Source("review_given", Review.reviewer_id, {"reviews_given": lambda: func.count(Review.id)}, {}),
+        Source(
+            "review_received",
+            Review.reviewee_id,
+            {"rated_sales": lambda: func.count(Review.id)},
+            {"min_rating": lambda value: Review.rating >= value},
+            base=lambda: (Review.role == "seller",),
+            defaults={"min_rating": 4},
+        ),
+        Source(
+            "bid",
+            Bid.bidder_id,
+            {"bids": lambda: func.count(Bid.id), "auctions_bid": lambda: func.count(Bid.listing_id.distinct())},
+            {},
+        ),
+        Source(
+            "story",
+            UserStory.author_id,
+            {"stories": lambda: func.count(UserStory.id)},
+            {},
+            base=lambda: (UserStory.status == "published",),
+        ),
+    )
+}
+METRIC_SOURCES = {metric: source.name for source in SOURCES.values() for metric in source.metrics}
+
+
+@dataclass(frozen=True)
+class CompiledBadge:
+    id: int
+    slug: str
+    requirements: tuple[tuple[MetricKey, int], ...]
+    sources: frozenset[str]
+    earned: Callable[[Mapping[MetricKey, int]], bool]
+
+
+def compile_badge(badge_id: int, slug: str, criteria: Mapping[str, Any]) -> CompiledBadge:
+    """Turn a criteria object into a predicate over per-user metric values."""
+    if not isinstance(criteria, Mapping) or not criteria:
+        raise BadgeCriteriaError(f"Badge {slug!r}: criteria must be a non-empty object")
+    metrics = {key: value for key, value in criteria.items() if key in METRIC_SOURCES}
+    filters = {key: value for key, value in criteria.items() if key not in METRIC_SOURCES}
+    if not metrics:
+        raise BadgeCriteriaError(f"Badge {slug!r}: criteria name no metric ({', '.join(sorted(METRIC_SOURCES))})")
+
+    requirements = []
+    for name, threshold in sorted(metrics.items()):
+        source = SOURCES[METRIC_SOURCES[name]]
+        if isinstance(threshold, bool) or not isinstance(threshold, int) or threshold < 1:
+            raise BadgeCriteriaError(f"Badge {slug!r}: {name} must be a positive integer")
+        scoped = dict(source.defaults or {})
+        # Lists become tuples so the key can index the per-user stats.
+        scoped.update(
+            {key: tuple(value) if isinstance(value, list) else value for key, value in filters.items() if key in source.filters}
+        )
+        requirements.append(((name, tuple(sorted(scoped.items()))), threshold))
+    applicable = set().union(*(SOURCES[METRIC_SOURCES[name]].filters for name in metrics))
+    unused = set(filters) - applicable
+    if unused:
+        raise BadgeCriteriaError(f"Badge {slug!r}: unknown or inapplicable filters {sorted(unused)}")
+
+    requirements = tuple(requirements)
+
+    def earned(stats: Mapping[MetricKey, int]) -> bool:
+        return all(stats.get(key, 0) >= threshold for key, threshold in requirements)
+
+    sources = frozenset(METRIC_SOURCES[name] for name in metrics)
+    return CompiledBadge(badge_id, slug, requirements, sources, earned)
+
+
+def _events(instance, deleted: bool) -> Optional[tuple[tuple[str, int], ...]]:
+    """``(source, user_id)`` pairs a flushed change could newly satisfy."""
+    if deleted:
+        return None
+    state = inspect(instance)
+    # Called from after_flush, where ``session.new`` still lists this flush's inserts.
+    inserted = instance in state.session.new
+    if isinstance(instance, Collection):
+        return (("collection", instance.user_id),)
+    if isinstance(instance, Review):
+        return (("review_given", instance.reviewer_id), ("review_received", instance.reviewee_id))
+    if isinstance(instance, Bid) and inserted:
+        return (("bid", instance.bidder_id),)
+    if isinstance(instance, Transaction) and (inserted or state.attrs.status.history.has_changes()):
+        return (("sale", instance.seller_id), ("purchase", instance.buyer_id))
+    if isinstance(instance, UserStory) and (inserted or state.attrs.status.history.has_changes()):
+        return (("story", instance.author_id),)
+    return None
+
+
+def stage_events(source: str, user_ids: Iterable[int]) -> None:
+    """Queue badge evaluation for Core writes, once the current transaction commits."""
+    stage(HOOK_NAME, [((source, user_id),) for user_id in user_ids])
+
+
+@dataclass(frozen=True)
+class RecomputeSummary:
+    members: int
+    awarded: int
+    revoked: int
+
+
+class BadgeEngine:
+    def __init__(self, interval: float = 5.0, definitions_ttl: float = 60.0) -> None:
+        self.interval = interval
+        self.definitions_ttl = definitions_ttl
+        self.evaluations = 0
+        self.awarded = 0
+        self._pending: dict[str, set[int]] = defaultdict(set)
+        self._badges: Optional[list[CompiledBadge]] = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._app: Optional[Flask] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def init_app(self, app: Flask) -> None:
+        self._app = app
+        self.interval = app.config.get("BADGE_EVALUATION_SECONDS", self.interval)
+        self.definitions_ttl = app.config.get("BADGE_DEFINITIONS_TTL_SECONDS", self.definitions_ttl)
+        register_commit_hook(HOOK_NAME, (Collection, Transaction, Review, Bid, UserStory), _events, self.queue)
+        register_commit_hook(DEFINITIONS_HOOK_NAME, (Badge,), lambda instance, deleted: True, self.forget_definitions)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._pending = defaultdict(set)
+            self._badges = None
+
+    def forget_definitions(self, _changes=None) -> None:
+        with self._lock:
+            self._badges = None
+
+    # -- events ----------------------------------------------------------------
+
+    def queue(self, batches: list[tuple[tuple[str, int], ...]]) -> None:
+        with self._lock:
+            for events in batches:
+                for source, user_id in events:
+                    self._pending[source].add(user_id)
+        if self.interval > 0:
+            self._ensure_thread()
+        else:
+            # Runs from the after-commit hook, so it needs a session of its own.
+            self.evaluate_in_app()
+
+    def evaluate_pending(self) -> int:
+        """Evaluate the queued events and commit any awards; return the number awarded."""
+        with self._lock:
+            pending, self._pending = self._pending, defaultdict(set)
+        if not pending:
+            return 0
+        try:
+            awarded = self.evaluate(pending)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            with self._lock:
+                for source, user_ids in pending.items():
+                    self._pending[source].update(user_ids)
+            raise
+        return awarded
+
+    def evaluate_in_app(self) -> int:
+        if self._app is None:
+            return 0
+        with self._app.app_context():
+            return self.evaluate_pending()
+
+    def evaluate(self, pending: Mapping[str, set[int]]) -> int:
+        """Award every badge reading a changed source that its users now satisfy."""
+        affected: dict[int, set[int]] = defaultdict(set)
+        for badge in self.badges():
+            for source in badge.sources & pending.keys():
+                affected[badge.id].update(pending[source])
+        if not affected:
+            return 0
+        badges = [badge for badge in self.badges() if badge.id in affected]
+        awards = self._award(badges, sorted(set().union(*affected.values())), affected)
+        self.evaluations += 1
+        return awards
+
+    # -- full recompute ----------------------------------------------------------
+
+    def recompute(
+        self, chunk_size: int = 1000, slugs: Optional[Iterable[str]] = None, revoke: bool = False
+    ) -> RecomputeSummary:
+        """Re-check every member against the active badges, committing per chunk."""
+        self.forget_definitions()
+        badges = self.badges()
+        if slugs is not None:
+            wanted = set(slugs)
+            badges = [badge for badge in badges if badge.slug in wanted]
+        members = awarded = revoked = 0
+        last_id = 0
+        while badges:
+            user_ids = list(
+                db.session.scalars(select(User.id).where(User.id > last_id).order_by(User.id).limit(chunk_size))
+            )
+            if not user_ids:
+                break
+            last_id = user_ids[-1]
+            awarded += self._award(badges, user_ids, None)
+            if revoke:
+                revoked += self._revoke(badges, user_ids)
+            db.session.commit()
+            members += len(user_ids)
+        return RecomputeSummary(members, awarded, revoked)
+
+    # -- internals ---------------------------------------------------------------
+
+    def badges(self) -> list[CompiledBadge]:
+        with self._lock:
+            if self._badges is not None and time.monotonic() - self._loaded_at < self.definitions_ttl:
+                return self._badges
+        compiled = []
+        rows = db.session.execute(
+            select(Badge.id, Badge.slug, Badge.criteria).where(Badge.is_active.is_(True)).order_by(Badge.id)
+        )
+        for badge_id, slug, criteria in rows:
+            try:
+                compiled.append(compile_badge(badge_id, slug, criteria))
+            except BadgeCriteriaError as exc:
+                logger.warning("Skipping badge: %s", exc)
+        with self._lock:
+            self._badges, self._loaded_at = compiled, time.monotonic()
+        return compiled
+
+    def _stats(self, badges: list[CompiledBadge], user_ids: list[int]) -> dict[int, dict[MetricKey, int]]:
+        # One grouped query per (source, filters) pair covers every metric that shares them.
+        wanted: dict[tuple[str, tuple], set[str]] = defaultdict(set)
+        for badge in badges:
+            for (name, filters), _ in badge.requirements:
+                wanted[METRIC_SOURCES[name], filters].add(name)
+        stats: dict[int, dict[MetricKey, int]] = defaultdict(dict)
+        for (source_name, filters), names in wanted.items():
+            for row in db.session.execute(SOURCES[source_name].query(user_ids, names, filters)):
+                for name in names:
+                    stats[row[0]][name, filters] = getattr(row, name)
+        return stats
+
+    def _held(self, badges: list[CompiledBadge], user_ids: list[int]) -> set[tuple[int, int]]:
+        rows = db.session.execute(
+            select(UserBadge.user_id, UserBadge.badge_id).where(
+                UserBadge.user_id.in_(user_ids), UserBadge.badge_id.in_([badge.id for badge in badges])
+            )
+        )
+        return {tuple(row) for row in rows}
+
+    def _award(
+        self, badges: list[CompiledBadge], user_ids: list[int], candidates: Optional[Mapping[int, set[int]]]
+    ) -> int:
+        stats = self._stats(badges, user_ids)
+        held = self._held(badges, user_ids)
+        rows = [
+            {"user_id": user_id, "badge_id": badge.id}
+            for badge in badges
+            for user_id in (sorted(candidates[badge.id]) if candidates is not None else user_ids)
+            if (user_id, badge.id) not in held and badge.earned(stats.get(user_id, {}))
+        ]
+        if not rows:
+            return 0
+        # Another worker's evaluation (or a recompute) may award the same badge first.
+        statement = (
+            UPSERT_INSERTS[db.session.get_bind().dialect.name](UserBadge)
+            .on_conflict_do_nothing(index_elements=["user_id", "badge_id"])
+            .returning(UserBadge.id)
+        )
+        awarded = len(db.session.execute(statement, rows).all())
+        with self._lock:
+            self.awarded += awarded
+        return awarded
+
+    def _revoke(self, badges: list[CompiledBadge], user_ids: list[int]) -> int:
+        stats = self._stats(badges, user_ids)
+        by_id = {badge.id: badge for badge in badges}
+        stale = [
+            (user_id, badge_id)
+            for user_id, badge_id in self._held(badges, user_ids)
+            if not by_id[badge_id].earned(stats.get(user_id, {}))
+        ]
+        if stale:
+            db.session.execute(delete(UserBadge).where(tuple_(UserBadge.user_id, UserBadge.badge_id).in_(stale)))
+        return len(stale)
+
+    def _ensure_thread(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name="badge-engine", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            try:
+                self.evaluate_in_app()
+            except Exception:  # pragma: no cover - retried on the next tick
+                if self._app is not None:
+                    self._app.logger.exception("Badge evaluation failed")
+
+
+badge_engine = BadgeEngine()
+
+
+@atexit.register
+def _evaluate_on_exit() -> None:
+    try:
+        badge_engine.evaluate_in_app()
+    except Exception:  # pragma: no cover - interpreter is shutting down
+        pass
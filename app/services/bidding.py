@@ -0,0 +1,224 @@
+"""Proxy bidding engine.
+
+Bids are resolved optimistically: the listing row is read without a lock, the
+proxy contest is settled in Python, and the result is published with a single
+conditional UPDATE keyed on ``Listing.bid_count``. The count only ever grows,
+so it doubles as a row version; a concurrent writer that got there first makes
+the UPDATE match zero rows and the bid is re-resolved against fresh state. The
+row lock is held only between that UPDATE and the commit.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Optional
+
+from sqlalchemy import or_, select, update
+
+from app.extensions import db, fragment_cache
+from app.models import Bid, Listing
+from app.utils.dates import utcnow
+
+CENT = Decimal("0.01")
+MAX_ATTEMPTS = 10
+
+# (lower bound of current price, minimum raise)
+BID_INCREMENTS = (
+    (Decimal("0"), Decimal("1.00")),
+    (Decimal("100"), Decimal("5.00")),
+    (Decimal("500"), Decimal("10.00")),
+    (Decimal("1000"), Decimal("25.00")),
+    (Decimal("5000"), Decimal("100.00")),
+)
+
+
+class BidError(Exception):
+    """Raised when a bid cannot be accepted."""
+
+
+class BidContentionError(BidError):
+    """Raised when a bid keeps losing the version race on a hot listing."""
+
+
+@dataclass(frozen=True)
+class BidResult:
+    listing_id: int
+    bid_id: int
+    current_bid: Decimal
+    bid_count: int
+    auction_end: Optional[datetime]
+    bidder_id: int
+    winning_bidder_id: int
+    previous_leader_id: Optional[int]
+    attempts: int
+
+    @property
+    def is_leading(self) -> bool:
+        return self.winning_bidder_id == self.bidder_id
+
+
+@dataclass(frozen=True)
+class _Leader:
+    bid_id: int
+    bidder_id: int
+    ceiling: Decimal
+
+
+def to_money(value) -> Decimal:
+    return Decimal(str(value)).quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def bid_increment(price: Decimal) -> Decimal:
+    step = BID_INCREMENTS[0][1]
+    for floor, increment in BID_INCREMENTS:
+        if price >= floor:
+            step = increment
+    return step
+
+
+def minimum_next_bid(starting_price: Decimal, current_bid: Optional[Decimal]) -> Decimal:
+    if current_bid is None:
+        return to_money(starting_price)
+    current = to_money(current_bid)
+    return current + bid_increment(current)
+
+
+def place_bid(listing_id: int, bidder_id: int, amount, proxy_max=None) -> BidResult:
+    amount = to_money(amount)
+    ceiling = to_money(proxy_max) if proxy_max not in (None, "") else amount
+    if amount <= 0:
+        raise BidError("Bid amount must be positive.")
+    if ceiling < amount:
+        raise BidError("Maximum bid cannot be lower than the bid amount.")
+
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        result = _try_place(listing_id, bidder_id, amount, ceiling, attempt)
+        if result is not None:
+            return result
+    raise BidContentionError("Bidding on this listing is very busy. Please try again.")
+
+
+def _try_place(listing_id: int, bidder_id: int, amount: Decimal, ceiling: Decimal, attempt: int) -> Optional[BidResult]:
+    now = utcnow()
+    row = db.session.execute(
+        select(
+            Listing.seller_id,
+            Listing.status,
+            Listing.auction_end,
+            Listing.starting_price,
+            Listing.current_bid,
+            Listing.bid_count,
+        ).where(Listing.id == listing_id)
+    ).one_or_none()
+    if row is None:
+        raise BidError("Listing not found.")
+    if row.seller_id == bidder_id:
+        raise BidError("You cannot bid on your own listing.")
+    if row.status != "active" or (row.auction_end is not None and row.auction_end <= now):
+        raise BidError("This auction is not accepting bids.")
+
+    minimum = minimum_next_bid(row.starting_price, row.current_bid)
+    leader = _current_leader(listing_id)
+
+    if leader is not None and leader.bidder_id == bidder_id:
+        if ceiling <= leader.ceiling:
+            raise BidError("You are already the high bidder.")
+        # Raising your own maximum does not move the visible price.
+        price = to_money(row.current_bid)
+        new_bids = [(bidder_id, price, ceiling, False, True)]
+    else:
+        if amount < minimum:
+            raise BidError(f"Bid must be at least ${minimum}.")
+        new_bids = _resolve_contest(leader, row.current_bid, bidder_id, amount, ceiling)
+        price = new_bids[-1][1]
+
+    seen_count = row.bid_count
+    claimed = db.session.execute(
+        update(Listing)
+        .where(
+            Listing.id == listing_id,
+            Listing.bid_count == seen_count,
+            Listing.status == "active",
+            or_(Listing.auction_end.is_(None), Listing.auction_end > now),
+        )
+        .values(current_bid=price, bid_count=Listing.bid_count + len(new_bids))
+        .execution_options(synchronize_session=False)
+    )
+    if claimed.rowcount != 1:
+        db.session.rollback()
+        return None
+
+    db.session.execute(
+        update(Bid)
+        .where(Bid.listing_id == listing_id, Bid.is_winning.is_(True))
+        .values(is_winning=False)
+        .execution_options(synchronize_session=False)
+    )
+    rows = [
+        Bid(
+            listing_id=listing_id,
+            bidder_id=row_bidder,
+            amount=row_amount,
+            proxy_max=row_ceiling if row_ceiling != row_amount else None,
+            is_auto=is_auto,
+            is_winning=is_winning,
+        )
+        for row_bidder, row_amount, row_ceiling, is_auto, is_winning in new_bids
+    ]
+    db.session.add_all(rows)
+    db.session.flush()
+    submitted = next(bid for bid in rows if bid.bidder_id == bidder_id and not bid.is_auto)
+    winner = next(bid for bid in rows if bid.is_winning)
+    # Listing cards show the current bid; the Core UPDATE above bypasses the ORM hooks.
+    fragment_cache.stage_invalidation("listing")
+    db.session.commit()
+
+    return BidResult(
+        listing_id=listing_id,
+        bid_id=submitted.id,
+        current_bid=price,
+        bid_count=seen_count + len(rows),
+        auction_end=row.auction_end,
+        bidder_id=bidder_id,
+        winning_bidder_id=winner.bidder_id,
+        previous_leader_id=leader.bidder_id if leader else None,
+        attempts=attempt,
+    )
+
+
+def _current_leader(listing_id: int) -> Optional[_Leader]:
+    row = db.session.execute(
+        select(Bid.id, Bid.bidder_id, Bid.amount, Bid.proxy_max)
+        .where(Bid.listing_id == listing_id, Bid.is_winning.is_(True))
+        .order_by(Bid.id.desc())
+        .limit(1)
+    ).one_or_none()
+    if row is None:
+        return None
+    return _Leader(row.id, row.bidder_id, to_money(row.proxy_max if row.proxy_max is not None else row.amount))
+
+
+def _resolve_contest(
+    leader: Optional[_Leader], current_bid, bidder_id: int, amount: Decimal, ceiling: Decimal
+) -> list[tuple[int, Decimal, Decimal, bool, bool]]:
+    """Return the bid rows to insert as (bidder, amount, ceiling, is_auto, is_winning), winner last."""
+    if leader is None:
+        return [(bidder_id, amount, ceiling, False, True)]
+
+    if ceiling > leader.ceiling:
+        price = max(amount, min(ceiling, leader.ceiling + bid_increment(leader.ceiling)))
+        rows = []
+        if current_bid is None or leader.ceiling > to_money(current_bid):
+            # Record the outgoing leader's proxy running out before it was beaten.
+            rows.append((leader.bidder_id, leader.ceiling, leader.ceiling, True, False))
+        rows.append((bidder_id, price, ceiling, False, True))
+        return rows
+
+    # The standing proxy covers the challenger; ties go to the earlier bid.
+    price = min(leader.ceiling, ceiling + bid_increment(ceiling))
+    return [
+        (bidder_id, ceiling, ceiling, False, False),
+        (leader.bidder_id, price, leader.ceiling, True, True),
+    ]
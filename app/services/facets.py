@@ -0,0 +1,246 @@
+"""Bitmap-backed facet counts over active listings.
+
+One ``RoaringBitmap`` of listing ids is kept per facet value. Counts for any
+filter combination come from bitmap intersections, using the usual
+multi-select rule: a facet's own selection is left out when counting that
+facet, so users can see how many results switching values would give.
+
+The bitmaps are maintained the same way as the search index: commit hooks for
+changes made in this process and an incremental ``updated_at`` refresh, read
+``refresh_lag`` seconds behind the watermark on its own connection, for
+changes made anywhere else.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Iterable, Mapping, Optional
+
+from sqlalchemy import select
+
+from app.extensions import db
+from app.models import Listing
+from app.utils.bitmap import RoaringBitmap, masks_and, masks_intersection_len, masks_or
+from app.utils.model_events import register_commit_hook
+
+FACET_FIELDS = ("county", "license_year", "license_type", "condition_grade", "listing_type")
+ACTIVE_STATUSES = frozenset({"active"})
+
+Filters = Mapping[str, Iterable[Any]]
+
+
+def parse_filters(args) -> dict[str, list[Any]]:
+    """Read repeated facet query parameters (``?county=Erie&county=Elk``)."""
+    filters: dict[str, list[Any]] = {}
+    for field in FACET_FIELDS:
+        values = [value.strip() for value in args.getlist(field) if value and value.strip()]
+        if field == "license_year":
+            values = [int(value) for value in values if value.isdigit()]
+        if values:
+            filters[field] = values
+    return filters
+
+
+class FacetIndex:
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        self.active = RoaringBitmap()
+        self._bitmaps: dict[str, dict[Any, RoaringBitmap]] = {field: {} for field in FACET_FIELDS}
+
+    def __len__(self) -> int:
+        return len(self.active)
+
+    def add(self, listing_id: int, values: Mapping[str, Any]) -> None:
+        with self._lock:
+            self._discard_locked(listing_id)
+            self.active.add(listing_id)
+            for field in FACET_FIELDS:
+                value = values.get(field)
+                if value is None:
+                    continue
+                bitmap = self._bitmaps[field].get(value)
+                if bitmap is None:
+                    bitmap = self._bitmaps[field][value] = RoaringBitmap()
+                bitmap.add(listing_id)
+
+    def remove(self, listing_id: int) -> None:
+        with self._lock:
+            self._discard_locked(listing_id)
+
+    def _discard_locked(self, listing_id: int) -> None:
+        if listing_id not in self.active:
+            return
+        self.active.discard(listing_id)
+        # Values are not remembered per listing; probing each value's bitmap
+        # is cheap and keeps memory proportional to the bitmaps alone.
+        for values in self._bitmaps.values():
+            for value, bitmap in list(values.items()):
+                if listing_id in bitmap:
+                    bitmap.discard(listing_id)
+                    if not bitmap:
+                        del values[value]
+
+    def values(self, field: str) -> list[Any]:
+        with self._lock:
+            return sorted(self._bitmaps[field])
+
+    def _selection(self, field: str, wanted: Iterable[Any]) -> dict[int, int]:
+        bitmaps = self._bitmaps[field]
+        selection: dict[int, int] = {}
+        for value in wanted:
+            bitmap = bitmaps.get(value)
+            if bitmap is not None:
+                selection = masks_or(selection, bitmap.masks())
+        return selection
+
+    def _selections(self, filters: Filters) -> dict[str, dict[int, int]]:
+        # Selections are combined as per-container masks so every union and
+        # intersection runs as big-int operations rather than Python loops.
+        return {
+            field: self._selection(field, values)
+            for field, values in filters.items()
+            if field in self._bitmaps and values is not None
+        }
+
+    def matching(self, filters: Filters) -> RoaringBitmap:
+        with self._lock:
+            result = self.active.masks()
+            for selection in self._selections(filters).values():
+                result = masks_and(result, selection)
+            return RoaringBitmap.from_masks(result)
+
+    def counts(self, filters: Optional[Filters] = None) -> dict[str, dict[Any, int]]:
+        with self._lock:
+            selections = self._selections(filters or {})
+            counts: dict[str, dict[Any, int]] = {}
+            for field in FACET_FIELDS:
+                scope: Optional[dict[int, int]] = None
+                for other, selection in selections.items():
+                    if other != field:
+                        scope = selection if scope is None else masks_and(scope, selection)
+                field_counts = {}
+                for value, bitmap in self._bitmaps[field].items():
+                    count = len(bitmap) if scope is None else masks_intersection_len(bitmap.masks(), scope)
+                    if count:
+                        field_counts[value] = count
+                counts[field] = dict(sorted(field_counts.items(), key=lambda item: (-item[1], str(item[0]))))
+            return counts
+
+    def warm(self) -> None:
+        with self._lock:
+            self.active.masks()
+            for values in self._bitmaps.values():
+                for bitmap in values.values():
+                    bitmap.masks()
+
+
+FACET_COLUMNS = (Listing.id, Listing.status, Listing.updated_at) + tuple(getattr(Listing, field) for field in FACET_FIELDS)
+
+
+class ListingFacets:
+    """Owns the per-worker facet index and keeps it in step with the database."""
+
+    def __init__(self, refresh_interval: float = 30.0, refresh_lag: float = 60.0) -> None:
+        self.refresh_interval = refresh_interval
+        self.refresh_lag = refresh_lag
+        self.index = FacetIndex()
+        self.watermark: Optional[datetime] = None
+        # listing id -> updated_at already applied, for rows inside the refresh lag.
+        self._recent: dict[int, datetime] = {}
+        self._ready = False
+        self._next_refresh = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self) -> bool:
+        return self._ready
+
+    def configure(self, app) -> None:
+        self.refresh_interval = app.config.get("FACET_REFRESH_SECONDS", self.refresh_interval)
+        self.refresh_lag = app.config.get("FACET_REFRESH_LAG_SECONDS", self.refresh_lag)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.index = FacetIndex()
+            self.watermark = None
+            self._recent = {}
+            self._ready = False
+            self._next_refresh = 0.0
+
+    def ensure_ready(self) -> None:
+        if self._ready and time.monotonic() < self._next_refresh:
+            return
+        with self._lock:
+            if not self._ready:
+                self.rebuild()
+                self._ready = True
+            else:
+                self.refresh()
+            self._next_refresh = time.monotonic() + self.refresh_interval
+
+    def rebuild(self, batch_size: int = 10000) -> int:
+        index = FacetIndex()
+        watermark = datetime(1970, 1, 1)
+        query = select(*FACET_COLUMNS).where(Listing.status.in_(ACTIVE_STATUSES)).execution_options(yield_per=batch_size)
+        # Its own connection: this runs mid-request, and the request's session may
+        # hold pending work and staged commit hooks.
+        with db.engine.connect() as connection:
+            for row in connection.execute(query):
+                index.add(row.id, row._mapping)
+                if row.updated_at and row.updated_at > watermark:
+                    watermark = row.updated_at
+        index.warm()
+        self.index, self.watermark, self._recent = index, watermark, {}
+        return len(index)
+
+    def refresh(self) -> int:
+        """Apply listings changed elsewhere since the watermark; returns how many were applied."""
+        since = self.watermark - timedelta(seconds=self.refresh_lag)
+        with db.engine.connect() as connection:
+            rows = connection.execute(select(*FACET_COLUMNS).where(Listing.updated_at >= since)).all()
+        applied = 0
+        for row in rows:
+            if self._recent.get(row.id) == row.updated_at:
+                continue
+            self._recent[row.id] = row.updated_at
+            self.apply(row.id, dict(row._mapping) if row.status in ACTIVE_STATUSES else None)
+            applied += 1
+            if row.updated_at and row.updated_at > self.watermark:
+                self.watermark = row.updated_at
+        horizon = self.watermark - timedelta(seconds=self.refresh_lag)
+        self._recent = {listing_id: stamp for listing_id, stamp in self._recent.items() if stamp >= horizon}
+        return applied
+
+    def apply(self, listing_id: int, values: Optional[Mapping[str, Any]]) -> None:
+        if values is None:
+            self.index.remove(listing_id)
+        else:
+            self.index.add(listing_id, values)
+
+    def counts(self, filters: Optional[Filters] = None) -> dict[str, dict[Any, int]]:
+        self.ensure_ready()
+        return self.index.counts(filters)
+
+    def matching(self, filters: Filters) -> RoaringBitmap:
+        self.ensure_ready()
+        return self.index.matching(filters)
+
+
+listing_facets = ListingFacets()
+
+
+def _snapshot(listing: Listing, deleted: bool):
+    if deleted or listing.status not in ACTIVE_STATUSES:
+        return listing.id, None
+    return listing.id, {field: getattr(listing, field) for field in FACET_FIELDS}
+
+
+def _apply(snapshots) -> None:
+    if listing_facets.ready:
+        for listing_id, values in snapshots:
+            listing_facets.apply(listing_id, values)
+
+
+register_commit_hook("listing_facets", (Listing,), _snapshot, _apply)
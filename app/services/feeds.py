@@ -0,0 +1,60 @@
+"""Keyset-paged feeds shared by the HTML views and the API.
+
+Each feed orders on columns covered by a composite index, so fetching a deep
+page costs the same as the first one.
+"""
+
+from __future__ import annotations
+
+from typing import Optional
+
+from flask import current_app
+from sqlalchemy import select
+from sqlalchemy.orm import joinedload, selectinload
+
+from app.models import Bid, Listing, Notification
+from app.utils.pagination import Page, keyset_page
+
+
+def _limit(limit: Optional[int]) -> int:
+    return limit or current_app.config["PAGE_SIZE"]
+
+
+def active_listings(cursor: Optional[str] = None, limit: Optional[int] = None, *, for_cards: bool = False) -> Page:
+    """Active listings, newest first.
+
+    ``for_cards`` loads the seller and images with the page, as listing cards
+    show both; lazy loading them would cost two queries per card.
+    """
+    statement = select(Listing).where(Listing.status == "active")
+    if for_cards:
+        statement = statement.options(joinedload(Listing.seller), selectinload(Listing.images))
+    return keyset_page(
+        statement,
+        (Listing.created_at, Listing.id),
+        scope="listings",
+        cursor=cursor,
+        limit=_limit(limit),
+    )
+
+
+def bid_history(listing_id: int, cursor: Optional[str] = None, limit: Optional[int] = None) -> Page:
+    """Bids on one listing, most recent first."""
+    return keyset_page(
+        select(Bid).where(Bid.listing_id == listing_id),
+        (Bid.placed_at, Bid.id),
+        scope=f"bids:{listing_id}",
+        cursor=cursor,
+        limit=_limit(limit),
+    )
+
+
+def notification_feed(user_id: int, cursor: Optional[str] = None, limit: Optional[int] = None) -> Page:
+    """A member's notifications, newest first."""
+    return keyset_page(
+        select(Notification).where(Notification.user_id == user_id),
+        (Notification.created_at, Notification.id),
+        scope=f"notifications:{user_id}",
+        cursor=cursor,
+        limit=_limit(limit),
+    )
@@ -0,0 +1,309 @@
+"""County x year holdings grids for collectors, and the want list built on them.
+
+A member's holdings are one Python ``int`` per county, with bit ``year -
+FIRST_LICENSE_YEAR`` set for every license year they hold there: 67 small
+integers for the whole matrix. A grid is built from one grouped query over the
+member's ``collections`` rows and cached per worker. Commit hooks apply
+``Collection`` inserts, deletes and edits to cached grids in place; duplicate
+copies of a cell are counted so deleting one of two keeps the bit. Bulk writes
+made elsewhere show up when an entry expires after ``ttl`` seconds.
+
+The want list intersects a member's gaps with the cells that active listings
+cover (another cached grid, from one grouped query over active listings) with
+per-county bit operations, then fetches the matching listings in one query
+whose ``WHERE`` is a ``county = ? AND license_year BETWEEN ? AND ?`` run per
+contiguous stretch of wanted years. Counties are compared trimmed and
+lowercased there too, as ``county_index`` does when the grids are built, so a
+listing stored as "allegheny " is both counted and returned.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator, Optional
+
+from sqlalchemy import and_, func, inspect, or_, select
+from sqlalchemy.orm import attributes
+
+from app.extensions import db
+from app.models import Collection, Listing
+from app.utils.dates import utcnow
+from app.utils.model_events import register_commit_hook
+
+HOOK_NAME = "collector_holdings"
+FIRST_LICENSE_YEAR = 1913
+
+PENNSYLVANIA_COUNTIES = (
+    "Adams", "Allegheny", "Armstrong", "Beaver", "Bedford", "Berks", "Blair", "Bradford", "Bucks", "Butler",
+    "Cambria", "Cameron", "Carbon", "Centre", "Chester", "Clarion", "Clearfield", "Clinton", "Columbia",
+    "Crawford", "Cumberland", "Dauphin", "Delaware", "Elk", "Erie", "Fayette", "Forest", "Franklin", "Fulton",
+    "Greene", "Huntingdon", "Indiana", "Jefferson", "Juniata", "Lackawanna", "Lancaster", "Lawrence", "Lebanon",
+    "Lehigh", "Luzerne", "Lycoming", "McKean", "Mercer", "Mifflin", "Monroe", "Montgomery", "Montour",
+    "Northampton", "Northumberland", "Perry", "Philadelphia", "Pike", "Potter", "Schuylkill", "Snyder",
+    "Somerset", "Sullivan", "Susquehanna", "Tioga", "Union", "Venango", "Warren", "Washington", "Wayne",
+    "Westmoreland", "Wyoming", "York",
+)  # fmt: skip
+COUNTY_INDEX = {county.lower(): index for index, county in enumerate(PENNSYLVANIA_COUNTIES)}
+
+# (user_id, county, license_year, delta): a member gained (+1) or lost (-1) one
+# copy of a cell. A delta of 0 drops the member's grid; a user_id of None drops all.
+Change = tuple[Optional[int], Optional[str], Optional[int], int]
+
+
+def county_index(county: Optional[str]) -> Optional[int]:
+    return COUNTY_INDEX.get((county or "").strip().lower())
+
+
+def last_license_year() -> int:
+    return utcnow().year
+
+
+def year_mask(year_from: Optional[int] = None, year_to: Optional[int] = None) -> int:
+    """Bits for every license year in ``[year_from, year_to]``, clamped to the grid."""
+    start = max(year_from or FIRST_LICENSE_YEAR, FIRST_LICENSE_YEAR) - FIRST_LICENSE_YEAR
+    end = min(year_to or last_license_year(), last_license_year()) - FIRST_LICENSE_YEAR
+    return ((1 << (end + 1)) - 1) ^ ((1 << start) - 1) if end >= start else 0
+
+
+def year_runs(mask: int) -> Iterator[tuple[int, int]]:
+    """Contiguous ``(first_year, last_year)`` stretches of the set bits."""
+    offset = 0
+    while mask:
+        skip = (mask & -mask).bit_length() - 1
+        mask >>= skip
+        offset += skip
+        length = (~mask & (mask + 1)).bit_length() - 1
+        yield FIRST_LICENSE_YEAR + offset, FIRST_LICENSE_YEAR + offset + length - 1
+        mask >>= length
+        offset += length
+
+
+@dataclass
+class HoldingsGrid:
+    rows: list[int] = field(default_factory=lambda: [0] * len(PENNSYLVANIA_COUNTIES))
+    # Extra copies beyond the first, so deleting a duplicate keeps the bit.
+    copies: dict[tuple[int, int], int] = field(default_factory=dict)
+
+    def add(self, county: int, year: int, copies: int = 1) -> None:
+        bit = 1 << (year - FIRST_LICENSE_YEAR)
+        if self.rows[county] & bit:
+            copies += 1
+        self.rows[county] |= bit
+        if copies > 1:
+            self.copies[county, year] = self.copies.get((county, year), 0) + copies - 1
+
+    def discard(self, county: int, year: int) -> None:
+        extra = self.copies.get((county, year), 0)
+        if extra > 1:
+            self.copies[county, year] = extra - 1
+        elif extra == 1:
+            del self.copies[county, year]
+        else:
+            self.rows[county] &= ~(1 << (year - FIRST_LICENSE_YEAR))
+
+    def holds(self, county: str, year: int) -> bool:
+        cell = _cell(county, year)
+        return cell is not None and bool(self.rows[cell[0]] >> (year - FIRST_LICENSE_YEAR) & 1)
+
+    @property
+    def cells(self) -> int:
+        return sum(row.bit_count() for row in self.rows)
+
+    @property
+    def counties_held(self) -> int:
+        return sum(1 for row in self.rows if row)
+
+    @property
+    def years_held(self) -> int:
+        combined = 0
+        for row in self.rows:
+            combined |= row
+        return combined.bit_count()
+
+    def decade_counts(self, county: int) -> dict[int, int]:
+        """Years held per decade (keyed 1910, 1920, ...) for one county."""
+        counts = {}
+        for decade in decades():
+            counts[decade] = (self.rows[county] & year_mask(decade, decade + 9)).bit_count()
+        return counts
+
+
+def decades() -> list[int]:
+    return list(range(FIRST_LICENSE_YEAR // 10 * 10, last_license_year() + 1, 10))
+
+
+def _cell(county: Optional[str], year: Optional[int]) -> Optional[tuple[int, int]]:
+    index = county_index(county)
+    if index is None or year is None or not FIRST_LICENSE_YEAR <= year <= last_license_year():
+        return None
+    return index, year
+
+
+def _grid(rows: Iterable[tuple[str, int, int]]) -> HoldingsGrid:
+    grid = HoldingsGrid()
+    for county, year, copies in rows:
+        cell = _cell(county, year)
+        if cell is not None:
+            grid.add(*cell, copies=copies)
+    return grid
+
+
+class HoldingsCache:
+    def __init__(self, ttl: float = 300.0, max_entries: int = 10000, market_ttl: float = 30.0) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.market_ttl = market_ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[int, tuple[HoldingsGrid, float]] = OrderedDict()
+        self._market: Optional[tuple[HoldingsGrid, float]] = None
+        self._lock = threading.Lock()
+
+    def configure(self, app) -> None:
+        self.ttl = app.config.get("HOLDINGS_CACHE_TTL_SECONDS", self.ttl)
+        self.max_entries = app.config.get("HOLDINGS_CACHE_MAX_ENTRIES", self.max_entries)
+        self.market_ttl = app.config.get("WANT_LIST_MARKET_TTL_SECONDS", self.market_ttl)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._market = None
+            self.hits = self.misses = 0
+
+    def get(self, user_id: int) -> HoldingsGrid:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[1] > now:
+                self._entries.move_to_end(user_id)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        grid = _grid(
+            db.session.execute(
+                select(Collection.county, Collection.license_year, func.count())
+                .where(Collection.user_id == user_id)
+                .group_by(Collection.county, Collection.license_year)
+            )
+        )
+        with self._lock:
+            self._entries[user_id] = (grid, time.monotonic() + self.ttl)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return grid
+
+    def market(self) -> HoldingsGrid:
+        """Cells covered by at least one active listing."""
+        now = time.monotonic()
+        with self._lock:
+            if self._market is not None and self._market[1] > now:
+                return self._market[0]
+        grid = _grid(
+            (county, year, 1)
+            for county, year in db.session.execute(
+                select(Listing.county, Listing.license_year)
+                .where(Listing.status == "active")
+                .group_by(Listing.county, Listing.license_year)
+            )
+        )
+        with self._lock:
+            self._market = (grid, time.monotonic() + self.market_ttl)
+        return grid
+
+    def apply(self, snapshots: list[tuple[Change, ...]]) -> None:
+        with self._lock:
+            for changes in snapshots:
+                for user_id, county, year, delta in changes:
+                    if user_id is None:
+                        self._entries.clear()
+                    elif not delta:
+                        self._entries.pop(user_id, None)
+                    else:
+                        entry, cell = self._entries.get(user_id), _cell(county, year)
+                        if entry is None or cell is None:
+                            continue
+                        if delta > 0:
+                            entry[0].add(*cell)
+                        else:
+                            entry[0].discard(*cell)
+
+
+holdings_cache = HoldingsCache()
+
+
+@dataclass(frozen=True)
+class WantList:
+    listings: list[Listing]
+    wanted_cells: int
+    available_cells: int
+
+
+def want_list(
+    user_id: int,
+    counties: Optional[Iterable[str]] = None,
+    year_from: Optional[int] = None,
+    year_to: Optional[int] = None,
+    limit: int = 24,
+) -> WantList:
+    """Active listings for county/year cells the member does not hold yet."""
+    holdings = holdings_cache.get(user_id)
+    market = holdings_cache.market()
+    years = year_mask(year_from, year_to)
+    scope = range(len(PENNSYLVANIA_COUNTIES))
+    if counties:
+        scope = sorted({index for index in map(county_index, counties) if index is not None})
+
+    wanted_cells = available_cells = 0
+    clauses = []
+    for index in scope:
+        gaps = ~holdings.rows[index] & years
+        available = gaps & market.rows[index]
+        wanted_cells += gaps.bit_count()
+        available_cells += available.bit_count()
+        for first, last in year_runs(available):
+            year_clause = Listing.license_year == first if first == last else Listing.license_year.between(first, last)
+            clauses.append(and_(func.lower(func.trim(Listing.county)) == PENNSYLVANIA_COUNTIES[index].lower(), year_clause))
+
+    listings = []
+    if clauses:
+        listings = list(
+            db.session.scalars(
+                select(Listing)
+                .where(Listing.status == "active", or_(*clauses))
+                .order_by(Listing.auction_end.asc().nulls_last(), Listing.id)
+                .limit(limit)
+            )
+        )
+    return WantList(listings, wanted_cells, available_cells)
+
+
+def _snapshot(collection: Collection, deleted: bool) -> Optional[tuple[Change, ...]]:
+    state = inspect(collection)
+    if deleted:
+        loaded = state.dict
+        if not {"user_id", "county", "license_year"} <= loaded.keys():
+            # Expired before the delete: the member is unknown, so drop every grid.
+            return ((None, None, None, 0),)
+        return ((loaded["user_id"], loaded["county"], loaded["license_year"], -1),)
+
+    current = (collection.user_id, collection.county, collection.license_year)
+    # Called from after_flush, where ``session.new`` still lists this flush's inserts.
+    if collection in state.session.new:
+        return ((*current, 1),)
+    histories = [attributes.get_history(collection, name) for name in ("user_id", "county", "license_year")]
+    if not any(history.has_changes() for history in histories):
+        return None
+    if any(not history.deleted and not history.unchanged for history in histories):
+        # The old value was never loaded; rebuild both members' grids on demand.
+        user_ids = {collection.user_id, *histories[0].deleted}
+        return tuple((user_id, None, None, 0) for user_id in user_ids)
+    previous = tuple(history.deleted[0] if history.deleted else history.unchanged[0] for history in histories)
+    return ((*previous, -1), (*current, 1))
+
+
+register_commit_hook(HOOK_NAME, (Collection,), _snapshot, holdings_cache.apply)
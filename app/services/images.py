@@ -0,0 +1,327 @@
+"""Listing photo ingest and background thumbnailing.
+
+An upload is copied to a staging file in 64 KiB chunks while its SHA-256 is
+computed, so memory stays flat whatever the photo's size, and the request only
+pays for that copy and one storage ``put``. Originals are content-addressed
+(``originals/ab/<sha256>.jpg``): the same photo uploaded twice to a listing
+returns the existing row, and uploaded to another listing reuses the stored
+original and any variants already rendered for it.
+
+New rows start as ``pending`` with no ``thumbnail_url``. Once the transaction
+that added them commits, the hash is handed to a process pool
+(``IMAGE_WORKERS``, spawned rather than forked so workers never inherit the
+app's connections) that renders the ``IMAGE_VARIANTS`` sizes. The done
+callback stores the variants and flips every pending row with that hash to
+``ready`` (or ``failed``) in one UPDATE; it runs on a small thread pool of its
+own, so storage puts and the commit never hold up the process pool's callback
+thread. ``IMAGE_WORKERS = 0`` renders inline, which the tests use. Rows left
+``pending`` by a restart are picked up again by ``flask images
+process-pending``.
+
+Staged copies belong to the transaction that ingested them: they are handed to
+the renderer when it commits and deleted when it rolls back.
+"""
+
+from __future__ import annotations
+
+import atexit
+import hashlib
+import multiprocessing
+import os
+import tempfile
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional
+
+from flask import Flask
+from sqlalchemy import event, func, select, update
+
+from app.extensions import db, fragment_cache
+from app.models import Listing, ListingImage
+from app.utils.image_variants import discard, render_variants, sniff
+from app.utils.model_events import register_commit_hook
+from app.utils.storage import LocalStorage, S3Storage, storage_from_config
+
+CHUNK_SIZE = 64 * 1024
+HOOK_NAME = "image_variants"
+# session.info key: content hash -> staged copy ingested in the current transaction.
+STAGED_KEY = "staged_images"
+
+
+class ImageUploadError(Exception):
+    """Raised when an upload is not an accepted image."""
+
+
+def original_key(content_hash: str, extension: str) -> str:
+    return f"originals/{content_hash[:2]}/{content_hash}.{extension}"
+
+
+def variant_key(content_hash: str, name: str) -> str:
+    return f"variants/{content_hash[:2]}/{content_hash}/{name}.jpg"
+
+
+class ImagePipeline:
+    def __init__(self) -> None:
+        self.max_bytes = 10 * 1024 * 1024
+        self.workers = 2
+        self.variants: dict[str, int] = {"thumb": 400, "medium": 1200}
+        self.staging_dir = "instance/image-staging"
+        self.storage: Optional[LocalStorage | S3Storage] = None
+        self._app: Optional[Flask] = None
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._finisher: Optional[ThreadPoolExecutor] = None
+        self._staged: dict[str, str] = {}
+        self._in_flight: dict[str, Optional[Future]] = {}
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+
+    def init_app(self, app: Flask) -> None:
+        self._app = app
+        self.max_bytes = app.config.get("IMAGE_MAX_BYTES", self.max_bytes)
+        self.workers = app.config.get("IMAGE_WORKERS", self.workers)
+        self.variants = dict(app.config.get("IMAGE_VARIANTS", self.variants))
+        self.staging_dir = os.path.abspath(app.config.get("IMAGE_STAGING_DIR", self.staging_dir))
+        self.storage = storage_from_config(app.config)
+        os.makedirs(self.staging_dir, exist_ok=True)
+        register_commit_hook(HOOK_NAME, (ListingImage,), _pending_original, self._submit_all)
+
+    # -- ingest ------------------------------------------------------------------
+
+    def ingest(self, listing: Listing, upload, caption: Optional[str] = None) -> tuple[ListingImage, bool]:
+        """Stage, store and attach ``upload`` to ``listing``; return ``(image, created)``.
+
+        The caller commits. Thumbnailing starts once it does.
+        """
+        staged, content_hash, extension = self._stage(upload)
+        existing = db.session.scalar(
+            select(ListingImage).where(ListingImage.listing_id == listing.id, ListingImage.content_hash == content_hash)
+        )
+        if existing is not None:
+            discard([staged])
+            return existing, False
+
+        key = original_key(content_hash, extension)
+        if not self.storage.exists(key):
+            self.storage.put(key, staged)
+        rendered = db.session.scalar(
+            select(ListingImage.thumbnail_url)
+            .where(ListingImage.content_hash == content_hash, ListingImage.status == "ready")
+            .limit(1)
+        )
+        if rendered is not None:
+            discard([staged])
+        elif db.session.info.setdefault(STAGED_KEY, {}).setdefault(content_hash, staged) != staged:
+            # The same photo twice in one transaction keeps the first staged copy.
+            discard([staged])
+
+        position = db.session.scalar(
+            select(func.coalesce(func.max(ListingImage.sort_order) + 1, 0)).where(ListingImage.listing_id == listing.id)
+        )
+        image = ListingImage(
+            listing_id=listing.id,
+            s3_key=key,
+            url=self.storage.url(key),
+            thumbnail_url=rendered,
+            content_hash=content_hash,
+            status="ready" if rendered is not None else "pending",
+            sort_order=position,
+            caption=(caption or "").strip()[:300] or None,
+        )
+        db.session.add(image)
+        # The listing cards show the first photo.
+        fragment_cache.stage_invalidation("listing")
+        return image, True
+
+    def variant_url(self, image: ListingImage, name: str) -> Optional[str]:
+        if image.status != "ready" or not image.content_hash:
+            return image.thumbnail_url if name == "thumb" else image.url
+        return self.storage.url(variant_key(image.content_hash, name))
+
+    def _stage(self, upload) -> tuple[str, str, str]:
+        digest = hashlib.sha256()
+        size = 0
+        handle, staged = tempfile.mkstemp(dir=self.staging_dir, suffix=".upload")
+        try:
+            with os.fdopen(handle, "wb") as out:
+                head = upload.stream.read(CHUNK_SIZE)
+                kind = sniff(head)
+                if kind is None:
+                    raise ImageUploadError("Photos must be JPEG, PNG, GIF or WebP images.")
+                chunk = head
+                while chunk:
+                    size += len(chunk)
+                    if size > self.max_bytes:
+                        raise ImageUploadError(f"Photos must be {self.max_bytes // (1024 * 1024)} MB or smaller.")
+                    digest.update(chunk)
+                    out.write(chunk)
+                    chunk = upload.stream.read(CHUNK_SIZE)
+        except BaseException:
+            discard([staged])
+            raise
+        return staged, digest.hexdigest(), kind[1]
+
+    # -- rendering ---------------------------------------------------------------
+
+    def process_pending(self) -> int:
+        """Queue every pending hash that is not already being rendered."""
+        originals = db.session.execute(
+            select(ListingImage.content_hash, func.min(ListingImage.s3_key))
+            .where(ListingImage.status == "pending", ListingImage.content_hash.is_not(None))
+            .group_by(ListingImage.content_hash)
+        ).all()
+        self._submit_all([tuple(row) for row in originals])
+        return len(originals)
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until every queued render has been written back."""
+        with self._idle:
+            return self._idle.wait_for(lambda: not self._in_flight, timeout)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+        # After the process pool: its last done callbacks still hand work to the finisher.
+        with self._lock:
+            finisher, self._finisher = self._finisher, None
+        if finisher is not None:
+            finisher.shutdown(wait=True)
+
+    def adopt_staged(self, staged: dict[str, str]) -> None:
+        """Take over copies staged by a transaction that committed."""
+        with self._lock:
+            for content_hash, path in staged.items():
+                # A second upload of a photo still in flight keeps the first staged copy.
+                if self._staged.setdefault(content_hash, path) != path:
+                    discard([path])
+
+    def _submit_all(self, originals: list[tuple[str, str]]) -> None:
+        # Runs from the after-commit hook, so it must not touch the session.
+        for content_hash, key in dict(originals).items():
+            try:
+                self._submit(content_hash, key)
+            except Exception:
+                # The rows stay pending for ``flask images process-pending``.
+                self._app.logger.exception("Queueing image variants failed for %s", content_hash)
+
+    def _submit(self, content_hash: str, key: str) -> None:
+        with self._lock:
+            staged = self._staged.pop(content_hash, None)
+            if content_hash in self._in_flight:
+                # The render under way flips this hash's new rows too.
+                if staged is not None:
+                    discard([staged])
+                return
+            self._in_flight[content_hash] = None
+
+        try:
+            if staged is None:
+                staged = self._fetch_original(key)
+            if self.workers <= 0:
+                try:
+                    outputs = render_variants(staged, self.variants)
+                except Exception as exc:
+                    outputs = exc
+                self._finish(content_hash, staged, outputs)
+                return
+            future = self._pool().submit(render_variants, staged, self.variants)
+        except Exception:
+            with self._lock:
+                self._in_flight.pop(content_hash, None)
+                self._idle.notify_all()
+            raise
+        with self._lock:
+            self._in_flight[content_hash] = future
+        future.add_done_callback(lambda done: self._finish_later(content_hash, staged, done))
+
+    def _finish_later(self, content_hash: str, staged: str, done: Future) -> None:
+        # Done callbacks run on the pool's management thread; storage puts and the
+        # commit would hold up every other future's callback.
+        outputs = done.exception() or done.result()
+        try:
+            self._finishing_pool().submit(self._finish, content_hash, staged, outputs)
+        except RuntimeError:  # pragma: no cover - shutting down
+            self._finish(content_hash, staged, outputs)
+
+    def _pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # Created lazily so forked web workers never inherit a pool.
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+    def _finishing_pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._finisher is None:
+                self._finisher = ThreadPoolExecutor(max_workers=max(1, self.workers), thread_name_prefix="image-finish")
+            return self._finisher
+
+    def _fetch_original(self, key: str) -> str:
+        handle, staged = tempfile.mkstemp(dir=self.staging_dir, suffix=".upload")
+        os.close(handle)
+        self.storage.fetch(key, staged)
+        return staged
+
+    def _finish(self, content_hash: str, staged: str, outputs) -> None:
+        try:
+            with self._app.app_context():
+                try:
+                    if isinstance(outputs, BaseException):
+                        raise outputs
+                    for name, path in outputs.items():
+                        self.storage.put(variant_key(content_hash, name), path)
+                    thumb = variant_key(content_hash, min(self.variants, key=self.variants.get))
+                    values = dict(status="ready", thumbnail_url=self.storage.url(thumb))
+                except Exception:
+                    self._app.logger.exception("Rendering image variants failed for %s", content_hash)
+                    values = dict(status="failed")
+                db.session.execute(
+                    update(ListingImage)
+                    .where(ListingImage.content_hash == content_hash, ListingImage.status == "pending")
+                    .values(**values)
+                    .execution_options(synchronize_session=False)
+                )
+                fragment_cache.stage_invalidation("listing")
+                db.session.commit()
+        finally:
+            discard([staged, *(outputs.values() if isinstance(outputs, dict) else ())])
+            with self._lock:
+                self._in_flight.pop(content_hash, None)
+                self._idle.notify_all()
+
+
+def _pending_original(instance: ListingImage, deleted: bool) -> Optional[tuple[str, str]]:
+    if deleted or instance.status != "pending" or not instance.content_hash:
+        return None
+    return instance.content_hash, instance.s3_key
+
+
+image_pipeline = ImagePipeline()
+
+
+def _adopt_staged(session) -> None:
+    staged = session.info.pop(STAGED_KEY, None)
+    if staged:
+        image_pipeline.adopt_staged(staged)
+
+
+# Ahead of the commit hooks, so the renderer queued by them finds the staged copies.
+event.listen(db.session, "after_commit", _adopt_staged, insert=True)
+
+
+@event.listens_for(db.session, "after_rollback")
+def _discard_staged(session) -> None:
+    staged = session.info.pop(STAGED_KEY, None)
+    if staged:
+        discard(staged.values())
+
+
+@atexit.register
+def _shutdown_on_exit() -> None:
+    try:
+        image_pipeline.shutdown()
+    except Exception:  # pragma: no cover - interpreter is shutting down
+        pass
@@ -0,0 +1,114 @@
+"""Live listing updates fanned out over the in-process broker.
+
+Bids accepted by this worker are published immediately. Bids accepted by other
+gunicorn workers (and closes made by the auction closer process) are picked up
+by one watcher thread per worker, which polls only the listings that currently
+have subscribers, with one query per interval regardless of client count.
+"""
+
+from __future__ import annotations
+
+import threading
+from datetime import datetime
+from typing import Optional
+
+from flask import Flask
+from sqlalchemy import or_, select
+
+from app.extensions import db
+from app.models import Listing
+from app.utils.broker import Event, broker
+from app.utils.dates import utcnow
+
+LISTING_TOPIC_PREFIX = "listing:"
+
+
+def listing_topic(listing_id: int) -> str:
+    return f"{LISTING_TOPIC_PREFIX}{listing_id}"
+
+
+def listing_payload(listing_id: int, current_bid, bid_count: int, status: str, auction_end: Optional[datetime]) -> dict:
+    return {
+        "listing_id": listing_id,
+        "current_bid": str(current_bid) if current_bid is not None else None,
+        "bid_count": bid_count,
+        "status": status,
+        "auction_end": auction_end.isoformat() + "Z" if auction_end else None,
+    }
+
+
+def publish_listing_state(payload: dict) -> int:
+    watcher.remember(payload)
+    return _publish(payload)
+
+
+def _publish(payload: dict) -> int:
+    name = "bid" if payload["status"] == "active" else "closed"
+    return broker.publish(listing_topic(payload["listing_id"]), name, payload)
+
+
+def snapshot_events(listing_ids: list[int], live_only: bool = False) -> list[Event]:
+    """Current state of ``listing_ids``; with ``live_only``, just auctions still taking bids."""
+    if not listing_ids:
+        return []
+    query = select(Listing.id, Listing.current_bid, Listing.bid_count, Listing.status, Listing.auction_end).where(
+        Listing.id.in_(listing_ids)
+    )
+    if live_only:
+        query = query.where(Listing.status == "active", or_(Listing.auction_end.is_(None), Listing.auction_end > utcnow()))
+    rows = db.session.execute(query).all()
+    return [Event(0, "snapshot", listing_payload(*row)) for row in rows]
+
+
+class ListingWatcher:
+    def __init__(self, interval: float = 2.0) -> None:
+        self.interval = interval
+        self._seen: dict[int, tuple] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def remember(self, payload: dict) -> None:
+        with self._lock:
+            self._seen[payload["listing_id"]] = (payload["bid_count"], payload["status"])
+
+    def ensure_started(self, app: Flask) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self.interval = app.config.get("SSE_POLL_SECONDS", self.interval)
+            self._thread = threading.Thread(target=self._run, args=(app,), name="listing-watcher", daemon=True)
+            self._thread.start()
+
+    def poll(self) -> int:
+        listing_ids = [int(topic[len(LISTING_TOPIC_PREFIX) :]) for topic in broker.active_topics(LISTING_TOPIC_PREFIX)]
+        with self._lock:
+            for stale in set(self._seen) - set(listing_ids):
+                del self._seen[stale]
+        if not listing_ids:
+            return 0
+
+        published = 0
+        for event in snapshot_events(listing_ids):
+            payload = event.data
+            with self._lock:
+                previous = self._seen.get(payload["listing_id"])
+            self.remember(payload)
+            if previous is not None and previous != (payload["bid_count"], payload["status"]):
+                _publish(payload)
+                published += 1
+        db.session.remove()
+        return published
+
+    def _run(self, app: Flask) -> None:
+        stop = threading.Event()
+        while not stop.wait(self.interval):
+            with app.app_context():
+                try:
+                    self.poll()
+                except Exception:  # pragma: no cover - keep the watcher alive across DB hiccups
+                    app.logger.exception("Listing watcher poll failed")
+
+
+watcher = ListingWatcher()
@@ -0,0 +1,142 @@
+"""Bounded executor for bcrypt work done on behalf of requests.
+
+A bcrypt hash at cost 12 takes a few hundred milliseconds of CPU. Running it
+inline lets a burst of logins occupy every request thread at once; routing it
+through a small pool caps how many hashes run per process, and a bounded
+backlog turns overload into a quick "try again" instead of a stalled worker.
+The bcrypt C code releases the GIL, so other request threads keep running
+while a hash is in flight.
+"""
+
+from __future__ import annotations
+
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from dataclasses import dataclass
+from typing import Callable, Optional, TypeVar
+
+from flask import Flask
+
+from app.extensions import bcrypt
+
+T = TypeVar("T")
+
+
+class HasherBusyError(Exception):
+    """Raised when the hashing backlog is full."""
+
+
+@dataclass(frozen=True)
+class HasherStats:
+    workers: int
+    in_flight: int
+    queued: int
+    peak_queued: int
+    completed: int
+    rejected: int
+    rehashed: int
+
+
+def hash_cost(password_hash: str) -> Optional[int]:
+    # Modular crypt format: $2b$<cost>$<salt+hash>
+    parts = (password_hash or "").split("$")
+    if len(parts) < 4 or not parts[2].isdigit():
+        return None
+    return int(parts[2])
+
+
+class PasswordHasher:
+    def __init__(self, rounds: int = 12, workers: int = 2, queue_size: int = 32, timeout: float = 10.0) -> None:
+        self.rounds = rounds
+        self.workers = workers
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+        self._in_flight = 0
+        self._peak_queued = 0
+        self._completed = 0
+        self._rejected = 0
+        self._rehashed = 0
+
+    def configure(self, app: Flask) -> None:
+        with self._lock:
+            self.rounds = app.config.get("BCRYPT_LOG_ROUNDS", self.rounds)
+            self.workers = app.config.get("PASSWORD_HASH_WORKERS", self.workers)
+            self.queue_size = app.config.get("PASSWORD_HASH_QUEUE_SIZE", self.queue_size)
+            self.timeout = app.config.get("PASSWORD_HASH_TIMEOUT_SECONDS", self.timeout)
+            self._slots = threading.BoundedSemaphore(self.workers + self.queue_size)
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+
+    def stats(self) -> HasherStats:
+        with self._lock:
+            return HasherStats(
+                workers=self.workers,
+                in_flight=self._in_flight,
+                queued=max(self._in_flight - self.workers, 0),
+                peak_queued=self._peak_queued,
+                completed=self._completed,
+                rejected=self._rejected,
+                rehashed=self._rehashed,
+            )
+
+    def hash(self, password: str) -> str:
+        rounds = self.rounds
+        return self._run(lambda: bcrypt.generate_password_hash(password, rounds).decode("utf-8"))
+
+    def verify(self, password_hash: str, password: str) -> bool:
+        if hash_cost(password_hash) is None:
+            return False
+        return self._run(lambda: bcrypt.check_password_hash(password_hash, password))
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        return hash_cost(password_hash) != self.rounds
+
+    def verify_and_update(self, user, password: str) -> bool:
+        """Check ``password`` and re-hash it at the configured cost if needed.
+
+        The caller commits; the new hash rides along with the login update.
+        """
+        if not self.verify(user.password_hash, password):
+            return False
+        if self.needs_rehash(user.password_hash):
+            user.password_hash = self.hash(password)
+            with self._lock:
+                self._rehashed += 1
+        return True
+
+    def _run(self, work: Callable[[], T]) -> T:
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise HasherBusyError("Too many sign-in attempts are being processed. Please try again shortly.")
+
+        with self._lock:
+            if self._executor is None:
+                # Created lazily so forked workers never inherit a pool's threads.
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+            executor = self._executor
+            self._in_flight += 1
+            self._peak_queued = max(self._peak_queued, self._in_flight - self.workers)
+            slots = self._slots
+
+        future: Future = executor.submit(work)
+        future.add_done_callback(lambda _: self._finish(slots))
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            # The hash finishes in the background and frees its slot; the request gives up.
+            raise HasherBusyError("Signing in is taking longer than usual. Please try again shortly.") from None
+
+    def _finish(self, slots: threading.BoundedSemaphore) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            self._completed += 1
+        slots.release()
+
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,364 @@
+"""Price guide: what completed sales fetch per year, county, license type and grade.
+
+``price_guide`` holds one row per combination of the listing's
+``license_year``, ``county``, ``license_type`` and ``condition_grade`` with the
+sale count, running total, min, max and a ``QuantileSketch`` of every
+``sale_amount``, from which the median is read. Flush listeners turn
+transactions that become completed (or stop being completed, or are deleted
+while completed) into deltas and fold them into those rows on the flush's own
+connection, so the guide commits or rolls back with the sale. Nothing is ever
+recomputed from scratch on the write path; only a refund of the current min or
+max re-reads that one combination's bounds.
+
+Each worker keeps the rows as ``PriceStats`` in a dict, loaded once, patched on
+commit for its own writes and refreshed by ``updated_at`` for everyone else's,
+so a lookup is a dictionary hit. Core writes to ``transactions`` and edits to
+a sold listing's year, county, type or grade bypass the listeners: run
+``flask price-guide rebuild`` (or ``rebuild_price_guide``) afterwards. The
+rebuild rewrites rows in place and empties the ones no sale backs any more, so
+other workers see it through their ``updated_at`` refresh.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+from typing import Iterable, Optional
+
+from sqlalchemy import bindparam, event, func, inspect, select, tuple_, update
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.extensions import db
+from app.models import Listing, PriceGuideEntry, Transaction
+from app.services.bidding import to_money
+from app.utils.model_events import register_commit_hook, stage
+from app.utils.quantiles import QuantileSketch
+
+HOOK_NAME = "price_guide"
+PENDING_KEY = "price_guide_sales"
+COMPLETED = "completed"
+KEY_FIELDS = ("license_year", "county", "license_type", "condition_grade")
+SALE_FIELDS = ("listing_id", "sale_amount", "status")
+VALUE_FIELDS = ("sale_count", "total_amount", "min_amount", "max_amount", "sketch")
+
+# Dialects with INSERT ... ON CONFLICT, used to create missing rows without racing.
+UPSERT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+Key = tuple[int, str, str, str]
+# (listing_id, sale_amount, delta): +1 when a sale completes, -1 when it is undone.
+Sale = tuple[int, Decimal, int]
+
+
+@dataclass(frozen=True)
+class PriceStats:
+    count: int
+    mean: Decimal
+    median: Decimal
+    low: Decimal
+    high: Decimal
+
+
+@dataclass(frozen=True)
+class RebuildSummary:
+    sales: int
+    entries: int
+
+
+def _listing_keys(columns) -> tuple:
+    return tuple(getattr(columns, field) for field in KEY_FIELDS)
+
+
+def stats_for(count: int, total, low, high, sketch: QuantileSketch) -> Optional[PriceStats]:
+    if count <= 0 or low is None or high is None:
+        return None
+    low, high = to_money(low), to_money(high)
+    # The sketch is accurate to 1%; keep its estimate inside the exact bounds.
+    median = min(max(to_money(sketch.quantile(0.5)), low), high)
+    return PriceStats(count=count, mean=to_money(Decimal(total) / count), median=median, low=low, high=high)
+
+
+def _stats(row) -> Optional[PriceStats]:
+    return stats_for(
+        row.sale_count, row.total_amount, row.min_amount, row.max_amount, QuantileSketch.from_dict(row.sketch)
+    )
+
+
+# -- write path ---------------------------------------------------------------
+
+
+def _values(entry: dict) -> dict:
+    values = (entry["count"], entry["total"], entry["low"], entry["high"], entry["sketch"].to_dict())
+    return dict(zip(VALUE_FIELDS, values))
+
+
+def apply_sales(connection, sales: Iterable[Sale]) -> list[tuple[Key, Optional[PriceStats]]]:
+    """Fold sale deltas into ``price_guide`` on ``connection``; returns the new stats per key."""
+    totals: Counter = Counter()
+    for listing_id, amount, delta in sales:
+        totals[listing_id, to_money(amount)] += delta
+    # Zeros drop out, e.g. a completed sale edited and saved unchanged.
+    net = {sale: delta for sale, delta in totals.items() if delta}
+    if not net:
+        return []
+
+    listing_columns = _listing_keys(Listing.__table__.c)
+    keys = {
+        row[0]: tuple(row[1:])
+        for row in connection.execute(
+            select(Listing.__table__.c.id, *listing_columns).where(Listing.__table__.c.id.in_({i for i, _ in net}))
+        )
+    }
+    changes: dict[Key, list[tuple[Decimal, int]]] = {}
+    for (listing_id, amount), delta in sorted(net.items()):
+        if listing_id in keys:
+            changes.setdefault(keys[listing_id], []).append((amount, delta))
+    if not changes:
+        return []
+
+    table = PriceGuideEntry.__table__
+    key_columns = _listing_keys(table.c)
+    # FOR UPDATE cannot lock rows that do not exist yet, so two first sales of a key
+    # would both insert it. Create the missing rows empty first; ON CONFLICT makes a
+    # concurrent creator wait and then skip, and every key is then locked and updated.
+    empty = _values({"count": 0, "total": Decimal("0"), "low": None, "high": None, "sketch": QuantileSketch()})
+    connection.execute(
+        UPSERT_INSERTS[connection.dialect.name](table).on_conflict_do_nothing(index_elements=list(KEY_FIELDS)),
+        [{**dict(zip(KEY_FIELDS, key)), **empty} for key in changes],
+    )
+    stored = {
+        _listing_keys(row): row
+        for row in connection.execute(select(table).where(tuple_(*key_columns).in_(list(changes))).with_for_update())
+    }
+
+    results: dict[Key, dict] = {}
+    stale_bounds = []
+    for key, deltas in changes.items():
+        row = stored.get(key)
+        sketch = QuantileSketch.from_dict(row.sketch if row else None)
+        count = row.sale_count if row else 0
+        total = Decimal(row.total_amount) if row else Decimal("0")
+        low = row.min_amount if row else None
+        high = row.max_amount if row else None
+        for amount, delta in deltas:
+            count += delta
+            total += amount * delta
+            if delta > 0:
+                sketch.add(amount, delta)
+                low = amount if low is None else min(low, amount)
+                high = amount if high is None else max(high, amount)
+            else:
+                sketch.remove(amount, -delta)
+                if amount in (low, high):
+                    stale_bounds.append(key)
+        if count <= 0:
+            count, total, low, high, sketch = 0, Decimal("0"), None, None, QuantileSketch()
+        results[key] = {"count": count, "total": total, "low": low, "high": high, "sketch": sketch}
+
+    if stale_bounds:
+        # A refund took out the cheapest or dearest sale; re-read just those bounds.
+        bounds = connection.execute(
+            select(*listing_columns, func.min(Transaction.sale_amount), func.max(Transaction.sale_amount))
+            .join(Transaction.__table__, Transaction.listing_id == Listing.id)
+            .where(Transaction.status == COMPLETED, tuple_(*listing_columns).in_(stale_bounds))
+            .group_by(*listing_columns)
+        )
+        found = {tuple(row[:4]): row[4:] for row in bounds}
+        for key in stale_bounds:
+            if results[key]["count"]:
+                results[key]["low"], results[key]["high"] = found.get(key, (None, None))
+
+    connection.execute(
+        update(table)
+        .where(table.c.id == bindparam("entry_id"))
+        .values({name: bindparam(f"new_{name}") for name in VALUE_FIELDS}),
+        [
+            {"entry_id": stored[key].id, **{f"new_{name}": value for name, value in _values(entry).items()}}
+            for key, entry in results.items()
+        ],
+    )
+
+    return [
+        (key, stats_for(values["count"], values["total"], values["low"], values["high"], values["sketch"]))
+        for key, values in results.items()
+    ]
+
+
+def _sale_deltas(session) -> list[Sale]:
+    sales: list[Sale] = []
+    for sale in session.new:
+        if isinstance(sale, Transaction) and sale.status == COMPLETED:
+            sales.append((sale.listing_id, sale.sale_amount, 1))
+    for sale in session.deleted:
+        if isinstance(sale, Transaction) and sale.status == COMPLETED:
+            sales.append((sale.listing_id, sale.sale_amount, -1))
+    edited = {
+        sale.id: sale
+        for sale in session.dirty
+        if isinstance(sale, Transaction)
+        and any(inspect(sale).attrs[name].history.has_changes() for name in SALE_FIELDS)
+    }
+    if edited:
+        # As for ratings: an expired transaction keeps no old values, so read them back.
+        stored = session.connection().execute(
+            select(Transaction.id, *(getattr(Transaction, name) for name in SALE_FIELDS)).where(
+                Transaction.id.in_(edited)
+            )
+        )
+        for sale_id, listing_id, amount, status in stored:
+            sale = edited[sale_id]
+            if status == COMPLETED:
+                sales.append((listing_id, amount, -1))
+            if sale.status == COMPLETED:
+                sales.append((sale.listing_id, sale.sale_amount, 1))
+    return sales
+
+
+@event.listens_for(db.session, "before_flush")
+def _collect_sales(session, flush_context, instances) -> None:
+    session.info[PENDING_KEY] = _sale_deltas(session)
+
+
+@event.listens_for(db.session, "after_flush")
+def _apply_sales(session, flush_context) -> None:
+    sales = session.info.pop(PENDING_KEY, None)
+    if sales:
+        stage(HOOK_NAME, apply_sales(session.connection(), sales))
+
+
+def rebuild_price_guide(batch_size: int = 5000) -> RebuildSummary:
+    """Recompute every ``price_guide`` row from completed transactions; the caller commits."""
+    listing_columns = _listing_keys(Listing)
+    query = (
+        select(*listing_columns, Transaction.sale_amount)
+        .select_from(Transaction)
+        .join(Listing, Listing.id == Transaction.listing_id)
+        .where(Transaction.status == COMPLETED)
+        .execution_options(yield_per=batch_size)
+    )
+    entries: dict[Key, dict] = {}
+    sales = 0
+    for row in db.session.execute(query):
+        key, amount = tuple(row[:4]), to_money(row[4])
+        entry = entries.get(key)
+        if entry is None:
+            entry = {"count": 0, "total": Decimal("0"), "low": amount, "high": amount, "sketch": QuantileSketch()}
+            entries[key] = entry
+        entry["count"] += 1
+        entry["total"] += amount
+        entry["low"], entry["high"] = min(entry["low"], amount), max(entry["high"], amount)
+        entry["sketch"].add(amount)
+        sales += 1
+
+    # Rows are rewritten and emptied in place, never deleted: other workers refresh on
+    # updated_at, which a deleted key would never reach.
+    table = PriceGuideEntry.__table__
+    upsert = UPSERT_INSERTS[db.session.get_bind().dialect.name](table)
+    upsert = upsert.on_conflict_do_update(
+        index_elements=list(KEY_FIELDS),
+        set_={name: upsert.excluded[name] for name in (*VALUE_FIELDS, "updated_at")},
+    )
+    rows = [{**dict(zip(KEY_FIELDS, key)), **_values(entry)} for key, entry in sorted(entries.items())]
+    for start in range(0, len(rows), batch_size):
+        db.session.execute(upsert, rows[start : start + batch_size])
+
+    empty = _values({"count": 0, "total": Decimal("0"), "low": None, "high": None, "sketch": QuantileSketch()})
+    gone = [
+        row.id
+        for row in db.session.execute(select(table.c.id, *_listing_keys(table.c)).where(table.c.sale_count != 0))
+        if _listing_keys(row) not in entries
+    ]
+    for start in range(0, len(gone), batch_size):
+        db.session.execute(update(table).where(table.c.id.in_(gone[start : start + batch_size])).values(empty))
+    # This worker reloads at once; the others pick the rows up by updated_at.
+    stage(HOOK_NAME, [None])
+    return RebuildSummary(sales=sales, entries=len(rows))
+
+
+# -- read path ----------------------------------------------------------------
+
+
+class PriceGuide:
+    """Per-worker copy of ``price_guide`` for dictionary-speed lookups."""
+
+    def __init__(self, refresh_interval: float = 60.0) -> None:
+        self.refresh_interval = refresh_interval
+        self.entries: dict[Key, PriceStats] = {}
+        self.watermark: Optional[datetime] = None
+        self._ready = False
+        self._next_refresh = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self) -> bool:
+        return self._ready
+
+    def configure(self, app) -> None:
+        self.refresh_interval = app.config.get("PRICE_GUIDE_REFRESH_SECONDS", self.refresh_interval)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.entries = {}
+            self.watermark = None
+            self._ready = False
+            self._next_refresh = 0.0
+
+    def ensure_ready(self) -> None:
+        if self._ready and time.monotonic() < self._next_refresh:
+            return
+        with self._lock:
+            if not self._ready:
+                self.rebuild()
+                self._ready = True
+            else:
+                self.refresh()
+            self._next_refresh = time.monotonic() + self.refresh_interval
+
+    def _load(self, query) -> int:
+        # Its own connection: lookups happen mid-request, and the request's session may
+        # hold pending work and staged commit hooks.
+        with db.engine.connect() as connection:
+            rows = connection.execute(query).all()
+        for row in rows:
+            self.apply_entry(_listing_keys(row), _stats(row))
+            if self.watermark is None or row.updated_at > self.watermark:
+                self.watermark = row.updated_at
+        return len(rows)
+
+    def rebuild(self) -> int:
+        self.entries, self.watermark = {}, None
+        return self._load(select(PriceGuideEntry.__table__))
+
+    def refresh(self) -> int:
+        query = select(PriceGuideEntry.__table__)
+        if self.watermark is not None:
+            query = query.where(PriceGuideEntry.updated_at >= self.watermark)
+        return self._load(query)
+
+    def apply_entry(self, key: Key, stats: Optional[PriceStats]) -> None:
+        if stats is None:
+            self.entries.pop(key, None)
+        else:
+            self.entries[key] = stats
+
+    def apply(self, snapshots: list) -> None:
+        if not self._ready:
+            return
+        for snapshot in snapshots:
+            if snapshot is None:
+                self._ready = False
+                return
+            self.apply_entry(*snapshot)
+
+    def lookup(self, license_year: int, county: str, license_type: str, condition_grade: str) -> Optional[PriceStats]:
+        self.ensure_ready()
+        return self.entries.get((license_year, county, license_type, condition_grade))
+
+
+price_guide = PriceGuide()
+
+# Fed by stage() from the flush listener and the rebuild; no model instances to snapshot.
+register_commit_hook(HOOK_NAME, (), lambda instance, deleted: None, price_guide.apply)
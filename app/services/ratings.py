@@ -0,0 +1,196 @@
+"""Seller and buyer ratings kept in step with ``reviews``.
+
+Each member carries a running review count and rating total per role
+(``seller_review_count`` / ``seller_rating_total`` and the buyer pair), and
+``seller_rating`` / ``buyer_rating`` hold their rounded average. Flush
+listeners turn the reviews inserted, deleted or edited in a flush into one
+batched ``UPDATE users`` per role, issued on the flush's own connection, so
+the numbers commit or roll back with the review. Profiles and listing cards
+read the stored columns and never aggregate; a change to a seller's rating
+also invalidates the cached listing fragments once it commits.
+
+Core writes to ``reviews`` bypass the listener: call ``apply_review_deltas``
+with the affected rows (and stage a ``"listing"`` fragment invalidation), or
+run ``flask ratings reconcile``, which rebuilds every member's numbers from a
+single grouped query and only rewrites the ones that drifted.
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+from dataclasses import dataclass
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Iterable, Optional
+
+from sqlalchemy import bindparam, case, event, func, inspect, literal, or_, select, update
+from sqlalchemy.orm.util import identity_key
+
+from app.extensions import db, fragment_cache
+from app.models import Review, User
+
+ROLES = ("seller", "buyer")
+TWO_PLACES = Decimal("0.01")
+PENDING_KEY = "review_rating_deltas"
+RATED_FIELDS = ("reviewee_id", "role", "rating")
+
+
+@dataclass(frozen=True)
+class ReconcileSummary:
+    members: int
+    corrected: int
+
+
+def _columns(role: str):
+    return (
+        getattr(User.__table__.c, f"{role}_review_count"),
+        getattr(User.__table__.c, f"{role}_rating_total"),
+        getattr(User.__table__.c, f"{role}_rating"),
+    )
+
+
+def average(total: int, count: int) -> Optional[Decimal]:
+    if not count:
+        return None
+    return (Decimal(total) / count).quantize(TWO_PLACES, rounding=ROUND_HALF_UP)
+
+
+def apply_review_deltas(connection, deltas: dict[tuple[int, str], tuple[int, int]]) -> None:
+    """Add ``(count, total)`` deltas keyed by ``(reviewee_id, role)`` to the stored ratings."""
+    for role in ROLES:
+        rows = [
+            {"member_id": user_id, "count_delta": count, "total_delta": total}
+            for (user_id, row_role), (count, total) in sorted(deltas.items())
+            if row_role == role and (count or total)
+        ]
+        if not rows:
+            continue
+        count_column, total_column, rating_column = _columns(role)
+        count = count_column + bindparam("count_delta")
+        total = total_column + bindparam("total_delta")
+        connection.execute(
+            update(User.__table__)
+            .where(User.__table__.c.id == bindparam("member_id"))
+            .values(
+                {
+                    count_column: count,
+                    total_column: total,
+                    rating_column: case((count > 0, func.round(total * literal(1.0) / count, 2)), else_=None),
+                }
+            ),
+            rows,
+        )
+
+
+def _review_deltas(session) -> dict[tuple[int, str], tuple[int, int]]:
+    deltas: Counter = Counter()
+
+    def add(key: tuple[int, str], count: int, total: int) -> None:
+        deltas[key, "count"] += count
+        deltas[key, "total"] += total
+
+    for review in session.new:
+        if isinstance(review, Review):
+            add((review.reviewee_id, review.role), 1, review.rating)
+    for review in session.deleted:
+        if isinstance(review, Review):
+            add((review.reviewee_id, review.role), -1, -review.rating)
+    edited = {
+        review.id: review
+        for review in session.dirty
+        if isinstance(review, Review)
+        and any(inspect(review).attrs[name].history.has_changes() for name in RATED_FIELDS)
+    }
+    if edited:
+        # An expired review keeps no old values; read them back before the flush overwrites them.
+        stored = session.connection().execute(
+            select(Review.id, *(getattr(Review, name) for name in RATED_FIELDS)).where(Review.id.in_(edited))
+        )
+        for review_id, reviewee_id, role, rating in stored:
+            review = edited[review_id]
+            add((reviewee_id, role), -1, -rating)
+            add((review.reviewee_id, review.role), 1, review.rating)
+
+    keys = {key for key, _ in deltas}
+    return {key: (deltas[key, "count"], deltas[key, "total"]) for key in keys}
+
+
+@event.listens_for(db.session, "before_flush")
+def _collect_review_changes(session, flush_context, instances) -> None:
+    # Read here: after the flush a deleted review's expired columns can no longer load.
+    session.info[PENDING_KEY] = _review_deltas(session)
+
+
+@event.listens_for(db.session, "after_flush")
+def _apply_review_changes(session, flush_context) -> None:
+    deltas = session.info.pop(PENDING_KEY, None)
+    if not deltas:
+        return
+    apply_review_deltas(session.connection(), deltas)
+    if any(role == "seller" for _, role in deltas):
+        # Listing cards show the seller's rating.
+        fragment_cache.stage_invalidation("listing")
+    # Loaded members would otherwise keep showing their old rating.
+    for user_id, role in deltas:
+        member = session.identity_map.get(identity_key(User, user_id))
+        if member is not None:
+            session.expire(member, list(_attribute_names(role)))
+
+
+def _attribute_names(role: str) -> Iterable[str]:
+    return (f"{role}_review_count", f"{role}_rating_total", f"{role}_rating")
+
+
+def reconcile_ratings(batch_size: int = 1000) -> ReconcileSummary:
+    """Rebuild every member's rating columns from ``reviews``; the caller commits."""
+    expected: dict[tuple[int, str], tuple[int, int]] = {}
+    grouped = select(Review.reviewee_id, Review.role, func.count(Review.id), func.sum(Review.rating)).group_by(
+        Review.reviewee_id, Review.role
+    )
+    for user_id, role, count, total in db.session.execute(grouped):
+        if role in ROLES:
+            expected[user_id, role] = (count, int(total))
+
+    rated = []
+    for role in ROLES:
+        count_column, _, rating_column = _columns(role)
+        rated += [count_column != 0, rating_column.is_not(None)]
+    members = set(db.session.scalars(select(User.id).where(or_(*rated))))
+    members.update(user_id for user_id, _ in expected)
+    stale = []
+    for chunk in _chunks(sorted(members), batch_size):
+        stored = db.session.execute(
+            select(User.id, *(column for role in ROLES for column in _columns(role))).where(User.id.in_(chunk))
+        )
+        for row in stored:
+            values = {"member_id": row.id}
+            for role in ROLES:
+                count, total = expected.get((row.id, role), (0, 0))
+                values[f"{role}_count"], values[f"{role}_total"] = count, total
+                values[f"{role}_average"] = average(total, count)
+            wanted = tuple(values[f"{role}_{field}"] for role in ROLES for field in ("count", "total", "average"))
+            if tuple(row[1:]) != wanted:
+                stale.append(values)
+
+    table = User.__table__
+    statement = (
+        update(table)
+        .where(table.c.id == bindparam("member_id"))
+        .values(
+            {
+                column: bindparam(f"{role}_{field}")
+                for role in ROLES
+                for column, field in zip(_columns(role), ("count", "total", "average"))
+            }
+        )
+    )
+    for chunk in _chunks(stale, batch_size):
+        db.session.execute(statement, chunk)
+    if stale:
+        db.session.expire_all()
+        fragment_cache.stage_invalidation("listing")
+    return ReconcileSummary(members=len(members), corrected=len(stale))
+
+
+def _chunks(items: list, size: int) -> Iterable[list]:
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
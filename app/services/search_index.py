@@ -0,0 +1,460 @@
+"""In-process inverted index over published listings with BM25 ranking.
+
+Each worker keeps its own index. Postings are append-only ``array`` pairs per
+term; re-indexing a listing gives it a fresh slot and tombstones the old one,
+and the index compacts itself once too many slots are dead. Changes made in
+this process are applied right after commit via session events; changes made
+elsewhere (other workers, the auction closer) are picked up by a cheap
+incremental ``updated_at`` query at most every ``refresh_interval`` seconds.
+That query reads ``refresh_lag`` seconds behind the watermark, because a row
+is stamped at flush and may commit after a later stamp was already seen; rows
+already applied at the same stamp are skipped. Reads use their own
+connection, never the caller's request session.
+"""
+
+from __future__ import annotations
+
+import heapq
+import math
+import os
+import pickle
+import re
+import tempfile
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import select
+
+from app.extensions import db
+from app.models import Listing
+from app.utils.model_events import register_commit_hook
+
+INDEX_FORMAT_VERSION = 1
+SEARCHABLE_STATUSES = frozenset({"active"})
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has in is it its of on or that the this to was were with".split()
+)
+TITLE_WEIGHT = 3
+
+
+def tokenize(text: Optional[str]) -> list[str]:
+    if not text:
+        return []
+    return [token for token in TOKEN_RE.findall(text.lower()) if token not in STOPWORDS]
+
+
+@dataclass(frozen=True)
+class SearchDocument:
+    listing_id: int
+    title: str
+    description: str = ""
+    provenance: Optional[str] = None
+    county: Optional[str] = None
+    license_type: Optional[str] = None
+    license_year: Optional[int] = None
+
+    def term_frequencies(self) -> dict[str, int]:
+        counts: dict[str, int] = {}
+        for token in tokenize(self.title):
+            counts[token] = counts.get(token, 0) + TITLE_WEIGHT
+        extra = " ".join(
+            str(value) for value in (self.description, self.provenance, self.county, self.license_type, self.license_year) if value
+        )
+        for token in tokenize(extra):
+            counts[token] = counts.get(token, 0) + 1
+        return counts
+
+
+@dataclass(frozen=True)
+class SearchHit:
+    listing_id: int
+    score: float
+
+
+class InvertedIndex:
+    def __init__(self, k1: float = 1.2, b: float = 0.75, compact_ratio: float = 0.25) -> None:
+        self.k1 = k1
+        self.b = b
+        self.compact_ratio = compact_ratio
+        self._lock = threading.RLock()
+        self._clear()
+
+    def _clear(self) -> None:
+        self._postings: dict[str, tuple[array, array]] = {}
+        self._slot_listing = array("i")
+        self._slot_length = array("I")
+        self._slot_alive = bytearray()
+        self._listing_slot: dict[int, int] = {}
+        self._total_length = 0
+        self.watermark: Optional[datetime] = None
+
+    def __len__(self) -> int:
+        return len(self._listing_slot)
+
+    def __contains__(self, listing_id: int) -> bool:
+        return listing_id in self._listing_slot
+
+    @property
+    def dead_slots(self) -> int:
+        return len(self._slot_listing) - len(self._listing_slot)
+
+    def add(self, document: SearchDocument) -> None:
+        frequencies = document.term_frequencies()
+        with self._lock:
+            self._remove_locked(document.listing_id)
+            slot = len(self._slot_listing)
+            length = sum(frequencies.values())
+            self._slot_listing.append(document.listing_id)
+            self._slot_length.append(length)
+            self._slot_alive.append(1)
+            self._listing_slot[document.listing_id] = slot
+            self._total_length += length
+            for term, frequency in frequencies.items():
+                postings = self._postings.get(term)
+                if postings is None:
+                    postings = self._postings[term] = (array("i"), array("H"))
+                postings[0].append(slot)
+                postings[1].append(min(frequency, 0xFFFF))
+            self._maybe_compact()
+
+    def remove(self, listing_id: int) -> bool:
+        with self._lock:
+            removed = self._remove_locked(listing_id)
+            if removed:
+                self._maybe_compact()
+            return removed
+
+    def _remove_locked(self, listing_id: int) -> bool:
+        slot = self._listing_slot.pop(listing_id, None)
+        if slot is None:
+            return False
+        self._slot_alive[slot] = 0
+        self._total_length -= self._slot_length[slot]
+        return True
+
+    def _maybe_compact(self) -> None:
+        if self.dead_slots > 1024 and self.dead_slots > self.compact_ratio * len(self._slot_listing):
+            self.compact()
+
+    def compact(self) -> None:
+        with self._lock:
+            remap = array("i", [-1]) * len(self._slot_listing)
+            slot_listing, slot_length = array("i"), array("I")
+            for slot, alive in enumerate(self._slot_alive):
+                if alive:
+                    remap[slot] = len(slot_listing)
+                    slot_listing.append(self._slot_listing[slot])
+                    slot_length.append(self._slot_length[slot])
+
+            postings: dict[str, tuple[array, array]] = {}
+            for term, (slots, frequencies) in self._postings.items():
+                new_slots, new_frequencies = array("i"), array("H")
+                for slot, frequency in zip(slots, frequencies):
+                    target = remap[slot]
+                    if target >= 0:
+                        new_slots.append(target)
+                        new_frequencies.append(frequency)
+                if new_slots:
+                    postings[term] = (new_slots, new_frequencies)
+
+            self._postings = postings
+            self._slot_listing = slot_listing
+            self._slot_length = slot_length
+            self._slot_alive = bytearray(b"\x01") * len(slot_listing)
+            self._listing_slot = {listing_id: slot for slot, listing_id in enumerate(slot_listing)}
+
+    def search(
+        self,
+        query: str,
+        limit: int = 20,
+        candidates: Optional[set[int]] = None,
+        after: Optional[tuple[float, int]] = None,
+    ) -> list[SearchHit]:
+        """Return the best ``limit`` hits, ranked by score then listing id.
+
+        ``after`` is the ``(score, listing_id)`` of the last hit on the
+        previous page; only hits ranked below it are returned.
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms or limit <= 0:
+            return []
+
+        with self._lock:
+            if not self._listing_slot:
+                return []
+            average_length = self._total_length / len(self._listing_slot)
+            # Document frequencies come straight from posting lengths, which
+            # still include tombstoned slots; compaction keeps that error small.
+            doc_count = len(self._slot_listing)
+            weighted = []
+            for term in terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                df = len(postings[0])
+                idf = math.log(1 + (doc_count - df + 0.5) / (df + 0.5))
+                weighted.append((idf, term))
+            if not weighted:
+                return []
+            # Terms present in most listings ("license", "pennsylvania") add
+            # almost nothing to the ranking but dominate the cost; skip them
+            # whenever a more selective term is available.
+            selective = [item for item in weighted if len(self._postings[item[1]][0]) <= doc_count // 2]
+            if selective:
+                weighted = selective
+            weighted.sort(reverse=True)
+
+            k1, b = self.k1, self.b
+            norm = k1 * (1 - b)
+            scale = k1 * b / average_length
+            lengths, alive, slot_listing = self._slot_length, self._slot_alive, self._slot_listing
+            # MaxScore: once the k-th best score beats everything the remaining
+            # (more common) terms could add, unseen listings can no longer make
+            # the cut and those terms only need to top up existing candidates.
+            remaining_bound = sum(idf * (k1 + 1) for idf, _ in weighted)
+            scores: dict[int, float] = {}
+            for position, (idf, term) in enumerate(weighted):
+                slots, frequencies = self._postings[term]
+                weight = idf * (k1 + 1)
+                # The threshold counts hits above ``after`` too, so pruning is
+                # only safe on first pages.
+                if position and after is None and self._threshold(scores, limit, candidates) >= remaining_bound:
+                    if candidates is not None:
+                        scores = {slot: score for slot, score in scores.items() if slot_listing[slot] in candidates}
+                    self._top_up(scores, slots, frequencies, weight, norm, scale)
+                else:
+                    get = scores.get
+                    for slot, tf in zip(slots, frequencies):
+                        if alive[slot]:
+                            scores[slot] = get(slot, 0.0) + weight * tf / (tf + norm + scale * lengths[slot])
+                remaining_bound -= weight
+
+            if candidates is not None:
+                ranked = ((score, slot_listing[slot]) for slot, score in scores.items() if slot_listing[slot] in candidates)
+            else:
+                ranked = ((score, slot_listing[slot]) for slot, score in scores.items())
+            if after is not None:
+                ranked = (item for item in ranked if item < after)
+            best = heapq.nlargest(limit, ranked)
+        return [SearchHit(listing_id, score) for score, listing_id in best]
+
+    def _threshold(self, scores: dict[int, float], limit: int, candidates) -> float:
+        if len(scores) < limit:
+            return 0.0
+        values = scores.values()
+        if candidates is not None:
+            slot_listing = self._slot_listing
+            values = [score for slot, score in scores.items() if slot_listing[slot] in candidates]
+            if len(values) < limit:
+                return 0.0
+        return heapq.nlargest(limit, values)[-1]
+
+    def _top_up(self, scores: dict[int, float], slots: array, frequencies: array, weight: float, norm: float, scale: float) -> None:
+        lengths = self._slot_length
+        if len(scores) * 16 < len(slots):
+            # Postings are in slot order, so probe them by binary search.
+            size = len(slots)
+            for slot in scores:
+                position = bisect_left(slots, slot)
+                if position < size and slots[position] == slot:
+                    tf = frequencies[position]
+                    scores[slot] += weight * tf / (tf + norm + scale * lengths[slot])
+        else:
+            for slot, tf in zip(slots, frequencies):
+                if slot in scores:
+                    scores[slot] += weight * tf / (tf + norm + scale * lengths[slot])
+
+    def save(self, path: str) -> None:
+        with self._lock:
+            if self.dead_slots:
+                self.compact()
+            state = {
+                "version": INDEX_FORMAT_VERSION,
+                "watermark": self.watermark,
+                "slot_listing": self._slot_listing.tobytes(),
+                "slot_length": self._slot_length.tobytes(),
+                "postings": {term: (slots.tobytes(), freqs.tobytes()) for term, (slots, freqs) in self._postings.items()},
+            }
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        handle, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(handle, "wb") as stream:
+            pickle.dump(state, stream, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path: str, **kwargs) -> "InvertedIndex":
+        with open(path, "rb") as stream:
+            state = pickle.load(stream)
+        if state.get("version") != INDEX_FORMAT_VERSION:
+            raise ValueError(f"Unsupported search index format: {state.get('version')!r}")
+
+        index = cls(**kwargs)
+        index.watermark = state["watermark"]
+        index._slot_listing.frombytes(state["slot_listing"])
+        index._slot_length.frombytes(state["slot_length"])
+        index._slot_alive = bytearray(b"\x01") * len(index._slot_listing)
+        for term, (slot_bytes, freq_bytes) in state["postings"].items():
+            slots, frequencies = array("i"), array("H")
+            slots.frombytes(slot_bytes)
+            frequencies.frombytes(freq_bytes)
+            index._postings[term] = (slots, frequencies)
+        index._listing_slot = {listing_id: slot for slot, listing_id in enumerate(index._slot_listing)}
+        index._total_length = sum(index._slot_length)
+        return index
+
+
+DOCUMENT_COLUMNS = (
+    Listing.id,
+    Listing.title,
+    Listing.description,
+    Listing.provenance,
+    Listing.county,
+    Listing.license_type,
+    Listing.license_year,
+    Listing.status,
+    Listing.updated_at,
+)
+
+
+def _document(row) -> SearchDocument:
+    return SearchDocument(
+        listing_id=row.id,
+        title=row.title,
+        description=row.description,
+        provenance=row.provenance,
+        county=row.county,
+        license_type=row.license_type,
+        license_year=row.license_year,
+    )
+
+
+class ListingSearch:
+    """Owns the per-worker index and keeps it in step with the database."""
+
+    def __init__(self, refresh_interval: float = 30.0, refresh_lag: float = 60.0) -> None:
+        self.refresh_interval = refresh_interval
+        self.refresh_lag = refresh_lag
+        self.index = InvertedIndex()
+        # listing id -> updated_at already applied, for rows inside the refresh lag.
+        self._recent: dict[int, datetime] = {}
+        self.path: Optional[str] = None
+        self._ready = False
+        self._next_refresh = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self) -> bool:
+        return self._ready
+
+    def configure(self, app) -> None:
+        self.path = app.config.get("SEARCH_INDEX_PATH")
+        self.refresh_interval = app.config.get("SEARCH_INDEX_REFRESH_SECONDS", self.refresh_interval)
+        self.refresh_lag = app.config.get("SEARCH_INDEX_REFRESH_LAG_SECONDS", self.refresh_lag)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.index = InvertedIndex()
+            self._recent = {}
+            self._ready = False
+            self._next_refresh = 0.0
+
+    def ensure_ready(self) -> None:
+        if self._ready and time.monotonic() < self._next_refresh:
+            return
+        with self._lock:
+            if not self._ready:
+                if self.path and os.path.exists(self.path):
+                    try:
+                        self.index = InvertedIndex.load(self.path)
+                    except (OSError, ValueError, pickle.UnpicklingError, EOFError):
+                        self.index = InvertedIndex()
+                if self.index.watermark is None:
+                    self.rebuild()
+                    if self.path:
+                        self.save()
+                self._ready = True
+            self.refresh()
+            self._next_refresh = time.monotonic() + self.refresh_interval
+
+    def rebuild(self, batch_size: int = 5000) -> int:
+        index = InvertedIndex()
+        query = (
+            select(*DOCUMENT_COLUMNS)
+            .where(Listing.status.in_(SEARCHABLE_STATUSES))
+            .execution_options(yield_per=batch_size)
+        )
+        # Its own connection: this runs mid-request, and the request's session may
+        # hold pending work and staged commit hooks.
+        with db.engine.connect() as connection:
+            for row in connection.execute(query):
+                index.add(_document(row))
+                if row.updated_at and (index.watermark is None or row.updated_at > index.watermark):
+                    index.watermark = row.updated_at
+        if index.watermark is None:
+            index.watermark = datetime(1970, 1, 1)
+        self.index = index
+        self._recent = {}
+        return len(index)
+
+    def refresh(self) -> int:
+        """Apply listings changed elsewhere since the watermark; returns how many were applied."""
+        since = self.index.watermark - timedelta(seconds=self.refresh_lag)
+        with db.engine.connect() as connection:
+            rows = connection.execute(select(*DOCUMENT_COLUMNS).where(Listing.updated_at >= since)).all()
+        applied = 0
+        for row in rows:
+            if self._recent.get(row.id) == row.updated_at:
+                continue
+            self._recent[row.id] = row.updated_at
+            self.apply(row.id, _document(row) if row.status in SEARCHABLE_STATUSES else None)
+            applied += 1
+            if row.updated_at and row.updated_at > self.index.watermark:
+                self.index.watermark = row.updated_at
+        horizon = self.index.watermark - timedelta(seconds=self.refresh_lag)
+        self._recent = {listing_id: stamp for listing_id, stamp in self._recent.items() if stamp >= horizon}
+        return applied
+
+    def apply(self, listing_id: int, document: Optional[SearchDocument]) -> None:
+        if document is None:
+            self.index.remove(listing_id)
+        else:
+            self.index.add(document)
+
+    def search(
+        self,
+        query: str,
+        limit: int = 20,
+        candidates: Optional[set[int]] = None,
+        after: Optional[tuple[float, int]] = None,
+    ) -> list[SearchHit]:
+        self.ensure_ready()
+        return self.index.search(query, limit=limit, candidates=candidates, after=after)
+
+    def save(self) -> None:
+        if self.path:
+            self.index.save(self.path)
+
+
+listing_search = ListingSearch()
+
+
+def _snapshot(listing: Listing, deleted: bool):
+    searchable = not deleted and listing.status in SEARCHABLE_STATUSES
+    return listing.id, _document(listing) if searchable else None
+
+
+def _apply(snapshots) -> None:
+    if listing_search.ready:
+        for listing_id, document in snapshots:
+            listing_search.apply(listing_id, document)
+
+
+register_commit_hook("search_index", (Listing,), _snapshot, _apply)
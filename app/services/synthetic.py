@@ -0,0 +1,498 @@
+"""Seeded synthetic marketplace data for load tests and local development.
+
+``generate`` fills every table behind ``app.models`` with plausible rows:
+members with badges and collections, listings with images, bid wars that
+follow a heavy-tailed distribution (most listings draw a few bids, a handful
+draw hundreds), sales with transactions and two-way reviews, watchlists and
+notifications. The same seed and scale always produce the same rows, with
+timestamps placed relative to the moment of generation.
+
+Rows are built as plain dicts and written with chunked Core ``insert()``
+batches, committing once per listing batch, so a million bids stream through
+without ever holding more than ``batch_size`` rows in memory. Denormalised
+columns stay consistent with the rows they summarise: ``Listing.current_bid``
+and ``bid_count`` match the bids, exactly one bid per open or sold listing is
+``is_winning``, and every sold listing has a transaction with the winner.
+
+Core inserts skip ORM commit hooks, so the fragment cache and unread counts
+are invalidated explicitly. Usernames, emails and slugs carry the seed, so
+generating twice with the same seed into one database fails on the unique
+constraints instead of silently duplicating data.
+"""
+
+from __future__ import annotations
+
+import random
+import time
+from dataclasses import dataclass, field, replace
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Callable, Iterable, Iterator, Optional
+
+from flask import current_app
+from sqlalchemy import insert, select
+
+from app.extensions import db, fragment_cache
+from app.models import (
+    Badge,
+    Bid,
+    Collection,
+    EducationArticle,
+    Listing,
+    ListingImage,
+    Notification,
+    Review,
+    Transaction,
+    User,
+    UserBadge,
+    UserStory,
+    Watchlist,
+)
+from app.services.bidding import bid_increment, minimum_next_bid, to_money
+from app.services.holdings import PENNSYLVANIA_COUNTIES
+from app.services.notifications import NOTIFICATION_TYPES
+from app.services.passwords import password_hasher
+from app.services.price_guide import rebuild_price_guide
+from app.services.ratings import reconcile_ratings
+from app.services.unread_counts import stage_created
+from app.utils.dates import utcnow
+
+SYNTHETIC_PASSWORD = "keystone-synthetic"
+
+LICENSE_TYPES = ("resident", "non-resident", "junior", "senior", "antlerless", "bear", "archery", "fishing")
+CONDITION_GRADES = ("poor", "fair", "good", "very good", "fine", "excellent")
+ACQUIRED_VIA = ("auction", "private sale", "estate", "family", "show")
+ARTICLE_CATEGORIES = ("history", "grading", "preservation", "identification")
+
+# Share of generated listings in each status; drafts never receive bids.
+STATUS_WEIGHTS = (("active", 0.70), ("sold", 0.20), ("ended", 0.05), ("draft", 0.05))
+
+BADGES = (
+    ("first-bid", "First Bid", "Placed a first bid.", "bidding", {"bids": 1}),
+    ("first-sale", "First Sale", "Sold a first license.", "selling", {"sales": 1}),
+    ("county-collector", "County Collector", "Holds licenses from ten counties.", "collecting", {"counties": 10}),
+    ("decade-collector", "Decade Collector", "Holds licenses from five decades.", "collecting", {"decades": 5}),
+    ("trusted-seller", "Trusted Seller", "Ten sales rated four stars or more.", "selling", {"rated_sales": 10}),
+    ("storyteller", "Storyteller", "Published a story.", "community", {"stories": 1}),
+)
+
+
+@dataclass(frozen=True)
+class Scale:
+    users: int
+    listings: int
+    bids: int
+    images_per_listing: int = 2
+    collections_per_user: int = 3
+    watchlist_entries: int = 0
+    notifications: int = 0
+    articles: int = 12
+    stories: int = 24
+    review_rate: float = 0.6
+
+
+SCALES = {
+    "tiny": Scale(users=20, listings=40, bids=300, watchlist_entries=60, notifications=120, articles=3, stories=3),
+    "small": Scale(users=500, listings=2_000, bids=20_000, watchlist_entries=5_000, notifications=10_000),
+    "medium": Scale(users=5_000, listings=25_000, bids=250_000, watchlist_entries=50_000, notifications=100_000),
+    "large": Scale(
+        users=25_000, listings=100_000, bids=1_000_000, watchlist_entries=250_000, notifications=500_000,
+        articles=40, stories=200,
+    ),  # fmt: skip
+}
+
+
+@dataclass
+class GenerationSummary:
+    seed: int
+    counts: dict[str, int] = field(default_factory=dict)
+    seconds: float = 0.0
+
+    def add(self, table: str, count: int) -> None:
+        self.counts[table] = self.counts.get(table, 0) + count
+
+
+def scale_for(name: str, **overrides: Optional[int]) -> Scale:
+    """Return the named scale with any non-``None`` field overridden."""
+    if name not in SCALES:
+        raise ValueError(f"Unknown scale {name!r}; expected one of {', '.join(SCALES)}")
+    return replace(SCALES[name], **{key: value for key, value in overrides.items() if value is not None})
+
+
+def _chunks(rows: Iterable[dict], size: int) -> Iterator[list[dict]]:
+    chunk: list[dict] = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _insert(model, rows: Iterable[dict], batch_size: int) -> int:
+    written = 0
+    for chunk in _chunks(rows, batch_size):
+        db.session.execute(insert(model), chunk)
+        written += len(chunk)
+    return written
+
+
+def _insert_returning_ids(model, rows: list[dict]) -> list[int]:
+    if not rows:
+        return []
+    statement = insert(model).returning(model.id, sort_by_parameter_order=True)
+    return list(db.session.scalars(statement, rows))
+
+
+def _split(total: int, weights: list[float]) -> list[int]:
+    """Share ``total`` out in proportion to ``weights`` (largest remainder)."""
+    weight_sum = sum(weights)
+    if not weights or weight_sum <= 0:
+        return [0] * len(weights)
+    exact = [total * weight / weight_sum for weight in weights]
+    counts = [int(value) for value in exact]
+    by_remainder = sorted(range(len(weights)), key=lambda index: exact[index] - counts[index], reverse=True)
+    for index in by_remainder[: total - sum(counts)]:
+        counts[index] += 1
+    return counts
+
+
+class _Generator:
+    def __init__(self, scale: Scale, seed: int, batch_size: int, progress: Callable[[str], None]) -> None:
+        self.scale = scale
+        self.seed = seed
+        self.batch_size = batch_size
+        self.progress = progress
+        self.rng = random.Random(seed)
+        self.now = utcnow()
+        self.fee_rate = Decimal(current_app.config.get("PLATFORM_FEE_PERCENT", 10)) / 100
+        self.summary = GenerationSummary(seed)
+        self.user_ids: list[int] = []
+        self.listing_ids: list[int] = []
+
+    def run(self) -> GenerationSummary:
+        started = time.perf_counter()
+        self.users()
+        self.badges()
+        self.collections()
+        self.listings()
+        self.watchlists()
+        self.notifications()
+        self.articles()
+        self.stories()
+        # Reviews and sales went in through Core, past the flush listeners that maintain
+        # ratings and the price guide.
+        reconcile_ratings(self.batch_size)
+        rebuild_price_guide(self.batch_size)
+        fragment_cache.stage_invalidation("listing", "education", "story")
+        db.session.commit()
+        self.summary.seconds = time.perf_counter() - started
+        return self.summary
+
+    def _commit(self, label: str) -> None:
+        db.session.commit()
+        self.progress(f"{label}: " + ", ".join(f"{table} {count}" for table, count in self.summary.counts.items()))
+
+    # -- members -------------------------------------------------------------
+
+    def users(self) -> None:
+        # One hash for everyone: bcrypt per row would dominate the run.
+        password_hash = password_hasher.hash(SYNTHETIC_PASSWORD)
+        for start in range(0, self.scale.users, self.batch_size):
+            rows = []
+            for index in range(start, min(start + self.batch_size, self.scale.users)):
+                name = f"synth{self.seed}-{index}"
+                rows.append(
+                    {
+                        "username": name,
+                        "email": f"{name}@example.com",
+                        "password_hash": password_hash,
+                        "display_name": f"Collector {index}",
+                        "county": self.rng.choice(PENNSYLVANIA_COUNTIES),
+                        "is_verified": self.rng.random() < 0.8,
+                        "is_admin": index == 0,
+                    }
+                )
+            self.user_ids.extend(_insert_returning_ids(User, rows))
+            self.summary.add("users", len(rows))
+        self._commit("users")
+
+    def badges(self) -> None:
+        existing = set(db.session.scalars(select(Badge.slug)))
+        rows = [
+            {"slug": slug, "name": name, "description": description, "category": category, "criteria": criteria}
+            for slug, name, description, category, criteria in BADGES
+            if slug not in existing
+        ]
+        _insert_returning_ids(Badge, rows)
+        self.summary.add("badges", len(rows))
+        badge_ids = list(db.session.scalars(select(Badge.id).order_by(Badge.id)))
+
+        def awards() -> Iterator[dict]:
+            for user_id in self.user_ids:
+                for badge_id in self.rng.sample(badge_ids, self.rng.randint(0, min(3, len(badge_ids)))):
+                    yield {"user_id": user_id, "badge_id": badge_id, "is_featured": self.rng.random() < 0.3}
+
+        self.summary.add("user_badges", _insert(UserBadge, awards(), self.batch_size))
+        self._commit("badges")
+
+    def collections(self) -> None:
+        def rows() -> Iterator[dict]:
+            for user_id in self.user_ids:
+                for _ in range(self.rng.randint(0, 2 * self.scale.collections_per_user)):
+                    year = self.rng.randint(1913, 1979)
+                    yield {
+                        "user_id": user_id,
+                        "license_year": year,
+                        "county": self.rng.choice(PENNSYLVANIA_COUNTIES),
+                        "license_type": self.rng.choice(LICENSE_TYPES),
+                        "condition_grade": self.rng.choice(CONDITION_GRADES),
+                        "acquired_via": self.rng.choice(ACQUIRED_VIA),
+                        "acquired_at": date(2000, 1, 1) + timedelta(days=self.rng.randint(0, 9000)),
+                        "is_public": self.rng.random() < 0.85,
+                    }
+
+        self.summary.add("collections", _insert(Collection, rows(), self.batch_size))
+        self._commit("collections")
+
+    # -- listings, bids and sales ---------------------------------------------
+
+    def listings(self) -> None:
+        statuses = self.rng.choices(
+            [status for status, _ in STATUS_WEIGHTS], [weight for _, weight in STATUS_WEIGHTS], k=self.scale.listings
+        )
+        # Capped Pareto weights give the long tail of bid wars; drafts and unsold
+        # auctions draw nothing, sold ones at least one bid.
+        weights = [
+            min(self.rng.paretovariate(1.3), 100.0) if status in ("active", "sold") else 0.0 for status in statuses
+        ]
+        bid_counts = _split(self.scale.bids, weights)
+        for index, status in enumerate(statuses):
+            if status == "sold" and not bid_counts[index]:
+                bid_counts[index] = 1
+
+        for start in range(0, self.scale.listings, self.batch_size):
+            stop = min(start + self.batch_size, self.scale.listings)
+            plans = [self._plan_listing(index, statuses[index], bid_counts[index]) for index in range(start, stop)]
+            ids = _insert_returning_ids(Listing, [plan["row"] for plan in plans])
+            self.listing_ids.extend(ids)
+            self.summary.add("listings", len(ids))
+            self.summary.add("listing_images", _insert(ListingImage, self._images(ids), self.batch_size))
+            bids = (bid for plan, listing_id in zip(plans, ids) for bid in self._bids(plan, listing_id))
+            self.summary.add("bids", _insert(Bid, bids, self.batch_size))
+            self._sales(plans, ids)
+            self._commit(f"listings {stop}/{self.scale.listings}")
+
+    def _plan_listing(self, index: int, status: str, bid_count: int) -> dict:
+        rng = self.rng
+        seller_id = rng.choice(self.user_ids)
+        year = rng.randint(1913, 1979)
+        county = rng.choice(PENNSYLVANIA_COUNTIES)
+        license_type = rng.choice(LICENSE_TYPES)
+        if status == "active":
+            created_at = self.now - timedelta(minutes=rng.randint(10, 60 * 24 * 30))
+            auction_end = self.now + timedelta(minutes=rng.randint(30, 60 * 24 * 10))
+        else:
+            created_at = self.now - timedelta(minutes=rng.randint(60 * 24 * 8, 60 * 24 * 365))
+            auction_end = created_at + timedelta(days=7)
+        starting_price = Decimal(rng.randint(5, 150))
+
+        # Each bid clears the live minimum raise, sometimes by a few steps.
+        amounts: list[Decimal] = []
+        for _ in range(bid_count):
+            minimum = minimum_next_bid(starting_price, amounts[-1] if amounts else None)
+            amounts.append(minimum + bid_increment(minimum) * rng.randint(0, 3))
+        bidders: list[int] = []
+        if bid_count:
+            sampled = rng.sample(self.user_ids, min(len(self.user_ids), 8))
+            candidates = [user_id for user_id in sampled if user_id != seller_id]
+            rivals = candidates[: rng.randint(1, 6)]
+            # Rivals alternate, so nobody outbids themselves.
+            bidders = [rivals[position % len(rivals)] for position in range(bid_count)]
+
+        return {
+            "status": status,
+            "seller_id": seller_id,
+            "created_at": created_at,
+            "bid_window": (created_at, min(auction_end, self.now)),
+            "amounts": amounts,
+            "bidders": bidders,
+            "row": {
+                "seller_id": seller_id,
+                "title": f"{year} {county} County {license_type} license",
+                "description": (
+                    f"Original {year} Pennsylvania {license_type} hunting license issued in {county} County, "
+                    f"in {rng.choice(CONDITION_GRADES)} condition with the original holder."
+                ),
+                "license_year": year,
+                "license_type": license_type,
+                "county": county,
+                "condition_grade": rng.choice(CONDITION_GRADES),
+                "listing_type": "auction",
+                "starting_price": starting_price,
+                "current_bid": amounts[-1] if amounts else None,
+                "bid_count": bid_count,
+                "auction_end": auction_end if status != "draft" else None,
+                "status": status,
+                "views": rng.randint(0, 40 * (bid_count + 1)),
+                "featured": rng.random() < 0.02,
+                "created_at": created_at,
+            },
+        }
+
+    def _images(self, listing_ids: list[int]) -> Iterator[dict]:
+        for listing_id in listing_ids:
+            for position in range(self.rng.randint(1, 2 * self.scale.images_per_listing - 1)):
+                key = f"listings/{listing_id}/{position}.jpg"
+                yield {
+                    "listing_id": listing_id,
+                    "s3_key": key,
+                    "url": f"https://images.example.com/{key}",
+                    "thumbnail_url": f"https://images.example.com/thumbs/{key}",
+                    "sort_order": position,
+                }
+
+    def _bids(self, plan: dict, listing_id: int) -> Iterator[dict]:
+        opened, closed = plan["bid_window"]
+        span = (closed - opened) / (len(plan["amounts"]) + 1)
+        last = len(plan["amounts"]) - 1
+        for position, (amount, bidder_id) in enumerate(zip(plan["amounts"], plan["bidders"])):
+            is_auto = self.rng.random() < 0.25
+            yield {
+                "listing_id": listing_id,
+                "bidder_id": bidder_id,
+                "amount": amount,
+                "proxy_max": amount + bid_increment(amount) * self.rng.randint(1, 10) if is_auto else None,
+                "is_auto": is_auto,
+                "is_winning": position == last,
+                "placed_at": opened + span * (position + 1),
+            }
+
+    def _sales(self, plans: list[dict], listing_ids: list[int]) -> None:
+        sold = [(plan, listing_id) for plan, listing_id in zip(plans, listing_ids) if plan["status"] == "sold"]
+        rows = [
+            {
+                "listing_id": listing_id,
+                "buyer_id": plan["bidders"][-1],
+                "seller_id": plan["seller_id"],
+                "sale_amount": plan["amounts"][-1],
+                "platform_fee": to_money(plan["amounts"][-1] * self.fee_rate),
+                "status": self.rng.choice(("pending", "paid", "shipped", "completed", "completed")),
+            }
+            for plan, listing_id in sold
+        ]
+        transaction_ids = _insert_returning_ids(Transaction, rows)
+        self.summary.add("transactions", len(transaction_ids))
+
+        def reviews() -> Iterator[dict]:
+            for transaction_id, row in zip(transaction_ids, rows):
+                if self.rng.random() >= self.scale.review_rate:
+                    continue
+                # ``role`` is the part the reviewee played in the sale.
+                yield self._review(transaction_id, row["buyer_id"], row["seller_id"], "seller")
+                if self.rng.random() < 0.7:
+                    yield self._review(transaction_id, row["seller_id"], row["buyer_id"], "buyer")
+
+        self.summary.add("reviews", _insert(Review, reviews(), self.batch_size))
+
+    def _review(self, transaction_id: int, reviewer_id: int, reviewee_id: int, role: str) -> dict:
+        rating = self.rng.choices((1, 2, 3, 4, 5), (1, 1, 3, 10, 25))[0]
+        return {
+            "transaction_id": transaction_id,
+            "reviewer_id": reviewer_id,
+            "reviewee_id": reviewee_id,
+            "role": role,
+            "rating": rating,
+            "comment": "Smooth sale, well packed." if rating >= 4 else "Slow to ship.",
+        }
+
+    # -- engagement ------------------------------------------------------------
+
+    def watchlists(self) -> None:
+        wanted = min(self.scale.watchlist_entries, len(self.user_ids) * len(self.listing_ids))
+        seen: set[tuple[int, int]] = set()
+        while len(seen) < wanted:
+            seen.add((self.rng.choice(self.user_ids), self.rng.choice(self.listing_ids)))
+        rows = ({"user_id": user_id, "listing_id": listing_id} for user_id, listing_id in sorted(seen))
+        self.summary.add("watchlist", _insert(Watchlist, rows, self.batch_size))
+        self._commit("watchlist")
+
+    def notifications(self) -> None:
+        if not self.listing_ids:
+            return
+        unread: list[int] = []
+
+        def rows() -> Iterator[dict]:
+            for index in range(self.scale.notifications):
+                user_id = self.rng.choice(self.user_ids)
+                listing_id = self.rng.choice(self.listing_ids)
+                is_read = self.rng.random() < 0.6
+                if not is_read:
+                    unread.append(user_id)
+                yield {
+                    "user_id": user_id,
+                    "type": self.rng.choice(NOTIFICATION_TYPES),
+                    "message": f"Update on listing {listing_id}.",
+                    "link": f"/listings/{listing_id}",
+                    "is_read": is_read,
+                    "created_at": self.now - timedelta(seconds=self.scale.notifications - index),
+                }
+
+        self.summary.add("notifications", _insert(Notification, rows(), self.batch_size))
+        stage_created(unread)
+        self._commit("notifications")
+
+    def articles(self) -> None:
+        rows = []
+        for index in range(self.scale.articles):
+            category = self.rng.choice(ARTICLE_CATEGORIES)
+            rows.append(
+                {
+                    "slug": f"synth{self.seed}-article-{index}",
+                    "title": f"Reading {category} marks on early licenses, part {index + 1}",
+                    "body": "Synthetic article body. " * 40,
+                    "category": category,
+                    "era_start": 1913 + index % 60,
+                    "era_end": 1923 + index % 60,
+                    "county": self.rng.choice(PENNSYLVANIA_COUNTIES),
+                    "author_id": self.user_ids[0],
+                    "is_published": self.rng.random() < 0.9,
+                    "published_at": self.now - timedelta(days=index),
+                }
+            )
+        self.summary.add("education_articles", _insert(EducationArticle, rows, self.batch_size))
+
+    def stories(self) -> None:
+        rows = []
+        for index in range(self.scale.stories):
+            year = self.rng.randint(1913, 1979)
+            status = "published" if self.rng.random() < 0.8 else "submitted"
+            rows.append(
+                {
+                    "author_id": self.rng.choice(self.user_ids),
+                    "title": f"My grandfather's {year} license",
+                    "body": "Synthetic story body. " * 30,
+                    "status": status,
+                    "related_county": self.rng.choice(PENNSYLVANIA_COUNTIES),
+                    "related_year": year,
+                    "submitted_at": self.now - timedelta(days=index + 1),
+                    "published_at": self.now - timedelta(days=index) if status == "published" else None,
+                }
+            )
+        self.summary.add("user_stories", _insert(UserStory, rows, self.batch_size))
+
+
+def generate(
+    scale: Scale,
+    seed: int = 0,
+    batch_size: int = 5000,
+    progress: Optional[Callable[[str], None]] = None,
+) -> GenerationSummary:
+    """Fill the database with ``scale`` worth of data derived from ``seed``.
+
+    Commits as it goes. Members can log in with ``SYNTHETIC_PASSWORD``.
+    """
+    if scale.users < 2:
+        raise ValueError("Synthetic data needs at least two members, so bids have a seller and a bidder.")
+    return _Generator(scale, seed, batch_size, progress or (lambda message: None)).run()
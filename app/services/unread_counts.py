@@ -0,0 +1,121 @@
+"""Per-worker cache of unread notification counts for the nav badge.
+
+Counts are loaded with one ``COUNT(*)`` per user and then kept current from
+commit hooks: ORM changes to ``Notification`` and the bulk inserts staged by
+the fan-out adjust or drop the cached value once their transaction commits.
+Notifications written by other processes (the auction closer, other web
+workers) show up when an entry expires after ``ttl`` seconds.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Iterable, Mapping, Optional
+
+from sqlalchemy import func, inspect, select, update
+from sqlalchemy.orm import attributes
+
+from app.extensions import db
+from app.models import Notification
+from app.utils.model_events import register_commit_hook, stage
+
+HOOK_NAME = "unread_counts"
+
+
+class UnreadCounts:
+    def __init__(self, ttl: float = 30.0, max_entries: int = 10000) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[int, tuple[int, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def configure(self, app) -> None:
+        self.ttl = app.config.get("UNREAD_COUNT_TTL_SECONDS", self.ttl)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def get(self, user_id: int) -> int:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[1] > now:
+                self._entries.move_to_end(user_id)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        count = db.session.scalar(
+            select(func.count()).select_from(Notification).where(Notification.user_id == user_id, Notification.is_read.is_(False))
+        )
+        self.set(user_id, count)
+        return count
+
+    def set(self, user_id: int, count: int) -> None:
+        with self._lock:
+            self._entries[user_id] = (max(count, 0), time.monotonic() + self.ttl)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def adjust(self, deltas: Mapping[int, int]) -> None:
+        # Only cached users are touched; everyone else is counted on demand.
+        with self._lock:
+            for user_id, delta in deltas.items():
+                entry = self._entries.get(user_id)
+                if entry is not None:
+                    self._entries[user_id] = (max(entry[0] + delta, 0), entry[1])
+
+    def invalidate(self, user_ids: Iterable[int]) -> None:
+        with self._lock:
+            for user_id in user_ids:
+                self._entries.pop(user_id, None)
+
+    def apply(self, snapshots: list[tuple[int, Optional[int]]]) -> None:
+        deltas: Counter[int] = Counter()
+        stale = set()
+        for user_id, delta in snapshots:
+            if delta is None:
+                stale.add(user_id)
+            else:
+                deltas[user_id] += delta
+        self.adjust(deltas)
+        self.invalidate(stale)
+
+
+unread_counts = UnreadCounts()
+
+
+def stage_created(user_ids: Iterable[int]) -> None:
+    """Count unread notifications inserted in bulk once the transaction commits."""
+    stage(HOOK_NAME, list(Counter(user_ids).items()))
+
+
+def mark_all_read(user_id: int) -> int:
+    marked = db.session.execute(
+        update(Notification)
+        .where(Notification.user_id == user_id, Notification.is_read.is_(False))
+        .values(is_read=True)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.session.commit()
+    unread_counts.set(user_id, 0)
+    return marked
+
+
+def _snapshot(notification: Notification, deleted: bool):
+    if inspect(notification).key is None and not deleted:
+        return (notification.user_id, 1) if not notification.is_read else None
+    if deleted or attributes.get_history(notification, "is_read").has_changes():
+        # The previous value is usually expired by now, so recount rather than guess.
+        return notification.user_id, None
+    return None
+
+
+register_commit_hook(HOOK_NAME, (Notification,), _snapshot, unread_counts.apply)
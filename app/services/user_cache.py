@@ -0,0 +1,120 @@
+"""Per-worker cache behind ``login_manager.user_loader``.
+
+Authenticated requests get a slim, frozen ``CachedUser`` instead of a full
+``User`` row, so the nav bar and ``current_user.id`` checks no longer cost a
+query each. Entries are dropped when a commit in this process changes one of
+the snapshot columns or the password hash. Edits made in other processes
+(another web worker, a CLI command) are picked up when the entry expires after
+``ttl`` seconds.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+from flask_login import UserMixin
+from sqlalchemy import select
+from sqlalchemy.orm import attributes
+
+from app.extensions import db
+from app.models import User
+from app.utils.model_events import register_commit_hook
+
+SNAPSHOT_FIELDS = ("id", "username", "email", "display_name", "avatar_url", "county", "is_verified", "is_admin")
+WATCHED_FIELDS = SNAPSHOT_FIELDS + ("password_hash",)
+
+
+@dataclass(frozen=True)
+class CachedUser(UserMixin):
+    id: int
+    username: str
+    email: str
+    display_name: Optional[str]
+    avatar_url: Optional[str]
+    county: Optional[str]
+    is_verified: bool
+    is_admin: bool
+
+
+@dataclass(frozen=True)
+class UserCacheStats:
+    size: int
+    hits: int
+    misses: int
+    evictions: int
+    invalidations: int
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class UserCache:
+    def __init__(self, ttl: float = 60.0, max_entries: int = 10000) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict[int, tuple[CachedUser, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = self._misses = self._evictions = self._invalidations = 0
+
+    def configure(self, app) -> None:
+        self.ttl = app.config.get("USER_CACHE_TTL_SECONDS", self.ttl)
+        self.max_entries = app.config.get("USER_CACHE_MAX_ENTRIES", self.max_entries)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._hits = self._misses = self._evictions = self._invalidations = 0
+
+    def stats(self) -> UserCacheStats:
+        with self._lock:
+            return UserCacheStats(len(self._entries), self._hits, self._misses, self._evictions, self._invalidations)
+
+    def get(self, user_id: int) -> Optional[CachedUser]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[1] > now:
+                self._entries.move_to_end(user_id)
+                self._hits += 1
+                return entry[0]
+            self._misses += 1
+
+        row = db.session.execute(
+            select(*(getattr(User, field) for field in SNAPSHOT_FIELDS)).where(User.id == user_id)
+        ).first()
+        if row is None:
+            return None
+        user = CachedUser(**row._asdict())
+        with self._lock:
+            self._entries[user_id] = (user, time.monotonic() + self.ttl)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+        return user
+
+    def invalidate(self, user_ids) -> None:
+        with self._lock:
+            for user_id in user_ids:
+                if self._entries.pop(user_id, None) is not None:
+                    self._invalidations += 1
+
+
+user_cache = UserCache()
+
+
+def _snapshot(user: User, deleted: bool) -> Optional[int]:
+    if deleted:
+        return user.id
+    if any(attributes.get_history(user, field).has_changes() for field in WATCHED_FIELDS):
+        return user.id
+    return None
+
+
+register_commit_hook("user_cache", (User,), _snapshot, user_cache.invalidate)
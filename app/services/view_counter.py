@@ -0,0 +1,127 @@
+"""Write-coalescing counter for ``Listing.views``.
+
+Page hits are tallied in memory per worker and written back with a single
+``UPDATE ... SET views = views + CASE id ... END`` every ``flush_seconds`` or
+every ``flush_hits`` hits, whichever comes first, and once more at exit.
+Each flush runs in its own transaction on the engine, never the request session.
+The UPDATE sets ``updated_at`` to itself so the column's ``onupdate`` does
+not fire: a page view is not an edit, and the search and facet refreshers key
+off ``updated_at``.
+"""
+
+from __future__ import annotations
+
+import atexit
+import threading
+from collections import Counter
+from typing import Optional
+
+from flask import Flask
+from sqlalchemy import case, update
+
+from app.extensions import db
+from app.models import Listing
+
+
+class ViewCounter:
+    def __init__(self, flush_seconds: float = 10.0, flush_hits: int = 500) -> None:
+        self.flush_seconds = flush_seconds
+        self.flush_hits = flush_hits
+        self.flushes = 0
+        self.flushed_hits = 0
+        self._pending: Counter[int] = Counter()
+        self._pending_hits = 0
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._app: Optional[Flask] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def init_app(self, app: Flask) -> None:
+        self._app = app
+        self.flush_seconds = app.config.get("VIEW_COUNTER_FLUSH_SECONDS", self.flush_seconds)
+        self.flush_hits = app.config.get("VIEW_COUNTER_FLUSH_HITS", self.flush_hits)
+
+    def record(self, listing_id: int) -> None:
+        with self._lock:
+            self._pending[listing_id] += 1
+            self._pending_hits += 1
+            full = self._pending_hits >= self.flush_hits
+        if self.flush_seconds > 0:
+            self._ensure_thread()
+            if full:
+                self._wake.set()
+        elif full:
+            self.flush()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._pending = Counter()
+            self._pending_hits = 0
+
+    def pending(self, listing_id: int) -> int:
+        with self._lock:
+            return self._pending.get(listing_id, 0)
+
+    def flush(self) -> int:
+        with self._lock:
+            batch, self._pending = self._pending, Counter()
+            self._pending_hits = 0
+        if not batch:
+            return 0
+
+        try:
+            # Own transaction: an inline flush runs inside a request and must not
+            # commit (or roll back) whatever that request's session has pending.
+            with db.engine.begin() as connection:
+                connection.execute(
+                    update(Listing)
+                    .where(Listing.id.in_(batch))
+                    .values(views=Listing.views + case(batch, value=Listing.id, else_=0), updated_at=Listing.updated_at)
+                )
+        except Exception:
+            # Put the hits back so a transient failure does not lose them.
+            with self._lock:
+                self._pending.update(batch)
+                self._pending_hits += sum(batch.values())
+            raise
+
+        hits = sum(batch.values())
+        self.flushes += 1
+        self.flushed_hits += hits
+        return hits
+
+    def flush_in_app(self) -> int:
+        if self._app is None:
+            return 0
+        with self._app.app_context():
+            return self.flush()
+
+    def _ensure_thread(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name="view-counter", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(self.flush_seconds)
+            self._wake.clear()
+            try:
+                self.flush_in_app()
+            except Exception:  # pragma: no cover - retried on the next tick
+                if self._app is not None:
+                    self._app.logger.exception("View counter flush failed")
+
+
+view_counter = ViewCounter()
+
+
+@atexit.register
+def _flush_on_exit() -> None:
+    try:
+        view_counter.flush_in_app()
+    except Exception:  # pragma: no cover - interpreter is shutting down
+        pass
@@ -0,0 +1,112 @@
+"""Member watchlists: deduplicated bulk edits and the ending-soon feed.
+
+``watchlist`` has a unique ``(user_id, listing_id)`` index, which both keeps a
+listing from being watched twice and covers reading a member's watched ids.
+Bulk adds skip ids already watched (or not watchable) and let the unique index
+settle a concurrent add of the same listing: the loser retries from a
+savepoint.
+
+The ending-soon feed never sorts the whole join. The watched ids are split into
+chunks; each chunk is one primary-key lookup returning at most ``limit`` active
+listings already ordered by ``auction_end``, and ``heapq.merge`` runs a k-way
+merge over those sorted runs, stopping after ``limit`` items.
+"""
+
+from __future__ import annotations
+
+import heapq
+from dataclasses import dataclass
+from datetime import datetime
+from itertools import islice
+from typing import Iterable, Iterator, Optional
+
+from flask import current_app
+from sqlalchemy import delete, insert, select
+from sqlalchemy.exc import IntegrityError
+
+from app.extensions import db
+from app.models import Listing, Watchlist
+from app.utils.dates import utcnow
+
+MAX_ADD_ATTEMPTS = 3
+
+
+@dataclass(frozen=True)
+class WatchlistChange:
+    added: int
+    existing: int
+    unavailable: int
+
+
+def _chunks(items: list[int], size: int) -> Iterator[list[int]]:
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+def _chunk_size() -> int:
+    return current_app.config["WATCHLIST_MERGE_CHUNK_SIZE"]
+
+
+def watched_ids(user_id: int) -> list[int]:
+    """Listing ids the member watches, read from the unique index alone."""
+    return list(db.session.scalars(select(Watchlist.listing_id).where(Watchlist.user_id == user_id)))
+
+
+def add_to_watchlist(user_id: int, listing_ids: Iterable[int]) -> WatchlistChange:
+    """Watch every listing in ``listing_ids`` not watched yet; the caller commits."""
+    wanted = sorted(set(listing_ids))
+    watchable: set[int] = set()
+    for chunk in _chunks(wanted, _chunk_size()):
+        watchable.update(db.session.scalars(select(Listing.id).where(Listing.id.in_(chunk), Listing.status != "draft")))
+
+    attempt = 1
+    while True:
+        existing: set[int] = set()
+        for chunk in _chunks(sorted(watchable), _chunk_size()):
+            existing.update(
+                db.session.scalars(
+                    select(Watchlist.listing_id).where(Watchlist.user_id == user_id, Watchlist.listing_id.in_(chunk))
+                )
+            )
+        fresh = sorted(watchable - existing)
+        try:
+            with db.session.begin_nested():
+                if fresh:
+                    rows = [{"user_id": user_id, "listing_id": listing_id} for listing_id in fresh]
+                    db.session.execute(insert(Watchlist), rows)
+            break
+        except IntegrityError:
+            # A concurrent request watched one of these between our read and insert.
+            if attempt == MAX_ADD_ATTEMPTS:
+                raise
+            attempt += 1
+
+    return WatchlistChange(added=len(fresh), existing=len(existing), unavailable=len(wanted) - len(watchable))
+
+
+def remove_from_watchlist(user_id: int, listing_ids: Iterable[int]) -> int:
+    """Stop watching ``listing_ids``; returns how many were watched. The caller commits."""
+    removed = 0
+    for chunk in _chunks(sorted(set(listing_ids)), _chunk_size()):
+        result = db.session.execute(delete(Watchlist).where(Watchlist.user_id == user_id, Watchlist.listing_id.in_(chunk)))
+        removed += result.rowcount
+    return removed
+
+
+def ending_soon(user_id: int, limit: int, now: Optional[datetime] = None) -> list[Listing]:
+    """The member's next ``limit`` watched auctions to end, soonest first."""
+    now = now or utcnow()
+    runs = []
+    for chunk in _chunks(watched_ids(user_id), _chunk_size()):
+        run = db.session.execute(
+            select(Listing.auction_end, Listing.id)
+            .where(Listing.id.in_(chunk), Listing.status == "active", Listing.auction_end > now)
+            .order_by(Listing.auction_end, Listing.id)
+            .limit(limit)
+        )
+        runs.append([tuple(row) for row in run])
+    head = [listing_id for _, listing_id in islice(heapq.merge(*runs), limit)]
+    if not head:
+        return []
+    listings = {listing.id: listing for listing in db.session.scalars(select(Listing).where(Listing.id.in_(head)))}
+    return [listings[listing_id] for listing_id in head]
@@ -2,20 +2,70 @@
   const amountNode = document.getElementById("bid-amount");
   const controls = document.querySelectorAll("[data-bid-adjust]");
 
-  if (!amountNode || controls.length === 0) {
+  if (amountNode && controls.length > 0) {
+    const parseAmount = () => Number(amountNode.textContent.replace(/[^0-9.]/g, "")) || 0;
+    const renderAmount = (value) => {
+      amountNode.textContent = "$" + Math.max(0, value).toFixed(0);
+    };
+
+    controls.forEach((button) => {
+      button.addEventListener("click", () => {
+        const delta = Number(button.getAttribute("data-bid-adjust")) || 0;
+        const next = parseAmount() + delta;
+        renderAmount(next);
+      });
+    });
+  }
+
+  if (!("EventSource" in window)) {
     return;
   }
 
-  const parseAmount = () => Number(amountNode.textContent.replace(/[^0-9.]/g, "")) || 0;
-  const renderAmount = (value) => {
-    amountNode.textContent = "$" + Math.max(0, value).toFixed(0);
+  const applyUpdate = (detail) => {
+    const selector = `[data-live-listing="${detail.listing_id}"]`;
+    document.querySelectorAll(selector).forEach((card) => {
+      const bidNode = card.querySelector("[data-current-bid]");
+      const countNode = card.querySelector("[data-bid-count]");
+      if (bidNode && detail.current_bid) {
+        bidNode.textContent = "$" + Number(detail.current_bid).toFixed(0);
+      }
+      if (countNode) {
+        countNode.textContent = String(detail.bid_count);
+      }
+    });
+    document.dispatchEvent(new CustomEvent("listing:update", { detail }));
   };
 
-  controls.forEach((button) => {
-    button.addEventListener("click", () => {
-      const delta = Number(button.getAttribute("data-bid-adjust")) || 0;
-      const next = parseAmount() + delta;
-      renderAmount(next);
+  const busyRetryMs = 30000;
+  const busyRetries = 5;
+
+  const listen = (url, attempt = 0) => {
+    const source = new EventSource(url);
+    ["snapshot", "bid", "closed"].forEach((name) => {
+      source.addEventListener(name, (event) => applyUpdate(JSON.parse(event.data)));
     });
+    source.addEventListener("closed", () => source.close());
+    // A busy worker answers 503, which EventSource treats as final; try again later.
+    source.addEventListener("error", () => {
+      if (source.readyState === EventSource.CLOSED && attempt < busyRetries) {
+        window.setTimeout(() => listen(url, attempt + 1), busyRetryMs);
+      }
+    });
+  };
+
+  const streamRoot = document.querySelector("[data-live-stream]");
+  if (streamRoot) {
+    listen(streamRoot.getAttribute("data-live-stream"));
+    return;
+  }
+
+  const liveCards = document.querySelectorAll("[data-live-listing]");
+  const seen = new Set();
+  liveCards.forEach((card) => {
+    const listingId = card.getAttribute("data-live-listing");
+    if (!seen.has(listingId)) {
+      seen.add(listingId);
+      listen(`/bids/${listingId}/stream`);
+    }
   });
 })();
@@ -5,10 +5,28 @@
     return;
   }
 
+  const format = (remaining) => {
+    const totalSeconds = Math.floor(remaining / 1000);
+    const days = Math.floor(totalSeconds / 86400);
+    const hours = Math.floor((totalSeconds % 86400) / 3600);
+    const minutes = Math.floor((totalSeconds % 3600) / 60);
+    const seconds = totalSeconds % 60;
+
+    if (days > 0) {
+      return `Ends in ${days}d ${hours}h ${minutes}m`;
+    }
+    return `Ends in ${hours}h ${minutes}m ${seconds}s`;
+  };
+
   const update = () => {
     const now = new Date();
 
     targets.forEach((node) => {
+      if (node.getAttribute("data-status") === "closed") {
+        node.textContent = "Auction closed";
+        return;
+      }
+
       const iso = node.getAttribute("data-countdown");
       const end = iso ? new Date(iso) : null;
 
@@ -22,15 +40,28 @@
         return;
       }
 
-      const totalMinutes = Math.floor(remaining / 60000);
-      const days = Math.floor(totalMinutes / 1440);
-      const hours = Math.floor((totalMinutes % 1440) / 60);
-      const minutes = totalMinutes % 60;
-
-      node.textContent = `Ends in ${days}d ${hours}h ${minutes}m`;
+      node.textContent = format(remaining);
     });
   };
 
+  // Live updates (bidding.js) may move the deadline or close the auction.
+  document.addEventListener("listing:update", (event) => {
+    const detail = event.detail || {};
+    targets.forEach((node) => {
+      if (node.getAttribute("data-listing-id") !== String(detail.listing_id)) {
+        return;
+      }
+      if (detail.auction_end) {
+        node.setAttribute("data-countdown", detail.auction_end);
+      }
+      if (detail.status && detail.status !== "active") {
+        node.setAttribute("data-status", "closed");
+      }
+    });
+    update();
+  });
+
+  // Ticking locally is free; the server is only involved when state changes.
   update();
-  window.setInterval(update, 60000);
+  window.setInterval(update, 1000);
 })();
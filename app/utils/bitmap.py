@@ -0,0 +1,261 @@
+"""Roaring-style compressed bitmap for integer ids.
+
+Ids are split into a 16-bit high key and a 16-bit low value. Each high key
+owns a container that is either a sorted ``array('H')`` while it holds at most
+``ARRAY_LIMIT`` values, or a 65536-bit Python ``int`` once it gets denser.
+Dense/dense operations therefore run as single big-int operations in C.
+"""
+
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_left
+from typing import Iterable, Iterator, Optional, Union
+
+ARRAY_LIMIT = 4096
+
+Container = Union[array, int]
+
+
+def _to_mask(values: Iterable[int]) -> int:
+    mask = 0
+    for value in values:
+        mask |= 1 << value
+    return mask
+
+
+def _bits(mask: int) -> Iterator[int]:
+    while mask:
+        lowest = mask & -mask
+        yield lowest.bit_length() - 1
+        mask ^= lowest
+
+
+def _bits_descending(mask: int) -> Iterator[int]:
+    while mask:
+        highest = mask.bit_length() - 1
+        yield highest
+        mask ^= 1 << highest
+
+
+def _normalize(container: Container) -> Optional[Container]:
+    if isinstance(container, int):
+        count = container.bit_count()
+        if not count:
+            return None
+        if count <= ARRAY_LIMIT:
+            return array("H", _bits(container))
+        return container
+    if not container:
+        return None
+    if len(container) > ARRAY_LIMIT:
+        return _to_mask(container)
+    return container
+
+
+def _container_len(container: Container) -> int:
+    return container.bit_count() if isinstance(container, int) else len(container)
+
+
+def _and(left: Container, right: Container) -> Optional[Container]:
+    if isinstance(left, int) and isinstance(right, int):
+        return _normalize(left & right)
+    if isinstance(left, int):
+        left, right = right, left
+    if isinstance(right, int):
+        return _normalize(array("H", (value for value in left if right >> value & 1)))
+    return _normalize(array("H", sorted(set(left).intersection(right))))
+
+
+def _or(left: Container, right: Container) -> Container:
+    if isinstance(left, int) or isinstance(right, int):
+        left_mask = left if isinstance(left, int) else _to_mask(left)
+        right_mask = right if isinstance(right, int) else _to_mask(right)
+        return _normalize(left_mask | right_mask)
+    return _normalize(array("H", sorted(set(left).union(right))))
+
+
+def masks_and(left: dict[int, int], right: dict[int, int]) -> dict[int, int]:
+    if len(left) > len(right):
+        left, right = right, left
+    result = {}
+    for key, mask in left.items():
+        other = right.get(key)
+        if other is not None:
+            merged = mask & other
+            if merged:
+                result[key] = merged
+    return result
+
+
+def masks_or(left: dict[int, int], right: dict[int, int]) -> dict[int, int]:
+    result = dict(left)
+    for key, mask in right.items():
+        result[key] = result.get(key, 0) | mask
+    return result
+
+
+def masks_intersection_len(left: dict[int, int], right: dict[int, int]) -> int:
+    if len(left) > len(right):
+        left, right = right, left
+    total = 0
+    for key, mask in left.items():
+        other = right.get(key)
+        if other is not None:
+            total += (mask & other).bit_count()
+    return total
+
+
+class RoaringBitmap:
+    __slots__ = ("_containers", "_masks")
+
+    def __init__(self, values: Iterable[int] = ()) -> None:
+        self._containers: dict[int, Container] = {}
+        self._masks: dict[int, int] = {}
+        for value in values:
+            self.add(value)
+
+    @classmethod
+    def _from_containers(cls, containers: dict[int, Container]) -> "RoaringBitmap":
+        bitmap = cls()
+        bitmap._containers = containers
+        return bitmap
+
+    def copy(self) -> "RoaringBitmap":
+        return self._from_containers(
+            {key: container if isinstance(container, int) else array("H", container) for key, container in self._containers.items()}
+        )
+
+    def add(self, value: int) -> None:
+        key, low = value >> 16, value & 0xFFFF
+        self._masks.pop(key, None)
+        container = self._containers.get(key)
+        if container is None:
+            self._containers[key] = array("H", (low,))
+        elif isinstance(container, int):
+            self._containers[key] = container | (1 << low)
+        else:
+            position = bisect_left(container, low)
+            if position == len(container) or container[position] != low:
+                container.insert(position, low)
+                if len(container) > ARRAY_LIMIT:
+                    self._containers[key] = _to_mask(container)
+
+    def discard(self, value: int) -> None:
+        key, low = value >> 16, value & 0xFFFF
+        self._masks.pop(key, None)
+        container = self._containers.get(key)
+        if container is None:
+            return
+        if isinstance(container, int):
+            updated = _normalize(container & ~(1 << low))
+        else:
+            position = bisect_left(container, low)
+            if position == len(container) or container[position] != low:
+                return
+            del container[position]
+            updated = _normalize(container)
+        if updated is None:
+            del self._containers[key]
+        else:
+            self._containers[key] = updated
+
+    def __contains__(self, value: int) -> bool:
+        container = self._containers.get(value >> 16)
+        if container is None:
+            return False
+        low = value & 0xFFFF
+        if isinstance(container, int):
+            return bool(container >> low & 1)
+        position = bisect_left(container, low)
+        return position < len(container) and container[position] == low
+
+    def __len__(self) -> int:
+        return sum(_container_len(container) for container in self._containers.values())
+
+    def __bool__(self) -> bool:
+        return bool(self._containers)
+
+    def __iter__(self) -> Iterator[int]:
+        for key in sorted(self._containers):
+            base = key << 16
+            container = self._containers[key]
+            values = _bits(container) if isinstance(container, int) else container
+            for low in values:
+                yield base | low
+
+    def __reversed__(self) -> Iterator[int]:
+        for key in sorted(self._containers, reverse=True):
+            base = key << 16
+            container = self._containers[key]
+            values = _bits_descending(container) if isinstance(container, int) else reversed(container)
+            for low in values:
+                yield base | low
+
+    def descending(self, below: Optional[int] = None) -> Iterator[int]:
+        """Yield values in descending order, starting under ``below`` when given."""
+        if below is None:
+            yield from reversed(self)
+            return
+        if below <= 0:
+            return
+        top, top_low = (below - 1) >> 16, (below - 1) & 0xFFFF
+        for key in sorted((key for key in self._containers if key <= top), reverse=True):
+            base = key << 16
+            container = self._containers[key]
+            if isinstance(container, int):
+                if key == top:
+                    container &= (1 << (top_low + 1)) - 1
+                values = _bits_descending(container)
+            else:
+                end = bisect_left(container, top_low + 1) if key == top else len(container)
+                values = (container[index] for index in range(end - 1, -1, -1))
+            for low in values:
+                yield base | low
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, RoaringBitmap) and list(self) == list(other)
+
+    def __and__(self, other: "RoaringBitmap") -> "RoaringBitmap":
+        containers = {}
+        for key, container in self._containers.items():
+            other_container = other._containers.get(key)
+            if other_container is not None:
+                merged = _and(container, other_container)
+                if merged is not None:
+                    containers[key] = merged
+        return self._from_containers(containers)
+
+    def __or__(self, other: "RoaringBitmap") -> "RoaringBitmap":
+        containers = dict(self.copy()._containers)
+        for key, container in other._containers.items():
+            existing = containers.get(key)
+            containers[key] = (container if isinstance(container, int) else array("H", container)) if existing is None else _or(existing, container)
+        return self._from_containers(containers)
+
+    def masks(self) -> dict[int, int]:
+        """Every container as a dense mask, cached per container until it changes.
+
+        Facet counting intersects the same bitmaps over and over; paying for
+        the conversion once turns every later count into big-int ``&``.
+        """
+        masks = self._masks
+        if len(masks) != len(self._containers):
+            for key, container in self._containers.items():
+                if key not in masks:
+                    masks[key] = container if isinstance(container, int) else _to_mask(container)
+        return masks
+
+    @classmethod
+    def from_masks(cls, masks: dict[int, int]) -> "RoaringBitmap":
+        # Dense containers are valid at any population; they are only
+        # shrunk back to arrays if the bitmap is mutated later.
+        bitmap = cls._from_containers({key: mask for key, mask in masks.items() if mask})
+        bitmap._masks = dict(bitmap._containers)
+        return bitmap
+
+    def intersection_len(self, other: "RoaringBitmap") -> int:
+        return masks_intersection_len(self.masks(), other.masks())
+
+    def __repr__(self) -> str:
+        return f"RoaringBitmap(len={len(self)}, containers={len(self._containers)})"
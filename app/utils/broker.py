@@ -0,0 +1,161 @@
+"""In-process publish/subscribe broker for server-sent events.
+
+Every subscriber owns a bounded queue. When a slow client falls behind, the
+oldest events are dropped rather than blocking publishers; for live prices
+only the newest state matters anyway.
+
+Each open stream pins a worker thread, so ``subscribe`` can be given a limit
+on the subscriptions a worker holds at once; past it, it raises
+``BrokerFullError`` and the caller asks the client to come back later.
+"""
+
+from __future__ import annotations
+
+import itertools
+import json
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Iterable, Iterator, Optional
+
+
+class BrokerFullError(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class Event:
+    id: int
+    name: str
+    data: dict[str, Any]
+
+    def encode(self) -> str:
+        return f"id: {self.id}\nevent: {self.name}\ndata: {json.dumps(self.data, separators=(',', ':'))}\n\n"
+
+
+class Subscription:
+    def __init__(self, broker: "Broker", topics: frozenset[str], maxsize: int) -> None:
+        self.topics = topics
+        self.dropped = 0
+        self._broker = broker
+        self._queue: deque[Event] = deque()
+        self._maxsize = maxsize
+        self._ready = threading.Condition()
+        self._closed = False
+
+    def put(self, event: Event) -> None:
+        with self._ready:
+            if len(self._queue) >= self._maxsize:
+                self._queue.popleft()
+                self.dropped += 1
+            self._queue.append(event)
+            self._ready.notify()
+
+    def get(self, timeout: Optional[float] = None) -> Optional[Event]:
+        with self._ready:
+            if not self._queue and not self._closed:
+                self._ready.wait(timeout)
+            return self._queue.popleft() if self._queue else None
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def close(self) -> None:
+        with self._ready:
+            self._closed = True
+            self._ready.notify_all()
+        self._broker.unsubscribe(self)
+
+    def __enter__(self) -> "Subscription":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class Broker:
+    def __init__(self, default_queue_size: int = 64) -> None:
+        self.default_queue_size = default_queue_size
+        self.published = 0
+        self._lock = threading.Lock()
+        self._topics: dict[str, set[Subscription]] = {}
+        self._subscriptions: set[Subscription] = set()
+        self._sequence = itertools.count(1)
+
+    def subscribe(
+        self, topics: Iterable[str], maxsize: Optional[int] = None, limit: Optional[int] = None
+    ) -> Subscription:
+        """Subscribe to ``topics``; raises ``BrokerFullError`` once ``limit`` subscriptions are open."""
+        subscription = Subscription(self, frozenset(topics), maxsize or self.default_queue_size)
+        with self._lock:
+            if limit is not None and len(self._subscriptions) >= limit:
+                raise BrokerFullError(f"{len(self._subscriptions)} streams already open")
+            self._subscriptions.add(subscription)
+            for topic in subscription.topics:
+                self._topics.setdefault(topic, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscriptions.discard(subscription)
+            for topic in subscription.topics:
+                subscribers = self._topics.get(topic)
+                if subscribers is None:
+                    continue
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._topics[topic]
+
+    def publish(self, topic: str, name: str, data: dict[str, Any]) -> int:
+        with self._lock:
+            subscribers = tuple(self._topics.get(topic, ()))
+            event = Event(next(self._sequence), name, data)
+            self.published += 1
+        # A subscriber on several topics could get the same state twice; that
+        # is harmless for idempotent price updates.
+        for subscription in subscribers:
+            subscription.put(event)
+        return len(subscribers)
+
+    def active_topics(self, prefix: str = "") -> list[str]:
+        with self._lock:
+            return [topic for topic in self._topics if topic.startswith(prefix)]
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len(self._subscriptions)
+
+
+def stream(
+    subscription: Subscription,
+    initial: Iterable[Event] = (),
+    heartbeat: float = 15.0,
+    max_seconds: float = 300.0,
+    retry_ms: int = 3000,
+) -> Iterator[str]:
+    """Yield SSE frames until the client goes away or ``max_seconds`` pass.
+
+    Streams are capped so a worker thread is never pinned forever; the browser's
+    ``EventSource`` reconnects on its own after ``retry_ms``. The subscription
+    is closed when the generator finishes, but a generator that is never
+    started never finishes: callers should also close it when the response
+    closes. Closing twice is harmless.
+    """
+    deadline = time.monotonic() + max_seconds
+    try:
+        yield f"retry: {retry_ms}\n\n"
+        for event in initial:
+            yield event.encode()
+        while not subscription.closed:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            event = subscription.get(timeout=min(heartbeat, remaining))
+            yield event.encode() if event else ": keepalive\n\n"
+    finally:
+        subscription.close()
+
+
+broker = Broker()
@@ -0,0 +1,6 @@
+from datetime import datetime, timezone
+
+
+def utcnow() -> datetime:
+    # Model DateTime columns are naive and hold UTC.
+    return datetime.now(timezone.utc).replace(tzinfo=None)
@@ -0,0 +1,324 @@
+"""Cache rendered template fragments.
+
+In a template::
+
+    {% cache "listings:index", 120, "listing" %} ... {% endcache %}
+
+The first argument is the key, the optional second is a TTL in seconds
+(``None`` for the configured default) and any further arguments are tags.
+Invalidating a tag bumps its version, and the version of every tag is part of
+the stored key, so one bump retires all fragments carrying that tag without
+enumerating them. Retired entries age out through the LRU or TTL.
+
+Backends:
+
+* ``memory``: per-worker LRU with a TTL per entry. Invalidations made by any
+  other process never reach it, so it only suits a single process; with
+  several web workers or the auction closer running, use ``disk``.
+* ``disk``: one file per fragment under ``FRAGMENT_CACHE_DIR``, shared by
+  every worker on the host. Tag versions are files too, so an invalidation
+  in one process (a web worker, the auction closer) is seen by all of them.
+  Needs ``fcntl``; where it is missing, ``memory`` is used instead.
+* ``none``: always renders.
+
+Only cache markup that is the same for every visitor.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import struct
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Iterable, Optional
+
+from jinja2 import nodes
+from jinja2.ext import Extension
+from markupsafe import Markup
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not POSIX
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+HOOK_NAME = "fragment_cache"
+EXPIRY = struct.Struct("<d")
+
+
+@dataclass(frozen=True)
+class FragmentCacheStats:
+    backend: str
+    hits: int
+    misses: int
+    invalidations: int
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class MemoryBackend:
+    name = "memory"
+
+    def __init__(self, max_entries: int = 2048) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[str, float]] = OrderedDict()
+        self._versions: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[1] <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def set(self, key: str, body: str, ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = (body, time.time() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def versions(self, tags: Iterable[str]) -> list[int]:
+        with self._lock:
+            return [self._versions.get(tag, 0) for tag in tags]
+
+    def bump(self, tags: Iterable[str]) -> None:
+        with self._lock:
+            for tag in tags:
+                self._versions[tag] = self._versions.get(tag, 0) + 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._versions.clear()
+
+
+class DiskBackend:
+    name = "disk"
+
+    def __init__(self, directory: str, max_entries: int = 2048, prune_every: int = 256) -> None:
+        self.directory = os.path.abspath(directory)
+        self.max_entries = max_entries
+        self.prune_every = prune_every
+        self._entries_dir = os.path.join(self.directory, "entries")
+        self._tags_dir = os.path.join(self.directory, "tags")
+        os.makedirs(self._entries_dir, exist_ok=True)
+        os.makedirs(self._tags_dir, exist_ok=True)
+        self._writes = 0
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self._entries_dir, hashlib.sha1(key.encode("utf-8")).hexdigest())
+
+    def _tag_path(self, tag: str) -> str:
+        return os.path.join(self._tags_dir, hashlib.sha1(tag.encode("utf-8")).hexdigest())
+
+    def get(self, key: str) -> Optional[str]:
+        try:
+            with open(self._path(key), "rb") as handle:
+                data = handle.read()
+        except FileNotFoundError:
+            return None
+        if len(data) < EXPIRY.size or EXPIRY.unpack_from(data)[0] <= time.time():
+            return None
+        return data[EXPIRY.size :].decode("utf-8")
+
+    def set(self, key: str, body: str, ttl: float) -> None:
+        path = self._path(key)
+        # Write then rename, so readers in other workers never see half a file.
+        temp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp, "wb") as handle:
+            handle.write(EXPIRY.pack(time.time() + ttl) + body.encode("utf-8"))
+        os.replace(temp, path)
+        with self._lock:
+            self._writes += 1
+            prune = self._writes % self.prune_every == 0
+        if prune:
+            self.prune()
+
+    def prune(self) -> int:
+        """Delete expired entries, then the oldest ones beyond ``max_entries``."""
+        now = time.time()
+        live: list[tuple[float, str]] = []
+        removed = 0
+        for entry in os.scandir(self._entries_dir):
+            if entry.name.endswith(".tmp"):
+                continue
+            try:
+                with open(entry.path, "rb") as handle:
+                    header = handle.read(EXPIRY.size)
+                modified = entry.stat().st_mtime
+            except FileNotFoundError:
+                continue
+            if len(header) < EXPIRY.size or EXPIRY.unpack(header)[0] <= now:
+                removed += self._unlink(entry.path)
+            else:
+                live.append((modified, entry.path))
+        live.sort()
+        for _, path in live[: max(len(live) - self.max_entries, 0)]:
+            removed += self._unlink(path)
+        return removed
+
+    @staticmethod
+    def _unlink(path: str) -> int:
+        try:
+            os.unlink(path)
+            return 1
+        except FileNotFoundError:
+            return 0
+
+    def versions(self, tags: Iterable[str]) -> list[int]:
+        versions = []
+        for tag in tags:
+            try:
+                with open(self._tag_path(tag), "rb") as handle:
+                    versions.append(int(handle.read() or 0))
+            except (FileNotFoundError, ValueError):
+                versions.append(0)
+        return versions
+
+    def bump(self, tags: Iterable[str]) -> None:
+        for tag in tags:
+            fd = os.open(self._tag_path(tag), os.O_RDWR | os.O_CREAT, 0o600)
+            try:
+                fcntl.lockf(fd, fcntl.LOCK_EX)
+                current = os.pread(fd, 32, 0)
+                version = int(current or 0) + 1
+                os.ftruncate(fd, 0)
+                os.pwrite(fd, str(version).encode("ascii"), 0)
+            finally:
+                os.close(fd)
+
+    def clear(self) -> None:
+        for directory in (self._entries_dir, self._tags_dir):
+            for entry in os.scandir(directory):
+                self._unlink(entry.path)
+
+
+class NullBackend:
+    name = "none"
+
+    def get(self, key: str) -> Optional[str]:
+        return None
+
+    def set(self, key: str, body: str, ttl: float) -> None:
+        pass
+
+    def versions(self, tags: Iterable[str]) -> list[int]:
+        return [0 for _ in tags]
+
+    def bump(self, tags: Iterable[str]) -> None:
+        pass
+
+    def clear(self) -> None:
+        pass
+
+
+class FragmentCache:
+    def __init__(self) -> None:
+        self.backend = MemoryBackend()
+        self.default_ttl = 300.0
+        self._lock = threading.Lock()
+        self._hits = self._misses = self._invalidations = 0
+
+    def init_app(self, app) -> None:
+        name = app.config.get("FRAGMENT_CACHE_BACKEND", "memory")
+        max_entries = app.config.get("FRAGMENT_CACHE_MAX_ENTRIES", 2048)
+        if name == "disk" and fcntl is None:
+            # Tag bumps could not be locked against other processes.
+            logger.warning("FRAGMENT_CACHE_BACKEND=disk needs fcntl; falling back to memory")
+            name = "memory"
+        if name == "memory":
+            self.backend = MemoryBackend(max_entries)
+        elif name == "disk":
+            self.backend = DiskBackend(app.config.get("FRAGMENT_CACHE_DIR", "instance/fragment-cache"), max_entries)
+        elif name in ("none", "null", ""):
+            self.backend = NullBackend()
+        else:
+            raise ValueError(f"Unknown FRAGMENT_CACHE_BACKEND: {name!r}")
+        self.default_ttl = app.config.get("FRAGMENT_CACHE_DEFAULT_TTL", self.default_ttl)
+        app.jinja_env.add_extension(FragmentCacheExtension)
+        app.jinja_env.fragment_cache = self
+        app.extensions["fragment_cache"] = self
+
+    def fetch(self, key: str, ttl: Optional[float], tags: Iterable[str], render: Callable[[], str]) -> str:
+        tags = sorted(set(tags))
+        versions = self.backend.versions(tags)
+        stored_key = key + "|" + ",".join(f"{tag}:{version}" for tag, version in zip(tags, versions))
+        body = self.backend.get(stored_key)
+        if body is not None:
+            with self._lock:
+                self._hits += 1
+            return body
+
+        with self._lock:
+            self._misses += 1
+        body = render()
+        self.backend.set(stored_key, body, self.default_ttl if ttl is None else ttl)
+        return body
+
+    def invalidate(self, tags: Iterable[str]) -> None:
+        tags = set(tags)
+        if not tags:
+            return
+        self.backend.bump(tags)
+        with self._lock:
+            self._invalidations += len(tags)
+
+    def stage_invalidation(self, *tags: str) -> None:
+        """Invalidate ``tags`` once the current transaction commits (for Core writes)."""
+        from app.utils.model_events import stage
+
+        stage(HOOK_NAME, list(tags))
+
+    def watch(self, tags_by_model: dict[type, str]) -> None:
+        """Invalidate a model's tag after any commit that adds, changes or deletes one."""
+        from app.utils.model_events import register_commit_hook
+
+        def snapshot(instance, deleted: bool) -> Optional[str]:
+            for model, tag in tags_by_model.items():
+                if isinstance(instance, model):
+                    return tag
+            return None
+
+        register_commit_hook(HOOK_NAME, tuple(tags_by_model), snapshot, self.invalidate)
+
+    def clear(self) -> None:
+        self.backend.clear()
+        with self._lock:
+            self._hits = self._misses = self._invalidations = 0
+
+    def stats(self) -> FragmentCacheStats:
+        with self._lock:
+            return FragmentCacheStats(self.backend.name, self._hits, self._misses, self._invalidations)
+
+
+class FragmentCacheExtension(Extension):
+    tags = {"cache"}
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        args = [parser.parse_expression()]
+        while parser.stream.skip_if("comma"):
+            args.append(parser.parse_expression())
+        body = parser.parse_statements(("name:endcache",), drop_needle=True)
+        return nodes.CallBlock(self.call_method("_render", args), [], [], body).set_lineno(lineno)
+
+    def _render(self, key, ttl=None, *tags, caller) -> Markup:
+        cache: Optional[FragmentCache] = getattr(self.environment, "fragment_cache", None)
+        if cache is None:
+            return Markup(caller())
+        return Markup(cache.fetch(str(key), ttl, (str(tag) for tag in tags), caller))
@@ -0,0 +1,56 @@
+"""Image sniffing and resizing, kept free of app imports for the worker processes.
+
+``render_variants`` runs in the image pipeline's process pool. It decodes the
+staged original once, fixes its EXIF orientation, and writes one JPEG per
+requested size (longest edge, never upscaled) next to it.
+"""
+
+from __future__ import annotations
+
+import os
+from typing import Optional
+
+# Magic bytes -> (format name, file extension).
+SIGNATURES = (
+    (b"\xff\xd8\xff", "jpeg", "jpg"),
+    (b"\x89PNG\r\n\x1a\n", "png", "png"),
+    (b"GIF87a", "gif", "gif"),
+    (b"GIF89a", "gif", "gif"),
+)
+
+
+def sniff(head: bytes) -> Optional[tuple[str, str]]:
+    """Return ``(format, extension)`` for a supported image header, else ``None``."""
+    for signature, name, extension in SIGNATURES:
+        if head.startswith(signature):
+            return name, extension
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "webp", "webp"
+    return None
+
+
+def render_variants(source: str, sizes: dict[str, int], quality: int = 85) -> dict[str, str]:
+    """Write a resized JPEG per ``sizes`` entry and return ``{name: path}``."""
+    from PIL import Image, ImageOps
+
+    outputs = {}
+    with Image.open(source) as original:
+        image = ImageOps.exif_transpose(original)
+        if image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+        # Largest first, so each smaller size resamples an already reduced image.
+        for name, edge in sorted(sizes.items(), key=lambda item: item[1], reverse=True):
+            image = image.copy()
+            image.thumbnail((edge, edge), Image.Resampling.LANCZOS)
+            path = f"{source}.{name}.jpg"
+            image.save(path, "JPEG", quality=quality, optimize=True, progressive=True)
+            outputs[name] = path
+    return outputs
+
+
+def discard(paths) -> None:
+    for path in paths:
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
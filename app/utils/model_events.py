@@ -0,0 +1,83 @@
+"""Run in-process hooks after model changes are committed.
+
+Hooks snapshot the changed instances during ``after_flush`` (while their
+attributes are still loaded) and receive those snapshots only once the
+transaction commits, so caches and indexes never see rolled-back writes.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from sqlalchemy import event
+
+from app.extensions import db
+
+PENDING_KEY = "commit_hooks_pending"
+
+
+@dataclass(frozen=True)
+class CommitHook:
+    name: str
+    models: tuple[type, ...]
+    snapshot: Callable[[Any, bool], Any]
+    apply: Callable[[list[Any]], None]
+
+
+_hooks: dict[str, CommitHook] = {}
+
+
+def register_commit_hook(
+    name: str,
+    models: tuple[type, ...],
+    snapshot: Callable[[Any, bool], Any],
+    apply: Callable[[list[Any]], None],
+) -> None:
+    """Register ``apply(snapshots)`` to run after commits touching ``models``.
+
+    ``snapshot(instance, deleted)`` is called at flush time and may return
+    ``None`` to ignore an instance.
+    """
+    _hooks[name] = CommitHook(name, models, snapshot, apply)
+
+
+def stage(name: str, snapshots: list[Any]) -> None:
+    """Queue snapshots for hook ``name`` on the current transaction.
+
+    For Core bulk writes, which bypass the ORM flush: the hook still only sees
+    them once the surrounding transaction commits.
+    """
+    if snapshots:
+        db.session.info.setdefault(PENDING_KEY, {}).setdefault(name, []).extend(snapshots)
+
+
+@event.listens_for(db.session, "after_flush")
+def _collect(session, flush_context) -> None:
+    if not _hooks:
+        return
+    pending = session.info.setdefault(PENDING_KEY, {})
+    changed = [(instance, False) for instance in session.new.union(session.dirty)]
+    changed.extend((instance, True) for instance in session.deleted)
+    for hook in _hooks.values():
+        for instance, deleted in changed:
+            if isinstance(instance, hook.models):
+                snapshot = hook.snapshot(instance, deleted)
+                if snapshot is not None:
+                    pending.setdefault(hook.name, []).append(snapshot)
+
+
+@event.listens_for(db.session, "after_commit")
+def _dispatch(session) -> None:
+    pending = session.info.pop(PENDING_KEY, None)
+    if not pending:
+        return
+    for name, snapshots in pending.items():
+        hook = _hooks.get(name)
+        if hook is not None:
+            hook.apply(snapshots)
+
+
+@event.listens_for(db.session, "after_rollback")
+def _discard(session) -> None:
+    session.info.pop(PENDING_KEY, None)
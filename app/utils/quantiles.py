@@ -0,0 +1,97 @@
+"""Mergeable streaming quantile sketch with a relative-error guarantee.
+
+A DDSketch: positive values land in logarithmic buckets ``ceil(log_gamma(x))``
+with ``gamma = (1 + a) / (1 - a)``, so any quantile comes back within a
+relative error ``a`` of a true value from the stream. Buckets are plain
+counters, which makes the sketch exact to merge, able to take values back out
+(a refunded sale), and small to store: prices between $1 and $100,000 need at
+most ~580 buckets at 1% accuracy.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Any, Mapping, Optional
+
+DEFAULT_ACCURACY = 0.01
+
+
+class QuantileSketch:
+    def __init__(self, relative_accuracy: float = DEFAULT_ACCURACY) -> None:
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be between 0 and 1")
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.bins: dict[int, int] = {}
+        self.zero_count = 0
+
+    def __len__(self) -> int:
+        return self.zero_count + sum(self.bins.values())
+
+    def _key(self, value: float) -> int:
+        return math.ceil(math.log(value) / self._log_gamma)
+
+    def _value(self, key: int) -> float:
+        return 2 * self.gamma**key / (self.gamma + 1)
+
+    def add(self, value: float, count: int = 1) -> None:
+        value = float(value)
+        if value < 0:
+            raise ValueError("QuantileSketch only holds non-negative values")
+        if value == 0:
+            self.zero_count += count
+            return
+        key = self._key(value)
+        self.bins[key] = self.bins.get(key, 0) + count
+
+    def remove(self, value: float, count: int = 1) -> None:
+        """Take ``count`` copies of a previously added value back out."""
+        value = float(value)
+        if value <= 0:
+            self.zero_count = max(self.zero_count - count, 0)
+            return
+        key = self._key(value)
+        remaining = self.bins.get(key, 0) - count
+        if remaining > 0:
+            self.bins[key] = remaining
+        else:
+            self.bins.pop(key, None)
+
+    def merge(self, other: QuantileSketch) -> None:
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("cannot merge sketches with different accuracy")
+        self.zero_count += other.zero_count
+        for key, count in other.bins.items():
+            self.bins[key] = self.bins.get(key, 0) + count
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate of the ``q``-quantile (0 <= q <= 1), or ``None`` when empty."""
+        total = len(self)
+        if not total:
+            return None
+        rank = q * (total - 1)
+        seen = self.zero_count
+        if seen > rank:
+            return 0.0
+        for key in sorted(self.bins):
+            seen += self.bins[key]
+            if seen > rank:
+                return self._value(key)
+        return self._value(max(self.bins))
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "accuracy": self.relative_accuracy,
+            "zero": self.zero_count,
+            "bins": {str(key): count for key, count in sorted(self.bins.items())},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Optional[Mapping[str, Any]]) -> QuantileSketch:
+        if not data:
+            return cls()
+        sketch = cls(data.get("accuracy", DEFAULT_ACCURACY))
+        sketch.zero_count = int(data.get("zero", 0))
+        sketch.bins = {int(key): int(count) for key, count in data.get("bins", {}).items()}
+        return sketch
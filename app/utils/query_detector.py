@@ -0,0 +1,167 @@
+"""Flag N+1 query patterns in development and tests.
+
+Within each request (or an explicit ``query_detector.watch()`` block) every
+statement is counted by shape: the SQL text SQLAlchemy sends, with the bound
+parameters as placeholders, so ``SELECT ... FROM users WHERE users.id = ?``
+run for ten different ids is one shape seen ten times. A shape seen more than
+``NPLUSONE_THRESHOLD`` times is reported along with the application frames
+that issued it, template lines included, which usually points straight at
+the lazy-loaded relationship inside a loop.
+
+``TestingConfig`` raises ``NPlusOneError`` so the test that made the request
+fails; ``DevelopmentConfig`` logs a warning instead. Endpoints that repeat a
+statement on purpose get their own limit in ``NPLUSONE_ENDPOINT_THRESHOLDS``.
+Stack walking only starts once a shape repeats, and the detector is off
+unless ``NPLUSONE_ENABLED`` is set.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import re
+import sys
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterator, Optional
+
+from flask import Flask, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROJECT_ROOT = os.path.dirname(APP_ROOT)
+MAX_SITES = 3
+STACK_DEPTH = 3
+COLUMN_LIST = re.compile(r"^SELECT .+? FROM ", re.DOTALL)
+
+
+class NPlusOneError(AssertionError):
+    """Raised in tests when a request repeats a statement past its threshold."""
+
+
+@dataclass(frozen=True)
+class RepeatedQuery:
+    statement: str
+    count: int
+    call_sites: tuple[str, ...]
+
+    def describe(self) -> str:
+        sites = "".join(f"\n    at {site}" for site in self.call_sites) or "\n    at <no application frame>"
+        # The column list is noise; the FROM and WHERE clauses identify the relationship.
+        statement = COLUMN_LIST.sub("SELECT ... FROM ", " ".join(self.statement.split()), count=1)
+        return f"{self.count}x {statement[:300]}{sites}"
+
+
+@dataclass
+class _Watch:
+    label: str
+    threshold: int
+    counts: Counter = field(default_factory=Counter)
+    sites: dict = field(default_factory=dict)
+
+    def findings(self) -> list[RepeatedQuery]:
+        return [
+            RepeatedQuery(statement, count, tuple(self.sites.get(statement, ())))
+            for statement, count in self.counts.most_common()
+            if count > self.threshold
+        ]
+
+
+_current: ContextVar[Optional[_Watch]] = ContextVar("query_detector", default=None)
+
+
+def _call_site(frame) -> Optional[str]:
+    """``path:line`` for an application frame, with template lines resolved."""
+    filename = frame.f_code.co_filename
+    if not filename.startswith(APP_ROOT) or filename == __file__:
+        return None
+    lineno = frame.f_lineno
+    template = frame.f_globals.get("__jinja_template__")
+    if template is not None:
+        lineno = template.get_corresponding_lineno(lineno)
+    return f"{os.path.relpath(filename, PROJECT_ROOT)}:{lineno}"
+
+
+def _stack() -> str:
+    sites = []
+    frame = sys._getframe(2)
+    while frame is not None and len(sites) < STACK_DEPTH:
+        site = _call_site(frame)
+        if site is not None and site not in sites:
+            sites.append(site)
+        frame = frame.f_back
+    return " <- ".join(sites)
+
+
+class QueryDetector:
+    def __init__(self) -> None:
+        self.enabled = False
+        self.threshold = 5
+        self.endpoint_thresholds: dict[str, int] = {}
+        self.raise_errors = False
+        self._listening = False
+
+    def init_app(self, app: Flask) -> None:
+        self.enabled = app.config.get("NPLUSONE_ENABLED", False)
+        self.threshold = app.config.get("NPLUSONE_THRESHOLD", self.threshold)
+        self.endpoint_thresholds = dict(app.config.get("NPLUSONE_ENDPOINT_THRESHOLDS", {}))
+        self.raise_errors = app.config.get("NPLUSONE_RAISE", False)
+        app.extensions["query_detector"] = self
+        if not self.enabled:
+            return
+        app.before_request(self._start)
+        app.after_request(self._check)
+        app.teardown_request(lambda exc: _current.set(None))
+        if not self._listening:
+            event.listen(Engine, "before_cursor_execute", self._before_cursor_execute)
+            self._listening = True
+
+    @contextmanager
+    def watch(self, label: str = "block", threshold: Optional[int] = None) -> Iterator[_Watch]:
+        """Check the statements run inside the block, outside any request."""
+        watch = _Watch(label, self.threshold if threshold is None else threshold)
+        token = _current.set(watch)
+        try:
+            yield watch
+        finally:
+            _current.reset(token)
+        self.report(watch)
+
+    def report(self, watch: _Watch) -> list[RepeatedQuery]:
+        findings = watch.findings()
+        if findings:
+            message = f"Possible N+1 queries in {watch.label} (threshold {watch.threshold}):\n" + "\n".join(
+                finding.describe() for finding in findings
+            )
+            if self.raise_errors:
+                raise NPlusOneError(message)
+            logger.warning(message)
+        return findings
+
+    def _start(self) -> None:
+        endpoint = request.endpoint or "<unmatched>"
+        _current.set(_Watch(endpoint, self.endpoint_thresholds.get(endpoint, self.threshold)))
+
+    def _check(self, response):
+        watch = _current.get()
+        if watch is not None:
+            _current.set(None)
+            self.report(watch)
+        return response
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        watch = _current.get()
+        if watch is None:
+            return
+        watch.counts[statement] += 1
+        if watch.counts[statement] > 1:
+            sites = watch.sites.setdefault(statement, [])
+            if len(sites) < MAX_SITES:
+                site = _stack()
+                if site not in sites:
+                    sites.append(site)
@@ -0,0 +1,301 @@
+"""Per-endpoint request latency and SQL metrics.
+
+Every request's latency lands in a fixed-bucket histogram for its endpoint,
+which costs one ``perf_counter`` pair and a short locked update. SQL is
+measured with ``before_cursor_execute`` / ``after_cursor_execute`` hooks, and
+only for a sampled fraction of requests (``METRICS_SQL_SAMPLE_RATE``): the hooks
+check a context variable and return immediately for everything else, so the
+per-statement cost is paid by the sampled requests alone. Sampled requests
+record their query count and DB time, and any statement slower than
+``METRICS_SLOW_QUERY_MS`` goes into a bounded log.
+
+Endpoints are Flask endpoint names (``listings.detail``), never raw paths, so
+the number of series stays fixed. Streamed responses (SSE) are not timed.
+Numbers are per worker process; Prometheus aggregates across workers at
+scrape time.
+"""
+
+from __future__ import annotations
+
+import random
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Optional
+
+from flask import Flask, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.utils.dates import utcnow
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+UNMATCHED = "<unmatched>"
+SKIPPED_ENDPOINTS = frozenset({"static"})
+
+
+@dataclass
+class _RequestState:
+    started: float
+    sampled: bool
+    queries: int = 0
+    db_seconds: float = 0.0
+    status: Optional[int] = None
+
+
+@dataclass(frozen=True)
+class SlowQuery:
+    endpoint: str
+    statement: str
+    seconds: float
+    at: datetime
+
+
+@dataclass
+class Histogram:
+    bounds: tuple
+    counts: list = field(default_factory=list)
+    total: float = 0.0
+    count: int = 0
+
+    def __post_init__(self) -> None:
+        # One slot per bound plus the +Inf overflow.
+        self.counts = [0] * (len(self.bounds) + 1)
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def cumulative(self) -> list[tuple[str, int]]:
+        running, rows = 0, []
+        for bound, count in zip(self.bounds + ("+Inf",), self.counts):
+            running += count
+            rows.append((str(bound), running))
+        return rows
+
+    def quantile(self, fraction: float) -> Optional[float]:
+        """Estimate a quantile by interpolating inside its bucket."""
+        if not self.count:
+            return None
+        rank, seen, lower = fraction * self.count, 0, 0.0
+        for index, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                if index == len(self.bounds):
+                    return float(self.bounds[-1])
+                upper = float(self.bounds[index])
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+            lower = float(self.bounds[index]) if index < len(self.bounds) else lower
+        return float(self.bounds[-1])
+
+
+@dataclass
+class EndpointMetrics:
+    latency: Histogram = field(default_factory=lambda: Histogram(LATENCY_BUCKETS))
+    statuses: dict = field(default_factory=dict)
+    sampled: int = 0
+    queries: Histogram = field(default_factory=lambda: Histogram(QUERY_BUCKETS))
+    db_seconds: float = 0.0
+    slow_queries: int = 0
+
+    @property
+    def errors(self) -> int:
+        return self.statuses.get("5xx", 0)
+
+    @property
+    def queries_per_request(self) -> Optional[float]:
+        return self.queries.total / self.sampled if self.sampled else None
+
+    @property
+    def db_ms_per_request(self) -> Optional[float]:
+        return self.db_seconds * 1000 / self.sampled if self.sampled else None
+
+
+_current: ContextVar[Optional[_RequestState]] = ContextVar("request_metrics", default=None)
+
+
+class RequestMetrics:
+    def __init__(self) -> None:
+        self.enabled = True
+        self.sample_rate = 0.1
+        self.slow_query_seconds = 0.1
+        self.slow_log: deque[SlowQuery] = deque(maxlen=50)
+        self.started_at = utcnow()
+        self._endpoints: dict[str, EndpointMetrics] = {}
+        self._lock = threading.Lock()
+        self._random = random.Random()
+        self._listening = False
+
+    def init_app(self, app: Flask) -> None:
+        self.enabled = app.config.get("METRICS_ENABLED", True)
+        self.sample_rate = app.config.get("METRICS_SQL_SAMPLE_RATE", self.sample_rate)
+        self.slow_query_seconds = app.config.get("METRICS_SLOW_QUERY_MS", 100) / 1000
+        self.slow_log = deque(self.slow_log, maxlen=app.config.get("METRICS_SLOW_QUERY_LOG_SIZE", 50))
+        app.extensions["request_metrics"] = self
+        if not self.enabled:
+            return
+        app.before_request(self._start)
+        app.after_request(self._capture_status)
+        app.teardown_request(self._finish)
+        if not self._listening:
+            event.listen(Engine, "before_cursor_execute", self._before_cursor_execute)
+            event.listen(Engine, "after_cursor_execute", self._after_cursor_execute)
+            self._listening = True
+
+    # -- request hooks ---------------------------------------------------------
+
+    def _start(self) -> None:
+        sampled = self.sample_rate >= 1 or self._random.random() < self.sample_rate
+        _current.set(_RequestState(time.perf_counter(), sampled))
+
+    def _capture_status(self, response):
+        state = _current.get()
+        if state is not None:
+            state.status = response.status_code
+            if response.mimetype == "text/event-stream":
+                # An SSE stream's lifetime is not a latency.
+                _current.set(None)
+        return response
+
+    def _finish(self, exc: Optional[BaseException]) -> None:
+        state = _current.get()
+        if state is None:
+            return
+        _current.set(None)
+        endpoint = request.endpoint or UNMATCHED
+        if endpoint in SKIPPED_ENDPOINTS:
+            return
+        status = state.status if state.status is not None else 500
+        self.record(endpoint, time.perf_counter() - state.started, status, state if state.sampled else None)
+
+    def record(self, endpoint: str, seconds: float, status: int, sql: Optional[_RequestState] = None) -> None:
+        status_class = f"{status // 100}xx"
+        with self._lock:
+            metrics = self._endpoints.get(endpoint)
+            if metrics is None:
+                metrics = self._endpoints[endpoint] = EndpointMetrics()
+            metrics.latency.observe(seconds)
+            metrics.statuses[status_class] = metrics.statuses.get(status_class, 0) + 1
+            if sql is not None:
+                metrics.sampled += 1
+                metrics.queries.observe(sql.queries)
+                metrics.db_seconds += sql.db_seconds
+
+    # -- SQL hooks ---------------------------------------------------------------
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        state = _current.get()
+        if state is not None and state.sampled:
+            conn.info.setdefault("request_metrics_started", []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        state = _current.get()
+        if state is None or not state.sampled:
+            return
+        started = conn.info.get("request_metrics_started")
+        if not started:
+            return
+        elapsed = time.perf_counter() - started.pop()
+        state.queries += 1
+        state.db_seconds += elapsed
+        if elapsed >= self.slow_query_seconds:
+            endpoint = request.endpoint or UNMATCHED
+            with self._lock:
+                self.slow_log.append(SlowQuery(endpoint, " ".join(statement.split())[:1000], elapsed, utcnow()))
+                metrics = self._endpoints.setdefault(endpoint, EndpointMetrics())
+                metrics.slow_queries += 1
+
+    # -- reporting ---------------------------------------------------------------
+
+    def snapshot(self) -> dict[str, EndpointMetrics]:
+        """Copies of the per-endpoint metrics, busiest first."""
+        with self._lock:
+            copies = {
+                name: EndpointMetrics(
+                    latency=_copy(metrics.latency),
+                    statuses=dict(metrics.statuses),
+                    sampled=metrics.sampled,
+                    queries=_copy(metrics.queries),
+                    db_seconds=metrics.db_seconds,
+                    slow_queries=metrics.slow_queries,
+                )
+                for name, metrics in self._endpoints.items()
+            }
+        return dict(sorted(copies.items(), key=lambda item: item[1].latency.count, reverse=True))
+
+    def slow_queries(self) -> list[SlowQuery]:
+        with self._lock:
+            return list(reversed(self.slow_log))
+
+    def reset(self) -> None:
+        with self._lock:
+            self._endpoints.clear()
+            self.slow_log.clear()
+            self.started_at = utcnow()
+
+    def prometheus(self) -> str:
+        """Render the metrics in the Prometheus text exposition format (0.0.4)."""
+        endpoints = self.snapshot()
+        lines = [
+            "# HELP keystonebid_http_requests_total Requests handled by this worker.",
+            "# TYPE keystonebid_http_requests_total counter",
+        ]
+        for name, metrics in endpoints.items():
+            for status_class, count in sorted(metrics.statuses.items()):
+                labels = f'endpoint="{_escape(name)}",status="{status_class}"'
+                lines.append(f"keystonebid_http_requests_total{{{labels}}} {count}")
+
+        lines += [
+            "# HELP keystonebid_http_request_duration_seconds Request latency.",
+            "# TYPE keystonebid_http_request_duration_seconds histogram",
+        ]
+        for name, metrics in endpoints.items():
+            lines += _histogram_lines("keystonebid_http_request_duration_seconds", name, metrics.latency)
+
+        lines += [
+            "# HELP keystonebid_sql_queries_per_request SQL statements per sampled request.",
+            "# TYPE keystonebid_sql_queries_per_request histogram",
+        ]
+        for name, metrics in endpoints.items():
+            if metrics.sampled:
+                lines += _histogram_lines("keystonebid_sql_queries_per_request", name, metrics.queries)
+
+        for metric, help_text, value in (
+            ("keystonebid_sql_duration_seconds_total", "Time spent in SQL by sampled requests.", "db_seconds"),
+            ("keystonebid_sql_slow_queries_total", "Statements slower than METRICS_SLOW_QUERY_MS.", "slow_queries"),
+        ):
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} counter"]
+            for name, metrics in endpoints.items():
+                lines.append(f'{metric}{{endpoint="{_escape(name)}"}} {getattr(metrics, value)}')
+
+        lines += [
+            "# HELP keystonebid_sql_sample_rate Fraction of requests whose SQL is measured.",
+            "# TYPE keystonebid_sql_sample_rate gauge",
+            f"keystonebid_sql_sample_rate {self.sample_rate}",
+        ]
+        return "\n".join(lines) + "\n"
+
+
+def _copy(histogram: Histogram) -> Histogram:
+    copy = Histogram(histogram.bounds)
+    copy.counts = list(histogram.counts)
+    copy.total, copy.count = histogram.total, histogram.count
+    return copy
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _histogram_lines(metric: str, endpoint: str, histogram: Histogram) -> list[str]:
+    label = f'endpoint="{_escape(endpoint)}"'
+    lines = [f'{metric}_bucket{{{label},le="{bound}"}} {count}' for bound, count in histogram.cumulative()]
+    lines.append(f"{metric}_sum{{{label}}} {histogram.total}")
+    lines.append(f"{metric}_count{{{label}}} {histogram.count}")
+    return lines
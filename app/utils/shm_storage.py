@@ -0,0 +1,256 @@
+"""Flask-Limiter storage shared by every worker on a host through ``mmap``.
+
+``RATELIMIT_STORAGE_URI = "shm://ratelimit.shm?slots=65536&stripes=64"``
+
+A relative path is resolved against the app's instance folder by
+``anchor_uri`` when the app is created, so every worker opens the same file
+whatever directory it was started from.
+
+The file holds a fixed-size open-addressing table of ``(key hash, count,
+expiry)`` slots split into stripes. A key hashes to one stripe and is probed
+linearly within it. Each stripe is guarded by a ``threading.Lock`` (threads in
+this process) plus an ``fcntl`` byte-range lock (other processes), so workers
+only contend when they touch the same stripe. Expired slots are reused in
+place and never emptied, which keeps probe chains intact without tombstones.
+When a stripe is full, the slot closest to expiring is evicted.
+
+Supports the fixed-window and sliding-window-counter strategies. ``fcntl`` is
+POSIX-only; elsewhere ``anchor_uri`` swaps an ``shm://`` URI for ``memory://``.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+from contextlib import contextmanager
+from math import floor
+from typing import Iterator, Optional
+from urllib.parse import parse_qs, urlparse
+
+from limits.storage.base import SlidingWindowCounterSupport, Storage, TimestampedSlidingWindow
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not POSIX
+    fcntl = None
+
+MAGIC = b"KBRLSHM1"
+HEADER = struct.Struct("<8sII")
+HEADER_SIZE = 4096
+SLOT = struct.Struct("<Qqd")
+INIT_LOCK_OFFSET = 0
+
+logger = logging.getLogger(__name__)
+
+
+def anchor_uri(uri: str, root: str) -> str:
+    """Make a relative ``shm://`` path absolute under ``root``; other URIs pass through.
+
+    Without ``fcntl`` the storage cannot lock across workers, so ``memory://`` is used instead.
+    """
+    parsed = urlparse(uri)
+    if parsed.scheme != "shm":
+        return uri
+    if fcntl is None:
+        logger.warning("shm:// rate-limit storage needs fcntl; falling back to memory://")
+        return "memory://"
+    if not parsed.netloc:
+        return uri
+    path = os.path.join(root, f"{parsed.netloc}{parsed.path}")
+    return f"shm://{path}" + (f"?{parsed.query}" if parsed.query else "")
+
+
+def key_hash(key: str) -> int:
+    # 0 marks an empty slot.
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "little") or 1
+
+
+class SharedMemoryStorage(Storage, SlidingWindowCounterSupport, TimestampedSlidingWindow):
+    STORAGE_SCHEME = ["shm"]
+
+    def __init__(self, uri: str, wrap_exceptions: bool = False, **options) -> None:
+        if fcntl is None:
+            raise RuntimeError("shm:// storage needs fcntl, which this platform lacks")
+        parsed = urlparse(uri)
+        query = {key: values[-1] for key, values in parse_qs(parsed.query).items()}
+        self.path = os.path.abspath(f"{parsed.netloc}{parsed.path}")
+        slots = int(query.get("slots", options.get("slots", 65536)))
+        stripes = int(query.get("stripes", options.get("stripes", 64)))
+        self.slots, self.stripes = self._open(slots, stripes)
+        self.stripe_size = self.slots // self.stripes
+        self._thread_locks = [threading.Lock() for _ in range(self.stripes)]
+        super().__init__(uri, wrap_exceptions=wrap_exceptions)
+
+    def _open(self, slots: int, stripes: int) -> tuple[int, int]:
+        if stripes < 1 or stripes >= HEADER_SIZE or slots < stripes:
+            raise ValueError("shm storage needs 1 <= stripes < 4096 and slots >= stripes")
+        slots -= slots % stripes
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        fcntl.lockf(self._fd, fcntl.LOCK_EX, 1, INIT_LOCK_OFFSET)
+        try:
+            header = os.pread(self._fd, HEADER.size, 0)
+            if len(header) == HEADER.size and header.startswith(MAGIC):
+                # Another worker created the table; adopt its geometry.
+                _, slots, stripes = HEADER.unpack(header)
+            else:
+                os.ftruncate(self._fd, HEADER_SIZE + slots * SLOT.size)
+                os.pwrite(self._fd, HEADER.pack(MAGIC, slots, stripes), 0)
+        finally:
+            fcntl.lockf(self._fd, fcntl.LOCK_UN, 1, INIT_LOCK_OFFSET)
+        self._map = mmap.mmap(self._fd, HEADER_SIZE + slots * SLOT.size)
+        return slots, stripes
+
+    @property
+    def base_exceptions(self) -> tuple[type[Exception], ...]:
+        return (OSError, ValueError)
+
+    # -- locking and slot access -------------------------------------------
+
+    @contextmanager
+    def _locked(self, *hashes: int) -> Iterator[None]:
+        stripes = sorted({value % self.stripes for value in hashes})
+        for stripe in stripes:
+            self._thread_locks[stripe].acquire()
+            fcntl.lockf(self._fd, fcntl.LOCK_EX, 1, stripe + 1)
+        try:
+            yield
+        finally:
+            for stripe in reversed(stripes):
+                fcntl.lockf(self._fd, fcntl.LOCK_UN, 1, stripe + 1)
+                self._thread_locks[stripe].release()
+
+    def _offset(self, index: int) -> int:
+        return HEADER_SIZE + index * SLOT.size
+
+    def _read(self, index: int) -> tuple[int, int, float]:
+        return SLOT.unpack_from(self._map, self._offset(index))
+
+    def _write(self, index: int, hashed: int, count: int, expiry: float) -> None:
+        SLOT.pack_into(self._map, self._offset(index), hashed, count, expiry)
+
+    def _find(self, hashed: int, now: float, create: bool) -> Optional[int]:
+        base = (hashed % self.stripes) * self.stripe_size
+        start = (hashed // self.stripes) % self.stripe_size
+        reusable: Optional[int] = None
+        oldest, oldest_expiry = base + start, float("inf")
+        for step in range(self.stripe_size):
+            index = base + (start + step) % self.stripe_size
+            slot_hash, _, expiry = self._read(index)
+            if slot_hash == hashed:
+                return index
+            if slot_hash == 0:
+                return (reusable if reusable is not None else index) if create else None
+            if reusable is None and expiry <= now:
+                reusable = index
+            if expiry < oldest_expiry:
+                oldest, oldest_expiry = index, expiry
+        if not create:
+            return None
+        return reusable if reusable is not None else oldest
+
+    def _live(self, hashed: int, now: float) -> tuple[Optional[int], int, float]:
+        index = self._find(hashed, now, create=False)
+        if index is None:
+            return None, 0, now
+        _, count, expiry = self._read(index)
+        if expiry <= now:
+            return index, 0, now
+        return index, count, expiry
+
+    def _incr(self, hashed: int, expiry: float, amount: int, now: float) -> int:
+        index = self._find(hashed, now, create=True)
+        slot_hash, count, expires_at = self._read(index)
+        if slot_hash != hashed or expires_at <= now:
+            count, expires_at = 0, now + expiry
+        count += amount
+        self._write(index, hashed, count, expires_at)
+        return count
+
+    # -- fixed window --------------------------------------------------------
+
+    def incr(self, key: str, expiry: int, amount: int = 1) -> int:
+        hashed = key_hash(key)
+        with self._locked(hashed):
+            return self._incr(hashed, expiry, amount, time.time())
+
+    def decr(self, key: str, amount: int = 1) -> int:
+        hashed = key_hash(key)
+        with self._locked(hashed):
+            index, count, expiry = self._live(hashed, time.time())
+            if index is None or not count:
+                return 0
+            count = max(count - amount, 0)
+            self._write(index, hashed, count, expiry)
+            return count
+
+    def get(self, key: str) -> int:
+        hashed = key_hash(key)
+        with self._locked(hashed):
+            return self._live(hashed, time.time())[1]
+
+    def get_expiry(self, key: str) -> float:
+        hashed = key_hash(key)
+        with self._locked(hashed):
+            return self._live(hashed, time.time())[2]
+
+    def clear(self, key: str) -> None:
+        hashed = key_hash(key)
+        with self._locked(hashed):
+            index = self._find(hashed, time.time(), create=False)
+            if index is not None:
+                self._write(index, hashed, 0, 0.0)
+
+    def check(self) -> bool:
+        return not self._map.closed
+
+    def reset(self) -> Optional[int]:
+        now = time.time()
+        with self._locked(*range(self.stripes)):
+            live = 0
+            for index in range(self.slots):
+                slot_hash, count, expiry = self._read(index)
+                live += bool(slot_hash and count and expiry > now)
+            self._map[HEADER_SIZE:] = bytes(self.slots * SLOT.size)
+        return live
+
+    # -- sliding window counter ----------------------------------------------
+
+    def _window(self, previous: int, current: int, expiry: int, now: float) -> tuple[int, float, int, float]:
+        previous_count = self._live(previous, now)[1]
+        current_count = self._live(current, now)[1]
+        previous_ttl = (1 - (((now - expiry) / expiry) % 1)) * expiry if previous_count else 0.0
+        current_ttl = (1 - ((now / expiry) % 1)) * expiry + expiry
+        return previous_count, previous_ttl, current_count, current_ttl
+
+    def acquire_sliding_window_entry(self, key: str, limit: int, expiry: int, amount: int = 1) -> bool:
+        if amount > limit:
+            return False
+        now = time.time()
+        previous_key, current_key = self.sliding_window_keys(key, expiry, now)
+        previous, current = key_hash(previous_key), key_hash(current_key)
+        # Both windows are locked together, so check-and-increment is atomic
+        # and never has to be rolled back.
+        with self._locked(previous, current):
+            previous_count, previous_ttl, current_count, _ = self._window(previous, current, expiry, now)
+            if floor(previous_count * previous_ttl / expiry + current_count) + amount > limit:
+                return False
+            self._incr(current, 2 * expiry, amount, now)
+            return True
+
+    def get_sliding_window(self, key: str, expiry: int) -> tuple[int, float, int, float]:
+        now = time.time()
+        previous_key, current_key = self.sliding_window_keys(key, expiry, now)
+        previous, current = key_hash(previous_key), key_hash(current_key)
+        with self._locked(previous, current):
+            return self._window(previous, current, expiry, now)
+
+    def clear_sliding_window(self, key: str, expiry: int) -> None:
+        previous_key, current_key = self.sliding_window_keys(key, expiry, time.time())
+        self.clear(previous_key)
+        self.clear(current_key)
@@ -0,0 +1,70 @@
+"""Cold-start profile of ``create_app``.
+
+Run by file path (``python app/utils/startup.py [config] [--lazy]``), not with
+``-m``: importing it as ``app.utils.startup`` would import the ``app`` package
+first and every measurement after that would be warm. Prints one JSON document
+with the import time of each third-party extension module and the phases
+recorded by ``create_app``.
+"""
+
+from __future__ import annotations
+
+import importlib
+import json
+import os
+import sys
+import time
+from typing import Optional
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+EXTENSION_MODULES = (
+    "flask",
+    "sqlalchemy",
+    "flask_sqlalchemy",
+    "flask_migrate",
+    "flask_login",
+    "flask_bcrypt",
+    "flask_mail",
+    "flask_limiter",
+    "authlib.integrations.flask_client",
+)
+
+
+def profile(config_object: Optional[str] = None) -> dict:
+    rows = []
+    started = time.perf_counter()
+    for module in EXTENSION_MODULES:
+        begin = time.perf_counter()
+        importlib.import_module(module)
+        rows.append(("import", module, time.perf_counter() - begin))
+
+    begin = time.perf_counter()
+    from app import create_app
+
+    rows.append(("import", "app", time.perf_counter() - begin))
+
+    begin = time.perf_counter()
+    app = create_app(config_object)
+    factory = time.perf_counter() - begin
+    rows.extend(app.extensions["startup_timings"])
+
+    return {
+        "lazy_blueprints": bool(app.config.get("LAZY_BLUEPRINTS")),
+        "create_app_seconds": factory,
+        "total_seconds": time.perf_counter() - started,
+        "phases": [{"phase": phase, "name": name, "seconds": seconds} for phase, name, seconds in rows],
+    }
+
+
+def main(argv: list[str]) -> None:
+    if "--lazy" in argv:
+        os.environ["LAZY_BLUEPRINTS"] = "true"
+    positional = [arg for arg in argv if not arg.startswith("--")]
+    print(json.dumps(profile(positional[0] if positional else None)))
+
+
+if __name__ == "__main__":
+    # Resolve imports from the project root rather than this file's directory.
+    sys.path[0] = PROJECT_ROOT
+    main(sys.argv[1:])
@@ -0,0 +1,110 @@
+"""Pluggable blob storage for uploaded media.
+
+Keys are relative paths such as ``originals/ab/abcdef....jpg``. Backends:
+
+* ``local``: files under ``IMAGE_STORAGE_DIR``, served by the listings
+  blueprint at ``/listings/media``. The stand-in for S3 in development and
+  tests.
+* ``s3``: a bucket (``IMAGE_S3_BUCKET``) through ``boto3``, which is only
+  imported when this backend is selected.
+
+``put`` never consumes the source file, so the caller can keep using it (the
+image pipeline hands the same staged file to its thumbnail workers).
+"""
+
+from __future__ import annotations
+
+import os
+import shutil
+from typing import Optional
+
+
+class LocalStorage:
+    name = "local"
+
+    def __init__(self, root: str, base_url: str) -> None:
+        self.root = os.path.abspath(root)
+        self.base_url = base_url.rstrip("/")
+        os.makedirs(self.root, exist_ok=True)
+
+    def path(self, key: str) -> str:
+        path = os.path.abspath(os.path.join(self.root, key))
+        if not path.startswith(self.root + os.sep):
+            raise ValueError(f"Storage key escapes the storage root: {key!r}")
+        return path
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(self.path(key))
+
+    def put(self, key: str, source: str) -> None:
+        target = self.path(key)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        temp = f"{target}.{os.getpid()}.tmp"
+        try:
+            # A hard link is free when staging shares the filesystem.
+            os.link(source, temp)
+        except OSError:
+            shutil.copyfile(source, temp)
+        os.replace(temp, target)
+
+    def fetch(self, key: str, destination: str) -> None:
+        shutil.copyfile(self.path(key), destination)
+
+    def delete(self, key: str) -> None:
+        try:
+            os.unlink(self.path(key))
+        except FileNotFoundError:
+            pass
+
+    def url(self, key: str) -> str:
+        return f"{self.base_url}/{key}"
+
+
+class S3Storage:
+    name = "s3"
+
+    def __init__(self, bucket: str, prefix: str = "", base_url: Optional[str] = None) -> None:
+        try:
+            import boto3
+        except ImportError as exc:
+            raise RuntimeError("IMAGE_STORAGE_BACKEND=s3 needs boto3 installed") from exc
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+        self.base_url = (base_url or f"https://{bucket}.s3.amazonaws.com").rstrip("/")
+        self._client = boto3.client("s3")
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}/{key}" if self.prefix else key
+
+    def exists(self, key: str) -> bool:
+        from botocore.exceptions import ClientError
+
+        try:
+            self._client.head_object(Bucket=self.bucket, Key=self._key(key))
+            return True
+        except ClientError as exc:
+            if exc.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+
+    def put(self, key: str, source: str) -> None:
+        self._client.upload_file(source, self.bucket, self._key(key))
+
+    def fetch(self, key: str, destination: str) -> None:
+        self._client.download_file(self.bucket, self._key(key), destination)
+
+    def delete(self, key: str) -> None:
+        self._client.delete_object(Bucket=self.bucket, Key=self._key(key))
+
+    def url(self, key: str) -> str:
+        return f"{self.base_url}/{self._key(key)}"
+
+
+def storage_from_config(config) -> LocalStorage | S3Storage:
+    name = config.get("IMAGE_STORAGE_BACKEND", "local")
+    if name == "local":
+        base_url = config.get("IMAGE_BASE_URL") or "/listings/media"
+        return LocalStorage(config.get("IMAGE_STORAGE_DIR", "instance/uploads"), base_url)
+    if name == "s3":
+        return S3Storage(config["IMAGE_S3_BUCKET"], config.get("IMAGE_S3_PREFIX", ""), config.get("IMAGE_BASE_URL"))
+    raise ValueError(f"Unknown IMAGE_STORAGE_BACKEND: {name!r}")
@@ -0,0 +1,152 @@
+"""Hammer one listing with concurrent bidders and check the final state.
+
+Usage::
+
+    python -m benchmarks.bid_contention --threads 16 --bidders 32 --bids-per-bidder 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from datetime import timedelta
+from decimal import Decimal
+
+
+@dataclass
+class ContentionStats:
+    accepted: int = 0
+    rejected: int = 0
+    gave_up: int = 0
+    retries: int = 0
+    elapsed: float = 0.0
+    ceilings: dict[int, Decimal] = field(default_factory=dict)
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    @property
+    def bids_per_second(self) -> float:
+        return self.accepted / self.elapsed if self.elapsed else 0.0
+
+
+def seed_auction(bidders: int, starting_price: str = "100.00") -> tuple[int, list[int]]:
+    from app.extensions import db
+    from app.models import Listing, User
+    from app.utils.dates import utcnow
+
+    users = [User(username=f"bench-{index}", email=f"bench-{index}@example.com", password_hash="x") for index in range(bidders + 1)]
+    db.session.add_all(users)
+    db.session.flush()
+    seller, *rest = users
+    listing = Listing(
+        seller_id=seller.id,
+        title="Contention benchmark listing",
+        description="Synthetic listing for bid contention runs.",
+        license_year=1917,
+        license_type="resident",
+        county="Allegheny",
+        condition_grade="fine",
+        listing_type="auction",
+        starting_price=Decimal(starting_price),
+        status="active",
+        auction_end=utcnow() + timedelta(hours=1),
+    )
+    db.session.add(listing)
+    db.session.commit()
+    return listing.id, [user.id for user in rest]
+
+
+def hammer_listing(app, pool: Executor, listing_id: int, bidder_ids: list[int], bids_per_bidder: int, seed: int = 0) -> ContentionStats:
+    from app.extensions import db
+    from app.models import Listing
+    from app.services.bidding import BidContentionError, BidError, minimum_next_bid, place_bid
+
+    stats = ContentionStats()
+    rng = random.Random(seed)
+    jobs = [(bidder_id, rng.randint(1, 40), rng.random() < 0.5) for bidder_id in bidder_ids for _ in range(bids_per_bidder)]
+    rng.shuffle(jobs)
+
+    def run(bidder_id: int, headroom: int, use_proxy: bool) -> None:
+        with app.app_context():
+            listing = db.session.get(Listing, listing_id)
+            amount = minimum_next_bid(listing.starting_price, listing.current_bid)
+            proxy_max = amount + headroom * 5 if use_proxy else None
+            db.session.rollback()
+            try:
+                result = place_bid(listing_id, bidder_id, amount, proxy_max=proxy_max)
+            except BidContentionError:
+                with stats.lock:
+                    stats.gave_up += 1
+                return
+            except BidError:
+                with stats.lock:
+                    stats.rejected += 1
+                return
+            ceiling = Decimal(proxy_max) if proxy_max is not None else amount
+            with stats.lock:
+                stats.accepted += 1
+                stats.retries += result.attempts - 1
+                stats.ceilings[bidder_id] = max(ceiling, stats.ceilings.get(bidder_id, Decimal(0)))
+
+    started = time.perf_counter()
+    wait([pool.submit(run, *job) for job in jobs])
+    stats.elapsed = time.perf_counter() - started
+    return stats
+
+
+def verify_listing_state(listing_id: int, stats: ContentionStats) -> None:
+    from app.extensions import db
+    from app.models import Bid, Listing
+
+    db.session.expire_all()
+    listing = db.session.get(Listing, listing_id)
+    bids = Bid.query.filter_by(listing_id=listing_id).all()
+    winners = [bid for bid in bids if bid.is_winning]
+
+    assert listing.bid_count == len(bids), f"bid_count {listing.bid_count} != {len(bids)} bid rows"
+    assert len(winners) == 1, f"expected one winning bid, found {len(winners)}"
+    winner = winners[0]
+    winning_ceiling = winner.proxy_max if winner.proxy_max is not None else winner.amount
+    assert winner.amount == listing.current_bid, "winning bid amount differs from current_bid"
+    assert listing.current_bid <= winning_ceiling, "current_bid exceeds the leader's maximum"
+    assert winning_ceiling >= max(stats.ceilings.values()), "a higher maximum bid is not winning"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--bidders", type=int, default=32)
+    parser.add_argument("--bids-per-bidder", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="keystonebid-bench-")
+    os.environ.setdefault("TEST_DATABASE_URL", f"sqlite:///{os.path.join(workdir, 'bench.db')}")
+
+    from app import create_app
+    from app.extensions import db
+
+    app = create_app("config.TestingConfig")
+    with app.app_context():
+        db.create_all()
+        listing_id, bidder_ids = seed_auction(args.bidders)
+
+    with ThreadPoolExecutor(max_workers=args.threads) as pool:
+        stats = hammer_listing(app, pool, listing_id, bidder_ids, args.bids_per_bidder, seed=args.seed)
+
+    with app.app_context():
+        verify_listing_state(listing_id, stats)
+
+    print(f"threads={args.threads} bidders={args.bidders} attempts={args.bidders * args.bids_per_bidder}")
+    print(f"accepted={stats.accepted} rejected={stats.rejected} gave_up={stats.gave_up} retries={stats.retries}")
+    print(f"elapsed={stats.elapsed:.3f}s throughput={stats.bids_per_second:.1f} bids/s")
+    print("final state consistent")
+
+
+if __name__ == "__main__":
+    main()
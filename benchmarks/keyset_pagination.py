@@ -0,0 +1,142 @@
+"""Compare OFFSET paging with keyset cursors at increasing depth.
+
+Usage::
+
+    python -m benchmarks.keyset_pagination --listings 200000 --bids 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from datetime import timedelta
+
+
+def seed(listings: int, bids: int, batch_size: int = 20000) -> int:
+    from sqlalchemy import insert
+
+    from app.extensions import db
+    from app.models import Bid, Listing, User
+    from app.utils.dates import utcnow
+
+    seller = User(username="bench-seller", email="bench-seller@example.com", password_hash="x")
+    bidder = User(username="bench-bidder", email="bench-bidder@example.com", password_hash="x")
+    db.session.add_all([seller, bidder])
+    db.session.flush()
+    started = utcnow() - timedelta(days=365)
+    for offset in range(0, listings, batch_size):
+        db.session.execute(
+            insert(Listing),
+            [
+                {
+                    "seller_id": seller.id,
+                    "title": f"Pagination benchmark listing {index}",
+                    "description": "Synthetic listing for paging runs.",
+                    "license_year": 1900 + index % 60,
+                    "license_type": "resident",
+                    "county": "Allegheny",
+                    "condition_grade": "fine",
+                    "listing_type": "auction",
+                    "starting_price": 100,
+                    "status": "active",
+                    "created_at": started + timedelta(seconds=index),
+                }
+                for index in range(offset, min(offset + batch_size, listings))
+            ],
+        )
+    listing_id = db.session.scalar(db.select(Listing.id).order_by(Listing.id).limit(1))
+    for offset in range(0, bids, batch_size):
+        db.session.execute(
+            insert(Bid),
+            [
+                {
+                    "listing_id": listing_id,
+                    "bidder_id": bidder.id,
+                    "amount": 100 + index,
+                    "placed_at": started + timedelta(seconds=index),
+                }
+                for index in range(offset, min(offset + batch_size, bids))
+            ],
+        )
+    db.session.commit()
+    return listing_id
+
+
+def median_ms(fetch, repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fetch()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def compare(label: str, statement, columns, scope: str, depths: list[int], page_size: int, repeats: int) -> None:
+    from app.extensions import db
+    from app.utils.pagination import encode_cursor, keyset_page
+
+    ordered = statement.order_by(*(column.desc() for column in columns))
+    print(f"\n{label}")
+    print(f"{'depth':>8} {'offset ms':>10} {'keyset ms':>10}")
+    for depth in depths:
+        boundary = db.session.execute(ordered.offset(depth - 1).limit(1)).scalar() if depth else None
+        if depth and boundary is None:
+            continue
+        cursor = encode_cursor(scope, [getattr(boundary, column.key) for column in columns]) if boundary else None
+        offset_ms = median_ms(lambda: db.session.execute(ordered.offset(depth).limit(page_size)).scalars().all(), repeats)
+        keyset_ms = median_ms(
+            lambda: keyset_page(statement, columns, scope=scope, cursor=cursor, limit=page_size), repeats
+        )
+        print(f"{depth:>8} {offset_ms:>10.2f} {keyset_ms:>10.2f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--listings", type=int, default=200000)
+    parser.add_argument("--bids", type=int, default=100000)
+    parser.add_argument("--page-size", type=int, default=24)
+    parser.add_argument("--repeats", type=int, default=7)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="keystonebid-paging-")
+    os.environ["TEST_DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+
+    from sqlalchemy import select
+
+    from app import create_app
+    from app.extensions import db
+    from app.models import Bid, Listing
+
+    app = create_app("config.TestingConfig")
+    with app.app_context():
+        db.create_all()
+        started = time.perf_counter()
+        listing_id = seed(args.listings, args.bids)
+        print(f"seeded {args.listings} listings and {args.bids} bids in {time.perf_counter() - started:.1f}s")
+
+        depths = [0, 100, 1000, 10000, 50000, 100000, 190000]
+        compare(
+            "listings, newest first",
+            select(Listing).where(Listing.status == "active"),
+            (Listing.created_at, Listing.id),
+            "listings",
+            [depth for depth in depths if depth < args.listings],
+            args.page_size,
+            args.repeats,
+        )
+        compare(
+            f"bid history for listing {listing_id}",
+            select(Bid).where(Bid.listing_id == listing_id),
+            (Bid.placed_at, Bid.id),
+            f"bids:{listing_id}",
+            [depth for depth in depths if depth < args.bids],
+            args.page_size,
+            args.repeats,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+"""Drive every blueprint with concurrent test clients and report latency per endpoint.
+
+Seeds a throwaway SQLite database with ``app.services.synthetic``, then runs
+each endpoint for ``--requests`` calls spread over ``--threads`` workers,
+followed by a mixed phase drawing from all of them. Every thread has an
+anonymous test client and one logged in as a member for the routes that need
+it. Reports throughput and p50/p95/p99 latency, and writes the run as JSON so
+later runs can be compared.
+
+Usage::
+
+    python -m benchmarks.load --scale small --threads 8 --requests 400 --output load-before.json
+    python -m benchmarks.load --scale small --threads 8 --requests 400 --compare load-before.json
+
+Streaming (SSE) and OAuth redirect routes are left out: neither has a
+meaningful per-request latency.
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import math
+import os
+import platform
+import random
+import sqlite3
+import subprocess
+import tempfile
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable, Optional
+
+
+@dataclass(frozen=True)
+class Fixtures:
+    user_ids: list[int]
+    active_ids: list[int]
+    busy_ids: list[int]
+    counties: list[str]
+    listings_cursor: Optional[str]
+
+
+@dataclass(frozen=True)
+class Endpoint:
+    name: str
+    path: Callable[[random.Random, Fixtures], str]
+    method: str = "GET"
+    auth: bool = False
+    body: Optional[Callable[[random.Random, Fixtures], dict]] = None
+    # Business-rule rejections (an outbid race) still exercise the full path.
+    expected: tuple[int, ...] = (200,)
+
+
+ENDPOINTS = (
+    Endpoint("home", lambda rng, f: "/"),
+    Endpoint("listings.index", lambda rng, f: "/listings/"),
+    Endpoint("listings.index.page2", lambda rng, f: f"/listings/?after={f.listings_cursor or ''}"),
+    Endpoint("listings.detail", lambda rng, f: f"/listings/{rng.choice(f.active_ids)}"),
+    Endpoint("search.text", lambda rng, f: f"/search/?q={rng.choice(f.counties)}+{rng.randint(1913, 1979)}"),
+    Endpoint("search.facets", lambda rng, f: f"/search/?county={rng.choice(f.counties)}"),
+    Endpoint("bids.index", lambda rng, f: "/bids/"),
+    Endpoint("bids.history", lambda rng, f: f"/bids/{rng.choice(f.busy_ids)}/history"),
+    Endpoint(
+        "bids.place",
+        lambda rng, f: f"/bids/{rng.choice(f.active_ids)}",
+        method="POST",
+        auth=True,
+        body=lambda rng, f: {"amount": str(rng.randint(200, 5000))},
+        expected=(200, 409),
+    ),
+    Endpoint("education.index", lambda rng, f: "/education/"),
+    Endpoint("stories.index", lambda rng, f: "/stories/"),
+    Endpoint("collector.index", lambda rng, f: "/collector/"),
+    Endpoint("payments.index", lambda rng, f: "/payments/"),
+    Endpoint("admin.index", lambda rng, f: "/admin/"),
+    Endpoint("auth.login", lambda rng, f: "/auth/login"),
+    Endpoint("auth.register", lambda rng, f: "/auth/register"),
+    Endpoint("dashboard.index", lambda rng, f: "/dashboard/", auth=True),
+    Endpoint("dashboard.notifications", lambda rng, f: "/dashboard/notifications", auth=True),
+    Endpoint("api.listings", lambda rng, f: "/api/listings"),
+    Endpoint("api.listing_bids", lambda rng, f: f"/api/listings/{rng.choice(f.busy_ids)}/bids"),
+    Endpoint("api.facets", lambda rng, f: f"/api/facets?county={rng.choice(f.counties)}"),
+    Endpoint("api.notifications", lambda rng, f: "/api/notifications", auth=True),
+    Endpoint("api.notifications.unread", lambda rng, f: "/api/notifications/unread", auth=True),
+)
+
+
+def percentile(ordered: list[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def summarise(samples: list[tuple[float, int, bool]], wall_seconds: float) -> dict:
+    latencies = sorted(latency for latency, _, _ in samples)
+    return {
+        "requests": len(samples),
+        "errors": sum(1 for _, _, ok in samples if not ok),
+        "statuses": dict(sorted(Counter(str(status) for _, status, _ in samples).items())),
+        "throughput_rps": round(len(samples) / wall_seconds, 1) if wall_seconds else 0.0,
+        "mean_ms": round(sum(latencies) / len(latencies), 2),
+        "p50_ms": round(percentile(latencies, 0.50), 2),
+        "p95_ms": round(percentile(latencies, 0.95), 2),
+        "p99_ms": round(percentile(latencies, 0.99), 2),
+        "max_ms": round(latencies[-1], 2),
+    }
+
+
+class LoadRunner:
+    def __init__(self, app, fixtures: Fixtures, threads: int, seed: int) -> None:
+        self.app = app
+        self.fixtures = fixtures
+        self.threads = threads
+        self.seed = seed
+        self._local = threading.local()
+        self._counter = itertools.count()
+
+    def _client(self, auth: bool):
+        # Test clients keep a cookie jar, so each worker thread gets its own
+        # anonymous client plus one logged in as its own member.
+        local = self._local
+        if not hasattr(local, "rng"):
+            local.rng = random.Random(self.seed * 1000 + next(self._counter))
+            local.anonymous = self.app.test_client()
+            local.member = self.app.test_client()
+            with local.member.session_transaction() as session:
+                session["_user_id"] = str(local.rng.choice(self.fixtures.user_ids))
+                session["_fresh"] = True
+        return (local.member if auth else local.anonymous), local.rng
+
+    def _call(self, endpoint: Endpoint) -> tuple[float, int, bool]:
+        client, rng = self._client(endpoint.auth)
+        path = endpoint.path(rng, self.fixtures)
+        body = endpoint.body(rng, self.fixtures) if endpoint.body else None
+        started = time.perf_counter()
+        response = client.open(path, method=endpoint.method, json=body)
+        response.close()
+        elapsed = (time.perf_counter() - started) * 1000
+        return elapsed, response.status_code, response.status_code in endpoint.expected
+
+    def run(self, endpoints: list[Endpoint], requests: int) -> tuple[list[tuple[float, int, bool]], float]:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(self.threads) as pool:
+            samples = list(pool.map(self._call, endpoints * (requests // len(endpoints) or 1)))
+        return samples, time.perf_counter() - started
+
+
+def load_fixtures(app) -> Fixtures:
+    from sqlalchemy import select
+
+    from app.extensions import db
+    from app.models import Listing, User
+
+    with app.app_context():
+        user_ids = list(db.session.scalars(select(User.id)))
+        active_ids = list(db.session.scalars(select(Listing.id).where(Listing.status == "active")))
+        busy = select(Listing.id).where(Listing.bid_count > 0).order_by(Listing.bid_count.desc()).limit(50)
+        busy_ids = list(db.session.scalars(busy))
+        counties = sorted(set(db.session.scalars(select(Listing.county).distinct())))
+    cursor = app.test_client().get("/api/listings").get_json().get("next_cursor")
+    return Fixtures(user_ids, active_ids, busy_ids or active_ids, counties, cursor)
+
+
+def git_revision() -> Optional[str]:
+    result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=False)
+    return result.stdout.strip() or None
+
+
+def print_report(report: dict, baseline: Optional[dict]) -> None:
+    previous = (baseline or {}).get("endpoints", {})
+    header = f"{'endpoint':<28} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>6}"
+    print("\n" + header + (f" {'p95 vs base':>12}" if baseline else ""))
+    for name, row in report["endpoints"].items():
+        line = (
+            f"{name:<28} {row['throughput_rps']:>8.1f} {row['p50_ms']:>8.2f} "
+            f"{row['p95_ms']:>8.2f} {row['p99_ms']:>8.2f} {row['errors']:>6}"
+        )
+        if name in previous and previous[name]["p95_ms"]:
+            line += f" {(row['p95_ms'] / previous[name]['p95_ms'] - 1) * 100:>+11.1f}%"
+        print(line)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", default="small", help="Synthetic data scale: tiny, small, medium or large.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=200, help="Requests per endpoint.")
+    parser.add_argument("--only", action="append", default=[], help="Run only endpoints starting with this name.")
+    parser.add_argument("--output", help="Write the results to this JSON file.")
+    parser.add_argument("--compare", help="A previous --output file to compare p95 latency against.")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="keystonebid-load-")
+    os.environ["TEST_DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'load.db')}"
+
+    from app import create_app
+    from app.extensions import db
+    from app.services.synthetic import generate, scale_for
+
+    app = create_app("config.TestingConfig")
+    with app.app_context():
+        db.create_all()
+        summary = generate(scale_for(args.scale), seed=args.seed)
+    print(f"seeded {sum(summary.counts.values())} rows ({args.scale}) in {summary.seconds:.1f}s")
+
+    fixtures = load_fixtures(app)
+    runner = LoadRunner(app, fixtures, args.threads, args.seed)
+    endpoints = [endpoint for endpoint in ENDPOINTS if not args.only or endpoint.name.startswith(tuple(args.only))]
+    # One untimed pass warms the search index, facet bitmaps and fragment cache.
+    runner.run(endpoints, len(endpoints))
+
+    results = {}
+    for endpoint in endpoints:
+        samples, wall = runner.run([endpoint], args.requests)
+        results[endpoint.name] = summarise(samples, wall)
+    samples, wall = runner.run(endpoints, args.requests * len(endpoints) // 4)
+    results["mixed"] = summarise(samples, wall)
+
+    report = {
+        "meta": {
+            "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "scale": args.scale,
+            "seed": args.seed,
+            "rows": summary.counts,
+            "threads": args.threads,
+            "requests_per_endpoint": args.requests,
+        },
+        "endpoints": results,
+    }
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as handle:
+            baseline = json.load(handle)
+    print_report(report, baseline)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+        print(f"\nwrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Measure login throughput through the auth route at several bcrypt costs.
+
+Usage::
+
+    python -m benchmarks.login_throughput --costs 10 11 12 --clients 8 --logins 64
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+def run_cost(app, cost: int, clients: int, logins: int) -> dict:
+    from app.extensions import bcrypt, db
+    from app.models import User
+    from app.services.passwords import password_hasher
+
+    app.config["BCRYPT_LOG_ROUNDS"] = cost
+    password_hasher.configure(app)
+    with app.app_context():
+        User.query.delete()
+        db.session.add_all(
+            User(
+                username=f"bench-{index}",
+                email=f"bench-{index}@example.com",
+                password_hash=bcrypt.generate_password_hash("hunter2026", cost).decode(),
+            )
+            for index in range(clients)
+        )
+        db.session.commit()
+
+    def login(index: int) -> tuple[float, int]:
+        client = app.test_client()
+        started = time.perf_counter()
+        response = client.post(
+            "/auth/login",
+            data={"email": f"bench-{index % clients}@example.com", "password": "hunter2026"},
+        )
+        return time.perf_counter() - started, response.status_code
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        results = list(pool.map(login, range(logins)))
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(latency for latency, status in results if status == 302)
+    stats = password_hasher.stats()
+    return {
+        "cost": cost,
+        "ok": len(latencies),
+        "busy": sum(1 for _, status in results if status == 503),
+        "logins_per_second": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000 if latencies else 0.0,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000 if latencies else 0.0,
+        "peak_queued": stats.peak_queued,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--costs", type=int, nargs="+", default=[10, 11, 12])
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--logins", type=int, default=64)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="keystonebid-bench-")
+    os.environ.setdefault("TEST_DATABASE_URL", f"sqlite:///{os.path.join(workdir, 'bench.db')}")
+
+    from app import create_app
+    from app.extensions import db
+
+    app = create_app("config.TestingConfig")
+    with app.app_context():
+        db.create_all()
+
+    print(f"clients={args.clients} logins={args.logins} hash workers={app.config['PASSWORD_HASH_WORKERS']}")
+    for cost in args.costs:
+        result = run_cost(app, cost, args.clients, args.logins)
+        print(
+            f"cost={result['cost']:>2} ok={result['ok']} busy={result['busy']} "
+            f"throughput={result['logins_per_second']:.1f}/s p50={result['p50_ms']:.0f}ms "
+            f"p95={result['p95_ms']:.0f}ms peak_queued={result['peak_queued']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Measure rate limiter overhead per request for each storage backend.
+
+Usage::
+
+    python -m benchmarks.rate_limiter --hits 20000 --threads 8 --processes 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+def _hit_loop(uri: str, hits: int, keys: int) -> float:
+    from limits import parse
+    from limits.storage import storage_from_string
+    from limits.strategies import SlidingWindowCounterRateLimiter
+
+    import app.utils.shm_storage  # noqa: F401 - registers shm://
+
+    limiter = SlidingWindowCounterRateLimiter(storage_from_string(uri))
+    item = parse("1000000/minute")
+    started = time.perf_counter()
+    for index in range(hits):
+        limiter.hit(item, f"10.0.0.{index % keys}")
+    return time.perf_counter() - started
+
+
+def per_request_overhead(uri: str, hits: int, threads: int, keys: int) -> float:
+    per_thread = hits // threads
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(lambda _: _hit_loop(uri, per_thread, keys), range(threads)))
+    return (time.perf_counter() - started) / (per_thread * threads) * 1e6
+
+
+def cross_process_count(uri: str, processes: int, hits: int) -> int:
+    from limits.storage import storage_from_string
+
+    context = multiprocessing.get_context("fork")
+    workers = [context.Process(target=_hit_loop, args=(uri, hits, 1)) for _ in range(processes)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    from limits import parse
+    from limits.strategies import SlidingWindowCounterRateLimiter
+
+    limiter = SlidingWindowCounterRateLimiter(storage_from_string(uri))
+    item = parse("1000000/minute")
+    return 1000000 - limiter.get_window_stats(item, "10.0.0.0").remaining
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hits", type=int, default=20000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--keys", type=int, default=200)
+    args = parser.parse_args()
+
+    import app.utils.shm_storage  # noqa: F401 - registers shm://
+
+    workdir = tempfile.mkdtemp(prefix="keystonebid-bench-")
+    backends = {
+        "memory://": "memory://",
+        "shm:// (64 stripes)": f"shm://{os.path.join(workdir, 'striped.shm')}?stripes=64",
+        "shm:// (1 stripe)": f"shm://{os.path.join(workdir, 'single.shm')}?stripes=1",
+    }
+    print(f"hits={args.hits} threads={args.threads} keys={args.keys}")
+    for label, uri in backends.items():
+        single = per_request_overhead(uri, args.hits, 1, args.keys)
+        threaded = per_request_overhead(uri, args.hits, args.threads, args.keys)
+        print(f"{label:<20} 1 thread: {single:6.1f}us/hit   {args.threads} threads: {threaded:6.1f}us/hit")
+
+    uri = f"shm://{os.path.join(workdir, 'shared.shm')}"
+    counted = cross_process_count(uri, args.processes, args.hits // args.processes)
+    expected = (args.hits // args.processes) * args.processes
+    print(f"{args.processes} processes sharing one key: counted {counted} of {expected} hits")
+
+
+if __name__ == "__main__":
+    main()
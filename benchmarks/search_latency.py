@@ -0,0 +1,112 @@
+"""Measure listing search latency on a synthetic in-memory index.
+
+Usage::
+
+    python -m benchmarks.search_latency --listings 500000 --queries 500
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from app.services.search_index import InvertedIndex, SearchDocument
+
+COUNTIES = (
+    "Adams Allegheny Armstrong Beaver Bedford Berks Blair Bradford Bucks Butler Cambria Cameron Carbon Centre "
+    "Chester Clarion Clearfield Clinton Columbia Crawford Cumberland Dauphin Delaware Elk Erie Fayette Forest "
+    "Franklin Fulton Greene Huntingdon Indiana Jefferson Juniata Lackawanna Lancaster Lawrence Lebanon Lehigh "
+    "Luzerne Lycoming McKean Mercer Mifflin Monroe Montgomery Montour Northampton Northumberland Perry "
+    "Philadelphia Pike Potter Schuylkill Snyder Somerset Sullivan Susquehanna Tioga Union Venango Warren "
+    "Washington Wayne Westmoreland Wyoming York"
+).split()
+LICENSE_TYPES = ("resident", "non-resident", "junior", "antlerless", "bear", "archery", "muzzleloader")
+FILLER = (
+    "license button badge tag original seal embossed signature registrar clerk county issue pin back paper "
+    "celluloid numbered faded crisp folded archive provenance estate collection hunter game commission"
+).split()
+
+
+def synthetic_documents(count: int, seed: int = 0, vocabulary: int = 20000):
+    rng = random.Random(seed)
+    words = FILLER + [f"w{index}" for index in range(vocabulary)]
+    cumulative = list(itertools.accumulate(1.0 / (rank + 1) for rank in range(len(words))))
+    for listing_id in range(1, count + 1):
+        county = rng.choice(COUNTIES)
+        license_type = rng.choice(LICENSE_TYPES)
+        year = rng.randint(1913, 1990)
+        body = rng.choices(words, cum_weights=cumulative, k=40)
+        yield SearchDocument(
+            listing_id=listing_id,
+            title=f"{county} {license_type} license {year}",
+            description=" ".join(body),
+            provenance=" ".join(rng.choices(words, cum_weights=cumulative, k=8)),
+            county=county,
+            license_type=license_type,
+            license_year=year,
+        )
+
+
+def query_mix(rng: random.Random, count: int) -> list[str]:
+    queries = []
+    for _ in range(count):
+        shape = rng.random()
+        if shape < 0.4:
+            queries.append(f"{rng.choice(COUNTIES)} {rng.randint(1913, 1990)}")
+        elif shape < 0.7:
+            queries.append(f"{rng.choice(COUNTIES)} {rng.choice(LICENSE_TYPES)} license")
+        elif shape < 0.9:
+            queries.append(f"{rng.choice(FILLER)} {rng.choice(COUNTIES)}")
+        else:
+            queries.append(f"w{rng.randint(0, 20000)} {rng.choice(FILLER)}")
+    return queries
+
+
+def percentile(samples: list[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--listings", type=int, default=500_000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    index = InvertedIndex()
+    build_seconds = 0.0
+    for document in synthetic_documents(args.listings, seed=args.seed):
+        started = time.perf_counter()
+        index.add(document)
+        build_seconds += time.perf_counter() - started
+
+    path = os.path.join(tempfile.mkdtemp(prefix="keystonebid-search-"), "index.pkl")
+    started = time.perf_counter()
+    index.save(path)
+    save_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    index = InvertedIndex.load(path)
+    load_seconds = time.perf_counter() - started
+
+    rng = random.Random(args.seed + 1)
+    latencies = []
+    for query in query_mix(rng, args.queries):
+        started = time.perf_counter()
+        index.search(query, limit=20)
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    print(f"listings={len(index)} build={build_seconds:.1f}s save={save_seconds:.2f}s load={load_seconds:.2f}s size={os.path.getsize(path) / 1e6:.1f}MB")
+    print(
+        f"queries={len(latencies)} p50={statistics.median(latencies):.2f}ms "
+        f"p95={percentile(latencies, 0.95):.2f}ms p99={percentile(latencies, 0.99):.2f}ms max={max(latencies):.2f}ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
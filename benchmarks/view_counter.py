@@ -0,0 +1,133 @@
+"""Compare per-request view UPDATEs with the coalescing view counter.
+
+Usage::
+
+    python -m benchmarks.view_counter --threads 8 --listings 50 --hits 20000
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+def seed_listings(count: int) -> list[int]:
+    from app.extensions import db
+    from app.models import Listing, User
+
+    seller = User(username="bench-seller", email="bench-seller@example.com", password_hash="x")
+    db.session.add(seller)
+    db.session.flush()
+    listings = [
+        Listing(
+            seller_id=seller.id,
+            title=f"View benchmark listing {index}",
+            description="Synthetic listing for view counter runs.",
+            license_year=1917,
+            license_type="resident",
+            county="Allegheny",
+            condition_grade="fine",
+            listing_type="auction",
+            starting_price=100,
+            status="active",
+        )
+        for index in range(count)
+    ]
+    db.session.add_all(listings)
+    db.session.commit()
+    return [listing.id for listing in listings]
+
+
+def workload(listing_ids: list[int], hits: int, seed: int) -> list[int]:
+    # Skewed like real traffic: a handful of listings take most of the views.
+    rng = random.Random(seed)
+    weights = [1 / (rank + 1) for rank in range(len(listing_ids))]
+    return rng.choices(listing_ids, weights=weights, k=hits)
+
+
+def run_direct(app, threads: int, hits: list[int]) -> float:
+    from sqlalchemy import update
+
+    from app.extensions import db
+    from app.models import Listing
+
+    def hit(listing_id: int) -> None:
+        with app.app_context():
+            db.session.execute(update(Listing).where(Listing.id == listing_id).values(views=Listing.views + 1))
+            db.session.commit()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(hit, hits))
+    return time.perf_counter() - started
+
+
+def run_coalesced(app, threads: int, hits: list[int], flush_hits: int) -> tuple[float, int]:
+    from app.services.view_counter import ViewCounter
+
+    counter = ViewCounter()
+    counter.init_app(app)
+    # Flush synchronously on the hit threshold so the timing covers every write.
+    counter.flush_seconds, counter.flush_hits = 0, flush_hits
+
+    def hit(listing_id: int) -> None:
+        with app.app_context():
+            counter.record(listing_id)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(hit, hits))
+    counter.flush_in_app()
+    return time.perf_counter() - started, counter.flushes
+
+
+def total_views() -> int:
+    from sqlalchemy import func, select
+
+    from app.extensions import db
+    from app.models import Listing
+
+    return db.session.scalar(select(func.sum(Listing.views)))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--listings", type=int, default=50)
+    parser.add_argument("--hits", type=int, default=20000)
+    parser.add_argument("--flush-hits", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="keystonebid-bench-")
+    os.environ.setdefault("TEST_DATABASE_URL", f"sqlite:///{os.path.join(workdir, 'bench.db')}")
+
+    from app import create_app
+    from app.extensions import db
+
+    app = create_app("config.TestingConfig")
+    with app.app_context():
+        db.create_all()
+        listing_ids = seed_listings(args.listings)
+    hits = workload(listing_ids, args.hits, args.seed)
+
+    direct = run_direct(app, args.threads, hits)
+    with app.app_context():
+        assert total_views() == args.hits, "per-request updates lost views"
+
+    coalesced, flushes = run_coalesced(app, args.threads, hits, args.flush_hits)
+    with app.app_context():
+        assert total_views() == 2 * args.hits, "coalesced flushes lost views"
+
+    print(f"threads={args.threads} listings={args.listings} hits={args.hits}")
+    print(f"per-request: {direct:.3f}s {args.hits / direct:.0f} views/s, {args.hits} UPDATE statements")
+    print(f"coalesced:   {coalesced:.3f}s {args.hits / coalesced:.0f} views/s, {flushes} UPDATE statements")
+    print(f"speedup={direct / coalesced:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -22,6 +22,13 @@ def _env_int(name: str, default: int) -> int:
         return default
 
 
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
 class BaseConfig:
     SECRET_KEY = os.getenv("SECRET_KEY", "dev-secret-key")
     SQLALCHEMY_TRACK_MODIFICATIONS = False
@@ -47,9 +54,102 @@ class BaseConfig:
     MAIL_PASSWORD = os.getenv("MAIL_PASSWORD")
 
     RATELIMIT_DEFAULT = os.getenv("RATELIMIT_DEFAULT", "200 per day;50 per hour")
+    # memory:// counts per worker. shm:// counters live in a memory-mapped file shared by
+    # every worker on the host (POSIX only); a relative path is taken from the instance folder.
     RATELIMIT_STORAGE_URI = os.getenv("RATELIMIT_STORAGE_URI", "memory://")
+    RATELIMIT_STRATEGY = os.getenv("RATELIMIT_STRATEGY", "sliding-window-counter")
     RATELIMIT_HEADERS_ENABLED = _env_bool("RATELIMIT_HEADERS_ENABLED", True)
 
+    PLATFORM_FEE_PERCENT = _env_int("PLATFORM_FEE_PERCENT", 10)
+    AUCTION_CLOSER_BATCH_SIZE = _env_int("AUCTION_CLOSER_BATCH_SIZE", 500)
+    AUCTION_CLOSER_REFRESH_SECONDS = _env_int("AUCTION_CLOSER_REFRESH_SECONDS", 5)
+    # Re-read this far behind the refresh watermark, for transactions that commit late.
+    AUCTION_CLOSER_REFRESH_LAG_SECONDS = _env_int("AUCTION_CLOSER_REFRESH_LAG_SECONDS", 60)
+    AUCTION_CLOSER_RELOAD_SECONDS = _env_int("AUCTION_CLOSER_RELOAD_SECONDS", 600)
+
+    # Every open stream holds one of the worker's threads (gthread --threads 8).
+    SSE_MAX_STREAMS = _env_int("SSE_MAX_STREAMS", 4)
+    SSE_BUSY_RETRY_SECONDS = _env_int("SSE_BUSY_RETRY_SECONDS", 30)
+    SSE_HEARTBEAT_SECONDS = _env_int("SSE_HEARTBEAT_SECONDS", 15)
+    SSE_MAX_STREAM_SECONDS = _env_int("SSE_MAX_STREAM_SECONDS", 300)
+    SSE_QUEUE_SIZE = _env_int("SSE_QUEUE_SIZE", 64)
+    SSE_POLL_SECONDS = _env_int("SSE_POLL_SECONDS", 2)
+    SSE_WATCHER_ENABLED = _env_bool("SSE_WATCHER_ENABLED", True)
+
+    SEARCH_INDEX_PATH = os.getenv("SEARCH_INDEX_PATH", "instance/search-index.pkl")
+    SEARCH_INDEX_REFRESH_SECONDS = _env_int("SEARCH_INDEX_REFRESH_SECONDS", 30)
+    SEARCH_INDEX_REFRESH_LAG_SECONDS = _env_int("SEARCH_INDEX_REFRESH_LAG_SECONDS", 60)
+    SEARCH_PAGE_SIZE = _env_int("SEARCH_PAGE_SIZE", 24)
+    PAGE_SIZE = _env_int("PAGE_SIZE", 24)
+    API_MAX_PAGE_SIZE = _env_int("API_MAX_PAGE_SIZE", 100)
+    FACET_REFRESH_SECONDS = _env_int("FACET_REFRESH_SECONDS", 30)
+    FACET_REFRESH_LAG_SECONDS = _env_int("FACET_REFRESH_LAG_SECONDS", 60)
+
+    VIEW_COUNTER_FLUSH_SECONDS = _env_int("VIEW_COUNTER_FLUSH_SECONDS", 10)
+    VIEW_COUNTER_FLUSH_HITS = _env_int("VIEW_COUNTER_FLUSH_HITS", 500)
+    NOTIFICATION_CHUNK_SIZE = _env_int("NOTIFICATION_CHUNK_SIZE", 1000)
+    UNREAD_COUNT_TTL_SECONDS = _env_int("UNREAD_COUNT_TTL_SECONDS", 30)
+
+    # Badge events are coalesced and evaluated this often; 0 evaluates right after each commit.
+    BADGE_EVALUATION_SECONDS = _env_int("BADGE_EVALUATION_SECONDS", 5)
+    BADGE_DEFINITIONS_TTL_SECONDS = _env_int("BADGE_DEFINITIONS_TTL_SECONDS", 60)
+    BADGE_RECOMPUTE_CHUNK_SIZE = _env_int("BADGE_RECOMPUTE_CHUNK_SIZE", 1000)
+
+    PRICE_GUIDE_REFRESH_SECONDS = _env_int("PRICE_GUIDE_REFRESH_SECONDS", 60)
+
+    WATCHLIST_BULK_LIMIT = _env_int("WATCHLIST_BULK_LIMIT", 500)
+    WATCHLIST_MERGE_CHUNK_SIZE = _env_int("WATCHLIST_MERGE_CHUNK_SIZE", 500)
+    ENDING_SOON_LIMIT = _env_int("ENDING_SOON_LIMIT", 10)
+
+    HOLDINGS_CACHE_TTL_SECONDS = _env_int("HOLDINGS_CACHE_TTL_SECONDS", 300)
+    HOLDINGS_CACHE_MAX_ENTRIES = _env_int("HOLDINGS_CACHE_MAX_ENTRIES", 10000)
+    WANT_LIST_MARKET_TTL_SECONDS = _env_int("WANT_LIST_MARKET_TTL_SECONDS", 30)
+
+    BCRYPT_LOG_ROUNDS = _env_int("BCRYPT_LOG_ROUNDS", 12)
+    PASSWORD_HASH_WORKERS = _env_int("PASSWORD_HASH_WORKERS", 2)
+    PASSWORD_HASH_QUEUE_SIZE = _env_int("PASSWORD_HASH_QUEUE_SIZE", 32)
+    PASSWORD_HASH_TIMEOUT_SECONDS = _env_int("PASSWORD_HASH_TIMEOUT_SECONDS", 10)
+    USER_CACHE_TTL_SECONDS = _env_int("USER_CACHE_TTL_SECONDS", 60)
+    USER_CACHE_MAX_ENTRIES = _env_int("USER_CACHE_MAX_ENTRIES", 10000)
+
+    # memory (per worker, single process only), disk (shared by the workers on a host) or none.
+    FRAGMENT_CACHE_BACKEND = os.getenv("FRAGMENT_CACHE_BACKEND", "memory")
+    FRAGMENT_CACHE_DIR = os.getenv("FRAGMENT_CACHE_DIR", "instance/fragment-cache")
+    FRAGMENT_CACHE_MAX_ENTRIES = _env_int("FRAGMENT_CACHE_MAX_ENTRIES", 2048)
+    FRAGMENT_CACHE_DEFAULT_TTL = _env_int("FRAGMENT_CACHE_DEFAULT_TTL", 300)
+
+    # Latency is recorded for every request; SQL is counted and timed for this share of them.
+    METRICS_ENABLED = _env_bool("METRICS_ENABLED", True)
+    METRICS_SQL_SAMPLE_RATE = _env_float("METRICS_SQL_SAMPLE_RATE", 0.1)
+    METRICS_SLOW_QUERY_MS = _env_int("METRICS_SLOW_QUERY_MS", 100)
+    METRICS_SLOW_QUERY_LOG_SIZE = _env_int("METRICS_SLOW_QUERY_LOG_SIZE", 50)
+    # Bearer token for Prometheus scrapes of /admin/metrics/prometheus; admins can always view it.
+    METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+    # Flags a statement shape repeated more than NPLUSONE_THRESHOLD times in one request.
+    NPLUSONE_ENABLED = _env_bool("NPLUSONE_ENABLED", False)
+    NPLUSONE_THRESHOLD = _env_int("NPLUSONE_THRESHOLD", 5)
+    NPLUSONE_RAISE = False
+    # Endpoint name -> threshold, for views that repeat a statement on purpose.
+    NPLUSONE_ENDPOINT_THRESHOLDS: dict[str, int] = {}
+
+    # Listing photos: local (files under IMAGE_STORAGE_DIR, served at /listings/media) or s3.
+    IMAGE_STORAGE_BACKEND = os.getenv("IMAGE_STORAGE_BACKEND", "local")
+    IMAGE_STORAGE_DIR = os.getenv("IMAGE_STORAGE_DIR", "instance/uploads")
+    IMAGE_STAGING_DIR = os.getenv("IMAGE_STAGING_DIR", "instance/image-staging")
+    IMAGE_BASE_URL = os.getenv("IMAGE_BASE_URL")
+    IMAGE_S3_BUCKET = os.getenv("IMAGE_S3_BUCKET")
+    IMAGE_S3_PREFIX = os.getenv("IMAGE_S3_PREFIX", "")
+    IMAGE_MAX_BYTES = _env_int("IMAGE_MAX_BYTES", 10 * 1024 * 1024)
+    # Thumbnail processes per web worker; 0 renders inline.
+    IMAGE_WORKERS = _env_int("IMAGE_WORKERS", 2)
+    # Variant name -> longest edge in pixels; the smallest becomes thumbnail_url.
+    IMAGE_VARIANTS = {"thumb": 400, "medium": 1200}
+    MAX_CONTENT_LENGTH = _env_int("MAX_CONTENT_LENGTH", 64 * 1024 * 1024)
+
+    # Skip blueprint imports until the first request (CLI and background workers).
+    LAZY_BLUEPRINTS = _env_bool("LAZY_BLUEPRINTS", False)
+
     OAUTH_GOOGLE_CLIENT_ID = os.getenv("OAUTH_GOOGLE_CLIENT_ID")
     OAUTH_GOOGLE_CLIENT_SECRET = os.getenv("OAUTH_GOOGLE_CLIENT_SECRET")
     OAUTH_APPLE_CLIENT_ID = os.getenv("OAUTH_APPLE_CLIENT_ID")
@@ -62,6 +162,10 @@ class DevelopmentConfig(BaseConfig):
     PREFERRED_URL_SCHEME = "https" if SECURITY_FORCE_HTTPS else "http"
     TRUSTED_PROXY_COUNT = _env_int("TRUSTED_PROXY_COUNT", 0)
     SQLALCHEMY_DATABASE_URI = os.getenv("DEV_DATABASE_URL", "sqlite:///keystonebid-dev.db")
+    # Cached fragments would hide template edits until they expire.
+    FRAGMENT_CACHE_BACKEND = os.getenv("FRAGMENT_CACHE_BACKEND", "none")
+    METRICS_SQL_SAMPLE_RATE = _env_float("METRICS_SQL_SAMPLE_RATE", 1.0)
+    NPLUSONE_ENABLED = _env_bool("NPLUSONE_ENABLED", True)
 
 
 class LaunchConfig(BaseConfig):
@@ -72,6 +176,10 @@ class LaunchConfig(BaseConfig):
 
     DEBUG = False
     SQLALCHEMY_DATABASE_URI = os.getenv("DATABASE_URL")
+    # Several gunicorn workers plus the closer process: invalidations must reach them all.
+    FRAGMENT_CACHE_BACKEND = os.getenv("FRAGMENT_CACHE_BACKEND", "disk")
+    # Shared by those workers, so a client's limit is not multiplied by their number.
+    RATELIMIT_STORAGE_URI = os.getenv("RATELIMIT_STORAGE_URI", "shm://ratelimit.shm")
     SECURITY_FORCE_HTTPS = _env_bool("SECURITY_FORCE_HTTPS", False)
     PREFERRED_URL_SCHEME = "https" if SECURITY_FORCE_HTTPS else "http"
     SESSION_COOKIE_SECURE = _env_bool("SESSION_COOKIE_SECURE", SECURITY_FORCE_HTTPS)
@@ -87,11 +195,24 @@ class TestingConfig(BaseConfig):
     WTF_CSRF_ENABLED = False
     RATELIMIT_ENABLED = False
     RATELIMIT_STORAGE_URI = "memory://"
+    SSE_WATCHER_ENABLED = False
+    SEARCH_INDEX_PATH = None
+    VIEW_COUNTER_FLUSH_SECONDS = 0
+    BADGE_EVALUATION_SECONDS = 0
+    BCRYPT_LOG_ROUNDS = 4
+    METRICS_SQL_SAMPLE_RATE = 1.0
+    NPLUSONE_ENABLED = True
+    NPLUSONE_RAISE = True
+    IMAGE_WORKERS = 0
 
 
 class ProductionConfig(BaseConfig):
     DEBUG = False
     SQLALCHEMY_DATABASE_URI = os.getenv("DATABASE_URL")
+    # Several gunicorn workers plus the closer process: invalidations must reach them all.
+    FRAGMENT_CACHE_BACKEND = os.getenv("FRAGMENT_CACHE_BACKEND", "disk")
+    # Shared by those workers, so a client's limit is not multiplied by their number.
+    RATELIMIT_STORAGE_URI = os.getenv("RATELIMIT_STORAGE_URI", "shm://ratelimit.shm")
     SECURITY_FORCE_HTTPS = _env_bool("SECURITY_FORCE_HTTPS", True)
     PREFERRED_URL_SCHEME = "https"
     SESSION_COOKIE_SECURE = _env_bool("SESSION_COOKIE_SECURE", True)
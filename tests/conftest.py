@@ -1,7 +1,15 @@
 import pytest
 
 from app import create_app
-from app.extensions import db
+from app.extensions import db, fragment_cache, request_metrics
+from app.services.badges import badge_engine
+from app.services.facets import listing_facets
+from app.services.holdings import holdings_cache
+from app.services.price_guide import price_guide
+from app.services.search_index import listing_search
+from app.services.unread_counts import unread_counts
+from app.services.user_cache import user_cache
+from app.services.view_counter import view_counter
 
 
 @pytest.fixture()
@@ -11,6 +19,17 @@ def app():
 
     with app.app_context():
         db.create_all()
+    # Per-worker indexes outlive the app object; start each test from scratch.
+    listing_search.reset()
+    listing_facets.reset()
+    view_counter.reset()
+    unread_counts.clear()
+    user_cache.clear()
+    fragment_cache.clear()
+    request_metrics.reset()
+    badge_engine.reset()
+    holdings_cache.clear()
+    price_guide.reset()
 
     yield app
 
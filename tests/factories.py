@@ -0,0 +1,42 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from app.extensions import db
+from app.models import Listing, User
+from app.utils.dates import utcnow
+
+
+def make_user(username: str, **overrides) -> User:
+    fields = dict(username=username, email=f"{username}@example.com", password_hash="x")
+    fields.update(overrides)
+    user = User(**fields)
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+def make_listing(seller: User, **overrides) -> Listing:
+    fields = dict(
+        seller_id=seller.id,
+        title="Allegheny Resident License - 1917",
+        description="Embossed seal intact.",
+        license_year=1917,
+        license_type="resident",
+        county="Allegheny",
+        condition_grade="fine",
+        listing_type="auction",
+        starting_price=Decimal("100.00"),
+        status="active",
+        auction_end=utcnow() + timedelta(days=1),
+    )
+    fields.update(overrides)
+    listing = Listing(**fields)
+    db.session.add(listing)
+    db.session.commit()
+    return listing
+
+
+def log_in(client, user: User) -> None:
+    with client.session_transaction() as session:
+        session["_user_id"] = str(user.id)
+        session["_fresh"] = True
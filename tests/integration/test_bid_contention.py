@@ -0,0 +1,15 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.bid_contention import hammer_listing, seed_auction, verify_listing_state
+
+
+def test_concurrent_bids_leave_listing_consistent(app):
+    with app.app_context():
+        listing_id, bidder_ids = seed_auction(bidders=8)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        stats = hammer_listing(app, pool, listing_id, bidder_ids, bids_per_bidder=5, seed=7)
+
+    assert stats.accepted > 0
+    with app.app_context():
+        verify_listing_state(listing_id, stats)
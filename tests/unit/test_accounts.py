@@ -0,0 +1,80 @@
+import io
+
+from sqlalchemy import event
+
+from app.extensions import db
+from app.models import User
+from app.services.accounts import UsernameAllocator, claim_username, username_base
+from app.services.passwords import password_hasher
+from tests.factories import make_user
+
+
+def test_allocator_reads_taken_names_once_and_fills_gaps(app):
+    with app.app_context():
+        for username in ("john", "john-2", "john-4", "john-smith", "johnny"):
+            make_user(username)
+
+        statements = []
+        listener = lambda conn, cursor, statement, *args: statements.append(statement)
+        event.listen(db.engine, "before_cursor_execute", listener)
+        try:
+            allocator = UsernameAllocator()
+            names = [allocator.allocate("John") for _ in range(3)]
+        finally:
+            event.remove(db.engine, "before_cursor_execute", listener)
+
+        assert names == ["john-3", "john-5", "john-6"]
+        assert len(statements) == 1
+        # A prefix match, not a BETWEEN range whose bounds depend on the collation.
+        assert " LIKE " in statements[0] and "BETWEEN" not in statements[0]
+        assert username_base("  Mary-Jo O'Neil ") == "mary-jo-o-neil"
+
+
+def test_claim_username_retries_when_the_name_was_just_taken(app, monkeypatch):
+    with app.app_context():
+        make_user("jane")
+        original = UsernameAllocator.load
+        reads = []
+
+        def racing_load(self, bases):
+            bases = list(bases)
+            if not reads:
+                # The first read misses "jane", as if it was registered right after.
+                self._taken.update({base: set() for base in bases})
+            reads.append(bases)
+            original(self, bases)
+
+        monkeypatch.setattr(UsernameAllocator, "load", racing_load)
+        user = claim_username(User(email="jane2@example.com", password_hash="x"), "Jane")
+        db.session.commit()
+
+        assert user.username == "jane-2"
+        assert User.query.count() == 2
+
+
+def test_users_import_command_batches_and_skips_existing(app):
+    with app.app_context():
+        make_user("existing", email="taken@example.com")
+        make_user("pat")
+
+    csv_file = io.StringIO(
+        "email,full_name,county,password\n"
+        "pat1@example.com,Pat,Erie,hunter2026\n"
+        "pat2@example.com,Pat,Elk,\n"
+        "taken@example.com,Someone,,\n"
+        "not-an-email,Nobody,,\n"
+        "PAT1@example.com,Pat Again,,\n"
+        "lee@example.com,Lee,,\n"
+    )
+    runner = app.test_cli_runner()
+    result = runner.invoke(args=["users", "import", "-", "--batch-size", "2"], input=csv_file.getvalue())
+
+    assert "Imported 3 members in 2 batches (2 already registered, 1 invalid rows)." in result.output
+    with app.app_context():
+        users = {user.email: user for user in User.query.all()}
+        assert users["pat1@example.com"].username == "pat-2"
+        assert users["pat2@example.com"].username == "pat-3"
+        assert users["lee@example.com"].username == "lee"
+        assert users["pat2@example.com"].county == "Elk"
+        assert password_hasher.verify(users["pat1@example.com"].password_hash, "hunter2026")
+        assert not password_hasher.verify(users["pat2@example.com"].password_hash, "")
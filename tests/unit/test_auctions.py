@@ -0,0 +1,139 @@
+import threading
+from datetime import timedelta
+from decimal import Decimal
+
+from sqlalchemy import update
+from sqlalchemy.exc import OperationalError
+
+from app.extensions import db
+from app.models import Listing, Transaction
+from app.services.auctions import AuctionScheduler, close_listings
+from app.services.bidding import place_bid
+from app.utils.dates import utcnow
+from tests.factories import make_listing, make_user
+
+
+def test_scheduler_pops_deadlines_in_order_and_skips_rescheduled():
+    scheduler = AuctionScheduler()
+    now = utcnow()
+    scheduler.schedule(1, now + timedelta(seconds=30))
+    scheduler.schedule(2, now - timedelta(seconds=5))
+    scheduler.schedule(3, now - timedelta(seconds=10))
+    scheduler.schedule(2, now + timedelta(minutes=5))
+    scheduler.forget(1)
+
+    assert scheduler.pop_due(now) == [3]
+    assert scheduler.next_deadline() == now + timedelta(minutes=5)
+    assert len(scheduler) == 1
+
+
+def test_run_once_closes_due_auctions_and_creates_transactions(app):
+    with app.app_context():
+        seller, bidder = make_user("seller"), make_user("bidder")
+        sold = make_listing(seller)
+        unsold = make_listing(seller, auction_end=utcnow() - timedelta(seconds=1))
+        reserve_missed = make_listing(seller, reserve_price=Decimal("500.00"))
+        open_listing = make_listing(seller, auction_end=utcnow() + timedelta(days=3))
+        place_bid(sold.id, bidder.id, "150")
+        place_bid(reserve_missed.id, bidder.id, "150")
+
+        scheduler = AuctionScheduler()
+        scheduler.load()
+        summary = scheduler.run_once(now=utcnow() + timedelta(days=1, seconds=1))
+
+        assert sorted(summary.closed) == sorted([sold.id, unsold.id, reserve_missed.id])
+        assert summary.sold == [sold.id]
+        db.session.expire_all()
+        assert db.session.get(Listing, sold.id).status == "sold"
+        assert db.session.get(Listing, unsold.id).status == "ended"
+        assert db.session.get(Listing, reserve_missed.id).status == "ended"
+        assert db.session.get(Listing, open_listing.id).status == "active"
+
+        transaction = Transaction.query.one()
+        assert transaction.buyer_id == bidder.id
+        assert transaction.sale_amount == Decimal("150.00")
+        assert transaction.platform_fee == Decimal("15.00")
+
+
+def test_closing_is_idempotent(app):
+    with app.app_context():
+        seller, bidder = make_user("seller"), make_user("bidder")
+        listing = make_listing(seller)
+        place_bid(listing.id, bidder.id, "150")
+        later = utcnow() + timedelta(days=2)
+
+        first = close_listings([listing.id], now=later)
+        second = close_listings([listing.id], now=later)
+
+        assert first.sold == [listing.id]
+        assert second.closed == []
+        assert Transaction.query.count() == 1
+
+
+def test_close_due_command(app):
+    with app.app_context():
+        seller = make_user("seller")
+        make_listing(seller, auction_end=utcnow() - timedelta(seconds=1))
+
+    result = app.test_cli_runner().invoke(args=["auctions", "close-due"])
+
+    assert "Closed 1 auctions (0 sold)." in result.output
+
+
+def test_refresh_schedules_listings_created_in_the_same_second(app):
+    with app.app_context():
+        seller = make_user("seller")
+        first = make_listing(seller)
+        scheduler = AuctionScheduler()
+        scheduler.load()
+
+        second = make_listing(seller, auction_end=utcnow() + timedelta(hours=2))
+        scheduler.refresh()
+
+        assert len(scheduler) == 2
+        assert scheduler.pop_due(utcnow() + timedelta(days=2)) == [second.id, first.id]
+
+
+def test_refresh_sees_listings_stamped_before_the_watermark_but_committed_after(app):
+    with app.app_context():
+        seller = make_user("seller")
+        make_listing(seller)
+        scheduler = AuctionScheduler()
+        scheduler.load()
+
+        # Flushed (and stamped) before the load, committed after it.
+        late = make_listing(seller, auction_end=utcnow() + timedelta(hours=2))
+        db.session.execute(
+            update(Listing).where(Listing.id == late.id).values(updated_at=scheduler._watermark - timedelta(seconds=20))
+        )
+        db.session.commit()
+        scheduler.refresh()
+
+        assert len(scheduler) == 2
+
+
+def test_run_forever_logs_failures_and_keeps_closing(app, caplog):
+    with app.app_context():
+        seller = make_user("seller")
+        listing_id = make_listing(seller, auction_end=utcnow() - timedelta(seconds=1)).id
+        scheduler = AuctionScheduler(refresh_interval=0.01)
+        stop = threading.Event()
+        passes = []
+        run_once = scheduler.run_once
+
+        def flaky_run_once():
+            passes.append(1)
+            if len(passes) == 1:
+                raise OperationalError("SELECT 1", {}, Exception("server closed the connection"))
+            return run_once()
+
+        def on_close(summary):
+            assert summary.closed == [listing_id]
+            stop.set()
+
+        scheduler.run_once = flaky_run_once
+        scheduler.run_forever(stop, on_close=on_close)
+
+        assert len(passes) == 2
+        assert "Auction closer pass failed" in caplog.text
+        assert db.session.get(Listing, listing_id).status == "ended"
@@ -0,0 +1,117 @@
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import event, func, select
+
+from app.extensions import db
+from app.models import Badge, Collection, Transaction, UserBadge
+from app.services.badges import BadgeCriteriaError, badge_engine, compile_badge
+from tests.factories import make_listing, make_user
+
+
+def _badge(slug, criteria):
+    badge = Badge(slug=slug, name=slug.title(), description=slug, criteria=criteria, category="collecting")
+    db.session.add(badge)
+    db.session.commit()
+    return badge
+
+
+def _awards():
+    return {tuple(row) for row in db.session.execute(select(UserBadge.user_id, UserBadge.badge_id))}
+
+
+def _collect(user, county, year):
+    db.session.add(Collection(user_id=user.id, county=county, license_year=year, license_type="resident"))
+
+
+def test_criteria_compile_into_predicates():
+    badge = compile_badge(1, "allegheny", {"items": 2, "county": ["Allegheny"], "years": 2})
+    assert badge.sources == {"collection"}
+    filters = (("county", ("Allegheny",)),)
+    assert badge.earned({("items", filters): 2, ("years", filters): 2})
+    assert not badge.earned({("items", filters): 2})
+
+    assert compile_badge(2, "trusted", {"rated_sales": 3}).requirements == ((("rated_sales", (("min_rating", 4),)), 3),)
+    for criteria in ({}, {"county": "Allegheny"}, {"sales": 0}, {"sales": 1, "county": "Allegheny"}):
+        with pytest.raises(BadgeCriteriaError):
+            compile_badge(3, "broken", criteria)
+
+
+def test_collection_inserts_only_evaluate_collection_badges(app):
+    with app.app_context():
+        collector, other = make_user("collector"), make_user("other")
+        counties = _badge("two-counties", {"counties": 2})
+        _badge("first-sale", {"sales": 1})
+
+        statements = []
+        listener = lambda conn, cursor, statement, *args: statements.append(statement)
+        event.listen(db.engine, "before_cursor_execute", listener)
+        try:
+            _collect(collector, "Allegheny", 1917)
+            _collect(collector, "Allegheny", 1921)
+            _collect(other, "Berks", 1930)
+            db.session.commit()
+            assert _awards() == set()
+
+            _collect(collector, "Centre", 1925)
+            db.session.commit()
+        finally:
+            event.remove(db.engine, "before_cursor_execute", listener)
+
+        assert _awards() == {(collector.id, counties.id)}
+        assert not [statement for statement in statements if "FROM transactions" in statement]
+
+
+def test_completed_sales_award_the_seller(app):
+    with app.app_context():
+        seller, buyer = make_user("seller"), make_user("buyer")
+        first_sale = _badge("first-sale", {"sales": 1})
+        sale = Transaction(
+            listing_id=make_listing(seller, status="sold").id,
+            buyer_id=buyer.id,
+            seller_id=seller.id,
+            sale_amount=Decimal("150.00"),
+            platform_fee=Decimal("15.00"),
+        )
+        db.session.add(sale)
+        db.session.commit()
+        assert _awards() == set()
+
+        sale.status = "completed"
+        db.session.commit()
+        assert _awards() == {(seller.id, first_sale.id)}
+
+
+def test_recompute_applies_changed_definitions_in_chunks(app):
+    with app.app_context():
+        members = [make_user(f"member{index}") for index in range(5)]
+        for index, member in enumerate(members):
+            for year in range(1913, 1913 + index):
+                _collect(member, "Allegheny", year)
+        db.session.commit()
+        badge = _badge("three-years", {"years": 3})
+        assert _awards() == set()
+
+        summary = badge_engine.recompute(chunk_size=2)
+        assert (summary.members, summary.awarded, summary.revoked) == (5, 2, 0)
+        assert _awards() == {(members[3].id, badge.id), (members[4].id, badge.id)}
+
+        badge.criteria = {"years": 4, "year_from": 1913}
+        db.session.commit()
+        summary = badge_engine.recompute(chunk_size=2, revoke=True)
+        assert (summary.awarded, summary.revoked) == (0, 1)
+        assert _awards() == {(members[4].id, badge.id)}
+
+
+def test_racing_evaluations_award_a_badge_once(app, monkeypatch):
+    with app.app_context():
+        collector = make_user("collector")
+        badge = _badge("first-county", {"counties": 1})
+        _collect(collector, "Allegheny", 1917)
+        db.session.commit()
+        assert _awards() == {(collector.id, badge.id)}
+
+        # A second evaluation that read the holders before the first one committed.
+        monkeypatch.setattr(badge_engine, "_held", lambda badges, user_ids: set())
+        assert badge_engine.recompute().awarded == 0
+        assert db.session.scalar(select(func.count()).select_from(UserBadge)) == 1
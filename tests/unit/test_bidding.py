@@ -0,0 +1,98 @@
+from datetime import timedelta
+from decimal import Decimal
+
+import pytest
+
+from app.extensions import db
+from app.models import Bid, Listing
+from app.services.bidding import BidError, minimum_next_bid, place_bid
+from app.utils.dates import utcnow
+from tests.factories import make_listing, make_user
+
+
+def _state(listing_id: int):
+    db.session.expire_all()
+    listing = db.session.get(Listing, listing_id)
+    winners = Bid.query.filter_by(listing_id=listing_id, is_winning=True).all()
+    return listing, winners
+
+
+def test_minimum_next_bid_uses_increment_ladder():
+    assert minimum_next_bid(Decimal("100"), None) == Decimal("100.00")
+    assert minimum_next_bid(Decimal("100"), Decimal("99")) == Decimal("100.00")
+    assert minimum_next_bid(Decimal("100"), Decimal("420")) == Decimal("425.00")
+
+
+def test_first_bid_becomes_winning(app):
+    with app.app_context():
+        seller, bidder = make_user("seller"), make_user("bidder")
+        listing = make_listing(seller)
+
+        result = place_bid(listing.id, bidder.id, "100")
+
+        listing, winners = _state(listing.id)
+        assert result.is_leading
+        assert listing.current_bid == Decimal("100.00")
+        assert listing.bid_count == 1
+        assert [bid.bidder_id for bid in winners] == [bidder.id]
+
+
+def test_proxy_defends_against_lower_challenger(app):
+    with app.app_context():
+        seller, alice, bob = make_user("seller"), make_user("alice"), make_user("bob")
+        listing = make_listing(seller)
+
+        place_bid(listing.id, alice.id, "100", proxy_max="300")
+        result = place_bid(listing.id, bob.id, "150")
+
+        listing, winners = _state(listing.id)
+        assert not result.is_leading
+        assert listing.current_bid == Decimal("155.00")
+        assert listing.bid_count == 3
+        assert [bid.bidder_id for bid in winners] == [alice.id]
+        assert winners[0].is_auto
+
+
+def test_higher_proxy_takes_lead_one_increment_over_previous_max(app):
+    with app.app_context():
+        seller, alice, bob = make_user("seller"), make_user("alice"), make_user("bob")
+        listing = make_listing(seller)
+
+        place_bid(listing.id, alice.id, "100", proxy_max="300")
+        result = place_bid(listing.id, bob.id, "110", proxy_max="500")
+
+        listing, winners = _state(listing.id)
+        assert result.is_leading
+        assert result.previous_leader_id == alice.id
+        assert listing.current_bid == Decimal("305.00")
+        assert [bid.bidder_id for bid in winners] == [bob.id]
+        assert listing.bid_count == Bid.query.filter_by(listing_id=listing.id).count()
+
+
+def test_bid_below_minimum_is_rejected(app):
+    with app.app_context():
+        seller, alice, bob = make_user("seller"), make_user("alice"), make_user("bob")
+        listing = make_listing(seller)
+        place_bid(listing.id, alice.id, "200")
+
+        with pytest.raises(BidError, match="at least"):
+            place_bid(listing.id, bob.id, "201")
+
+
+def test_seller_and_closed_auctions_cannot_be_bid_on(app):
+    with app.app_context():
+        seller, bidder = make_user("seller"), make_user("bidder")
+        listing = make_listing(seller)
+        ended = make_listing(seller, auction_end=utcnow() - timedelta(minutes=1))
+
+        with pytest.raises(BidError, match="own listing"):
+            place_bid(listing.id, seller.id, "100")
+        with pytest.raises(BidError, match="not accepting"):
+            place_bid(ended.id, bidder.id, "100")
+
+
+def test_place_route_requires_login(client):
+    response = client.post("/bids/1", data={"amount": "100"})
+
+    assert response.status_code == 302
+    assert "/auth/login" in response.headers["Location"]
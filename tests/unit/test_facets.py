@@ -0,0 +1,138 @@
+import random
+from datetime import timedelta
+from decimal import Decimal
+
+from sqlalchemy import insert, update
+
+from app.extensions import db
+from app.models import Listing, Watchlist
+from app.services.facets import FacetIndex, listing_facets
+from app.utils.bitmap import ARRAY_LIMIT, RoaringBitmap
+from tests.factories import make_listing, make_user
+
+
+def test_bitmap_matches_set_semantics_across_container_kinds():
+    rng = random.Random(5)
+    dense = set(rng.sample(range(200_000), 30_000))
+    sparse = set(rng.sample(range(200_000), 500))
+    left, right = RoaringBitmap(dense), RoaringBitmap(sparse)
+
+    assert len(left) == len(dense)
+    assert list(left & right) == sorted(dense & sparse)
+    assert list(left | right) == sorted(dense | sparse)
+    assert left.intersection_len(right) == len(dense & sparse)
+    assert list(reversed(right)) == sorted(sparse, reverse=True)
+
+
+def test_bitmap_descending_starts_below_a_bound():
+    rng = random.Random(8)
+    values = set(rng.sample(range(200_000), 30_000)) | set(range(70_000, 70_100))
+    bitmap = RoaringBitmap(values)
+
+    for below in (0, 1, 65_536, 70_050, 131_072, 199_999, 10**6):
+        assert list(bitmap.descending(below)) == sorted((value for value in values if value < below), reverse=True)
+    assert list(bitmap.descending()) == sorted(values, reverse=True)
+
+
+def test_bitmap_converts_between_array_and_dense_containers():
+    bitmap = RoaringBitmap(range(ARRAY_LIMIT + 10))
+    for value in range(20):
+        bitmap.discard(value)
+
+    assert len(bitmap) == ARRAY_LIMIT - 10
+    assert 5 not in bitmap and 25 in bitmap
+
+
+def test_counts_leave_out_the_facets_own_selection():
+    index = FacetIndex()
+    index.add(1, {"county": "Erie", "license_year": 1917})
+    index.add(2, {"county": "Erie", "license_year": 1934})
+    index.add(3, {"county": "Tioga", "license_year": 1917})
+
+    counts = index.counts({"county": ["Erie"]})
+
+    assert counts["county"] == {"Erie": 2, "Tioga": 1}
+    assert counts["license_year"] == {1917: 1, 1934: 1}
+    assert list(index.matching({"county": ["Erie"], "license_year": [1917]})) == [1]
+
+
+def test_status_changes_update_bitmaps(app):
+    with app.app_context():
+        seller = make_user("seller")
+        erie = make_listing(seller, county="Erie")
+        make_listing(seller, county="Tioga")
+        assert listing_facets.counts()["county"] == {"Erie": 1, "Tioga": 1}
+
+        erie.status = "sold"
+        db.session.commit()
+        make_listing(seller, county="Tioga", license_year=1952)
+
+        counts = listing_facets.counts()
+        assert counts["county"] == {"Tioga": 2}
+        assert counts["license_year"] == {1917: 1, 1952: 1}
+
+
+def test_refresh_counts_listings_written_in_the_same_second(app):
+    with app.app_context():
+        seller = make_user("seller")
+        make_listing(seller, county="Erie")
+        assert listing_facets.counts()["county"] == {"Erie": 1}
+
+        # Core insert: another worker's write, seen only through the updated_at refresh.
+        db.session.execute(
+            insert(Listing).values(
+                seller_id=seller.id,
+                title="Tioga junior license",
+                description="Pin intact.",
+                license_year=1931,
+                license_type="junior",
+                county="Tioga",
+                condition_grade="good",
+                listing_type="auction",
+                starting_price=Decimal("40.00"),
+                status="active",
+            )
+        )
+        db.session.commit()
+        listing_facets.refresh()
+        assert listing_facets.index.counts()["county"] == {"Erie": 1, "Tioga": 1}
+
+
+def test_refresh_reads_behind_the_watermark_without_touching_the_session(app):
+    with app.app_context():
+        seller = make_user("seller")
+        make_listing(seller, county="Erie")
+        late_id = make_listing(seller, county="Tioga").id
+        assert listing_facets.counts()["county"] == {"Erie": 1, "Tioga": 1}
+        listing_facets.refresh()
+
+        # Another worker's write, stamped before the watermark but committed after it.
+        listing_facets.index.remove(late_id)
+        db.session.execute(
+            update(Listing)
+            .where(Listing.id == late_id)
+            .values(updated_at=listing_facets.watermark - timedelta(seconds=20))
+        )
+        db.session.commit()
+
+        watch = Watchlist(user_id=seller.id, listing_id=late_id)
+        db.session.add(watch)
+        assert listing_facets.refresh() == 1
+        assert listing_facets.refresh() == 0
+        assert listing_facets.index.counts()["county"] == {"Erie": 1, "Tioga": 1}
+        assert watch in db.session.new
+
+
+def test_facets_api_and_search_browse(app, client):
+    with app.app_context():
+        seller = make_user("seller")
+        make_listing(seller, county="Erie", title="Erie resident license")
+        make_listing(seller, county="Tioga", title="Tioga junior license")
+
+    payload = client.get("/api/facets?county=Tioga").get_json()
+    assert payload["total"] == 1
+    assert payload["facets"]["county"] == {"Erie": 1, "Tioga": 1}
+
+    response = client.get("/search/?county=Tioga")
+    assert b"Tioga junior license" in response.data
+    assert b"Erie resident license" not in response.data
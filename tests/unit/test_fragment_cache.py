@@ -0,0 +1,125 @@
+from datetime import timedelta
+
+from flask import render_template_string
+from sqlalchemy import event
+
+from app.extensions import db, fragment_cache
+from app.models import EducationArticle
+from app.services.auctions import close_listings
+from app.services.bidding import place_bid
+from app.utils.dates import utcnow
+from app.utils.fragment_cache import DiskBackend, FragmentCache, MemoryBackend
+from tests.factories import make_listing, make_user
+
+
+def _listing_queries(action) -> int:
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(db.engine, "before_cursor_execute", listener)
+    try:
+        action()
+    finally:
+        event.remove(db.engine, "before_cursor_execute", listener)
+    return len([statement for statement in statements if "FROM listings" in statement])
+
+
+def test_cache_tag_renders_once_until_its_tag_is_invalidated(app):
+    calls = []
+
+    def render():
+        calls.append(1)
+        return f"<b>{len(calls)}</b>"
+
+    template = '{% cache "widget", 60, "listing" %}{{ render() | safe }}{% endcache %}'
+    with app.test_request_context():
+        assert render_template_string(template, render=render) == "<b>1</b>"
+        assert render_template_string(template, render=render) == "<b>1</b>"
+
+        fragment_cache.invalidate(["listing"])
+        assert render_template_string(template, render=render) == "<b>2</b>"
+
+    stats = fragment_cache.stats()
+    assert (stats.hits, stats.misses, stats.invalidations) == (1, 2, 1)
+
+
+def test_listing_commit_invalidates_index_and_hits_skip_the_query(app, client):
+    with app.app_context():
+        seller = make_user("seller")
+
+        assert b"No auctions are open" in client.get("/listings/").data
+        assert _listing_queries(lambda: client.get("/listings/")) == 0
+
+        make_listing(seller, title="Tioga Junior License - 1952", license_year=1952)
+        response = client.get("/listings/")
+        assert b"Tioga Junior License - 1952" in response.data
+        assert b"1950s" in response.data
+        assert b"<h2>1</h2>" in client.get("/").data
+
+
+def test_education_index_follows_published_articles(app, client):
+    with app.app_context():
+        assert b"Authentication Basics" in client.get("/education/").data
+
+        db.session.add(
+            EducationArticle(
+                slug="watermarks", title="Reading Watermarks", body="<p>Hold it up.</p>", category="guides", is_published=True
+            )
+        )
+        db.session.commit()
+
+        body = client.get("/education/").data
+        assert b"Reading Watermarks" in body and b"Authentication Basics" not in body
+
+
+def test_closing_auctions_invalidates_listing_fragments(app, client):
+    with app.app_context():
+        seller = make_user("seller")
+        listing = make_listing(seller, title="Clearfield Non-Resident License - 1934")
+        assert b"Clearfield" in client.get("/listings/").data
+
+        listing.auction_end = utcnow() - timedelta(minutes=1)
+        db.session.commit()
+        client.get("/listings/")
+        close_listings([listing.id])
+
+        assert b"No auctions are open" in client.get("/listings/").data
+
+
+def test_bids_invalidate_listing_fragments(app, client):
+    with app.app_context():
+        seller, bidder = make_user("seller"), make_user("bidder")
+        listing_id = make_listing(seller).id
+        bidder_id = bidder.id
+        assert b"Current bid: $100.00" in client.get("/listings/").data
+
+        place_bid(listing_id, bidder_id, "150")
+
+        assert b"Current bid: $150.00" in client.get("/listings/").data
+
+
+def test_memory_backend_evicts_least_recently_used_and_expired():
+    backend = MemoryBackend(max_entries=2)
+    backend.set("a", "A", 60)
+    backend.set("b", "B", 60)
+    backend.get("a")
+    backend.set("c", "C", 60)
+
+    assert (backend.get("a"), backend.get("b"), backend.get("c")) == ("A", None, "C")
+    backend.set("d", "D", -1)
+    assert backend.get("d") is None
+
+
+def test_disk_backend_is_shared_between_cache_instances(tmp_path):
+    first, second = FragmentCache(), FragmentCache()
+    first.backend = DiskBackend(str(tmp_path))
+    second.backend = DiskBackend(str(tmp_path), max_entries=1)
+
+    assert first.fetch("page", 60, ["story"], lambda: "v1") == "v1"
+    assert second.fetch("page", 60, ["story"], lambda: "v2") == "v1"
+
+    second.invalidate(["story"])
+    assert first.fetch("page", 60, ["story"], lambda: "v3") == "v3"
+
+    second.backend.set("other", "x", 60)
+    assert second.backend.prune() >= 1
+    assert len(list((tmp_path / "entries").iterdir())) == 1
@@ -0,0 +1,105 @@
+from sqlalchemy import event
+
+from app.extensions import db
+from app.models import Collection
+from app.services.holdings import (
+    FIRST_LICENSE_YEAR,
+    county_index,
+    holdings_cache,
+    last_license_year,
+    want_list,
+    year_mask,
+    year_runs,
+)
+from tests.factories import log_in, make_listing, make_user
+
+
+def _collect(user, county, year):
+    item = Collection(user_id=user.id, county=county, license_year=year, license_type="resident")
+    db.session.add(item)
+    return item
+
+
+def test_year_runs_split_a_mask_into_stretches():
+    mask = year_mask(1913, 1915) | year_mask(1920, 1920) | year_mask(1930, 1931)
+    assert list(year_runs(mask)) == [(1913, 1915), (1920, 1920), (1930, 1931)]
+    assert year_mask(1900, 1913) == 1
+    assert year_mask(1950, 1940) == 0
+
+
+def test_grid_is_built_once_and_follows_inserts_and_deletes(app):
+    with app.app_context():
+        collector = make_user("collector")
+        _collect(collector, "Allegheny", 1917)
+        duplicate = _collect(collector, "Allegheny", 1917)
+        _collect(collector, "Tioga", 1935)
+        db.session.commit()
+        user_id = collector.id
+
+        statements = []
+        listener = lambda conn, cursor, statement, *args: statements.append(statement)
+        event.listen(db.engine, "before_cursor_execute", listener)
+        try:
+            grid = holdings_cache.get(user_id)
+            assert holdings_cache.get(user_id) is grid
+        finally:
+            event.remove(db.engine, "before_cursor_execute", listener)
+        assert len(statements) == 1
+        assert (grid.cells, grid.counties_held, grid.years_held) == (2, 2, 2)
+
+        _collect(collector, "Berks", 1917)
+        db.session.delete(duplicate)
+        db.session.commit()
+        assert grid.holds("Allegheny", 1917) and grid.holds("berks", 1917)
+        assert grid.decade_counts(county_index("Tioga"))[1930] == 1
+
+        db.session.delete(db.session.get(Collection, 1))
+        db.session.commit()
+        assert not grid.holds("Allegheny", 1917)
+        assert grid.cells == 2
+        assert holdings_cache.misses == 1
+
+
+def test_want_list_matches_active_listings_in_gaps(app):
+    with app.app_context():
+        collector, seller = make_user("collector"), make_user("seller")
+        _collect(collector, "Allegheny", 1917)
+        db.session.commit()
+        make_listing(seller)
+        wanted = make_listing(seller, license_year=1918)
+        make_listing(seller, license_year=1919, status="sold")
+        other = make_listing(seller, county="Erie", license_year=FIRST_LICENSE_YEAR)
+
+        result = want_list(collector.id)
+        assert [listing.id for listing in result.listings] == [wanted.id, other.id]
+        assert result.available_cells == 2
+
+        result = want_list(collector.id, counties=["Allegheny"], year_from=1915)
+        assert [listing.id for listing in result.listings] == [wanted.id]
+        assert result.wanted_cells == last_license_year() - 1915
+
+
+def test_want_list_returns_listings_whatever_the_county_case(app):
+    with app.app_context():
+        collector, seller = make_user("collector"), make_user("seller")
+        lower = make_listing(seller, county="allegheny", license_year=1918)
+        padded = make_listing(seller, county="ERIE ", license_year=1920)
+
+        result = want_list(collector.id, counties=["Allegheny", "Erie"], year_from=1918, year_to=1920)
+
+        assert result.available_cells == 2
+        assert {listing.id for listing in result.listings} == {lower.id, padded.id}
+
+
+def test_collector_pages_render_the_grid(app, client):
+    with app.app_context():
+        collector = make_user("collector")
+        _collect(collector, "Allegheny", 1917)
+        db.session.commit()
+        log_in(client, collector)
+
+    page = client.get("/collector/")
+    assert page.status_code == 200
+    assert b"data-collector-grid" in page.data
+    assert b"<strong>1</strong> of 67 counties" in page.data
+    assert client.get("/collector/want-list?county=Allegheny&year_from=1913&year_to=1920").status_code == 200
@@ -0,0 +1,141 @@
+import io
+import os
+import threading
+
+import pytest
+from PIL import Image
+from sqlalchemy import select
+
+from app.extensions import db
+from app.models import ListingImage
+from app.services.images import image_pipeline, variant_key
+from tests.factories import log_in, make_listing, make_user
+
+
+@pytest.fixture()
+def pipeline(app, tmp_path):
+    app.config.update(IMAGE_STORAGE_DIR=str(tmp_path / "uploads"), IMAGE_STAGING_DIR=str(tmp_path / "staging"))
+    image_pipeline.init_app(app)
+    yield image_pipeline
+    image_pipeline.shutdown()
+    image_pipeline.workers = app.config["IMAGE_WORKERS"]
+
+
+def _photo(color=(120, 80, 40), size=(900, 600)) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", size, color).save(buffer, "JPEG")
+    return buffer.getvalue()
+
+
+def _seller_listing(app, client):
+    with app.app_context():
+        seller = make_user("seller")
+        listing_id = make_listing(seller).id
+        log_in(client, seller)
+    return listing_id
+
+
+def _upload(client, listing_id, *photos):
+    return client.post(
+        f"/listings/{listing_id}/images",
+        data={"images": [(io.BytesIO(photo), f"photo{index}.jpg") for index, photo in enumerate(photos)]},
+        headers={"Accept": "application/json"},
+    )
+
+
+def test_upload_renders_variants_and_fills_thumbnail_url(app, client, pipeline):
+    listing_id = _seller_listing(app, client)
+
+    response = _upload(client, listing_id, _photo())
+    assert response.status_code == 201
+
+    with app.app_context():
+        image = db.session.scalars(select(ListingImage)).one()
+        assert image.status == "ready"
+        assert image.thumbnail_url == pipeline.storage.url(variant_key(image.content_hash, "thumb"))
+        with Image.open(pipeline.storage.path(variant_key(image.content_hash, "thumb"))) as thumb:
+            assert max(thumb.size) == 400
+        assert client.get(image.thumbnail_url).status_code == 200
+    assert os.listdir(pipeline.staging_dir) == []
+
+
+def test_identical_photos_are_stored_once(app, client, pipeline):
+    listing_id = _seller_listing(app, client)
+    photo = _photo()
+
+    _upload(client, listing_id, photo)
+    response = _upload(client, listing_id, photo, _photo(color=(10, 10, 10)))
+
+    assert response.status_code == 201
+    with app.app_context():
+        images = db.session.scalars(select(ListingImage).order_by(ListingImage.sort_order)).all()
+        assert [image.sort_order for image in images] == [0, 1]
+        assert response.json["images"][0]["id"] == images[0].id
+    originals = [name for _, _, names in os.walk(os.path.join(pipeline.storage.root, "originals")) for name in names]
+    assert len(originals) == 2
+
+
+def test_rejects_non_images_oversized_photos_and_other_sellers(app, client, pipeline):
+    listing_id = _seller_listing(app, client)
+
+    assert _upload(client, listing_id, b"%PDF-1.4 not a photo").status_code == 400
+    pipeline.max_bytes = 1024
+    try:
+        response = _upload(client, listing_id, _photo())
+    finally:
+        pipeline.max_bytes = app.config["IMAGE_MAX_BYTES"]
+    assert response.status_code == 400
+    assert os.listdir(pipeline.staging_dir) == []
+
+    with app.app_context():
+        log_in(client, make_user("stranger"))
+    assert _upload(client, listing_id, _photo()).status_code == 403
+    with app.app_context():
+        assert db.session.scalars(select(ListingImage)).all() == []
+
+
+def test_process_pool_writes_thumbnails_back(app, client, pipeline):
+    listing_id = _seller_listing(app, client)
+    pipeline.workers = 1
+
+    response = _upload(client, listing_id, _photo())
+    assert response.json["images"][0]["status"] == "pending"
+    assert response.json["images"][0]["thumbnail_url"] is None
+
+    assert pipeline.wait(timeout=60)
+    with app.app_context():
+        image = db.session.scalars(select(ListingImage)).one()
+        assert image.status == "ready"
+        assert image.thumbnail_url
+
+
+def test_rejected_batch_discards_photos_staged_before_the_failure(app, client, pipeline):
+    listing_id = _seller_listing(app, client)
+
+    response = _upload(client, listing_id, _photo(), b"%PDF-1.4 not a photo")
+
+    assert response.status_code == 400
+    assert os.listdir(pipeline.staging_dir) == []
+    assert pipeline._staged == {}
+    with app.app_context():
+        assert db.session.scalars(select(ListingImage)).all() == []
+
+
+def test_renders_are_finished_off_the_process_pool_callback_thread(app, client, pipeline, monkeypatch):
+    listing_id = _seller_listing(app, client)
+    pipeline.workers = 1
+    finished_on = []
+    finish = pipeline._finish
+
+    def recording_finish(*args):
+        finished_on.append(threading.current_thread().name)
+        finish(*args)
+
+    monkeypatch.setattr(pipeline, "_finish", recording_finish)
+
+    _upload(client, listing_id, _photo())
+
+    assert pipeline.wait(timeout=60)
+    assert len(finished_on) == 1 and finished_on[0].startswith("image-finish")
+    with app.app_context():
+        assert db.session.scalars(select(ListingImage)).one().status == "ready"
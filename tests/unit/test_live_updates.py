@@ -0,0 +1,121 @@
+from datetime import timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import update
+
+from app.extensions import db
+from app.models import Listing
+from app.services.live import ListingWatcher, listing_topic
+from app.utils.broker import Broker, BrokerFullError, broker, stream
+from app.utils.dates import utcnow
+from tests.factories import make_listing, make_user
+
+
+def test_broker_fans_out_and_bounds_queues():
+    local = Broker()
+    fast = local.subscribe(["listing:1"], maxsize=2)
+    other = local.subscribe(["listing:2"])
+
+    for amount in (100, 105, 110):
+        local.publish("listing:1", "bid", {"current_bid": amount})
+
+    assert fast.dropped == 1
+    assert [fast.get(0).data["current_bid"], fast.get(0).data["current_bid"]] == [105, 110]
+    assert fast.get(0) is None
+    assert other.get(0) is None
+
+    fast.close()
+    assert local.active_topics() == ["listing:2"]
+    with pytest.raises(BrokerFullError):
+        local.subscribe(["listing:3"], limit=1)
+    assert local.subscriber_count() == 1
+
+
+def test_stream_emits_heartbeats_and_closes_subscription():
+    local = Broker()
+    subscription = local.subscribe(["listing:1"])
+
+    frames = list(stream(subscription, heartbeat=0.01, max_seconds=0.05))
+
+    assert frames[0].startswith("retry:")
+    assert ": keepalive\n\n" in frames
+    assert local.subscriber_count() == 0
+
+
+def test_listing_stream_sends_snapshot_then_bids(app, client):
+    with app.app_context():
+        seller = make_user("seller")
+        listing = make_listing(seller, current_bid=Decimal("120.00"), bid_count=3)
+        listing_id = listing.id
+    app.config["SSE_MAX_STREAM_SECONDS"] = 1
+
+    response = client.get(f"/bids/{listing_id}/stream")
+    frames = iter(response.response)
+
+    assert response.mimetype == "text/event-stream"
+    assert next(frames).startswith(b"retry:")
+    snapshot = next(frames)
+    assert b"event: snapshot" in snapshot
+    assert b'"current_bid":"120.00"' in snapshot
+
+    broker.publish(listing_topic(listing_id), "bid", {"listing_id": listing_id, "current_bid": "125.00"})
+    assert b'"current_bid":"125.00"' in next(frames)
+    response.close()
+
+
+def test_stream_unsubscribes_when_closed_before_iterating(app):
+    with app.app_context():
+        listing_id = make_listing(make_user("seller")).id
+    before = broker.subscriber_count()
+
+    with app.test_request_context(f"/bids/{listing_id}/stream"):
+        response = app.view_functions["bids.listing_stream"](listing_id)
+    assert broker.subscriber_count() == before + 1
+    response.close()
+    assert broker.subscriber_count() == before
+
+
+def test_listing_stream_404s_for_unknown_listing(client):
+    assert client.get("/bids/999/stream").status_code == 404
+
+
+def test_streams_are_capped_per_worker_and_only_open_while_live(app):
+    with app.app_context():
+        seller = make_user("seller")
+        live_id = make_listing(seller).id
+        ended_id = make_listing(seller, auction_end=utcnow() - timedelta(minutes=1)).id
+        sold_id = make_listing(seller, status="sold").id
+    app.config["SSE_MAX_STREAMS"] = broker.subscriber_count() + 1
+
+    def open_stream(listing_id):
+        with app.test_request_context(f"/bids/{listing_id}/stream"):
+            return app.view_functions["bids.listing_stream"](listing_id)
+
+    assert open_stream(ended_id).status_code == 204
+    assert open_stream(sold_id).status_code == 204
+    first = open_stream(live_id)
+    busy = open_stream(live_id)
+    assert (first.status_code, busy.status_code) == (200, 503)
+    assert busy.headers["Retry-After"] == str(app.config["SSE_BUSY_RETRY_SECONDS"])
+    first.close()
+    again = open_stream(live_id)
+    assert again.status_code == 200
+    again.close()
+
+
+def test_watcher_publishes_changes_made_by_other_workers(app):
+    with app.app_context():
+        seller = make_user("seller")
+        listing = make_listing(seller)
+        local_watcher = ListingWatcher()
+
+        with broker.subscribe([listing_topic(listing.id)]) as subscription:
+            assert local_watcher.poll() == 0
+            db.session.execute(update(Listing).where(Listing.id == listing.id).values(bid_count=1, current_bid=100))
+            db.session.commit()
+
+            assert local_watcher.poll() == 1
+            event = subscription.get(0)
+            assert event.name == "bid"
+            assert event.data["bid_count"] == 1
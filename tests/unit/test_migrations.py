@@ -0,0 +1,24 @@
+import os
+
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from flask_migrate import downgrade, upgrade
+
+from app.extensions import db
+
+MIGRATIONS = os.path.join(os.path.dirname(__file__), "..", "..", "migrations")
+
+
+def test_migrations_build_the_schema_the_models_describe(app):
+    with app.app_context():
+        db.drop_all()
+        try:
+            upgrade(directory=MIGRATIONS)
+            with db.engine.connect() as connection:
+                assert compare_metadata(MigrationContext.configure(connection), db.metadata) == []
+
+            downgrade(directory=MIGRATIONS, revision="base")
+            upgrade(directory=MIGRATIONS)
+        finally:
+            db.session.execute(db.text("DROP TABLE IF EXISTS alembic_version"))
+            db.session.commit()
@@ -0,0 +1,108 @@
+from datetime import timedelta
+
+from sqlalchemy import event, select
+
+from app import create_app
+from app.extensions import db
+from app.models import Notification, User, Watchlist
+from app.services.auctions import close_listings
+from app.services.bidding import place_bid
+from app.services.notifications import AUCTION_ENDED, AUCTION_LOST, AUCTION_WON, OUTBID, WATCHLIST, fan_out, notify_bid
+from app.utils.dates import utcnow
+from config import TestingConfig
+from tests.factories import make_listing, make_user
+
+
+def _inbox() -> set[tuple[str, str]]:
+    rows = db.session.execute(select(User.username, Notification.type).join(User, User.id == Notification.user_id)).all()
+    return {(row.username, row.type) for row in rows}
+
+
+def _watch(listing, *users) -> None:
+    db.session.add_all(Watchlist(user_id=user.id, listing_id=listing.id) for user in users)
+    db.session.commit()
+
+
+def test_fan_out_respects_prefs_and_inserts_in_chunks(app):
+    with app.app_context():
+        listing = make_listing(make_user("seller"))
+        watchers = [
+            make_user("default"),
+            make_user("opted_in", notification_prefs={"watchlist": True}),
+            make_user("other_pref", notification_prefs={"outbid": False}),
+            make_user("opted_out", notification_prefs={"watchlist": False}),
+        ]
+        _watch(listing, *watchers)
+
+        inserts = []
+        listener = lambda conn, cursor, statement, *args: inserts.append(statement) if statement.startswith("INSERT INTO notifications") else None
+        event.listen(db.engine, "before_cursor_execute", listener)
+        try:
+            sent = fan_out(
+                WATCHLIST,
+                select(Watchlist.user_id.label("user_id"), Watchlist.listing_id.label("listing_id")),
+                lambda row: "Watched listing changed.",
+                chunk_size=2,
+            )
+            db.session.commit()
+        finally:
+            event.remove(db.engine, "before_cursor_execute", listener)
+
+        assert sent == 3
+        assert len(inserts) == 2
+        assert _inbox() == {("default", WATCHLIST), ("opted_in", WATCHLIST), ("other_pref", WATCHLIST)}
+        assert Notification.query.first().link == f"/listings/{listing.id}"
+
+
+def test_fan_out_builds_links_without_registering_lazy_blueprints(app):
+    class LazyConfig(TestingConfig):
+        LAZY_BLUEPRINTS = True
+
+    with app.app_context():
+        listing = make_listing(make_user("seller"))
+        _watch(listing, make_user("fan"))
+        listing_id = listing.id
+
+    lazy = create_app(LazyConfig)
+    with lazy.app_context():
+        sent = fan_out(
+            WATCHLIST,
+            select(Watchlist.user_id.label("user_id"), Watchlist.listing_id.label("listing_id")),
+            lambda row: "Watched listing changed.",
+        )
+        db.session.commit()
+        assert sent == 1
+        assert Notification.query.one().link == f"/listings/{listing_id}"
+    assert lazy.blueprints == {}
+
+
+def test_bid_notifies_displaced_leader_and_watchers(app):
+    with app.app_context():
+        seller, alice, bob, fan = make_user("seller"), make_user("alice"), make_user("bob"), make_user("fan")
+        listing = make_listing(seller)
+        _watch(listing, alice, bob, fan)
+
+        place_bid(listing.id, alice.id, "100")
+        notify_bid(place_bid(listing.id, bob.id, "150"))
+        db.session.commit()
+
+        assert _inbox() == {("alice", OUTBID), ("fan", WATCHLIST)}
+
+
+def test_closing_notifies_winner_losers_seller_and_watchers(app):
+    with app.app_context():
+        seller, alice, bob, fan = make_user("seller"), make_user("alice"), make_user("bob"), make_user("fan")
+        listing = make_listing(seller)
+        _watch(listing, bob, fan)
+        place_bid(listing.id, alice.id, "100")
+        place_bid(listing.id, bob.id, "150")
+
+        close_listings([listing.id], now=utcnow() + timedelta(days=2))
+
+        assert _inbox() == {
+            ("bob", AUCTION_WON),
+            ("alice", AUCTION_LOST),
+            ("seller", AUCTION_ENDED),
+            ("fan", WATCHLIST),
+        }
+        assert "sold for $150.00" in Notification.query.filter_by(type=AUCTION_ENDED).one().message
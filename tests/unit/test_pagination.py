@@ -0,0 +1,107 @@
+import html
+import re
+from datetime import datetime
+from decimal import Decimal
+from typing import Optional
+
+from app.extensions import db
+from app.models import Bid, Notification
+from app.services.feeds import active_listings
+from app.utils.pagination import decode_cursor, encode_cursor
+from tests.factories import log_in, make_listing, make_user
+
+
+def _next_link(body: bytes) -> Optional[str]:
+    match = re.search(r'href="([^"]*after=[^"]*)"', body.decode())
+    return html.unescape(match.group(1)) if match else None
+
+
+def test_api_pages_cover_every_listing_once_in_order(app, client):
+    with app.app_context():
+        seller = make_user("seller")
+        # Created within the same second, so the id tie-breaker decides the order.
+        ids = [make_listing(seller, title=f"License {number}").id for number in range(7)]
+        make_listing(seller, title="Draft", status="draft")
+
+    seen, url = [], "/api/listings?limit=3"
+    while url:
+        payload = client.get(url).get_json()
+        seen.extend(item["id"] for item in payload["items"])
+        url = f"/api/listings?limit=3&after={payload['next_cursor']}" if payload["next_cursor"] else None
+
+    assert seen == sorted(ids, reverse=True)
+
+
+def test_listing_deleted_between_pages_does_not_shift_the_next_page(app):
+    with app.test_request_context():
+        seller = make_user("seller")
+        listings = [make_listing(seller, title=f"License {number}") for number in range(5)]
+        first = active_listings(limit=2)
+        db.session.delete(listings[-1])
+        db.session.commit()
+
+        second = active_listings(first.next_cursor, limit=2)
+
+    assert [listing.id for listing in second.items] == [listings[2].id, listings[1].id]
+
+
+def test_tampered_and_foreign_cursors_are_rejected(app, client):
+    with app.app_context():
+        seller = make_user("seller")
+        first, second = make_listing(seller), make_listing(seller)
+        db.session.add_all(Bid(listing_id=first.id, bidder_id=seller.id, amount=100 + n) for n in range(3))
+        db.session.commit()
+        first_id, second_id = first.id, second.id
+
+    cursor = client.get(f"/api/listings/{first_id}/bids?limit=1").get_json()["next_cursor"]
+    assert client.get(f"/api/listings/{first_id}/bids?limit=1&after={cursor}").status_code == 200
+
+    response = client.get(f"/api/listings/{second_id}/bids?after={cursor}")
+    assert response.status_code == 400
+    assert response.get_json()["ok"] is False
+    assert client.get(f"/api/listings?after={cursor[:-2]}xx").status_code == 400
+    assert client.get("/listings/?after=garbage").status_code == 400
+
+
+def test_bid_history_and_notification_pages_link_to_older_rows(app, client):
+    app.config["PAGE_SIZE"] = 2
+    with app.app_context():
+        seller, bidder = make_user("seller"), make_user("bidder")
+        listing = make_listing(seller)
+        db.session.add_all(Bid(listing_id=listing.id, bidder_id=bidder.id, amount=100 + n) for n in range(3))
+        db.session.add_all(Notification(user_id=bidder.id, type="outbid", message=f"Message {n}") for n in range(3))
+        db.session.commit()
+        listing_id = listing.id
+        log_in(client, bidder)
+
+    first = client.get(f"/bids/{listing_id}/history").data
+    assert b"$102" in first and b"$101" in first and b"$100" not in first
+    assert b"$100" in client.get(_next_link(first)).data
+
+    first = client.get("/dashboard/notifications").data
+    assert b"Message 2" in first and b"Message 0" not in first
+    older = client.get(_next_link(first)).data
+    assert b"Message 0" in older and _next_link(older) is None
+
+
+def test_search_pages_text_and_facet_results(app, client):
+    app.config["SEARCH_PAGE_SIZE"] = 2
+    with app.app_context():
+        seller = make_user("seller")
+        ids = [make_listing(seller, title=f"Tioga Junior License {n}", county="Tioga").id for n in range(3)]
+
+    first = client.get("/search/?county=Tioga").data
+    assert b"Tioga Junior License 2" in first
+    rest = client.get(_next_link(first)).data
+    assert b"Tioga Junior License 0" in rest and _next_link(rest) is None
+
+    first = client.get("/search/?q=tioga").data
+    rest = client.get(_next_link(first)).data
+    titles = re.findall(rb"Tioga Junior License (\d)", first + rest)
+    assert sorted(int(title) for title in titles) == list(range(len(ids)))
+
+
+def test_cursor_round_trips_dates_and_decimals(app):
+    with app.app_context():
+        values = [datetime(2026, 3, 1, 19, 0, 0, 250), Decimal("420.50"), 7]
+        assert decode_cursor("bids:1", encode_cursor("bids:1", values), 3) == tuple(values)
@@ -0,0 +1,94 @@
+import threading
+
+import pytest
+
+from app.blueprints.auth.routes import _create_or_update_oauth_user
+from app.extensions import bcrypt, db
+from app.models import User
+from app.services.passwords import HasherBusyError, PasswordHasher, hash_cost, password_hasher
+
+
+def test_hash_cost_reads_modular_crypt_cost():
+    assert hash_cost(bcrypt.generate_password_hash("hunter2026", 5).decode()) == 5
+    assert hash_cost("not-a-hash") is None
+
+
+def test_login_rehashes_password_stored_at_old_cost(client, app):
+    with app.app_context():
+        user = User(username="collector", email="collector@example.com")
+        user.password_hash = bcrypt.generate_password_hash("hunter2026", 5).decode()
+        db.session.add(user)
+        db.session.commit()
+    rehashed = password_hasher.stats().rehashed
+
+    response = client.post("/auth/login", data={"email": "collector@example.com", "password": "hunter2026"})
+
+    assert response.status_code == 302
+    with app.app_context():
+        stored = User.query.one().password_hash
+        assert hash_cost(stored) == app.config["BCRYPT_LOG_ROUNDS"]
+        assert bcrypt.check_password_hash(stored, "hunter2026")
+    assert password_hasher.stats().rehashed == rehashed + 1
+
+
+def test_full_backlog_rejects_instead_of_queueing():
+    hasher = PasswordHasher(rounds=4, workers=1, queue_size=0)
+    started, release = threading.Event(), threading.Event()
+
+    def slow():
+        started.set()
+        release.wait(5)
+        return True
+
+    blocker = threading.Thread(target=hasher._run, args=(slow,))
+    blocker.start()
+    started.wait(5)
+    try:
+        assert hasher.stats().in_flight == 1
+        with pytest.raises(HasherBusyError):
+            hasher.hash("hunter2026")
+    finally:
+        release.set()
+        blocker.join(5)
+
+    stats = hasher.stats()
+    assert stats.rejected == 1 and stats.completed == 1 and stats.in_flight == 0
+    assert hasher.verify(hasher.hash("hunter2026"), "hunter2026")
+
+
+def test_login_reports_busy_hasher_with_503(client, app, monkeypatch):
+    def busy(*args):
+        raise HasherBusyError("Too many sign-in attempts are being processed. Please try again shortly.")
+
+    monkeypatch.setattr(password_hasher, "verify_and_update", busy)
+    with app.app_context():
+        user = User(username="collector", email="collector@example.com", password_hash="x")
+        db.session.add(user)
+        db.session.commit()
+
+    response = client.post("/auth/login", data={"email": "collector@example.com", "password": "hunter2026"})
+
+    assert response.status_code == 503
+    assert b"try again shortly" in response.data
+
+
+def test_slow_hash_times_out_as_busy():
+    hasher = PasswordHasher(rounds=4, workers=1, queue_size=1, timeout=0.05)
+    release = threading.Event()
+    try:
+        with pytest.raises(HasherBusyError):
+            hasher._run(lambda: release.wait(5))
+    finally:
+        release.set()
+
+
+def test_oauth_accounts_skip_the_hasher(app, monkeypatch):
+    def busy(*args):
+        raise HasherBusyError("busy")
+
+    monkeypatch.setattr(password_hasher, "hash", busy)
+    with app.app_context():
+        user = _create_or_update_oauth_user("google", "sub-1", "oauth@example.com", "Oauth Member")
+        assert user.oauth_sub == "sub-1"
+        assert hash_cost(user.password_hash) is None
+        assert not password_hasher.verify(user.password_hash, "anything")
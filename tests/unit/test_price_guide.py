@@ -0,0 +1,136 @@
+import random
+from decimal import Decimal
+
+from sqlalchemy import delete, select
+
+from app.extensions import db
+from app.models import PriceGuideEntry, Transaction
+from app.services.price_guide import PriceGuide, apply_sales, price_guide, rebuild_price_guide
+from app.utils.quantiles import QuantileSketch
+from tests.factories import make_listing, make_user
+
+
+def _sale(seller, buyer, amount, status="completed", **listing):
+    sale = Transaction(
+        listing_id=make_listing(seller, status="sold", **listing).id,
+        buyer_id=buyer.id,
+        seller_id=seller.id,
+        sale_amount=Decimal(amount),
+        platform_fee=Decimal("1.00"),
+        status=status,
+    )
+    db.session.add(sale)
+    db.session.commit()
+    return sale
+
+
+def _entries():
+    return {
+        (row.license_year, row.county, row.sale_count, row.total_amount, row.min_amount, row.max_amount)
+        for row in db.session.scalars(select(PriceGuideEntry))
+    }
+
+
+def test_sketch_quantiles_stay_within_relative_accuracy():
+    rng = random.Random(7)
+    values = sorted(rng.uniform(20, 5000) for _ in range(2000))
+    sketch = QuantileSketch()
+    for value in values:
+        sketch.add(value)
+    for q in (0.1, 0.5, 0.9):
+        exact = values[int(q * (len(values) - 1))]
+        assert abs(sketch.quantile(q) - exact) <= exact * 0.0101
+
+    restored = QuantileSketch.from_dict(sketch.to_dict())
+    for value in values[1000:]:
+        restored.remove(value)
+    assert len(restored) == 1000
+    assert abs(restored.quantile(1.0) - values[999]) <= values[999] * 0.0101
+
+
+def test_completed_sales_update_the_guide_and_api(app, client):
+    with app.app_context():
+        seller, buyer = make_user("seller"), make_user("buyer")
+        _sale(seller, buyer, "100.00")
+        pending = _sale(seller, buyer, "300.00", status="shipped")
+        _sale(seller, buyer, "500.00", county="Erie")
+        assert _entries() == {
+            (1917, "Allegheny", 1, Decimal("100.00"), Decimal("100.00"), Decimal("100.00")),
+            (1917, "Erie", 1, Decimal("500.00"), Decimal("500.00"), Decimal("500.00")),
+        }
+
+        query = "/api/price-guide?license_year=1917&county=Allegheny&license_type=resident&condition_grade=fine"
+        assert client.get(query).get_json()["count"] == 1
+
+        pending.status = "completed"
+        db.session.commit()
+        _sale(seller, buyer, "200.00")
+        body = client.get(query).get_json()
+        assert (body["count"], body["mean"], body["min"], body["max"]) == (3, "200.00", "100.00", "300.00")
+        assert abs(Decimal(body["median"]) - 200) <= 2
+
+        # A refund of the dearest sale re-reads the bounds.
+        pending.status = "refunded"
+        db.session.commit()
+        body = client.get(query).get_json()
+        assert (body["count"], body["mean"], body["max"]) == (2, "150.00", "200.00")
+
+    assert client.get(query.replace("Allegheny", "Tioga")).status_code == 404
+    assert client.get("/api/price-guide?county=Allegheny").status_code == 400
+
+
+def test_rebuild_matches_incremental_maintenance(app):
+    with app.app_context():
+        seller, buyer = make_user("seller"), make_user("buyer")
+        for index, amount in enumerate(("80.00", "120.00", "95.50", "410.00")):
+            _sale(seller, buyer, amount, license_year=1917 + index % 2)
+        refunded = _sale(seller, buyer, "60.00")
+        db.session.delete(refunded)
+        db.session.commit()
+        incremental = _entries()
+
+        summary = rebuild_price_guide(batch_size=2)
+        db.session.commit()
+        assert (summary.sales, summary.entries) == (4, 2)
+        assert _entries() == incremental
+        stats = price_guide.lookup(1918, "Allegheny", "resident", "fine")
+        assert stats.count == 2 and abs(stats.median - 120) <= Decimal("1.20")
+
+
+def test_other_workers_drop_keys_a_rebuild_empties(app):
+    with app.app_context():
+        seller, buyer = make_user("seller"), make_user("buyer")
+        _sale(seller, buyer, "100.00")
+        erie = _sale(seller, buyer, "80.00", county="Erie")
+        other_worker = PriceGuide()
+        other_worker.ensure_ready()
+        assert other_worker.lookup(1917, "Erie", "resident", "fine").count == 1
+
+        # A Core delete bypasses the listeners; the rebuild catches the guide up.
+        db.session.execute(delete(Transaction).where(Transaction.id == erie.id))
+        rebuild_price_guide()
+        db.session.commit()
+
+        assert other_worker.refresh() >= 1
+        assert other_worker.entries.get((1917, "Erie", "resident", "fine")) is None
+        assert other_worker.lookup(1917, "Allegheny", "resident", "fine").count == 1
+        assert price_guide.lookup(1917, "Erie", "resident", "fine") is None
+
+
+def test_refresh_sees_other_workers_writes_without_touching_the_session(app):
+    with app.app_context():
+        seller, buyer = make_user("seller"), make_user("buyer")
+        _sale(seller, buyer, "100.00")
+        erie = make_listing(seller, status="sold", county="Erie")
+        assert price_guide.lookup(1917, "Erie", "resident", "fine") is None
+
+        # Another worker's sale, in the same second as the load above.
+        with db.engine.begin() as connection:
+            apply_sales(connection, [(erie.id, Decimal("80.00"), 1)])
+        pending = Transaction(
+            listing_id=erie.id, buyer_id=buyer.id, seller_id=seller.id, sale_amount=80, platform_fee=8
+        )
+        db.session.add(pending)
+        price_guide.refresh()
+        assert price_guide.lookup(1917, "Erie", "resident", "fine").count == 1
+        assert pending in db.session.new
@@ -0,0 +1,86 @@
+import logging
+
+import pytest
+from flask import render_template
+
+from app.extensions import db, query_detector
+from app.models import Listing, ListingImage
+from app.services.feeds import active_listings
+from app.utils.query_detector import NPlusOneError
+from tests.factories import make_listing, make_user
+
+
+def _listings_with_images(count: int) -> None:
+    for number in range(count):
+        seller = make_user(f"seller{number}", display_name=f"Seller {number}")
+        listing = make_listing(seller, title=f"License {number}")
+        db.session.add(
+            ListingImage(
+                listing_id=listing.id,
+                s3_key=f"listings/{listing.id}/0.jpg",
+                url=f"https://images.example.com/{listing.id}.jpg",
+                thumbnail_url=f"https://images.example.com/thumbs/{listing.id}.jpg",
+            )
+        )
+    db.session.commit()
+
+
+def _add_lazy_seller_route(app) -> None:
+    @app.get("/_test/sellers")
+    def lazy_sellers():
+        return ", ".join(listing.seller.username for listing in db.session.scalars(db.select(Listing)))
+
+
+def test_listing_cards_load_sellers_and_thumbnails_with_the_page(app, client):
+    with app.app_context():
+        _listings_with_images(8)
+
+    response = client.get("/listings/")
+
+    assert response.status_code == 200
+    assert b"Seller: Seller 7" in response.data
+    assert b"thumbs/" in response.data
+
+
+def test_lazy_relationships_in_a_template_loop_are_reported_with_the_template_line(app):
+    with app.test_request_context():
+        _listings_with_images(8)
+        with pytest.raises(NPlusOneError) as error:
+            with query_detector.watch("listing cards"):
+                render_template("listings/index.html", cursor=None, active_listings=lambda: active_listings())
+
+    message = str(error.value)
+    assert "listing cards" in message
+    assert "FROM users" in message and "FROM listing_images" in message
+    assert "app/templates/listings/index.html:20" in message
+    assert "app/templates/listings/index.html:29" in message
+
+
+def test_requests_fail_above_the_threshold_unless_the_endpoint_allows_it(app, client):
+    _add_lazy_seller_route(app)
+    with app.app_context():
+        _listings_with_images(query_detector.threshold + 1)
+
+    with pytest.raises(NPlusOneError, match="lazy_sellers"):
+        client.get("/_test/sellers")
+
+    query_detector.endpoint_thresholds["lazy_sellers"] = 50
+    try:
+        assert client.get("/_test/sellers").status_code == 200
+    finally:
+        query_detector.endpoint_thresholds.pop("lazy_sellers")
+
+
+def test_development_mode_logs_instead_of_raising(app, client, caplog):
+    _add_lazy_seller_route(app)
+    with app.app_context():
+        _listings_with_images(query_detector.threshold + 1)
+
+    query_detector.raise_errors = False
+    try:
+        with caplog.at_level(logging.WARNING, logger="app.utils.query_detector"):
+            assert client.get("/_test/sellers").status_code == 200
+    finally:
+        query_detector.raise_errors = True
+
+    assert "Possible N+1 queries in lazy_sellers" in caplog.text
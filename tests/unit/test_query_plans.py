@@ -0,0 +1,102 @@
+"""EXPLAIN QUERY PLAN checks for the hot queries.
+
+Each case runs the real code path, captures the SQL it sends, and fails if
+SQLite plans a full scan of a hot table, sorts a paged feed in a temp b-tree,
+or stops using the index the query was designed around.
+"""
+
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import event, select
+
+from app.extensions import db
+from app.models import Bid, Notification, Watchlist
+from app.services.auctions import AuctionScheduler
+from app.services.bidding import _current_leader
+from app.services.feeds import active_listings, bid_history, notification_feed
+from app.services.unread_counts import mark_all_read, unread_counts
+from app.utils.dates import utcnow
+from tests.factories import make_listing, make_user
+
+HOT_TABLES = ("listings", "bids", "notifications", "watchlist")
+
+
+def _refresh_closer(ids):
+    scheduler = AuctionScheduler()
+    # Skip the initial load so only the incremental query runs.
+    scheduler._watermark = utcnow() - timedelta(minutes=1)
+    scheduler.refresh()
+
+
+# name -> (run(ids), table the query reads, index it must use)
+HOT_QUERIES = {
+    "listing_feed": (lambda ids: active_listings(), "listings", "ix_listings_status_created_at_id"),
+    "listing_feed_next_page": (
+        lambda ids: active_listings(active_listings(limit=1).next_cursor, limit=1),
+        "listings",
+        "ix_listings_status_created_at_id",
+    ),
+    "closer_load": (lambda ids: AuctionScheduler().load(), "listings", "ix_listings_status_auction_end"),
+    "closer_refresh": (_refresh_closer, "listings", "ix_listings_updated_at"),
+    "bid_history": (lambda ids: bid_history(ids["listing"]), "bids", "ix_bids_listing_placed_at_id"),
+    "current_leader": (lambda ids: _current_leader(ids["listing"]), "bids", "ix_bids_winning_listing"),
+    "notification_feed": (lambda ids: notification_feed(ids["user"]), "notifications", "ix_notifications_user_created_at_id"),
+    "unread_count": (lambda ids: unread_counts.get(ids["user"]), "notifications", "ix_notifications_user_is_read_created_at"),
+    "mark_all_read": (lambda ids: mark_all_read(ids["user"]), "notifications", "ix_notifications_user_is_read_created_at"),
+    "user_watchlist": (
+        lambda ids: db.session.execute(select(Watchlist.listing_id).where(Watchlist.user_id == ids["user"])).all(),
+        "watchlist",
+        "ix_watchlist_user_listing",
+    ),
+}
+
+
+@pytest.fixture()
+def ids(app):
+    with app.app_context():
+        seller, bidder = make_user("seller"), make_user("bidder")
+        listings = [make_listing(seller, title=f"License {number}") for number in range(3)]
+        db.session.add_all(
+            Bid(listing_id=listings[0].id, bidder_id=bidder.id, amount=100 + number, is_winning=number == 2)
+            for number in range(3)
+        )
+        db.session.add_all(Notification(user_id=bidder.id, type="outbid", message="Outbid") for _ in range(3))
+        db.session.add(Watchlist(user_id=bidder.id, listing_id=listings[1].id))
+        db.session.commit()
+        yield {"user": bidder.id, "listing": listings[0].id}
+
+
+def _captured(run, ids) -> list[tuple[str, tuple]]:
+    statements = []
+    listener = lambda conn, cursor, statement, parameters, *args: statements.append((statement, parameters))
+    event.listen(db.engine, "before_cursor_execute", listener)
+    try:
+        run(ids)
+    finally:
+        event.remove(db.engine, "before_cursor_execute", listener)
+    return statements
+
+
+def _plan(statement: str, parameters) -> list[str]:
+    rows = db.session.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+    return [row[-1] for row in rows]
+
+
+@pytest.mark.parametrize("name", sorted(HOT_QUERIES))
+def test_hot_query_uses_its_index(app, ids, name):
+    run, table, index = HOT_QUERIES[name]
+    with app.test_request_context():
+        statements = [
+            (statement, parameters)
+            for statement, parameters in _captured(run, ids)
+            if f" {table} " in f" {statement} ".replace("\n", " ") and not statement.startswith(("SAVEPOINT", "RELEASE"))
+        ]
+        assert statements, f"{name} sent no query against {table}"
+
+        for statement, parameters in statements:
+            plan = _plan(statement, parameters)
+            full_scans = [step for step in plan if step.startswith("SCAN") and step.split()[1] in HOT_TABLES]
+            assert not full_scans, f"{name} scans a whole table: {plan}\n{statement}"
+            assert not any("TEMP B-TREE FOR ORDER BY" in step for step in plan), f"{name} sorts instead of reading in index order: {plan}"
+            assert any(f"INDEX {index}" in step for step in plan), f"{name} no longer uses {index}: {plan}"
@@ -0,0 +1,93 @@
+from decimal import Decimal
+
+from sqlalchemy import update
+
+from app.extensions import db
+from app.models import Review, Transaction, User
+from app.services.ratings import reconcile_ratings
+from tests.factories import make_listing, make_user
+
+
+def _sale(seller, buyer):
+    listing = make_listing(seller, status="sold")
+    sale = Transaction(
+        listing_id=listing.id,
+        buyer_id=buyer.id,
+        seller_id=seller.id,
+        sale_amount=Decimal("150.00"),
+        platform_fee=Decimal("15.00"),
+    )
+    db.session.add(sale)
+    db.session.commit()
+    return sale
+
+
+def _review(sale, reviewer, reviewee, role, rating):
+    review = Review(transaction_id=sale.id, reviewer_id=reviewer.id, reviewee_id=reviewee.id, role=role, rating=rating)
+    db.session.add(review)
+    return review
+
+
+def test_reviews_update_ratings_in_the_same_transaction(app):
+    with app.app_context():
+        seller, buyer = make_user("seller"), make_user("buyer")
+        sale = _sale(seller, buyer)
+
+        _review(sale, buyer, seller, "seller", 5)
+        _review(sale, seller, buyer, "buyer", 4)
+        db.session.commit()
+        assert (seller.seller_review_count, seller.seller_rating_total, seller.seller_rating) == (1, 5, Decimal("5.00"))
+        assert (buyer.buyer_review_count, buyer.buyer_rating) == (1, Decimal("4.00"))
+        assert seller.buyer_rating is None
+
+        second = _review(_sale(seller, buyer), buyer, seller, "seller", 2)
+        db.session.flush()
+        assert seller.seller_rating == Decimal("3.50")
+        db.session.rollback()
+        assert (seller.seller_review_count, seller.seller_rating) == (1, Decimal("5.00"))
+
+        second = _review(_sale(seller, buyer), buyer, seller, "seller", 2)
+        db.session.commit()
+        second.rating = 4
+        db.session.commit()
+        assert (seller.seller_review_count, seller.seller_rating_total, seller.seller_rating) == (2, 9, Decimal("4.50"))
+
+        db.session.delete(second)
+        db.session.commit()
+        assert (seller.seller_review_count, seller.seller_rating) == (1, Decimal("5.00"))
+
+
+def test_reconcile_rebuilds_drifted_members_only(app):
+    with app.app_context():
+        seller, buyer, bystander = make_user("seller"), make_user("buyer"), make_user("bystander")
+        sale = _sale(seller, buyer)
+        _review(sale, buyer, seller, "seller", 5)
+        _review(sale, seller, buyer, "buyer", 3)
+        db.session.commit()
+        assert reconcile_ratings().corrected == 0
+
+        db.session.execute(
+            update(User)
+            .where(User.id.in_([seller.id, bystander.id]))
+            .values(seller_review_count=7, seller_rating_total=20, seller_rating=Decimal("2.86"))
+        )
+        db.session.commit()
+
+        summary = reconcile_ratings(batch_size=1)
+        db.session.commit()
+        assert (summary.members, summary.corrected) == (3, 2)
+        assert (seller.seller_review_count, seller.seller_rating_total, seller.seller_rating) == (1, 5, Decimal("5.00"))
+        assert (bystander.seller_review_count, bystander.seller_rating) == (0, None)
+        assert buyer.buyer_rating == Decimal("3.00")
+
+
+def test_new_reviews_refresh_the_seller_rating_on_cached_cards(app, client):
+    with app.app_context():
+        seller, buyer = make_user("seller"), make_user("buyer")
+        make_listing(seller, title="Clinton Resident License - 1925")
+        sale = _sale(seller, buyer)
+        assert b"/5 (" not in client.get("/listings/").data
+
+        _review(sale, buyer, seller, "seller", 4)
+        db.session.commit()
+        assert b"4.00/5 (1)" in client.get("/listings/").data
@@ -0,0 +1,85 @@
+from app.extensions import request_metrics
+from app.utils.request_metrics import LATENCY_BUCKETS, Histogram
+from tests.factories import log_in, make_listing, make_user
+
+
+def test_requests_record_latency_queries_and_status(app, client):
+    with app.app_context():
+        seller = make_user("seller")
+        make_listing(seller)
+
+    client.get("/listings/")
+    client.get("/listings/")
+    client.get("/listings/999999")
+
+    endpoints = request_metrics.snapshot()
+    listings = endpoints["listings.index"]
+    assert listings.latency.count == 2
+    assert listings.sampled == 2
+    # The second render came out of the fragment cache without touching the database.
+    assert listings.queries.total >= 1
+    assert listings.queries.counts[0] == 1
+    assert listings.db_seconds > 0
+    assert endpoints["listings.detail"].statuses == {"4xx": 1}
+
+
+def test_unsampled_requests_still_record_latency(app, client):
+    request_metrics.sample_rate = 0.0
+    try:
+        client.get("/listings/")
+    finally:
+        request_metrics.sample_rate = app.config["METRICS_SQL_SAMPLE_RATE"]
+
+    listings = request_metrics.snapshot()["listings.index"]
+    assert listings.latency.count == 1
+    assert listings.sampled == 0
+    assert listings.queries_per_request is None
+
+
+def test_statements_over_the_threshold_are_logged(app, client):
+    request_metrics.slow_query_seconds = 0.0
+    try:
+        client.get("/listings/")
+    finally:
+        request_metrics.slow_query_seconds = app.config["METRICS_SLOW_QUERY_MS"] / 1000
+
+    slow = request_metrics.slow_queries()
+    assert slow and slow[0].endpoint == "listings.index"
+    assert slow[0].statement.startswith("SELECT listings.")
+    assert request_metrics.snapshot()["listings.index"].slow_queries == len(slow)
+
+
+def test_metrics_pages_need_an_admin_or_the_scrape_token(app, client):
+    client.get("/listings/")
+    assert client.get("/admin/metrics").status_code == 403
+    assert client.get("/admin/metrics/prometheus").status_code == 403
+
+    app.config["METRICS_TOKEN"] = "scrape-secret"
+    assert client.get("/admin/metrics/prometheus", headers={"Authorization": "Bearer wrong"}).status_code == 403
+    response = client.get("/admin/metrics/prometheus", headers={"Authorization": "Bearer scrape-secret"})
+    assert response.status_code == 200
+    assert response.mimetype == "text/plain"
+    body = response.get_data(as_text=True)
+    assert 'keystonebid_http_requests_total{endpoint="listings.index",status="2xx"} 1' in body
+    assert 'keystonebid_http_request_duration_seconds_bucket{endpoint="listings.index",le="+Inf"} 1' in body
+    assert "keystonebid_sql_queries_per_request_count" in body
+
+    with app.app_context():
+        log_in(client, make_user("member"))
+        assert client.get("/admin/metrics").status_code == 403
+        log_in(client, make_user("admin", is_admin=True))
+    page = client.get("/admin/metrics")
+    assert page.status_code == 200
+    assert b"listings.index" in page.data
+
+
+def test_histogram_quantiles_interpolate_within_buckets():
+    histogram = Histogram(LATENCY_BUCKETS)
+    for _ in range(90):
+        histogram.observe(0.003)
+    for _ in range(10):
+        histogram.observe(0.2)
+
+    assert 0 < histogram.quantile(0.5) <= 0.005
+    assert 0.1 < histogram.quantile(0.95) <= 0.25
+    assert histogram.cumulative()[-1] == ("+Inf", 100)
@@ -0,0 +1,161 @@
+import random
+from datetime import timedelta
+from decimal import Decimal
+
+from sqlalchemy import insert, update
+
+from app.extensions import db
+from app.models import Listing, Watchlist
+from app.services.search_index import InvertedIndex, SearchDocument, listing_search, tokenize
+from tests.factories import make_listing, make_user
+
+
+def test_tokenize_lowercases_and_drops_stopwords():
+    assert tokenize("The Allegheny License of 1917!") == ["allegheny", "license", "1917"]
+
+
+def test_title_matches_outrank_description_matches():
+    index = InvertedIndex()
+    index.add(SearchDocument(1, "Tioga junior license", "Game commission annotation"))
+    index.add(SearchDocument(2, "Clearfield resident license", "Bought alongside a Tioga button"))
+
+    assert [hit.listing_id for hit in index.search("tioga")] == [1, 2]
+
+
+def test_reindex_and_remove_replace_postings():
+    index = InvertedIndex()
+    index.add(SearchDocument(1, "Tioga junior license"))
+    index.add(SearchDocument(1, "Erie resident license"))
+
+    assert index.search("tioga") == []
+    assert [hit.listing_id for hit in index.search("erie")] == [1]
+    assert index.remove(1)
+    assert index.search("erie") == []
+    assert len(index) == 0
+
+
+def test_pruned_search_matches_exhaustive_scoring(monkeypatch):
+    rng = random.Random(3)
+    words = [f"w{number}" for number in range(60)]
+    index = InvertedIndex()
+    for listing_id in range(1, 3001):
+        index.add(SearchDocument(listing_id, " ".join(rng.choices(words, k=3)), " ".join(rng.choices(words, k=20))))
+
+    queries = ("w1 w2", "w0 w5 w59", "w40 w3")
+    pruned = [[hit.listing_id for hit in index.search(query, limit=10)] for query in queries]
+    monkeypatch.setattr(InvertedIndex, "_threshold", lambda self, scores, limit, candidates: -1.0)
+    exhaustive = [[hit.listing_id for hit in index.search(query, limit=10)] for query in queries]
+
+    assert pruned == exhaustive
+
+
+def test_after_pages_through_the_full_ranking():
+    rng = random.Random(4)
+    words = [f"w{number}" for number in range(30)]
+    index = InvertedIndex()
+    for listing_id in range(1, 501):
+        index.add(SearchDocument(listing_id, " ".join(rng.choices(words, k=3)), " ".join(rng.choices(words, k=10))))
+
+    expected = index.search("w1 w2", limit=1000)
+    pages, after = [], None
+    while True:
+        page = index.search("w1 w2", limit=7, after=after)
+        if not page:
+            break
+        pages.extend(page)
+        after = (page[-1].score, page[-1].listing_id)
+
+    assert pages == expected
+
+
+def test_save_and_load_round_trip(tmp_path):
+    index = InvertedIndex()
+    index.add(SearchDocument(1, "Tioga junior license"))
+    index.add(SearchDocument(2, "Erie resident license"))
+    index.add(SearchDocument(3, "Erie junior license"))
+    index.remove(2)
+    path = tmp_path / "index.pkl"
+
+    index.save(str(path))
+    loaded = InvertedIndex.load(str(path))
+
+    assert len(loaded) == 2
+    assert [hit.listing_id for hit in loaded.search("junior", limit=5)] == [hit.listing_id for hit in index.search("junior", limit=5)]
+    assert [hit.listing_id for hit in loaded.search("erie")] == [3]
+
+
+def test_listing_changes_update_index_after_commit(app):
+    with app.app_context():
+        seller = make_user("seller")
+        make_listing(seller, title="Allegheny resident license 1917")
+        assert [hit.listing_id for hit in listing_search.search("allegheny")] == [1]
+
+        listing = make_listing(seller, title="Tioga junior license 1952")
+        assert [hit.listing_id for hit in listing_search.search("tioga")] == [listing.id]
+
+        listing.status = "ended"
+        db.session.commit()
+        assert listing_search.search("tioga") == []
+
+
+def test_refresh_picks_up_listings_written_in_the_same_second(app):
+    with app.app_context():
+        seller = make_user("seller")
+        make_listing(seller, title="Alpha resident license")
+        assert len(listing_search.search("alpha")) == 1
+
+        # Core insert: another worker's write, seen only through the updated_at refresh.
+        db.session.execute(
+            insert(Listing).values(
+                seller_id=seller.id,
+                title="Bravo junior license",
+                description="Pin intact.",
+                license_year=1931,
+                license_type="junior",
+                county="Erie",
+                condition_grade="good",
+                listing_type="auction",
+                starting_price=Decimal("40.00"),
+                status="active",
+            )
+        )
+        db.session.commit()
+        listing_search.refresh()
+        assert [hit.listing_id for hit in listing_search.search("bravo")] == [2]
+
+
+def test_search_page_renders_ranked_results(app, client):
+    with app.app_context():
+        seller = make_user("seller")
+        make_listing(seller, title="Clearfield non-resident license 1934")
+        make_listing(seller, title="Tioga junior license 1952", county="Tioga")
+
+    response = client.get("/search/?q=tioga+junior")
+
+    assert response.status_code == 200
+    assert b"Tioga junior license 1952" in response.data
+    assert b"Clearfield" not in response.data
+
+
+def test_refresh_reads_behind_the_watermark_without_touching_the_session(app):
+    with app.app_context():
+        seller = make_user("seller")
+        make_listing(seller, title="Alpha resident license")
+        late_id = make_listing(seller, title="Bravo junior license").id
+        assert len(listing_search.search("alpha")) == 1
+
+        # Another worker's write, stamped before the watermark but committed after it.
+        listing_search.index.remove(late_id)
+        db.session.execute(
+            update(Listing)
+            .where(Listing.id == late_id)
+            .values(updated_at=listing_search.index.watermark - timedelta(seconds=20))
+        )
+        db.session.commit()
+
+        watch = Watchlist(user_id=seller.id, listing_id=late_id)
+        db.session.add(watch)
+        assert listing_search.refresh() == 1
+        assert listing_search.refresh() == 0
+        assert [hit.listing_id for hit in listing_search.search("bravo")] == [late_id]
+        assert watch in db.session.new
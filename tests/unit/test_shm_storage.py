@@ -0,0 +1,121 @@
+import multiprocessing
+
+from limits import parse
+from limits.storage import storage_from_string
+from limits.strategies import FixedWindowRateLimiter, SlidingWindowCounterRateLimiter
+
+from app import create_app
+from app.extensions import fragment_cache
+from app.utils.shm_storage import SharedMemoryStorage, anchor_uri
+
+
+def _storage(tmp_path, query="slots=256&stripes=4") -> SharedMemoryStorage:
+    return storage_from_string(f"shm://{tmp_path}/ratelimit.shm?{query}")
+
+
+def _hammer(uri: str, hits: int) -> None:
+    storage = storage_from_string(uri)
+    for _ in range(hits):
+        storage.incr("shared", 60)
+
+
+def test_counters_expire_and_clear(tmp_path, monkeypatch):
+    storage = _storage(tmp_path)
+    assert isinstance(storage, SharedMemoryStorage)
+
+    assert storage.incr("login/1.2.3.4", 10) == 1
+    assert storage.incr("login/1.2.3.4", 10, amount=2) == 3
+    assert storage.get("login/1.2.3.4") == 3
+    storage.clear("login/1.2.3.4")
+    assert storage.get("login/1.2.3.4") == 0
+
+    storage.incr("short", 10)
+    expiry = storage.get_expiry("short")
+    monkeypatch.setattr("app.utils.shm_storage.time.time", lambda: expiry + 1)
+    assert storage.get("short") == 0
+    assert storage.incr("short", 10) == 1
+
+
+def test_full_stripe_evicts_the_slot_closest_to_expiry(tmp_path):
+    storage = _storage(tmp_path, "slots=4&stripes=1")
+    storage.incr("soonest", 5)
+    for index in range(3):
+        storage.incr(f"later-{index}", 100)
+
+    storage.incr("newcomer", 100)
+
+    assert storage.get("newcomer") == 1
+    assert storage.get("soonest") == 0
+    assert all(storage.get(f"later-{index}") == 1 for index in range(3))
+
+
+def test_sliding_window_limit_is_enforced(tmp_path):
+    limiter = SlidingWindowCounterRateLimiter(_storage(tmp_path))
+    item = parse("5/minute")
+
+    assert [limiter.hit(item, "1.2.3.4") for _ in range(7)] == [True] * 5 + [False] * 2
+    assert limiter.hit(item, "5.6.7.8")
+    assert FixedWindowRateLimiter(_storage(tmp_path)).hit(item, "fixed")
+
+
+def test_counters_are_shared_across_processes(tmp_path):
+    uri = f"shm://{tmp_path}/ratelimit.shm?slots=256&stripes=4"
+    storage = storage_from_string(uri)
+    context = multiprocessing.get_context("fork")
+    workers = [context.Process(target=_hammer, args=(uri, 200)) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(30)
+
+    assert all(worker.exitcode == 0 for worker in workers)
+    assert storage.get("shared") == 800
+    assert storage.reset() == 1
+
+
+def test_login_limit_applies_through_flask_limiter(tmp_path):
+    app = create_app("config.TestingConfig")
+    app.config.update(RATELIMIT_ENABLED=True, RATELIMIT_STORAGE_URI=f"shm://{tmp_path}/ratelimit.shm")
+    # Flask-Limiter reads its settings at init_app time.
+    from app.extensions import limiter
+
+    limiter.init_app(app)
+    client = app.test_client()
+
+    statuses = [client.get("/auth/login").status_code for _ in range(16)]
+
+    assert statuses[:15] == [200] * 15
+    assert statuses[15] == 429
+
+
+def test_relative_paths_resolve_against_the_instance_folder(monkeypatch, tmp_path):
+    assert anchor_uri("shm://ratelimit.shm?slots=256", "/srv/instance") == "shm:///srv/instance/ratelimit.shm?slots=256"
+    assert anchor_uri(f"shm://{tmp_path}/ratelimit.shm", "/srv/instance") == f"shm://{tmp_path}/ratelimit.shm"
+    assert anchor_uri("memory://", "/srv/instance") == "memory://"
+
+    monkeypatch.setattr("config.TestingConfig.RATELIMIT_STORAGE_URI", "shm://ratelimit.shm")
+    # Started from elsewhere, the worker still opens the file in the instance folder.
+    monkeypatch.chdir(tmp_path)
+    app = create_app("config.TestingConfig")
+    assert app.config["RATELIMIT_STORAGE_URI"] == f"shm://{app.instance_path}/ratelimit.shm"
+    assert not app.instance_path.startswith(str(tmp_path))
+
+
+def test_falls_back_to_memory_storage_without_fcntl(monkeypatch):
+    monkeypatch.setattr("app.utils.shm_storage.fcntl", None)
+    monkeypatch.setattr("app.utils.fragment_cache.fcntl", None)
+    monkeypatch.setattr("config.TestingConfig.RATELIMIT_STORAGE_URI", "shm://ratelimit.shm")
+    monkeypatch.setattr("config.TestingConfig.FRAGMENT_CACHE_BACKEND", "disk", raising=False)
+
+    app = create_app("config.TestingConfig")
+
+    assert app.config["RATELIMIT_STORAGE_URI"] == "memory://"
+    assert fragment_cache.backend.name == "memory"
+
+
+def test_only_deployed_configs_default_to_shared_memory_storage():
+    from config import DevelopmentConfig, LaunchConfig, ProductionConfig
+
+    assert DevelopmentConfig.RATELIMIT_STORAGE_URI == "memory://"
+    assert LaunchConfig.RATELIMIT_STORAGE_URI.startswith("shm://")
+    assert ProductionConfig.RATELIMIT_STORAGE_URI.startswith("shm://")
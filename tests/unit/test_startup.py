@@ -0,0 +1,57 @@
+from app import create_app
+from app.extensions import db, oauth
+from app.services.passwords import password_hasher
+from app.services.price_guide import price_guide
+from config import TestingConfig
+
+
+class LazyConfig(TestingConfig):
+    LAZY_BLUEPRINTS = True
+
+
+def test_lazy_app_registers_blueprints_on_first_request():
+    app = create_app(LazyConfig)
+    assert app.blueprints == {}
+    with app.app_context():
+        db.create_all()
+
+    response = app.test_client().get("/listings/")
+
+    assert response.status_code == 200
+    assert "listings" in app.blueprints and "auth" in app.blueprints
+    assert any(name == "blueprint:auth" for _, name, _ in app.extensions["startup_timings"])
+    with app.app_context():
+        db.drop_all()
+
+
+def test_lazy_app_configures_services_without_blueprints():
+    class Tuned(LazyConfig):
+        BCRYPT_LOG_ROUNDS = 5
+        PRICE_GUIDE_REFRESH_SECONDS = 7
+
+    app = create_app(Tuned)
+    assert app.blueprints == {}
+    assert (password_hasher.rounds, price_guide.refresh_interval) == (5, 7)
+    create_app(TestingConfig)
+
+
+def test_auth_pages_use_the_cached_provider_map(app, client, monkeypatch):
+    assert app.extensions["oauth_providers"] == {"google": False, "apple": False}
+
+    def unexpected(name):
+        raise AssertionError(f"create_client({name!r}) called during render")
+
+    monkeypatch.setattr(oauth, "create_client", unexpected)
+
+    assert client.get("/auth/login").status_code == 200
+    assert client.get("/auth/register").status_code == 200
+    assert client.get("/auth/google").status_code == 302
+
+
+def test_startup_profile_command_reports_each_phase(app):
+    result = app.test_cli_runner().invoke(args=["startup-profile", "--config", "config.TestingConfig"])
+
+    assert result.exit_code == 0, result.output
+    assert "init      db" in result.output
+    assert "blueprint:auth" in result.output
+    assert "create_app (eager blueprints)" in result.output
@@ -0,0 +1,75 @@
+from sqlalchemy import func, select
+
+from app.extensions import db
+from app.models import Bid, Listing, Review, Transaction, Watchlist
+from app.services.holdings import PENNSYLVANIA_COUNTIES
+from app.services.synthetic import generate, scale_for
+
+
+def _fingerprint():
+    return db.session.execute(
+        select(Listing.title, Listing.status, Listing.current_bid, Listing.bid_count).order_by(Listing.id)
+    ).all()
+
+
+def test_generate_fills_every_table(app):
+    with app.app_context():
+        summary = generate(scale_for("tiny"), seed=7, batch_size=16)
+
+        for table in db.metadata.sorted_tables:
+            assert db.session.scalar(select(func.count()).select_from(table)), table.name
+        assert summary.counts["bids"] == db.session.scalar(select(func.count(Bid.id)))
+        assert set(db.session.scalars(select(Listing.county))) <= set(PENNSYLVANIA_COUNTIES)
+        assert len(set(PENNSYLVANIA_COUNTIES)) == 67
+
+
+def test_denormalised_columns_match_the_generated_bids(app):
+    with app.app_context():
+        generate(scale_for("tiny", listings=60, bids=500), seed=3, batch_size=25)
+
+        per_listing = (
+            select(
+                Bid.listing_id,
+                func.count(Bid.id).label("bids"),
+                func.max(Bid.amount).label("top"),
+                func.sum(Bid.is_winning.cast(db.Integer)).label("winning"),
+            )
+            .group_by(Bid.listing_id)
+            .subquery()
+        )
+        rows = db.session.execute(
+            select(Listing.status, Listing.bid_count, Listing.current_bid, *per_listing.c[1:]).outerjoin(
+                per_listing, per_listing.c.listing_id == Listing.id
+            )
+        ).all()
+        for status, bid_count, current_bid, bids, top, winning in rows:
+            assert bid_count == (bids or 0)
+            assert current_bid == top
+            assert winning == (1 if bids else None)
+            if status in ("draft", "ended"):
+                assert not bids
+
+        sold = db.session.scalar(select(func.count(Listing.id)).where(Listing.status == "sold"))
+        assert db.session.scalar(select(func.count(Transaction.id))) == sold
+        winner = (
+            select(Bid.bidder_id)
+            .where(Bid.listing_id == Transaction.listing_id, Bid.is_winning.is_(True))
+            .scalar_subquery()
+        )
+        assert not db.session.scalar(select(func.count(Transaction.id)).where(Transaction.buyer_id != winner))
+        assert not db.session.scalar(select(func.count(Review.id)).where(Review.reviewer_id == Review.reviewee_id))
+        pairs = select(Watchlist.user_id, Watchlist.listing_id).distinct().subquery()
+        watched = db.session.scalar(select(func.count(Watchlist.id)))
+        assert db.session.scalar(select(func.count()).select_from(pairs)) == watched
+
+
+def test_same_seed_gives_the_same_data(app):
+    with app.app_context():
+        generate(scale_for("tiny"), seed=11)
+        first = _fingerprint()
+        for table in reversed(db.metadata.sorted_tables):
+            db.session.execute(table.delete())
+        db.session.commit()
+
+        generate(scale_for("tiny"), seed=11)
+        assert _fingerprint() == first
@@ -0,0 +1,75 @@
+from sqlalchemy import event, select
+
+from app.extensions import db
+from app.models import Notification, Watchlist
+from app.services.notifications import WATCHLIST, fan_out
+from app.services.unread_counts import unread_counts
+from tests.factories import log_in, make_listing, make_user
+
+
+def _count_queries(app, action):
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    with app.app_context():
+        event.listen(db.engine, "before_cursor_execute", listener)
+        try:
+            action()
+        finally:
+            event.remove(db.engine, "before_cursor_execute", listener)
+    return [statement for statement in statements if "count(*)" in statement.lower()]
+
+
+def test_count_is_cached_and_kept_current_by_commits(app):
+    with app.app_context():
+        user = make_user("reader")
+        db.session.add(Notification(user_id=user.id, type="test", message="one"))
+        db.session.commit()
+
+        assert unread_counts.get(user.id) == 1
+        assert _count_queries(app, lambda: unread_counts.get(user.id)) == []
+
+        db.session.add(Notification(user_id=user.id, type="test", message="two"))
+        db.session.commit()
+        assert unread_counts.get(user.id) == 2
+
+        notification = Notification.query.first()
+        notification.is_read = True
+        db.session.commit()
+        assert unread_counts.get(user.id) == 1
+
+
+def test_bulk_fan_out_updates_cached_counts_only_after_commit(app):
+    with app.app_context():
+        listing = make_listing(make_user("seller"))
+        watcher = make_user("watcher")
+        db.session.add(Watchlist(user_id=watcher.id, listing_id=listing.id))
+        db.session.commit()
+        assert unread_counts.get(watcher.id) == 0
+
+        recipients = select(Watchlist.user_id.label("user_id"), Watchlist.listing_id.label("listing_id"))
+        fan_out(WATCHLIST, recipients, lambda row: "Changed.")
+        db.session.rollback()
+        assert unread_counts.get(watcher.id) == 0
+
+        fan_out(WATCHLIST, recipients, lambda row: "Changed.")
+        db.session.commit()
+        assert _count_queries(app, lambda: unread_counts.get(watcher.id)) == []
+        assert unread_counts.get(watcher.id) == 1
+
+
+def test_mark_all_read_endpoint_and_nav_badge(app, client):
+    with app.app_context():
+        user = make_user("reader")
+        db.session.add_all(Notification(user_id=user.id, type="test", message=str(index)) for index in range(3))
+        db.session.commit()
+        log_in(client, user)
+
+    page = client.get("/listings/")
+    assert b'class="nav-badge"' in page.data and b">3</span>" in page.data
+
+    response = client.post("/api/notifications/mark-all-read")
+    assert response.get_json() == {"ok": True, "marked": 3, "unread": 0}
+    assert client.get("/api/notifications/unread").get_json() == {"unread": 0}
+    assert b'class="nav-badge"' not in client.get("/listings/").data
+    with app.app_context():
+        assert Notification.query.filter_by(is_read=False).count() == 0
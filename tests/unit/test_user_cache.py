@@ -0,0 +1,80 @@
+from sqlalchemy import event
+
+from app.extensions import db
+from app.models import User
+from app.services.user_cache import CachedUser, UserCache, user_cache
+from tests.factories import log_in, make_user
+
+
+def _queries(action) -> int:
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(db.engine, "before_cursor_execute", listener)
+    try:
+        action()
+    finally:
+        event.remove(db.engine, "before_cursor_execute", listener)
+    return len([statement for statement in statements if "FROM users" in statement])
+
+
+def test_cache_serves_slim_snapshot_and_counts_hits(app):
+    with app.app_context():
+        user_id = make_user("collector", bio="Long biography", notification_prefs={"outbid": False}).id
+
+        assert _queries(lambda: user_cache.get(user_id)) == 1
+        assert _queries(lambda: user_cache.get(user_id)) == 0
+        cached = user_cache.get(user_id)
+
+        assert isinstance(cached, CachedUser)
+        assert cached.username == "collector" and cached.is_authenticated and cached.get_id() == str(user_id)
+        assert not hasattr(cached, "bio")
+        stats = user_cache.stats()
+        assert (stats.hits, stats.misses) == (2, 1)
+        assert round(stats.hit_rate, 2) == 0.67
+
+
+def test_committed_profile_admin_and_password_edits_invalidate(app):
+    with app.app_context():
+        user = make_user("collector")
+        user_cache.get(user.id)
+
+        user.last_login = None
+        user.bio = "Not part of the snapshot"
+        db.session.commit()
+        assert user_cache.stats().invalidations == 0
+
+        user.is_admin = True
+        db.session.commit()
+        assert user_cache.get(user.id).is_admin
+
+        user.password_hash = "changed"
+        db.session.flush()
+        db.session.rollback()
+        assert user_cache.stats().invalidations == 1
+
+        user.password_hash = "changed"
+        db.session.commit()
+        assert user_cache.stats().invalidations == 2
+
+
+def test_lru_evicts_oldest_entry(app):
+    with app.app_context():
+        ids = [make_user(f"user{index}").id for index in range(3)]
+        cache = UserCache(max_entries=2)
+        for user_id in ids:
+            cache.get(user_id)
+
+        assert cache.stats().evictions == 1
+        assert _queries(lambda: cache.get(ids[0])) == 1
+        assert cache.get(999) is None
+
+
+def test_authenticated_requests_reuse_the_cached_user(app, client):
+    with app.app_context():
+        user = make_user("collector")
+        log_in(client, user)
+
+    client.get("/dashboard/")
+    with app.app_context():
+        assert _queries(lambda: client.get("/dashboard/")) == 0
+    assert user_cache.stats().hits >= 1
@@ -0,0 +1,78 @@
+from sqlalchemy import event
+
+from app.extensions import db
+from app.models import Listing, Watchlist
+from app.services.view_counter import ViewCounter, view_counter
+from tests.factories import make_listing, make_user
+
+
+def test_flush_applies_all_pending_views_in_one_update_without_touching_updated_at(app):
+    with app.app_context():
+        seller = make_user("seller")
+        first, second = make_listing(seller), make_listing(seller, title="Second listing")
+        stamps = {first.id: first.updated_at, second.id: second.updated_at}
+
+        counter = ViewCounter(flush_seconds=0, flush_hits=1000)
+        for _ in range(3):
+            counter.record(first.id)
+        counter.record(second.id)
+
+        statements = []
+        listener = lambda conn, cursor, statement, *args: statements.append(statement)
+        event.listen(db.engine, "before_cursor_execute", listener)
+        try:
+            assert counter.flush() == 4
+        finally:
+            event.remove(db.engine, "before_cursor_execute", listener)
+
+        assert len([statement for statement in statements if statement.startswith("UPDATE listings")]) == 1
+        db.session.expire_all()
+        assert db.session.get(Listing, first.id).views == 3
+        assert db.session.get(Listing, second.id).views == 1
+        assert {listing.id: listing.updated_at for listing in Listing.query.all()} == stamps
+        assert counter.pending(first.id) == 0
+
+
+def test_hit_threshold_flushes_without_a_background_thread(app):
+    with app.app_context():
+        listing = make_listing(make_user("seller"))
+        counter = ViewCounter(flush_seconds=0, flush_hits=2)
+
+        counter.record(listing.id)
+        assert counter.flushes == 0 and counter.pending(listing.id) == 1
+
+        counter.record(listing.id)
+        assert counter.flushes == 1 and counter.pending(listing.id) == 0
+        db.session.expire_all()
+        assert db.session.get(Listing, listing.id).views == 2
+
+
+def test_detail_page_counts_views_including_unflushed_hits(app, client):
+    with app.app_context():
+        listing_id = make_listing(make_user("seller")).id
+
+    client.get(f"/listings/{listing_id}")
+    response = client.get(f"/listings/{listing_id}")
+
+    assert response.status_code == 200
+    assert b"2 views" in response.data
+    assert view_counter.pending(listing_id) == 2
+    assert client.get("/listings/9999").status_code == 404
+
+
+def test_inline_flush_leaves_the_request_session_alone(app):
+    with app.app_context():
+        collector, listing = make_user("collector"), make_listing(make_user("seller"))
+        collector_id, listing_id = collector.id, listing.id
+        db.session.commit()
+        counter = ViewCounter(flush_seconds=0, flush_hits=1)
+
+        watch = Watchlist(user_id=collector_id, listing_id=listing_id)
+        db.session.add(watch)
+        counter.record(listing_id)
+        assert counter.flushes == 1
+        assert watch in db.session.new
+
+        db.session.rollback()
+        assert Watchlist.query.count() == 0
+        assert db.session.get(Listing, listing_id).views == 1
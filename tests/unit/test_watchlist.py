@@ -0,0 +1,64 @@
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+
+from app.extensions import db
+from app.models import Watchlist
+from app.services.watchlist import add_to_watchlist, ending_soon
+from app.utils.dates import utcnow
+from tests.factories import log_in, make_listing, make_user
+
+
+def test_bulk_add_and_remove_deduplicate(app, client):
+    with app.app_context():
+        collector, seller = make_user("collector"), make_user("seller")
+        listing_ids = [make_listing(seller).id for _ in range(3)]
+        draft = make_listing(seller, status="draft").id
+        log_in(client, collector)
+
+    response = client.post("/api/watchlist/add", json={"listing_ids": listing_ids[:2] + [listing_ids[0], draft, 999]})
+    assert response.get_json() == {"ok": True, "added": 2, "existing": 0, "unavailable": 2}
+    response = client.post("/api/watchlist/add", json={"listing_ids": listing_ids})
+    assert response.get_json() == {"ok": True, "added": 1, "existing": 2, "unavailable": 0}
+
+    assert client.post("/api/watchlist/remove", json={"listing_ids": listing_ids[1:] + [999]}).get_json()["removed"] == 2
+    assert client.post("/api/watchlist/add", json={"listing_ids": ["1"]}).status_code == 400
+
+    with app.app_context():
+        assert db.session.scalar(select(func.count()).select_from(Watchlist)) == 1
+        db.session.add(Watchlist(user_id=collector.id, listing_id=listing_ids[0]))
+        with pytest.raises(IntegrityError):
+            db.session.commit()
+
+
+def test_ending_soon_merges_chunks_in_deadline_order(app):
+    app.config["WATCHLIST_MERGE_CHUNK_SIZE"] = 2
+    with app.app_context():
+        collector, seller = make_user("collector"), make_user("seller")
+        now = utcnow()
+        hours = [5, 1, 7, 3, 2, 6, 4]
+        listings = [make_listing(seller, auction_end=now + timedelta(hours=hour)) for hour in hours]
+        ended = make_listing(seller, auction_end=now - timedelta(hours=1))
+        sold = make_listing(seller, status="sold", auction_end=now + timedelta(minutes=30))
+        make_listing(seller, auction_end=now + timedelta(minutes=10))
+        add_to_watchlist(collector.id, [listing.id for listing in listings] + [ended.id, sold.id])
+        db.session.commit()
+
+        feed = ending_soon(collector.id, limit=4, now=now)
+        assert [listing.auction_end - now for listing in feed] == [timedelta(hours=hour) for hour in (1, 2, 3, 4)]
+        assert len(ending_soon(collector.id, limit=20, now=now)) == len(hours)
+
+
+def test_dashboard_shows_watched_auctions(app, client):
+    with app.app_context():
+        collector, seller = make_user("collector"), make_user("seller")
+        add_to_watchlist(collector.id, [make_listing(seller, title="Tioga Junior 1951").id])
+        db.session.commit()
+        log_in(client, collector)
+
+    page = client.get("/dashboard/")
+    assert page.status_code == 200
+    assert b"Tioga Junior 1951" in page.data
+    assert client.get("/api/watchlist/ending-soon").get_json()["items"][0]["title"] == "Tioga Junior 1951"